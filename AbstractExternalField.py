@@ -14,6 +14,9 @@ class AbstractExternalFieldClass(ABC, GenericFieldClass):
             name (str): Name of EM field
             listOfDimensions (list): List of maximum and minimum dimensions
                 of the field in 3D space
+            timeFactorCache (list): The time, angular frequency and phase shift that the cosine
+                function of the field was last found for, and its value, which is reused until one
+                of them changes
     """
 
     def __init__(self, fieldStrength=np.array([0, 0, 0], dtype=float)
@@ -36,7 +39,7 @@ class AbstractExternalFieldClass(ABC, GenericFieldClass):
         self.phaseShift = phaseShift
         self.name = name
         self.listOfDimensions = listOfDimensions
-
+        self.timeFactorCache = None
 
     @abstractmethod 
     def __repr__(self):
@@ -59,17 +62,63 @@ class AbstractExternalFieldClass(ABC, GenericFieldClass):
                 boundaries in that dimension. 0.0 means the particle is outside of the field
                 boundaries in that dimension.
         """
-        # self.listOfDimensions[i][0]: minimum limit
-        # self.listOfDimensions[i][1]: maximum limit
-        # if both conditions are true, no change is made to isInFieldValue
         # if isInFieldValue is 1.0, field is applied. If isInFieldValue is 0.0, field is not applied
-        isInFieldValue = 1.0
-        for i in range(3):
-            if not (affectedParticle.position[i] > self.listOfDimensions[i][0]
-            and affectedParticle.position[i] < self.listOfDimensions[i][1]):
-                isInFieldValue = 0.0
-        return isInFieldValue
-           
+        return float(AbstractExternalFieldClass.IsPositionInField(self, affectedParticle.position))
+
+    def IsPositionInField(self, arrayOfPositions):
+        """ Method determines whether each of an array of positions is within this field's dimensions,
+                with the same boundaries as IsParticleInField()
+
+        Args:
+            arrayOfPositions (ndarray): Array of positions, with the three dimensions along the last axis
+
+        Returns:
+            isInField (ndarray): Boolean array with one value for each position, True if the position
+                is within the boundaries of the field in every dimension
+        """
+        minimumCorner = np.array([i[0] for i in self.listOfDimensions], dtype=float)
+        maximumCorner = np.array([i[1] for i in self.listOfDimensions], dtype=float)
+        return np.all((arrayOfPositions > minimumCorner) & (arrayOfPositions < maximumCorner), axis=-1)
+
+    def FindTimeFactor(self, timeElapsed):
+        """ Method that returns the value of the cosine function of the field at a time. The value is
+                kept until the time, angular frequency or phase shift changes, so it is found once for
+                each field in a step however many times the field is evaluated.
+
+        Args:
+            timeElapsed (float): Time that has elapsed in the simulation
+
+        Returns:
+            timeFactor (float): The cosine of the angular frequency multiplied by the time, plus the
+                phase shift
+        """
+        timeFactorCache = getattr(self, 'timeFactorCache', None)
+        if timeFactorCache is not None and timeFactorCache[:3] == [timeElapsed, self.angularFrequency
+        , self.phaseShift]:
+            return timeFactorCache[3]
+
+        # cosine function will return the amplitude of the field with fieldStrength
+        # if angularFrequency is 0.0
+        # phaseShift refers to the fraction of a period that the field is shifted by
+        timeFactor = math.cos(self.angularFrequency * timeElapsed + self.phaseShift * 2 * math.pi)
+        self.timeFactorCache = [timeElapsed, self.angularFrequency, self.phaseShift, timeFactor]
+        return timeFactor
+
+    def GenerateFieldAtPositions(self, timeElapsed, arrayOfPositions):
+        """Calculates the field in 3D at every one of an array of positions at once, using a cosine
+                function that is found once for the time.
+
+        Args:
+            timeElapsed (float): Time that has elapsed in the simulation
+            arrayOfPositions (ndarray): N x 3 array of the positions where the field is found
+
+        Returns:
+            Strength of Field (ndarray): N x 3 array of the strength of the field at each position,
+                which is zero outside of the dimensions of the field
+        """
+        return (AbstractExternalFieldClass.FindTimeFactor(self, timeElapsed)
+        * (AbstractExternalFieldClass.IsPositionInField(self, arrayOfPositions)[:, np.newaxis] * self.fieldStrength))
+
     def GenerateField(self, timeElapsed, affectedParticle):
         """Calculates the magntiude of the field in 3D using a cosine function.
 
@@ -80,11 +129,5 @@ class AbstractExternalFieldClass(ABC, GenericFieldClass):
         Returns:
             Strength of Field (ndarray): Strength of the field in three dimensions.
         """
-        # calls isParticleInField to determine if the affected particle
-        # is within the boundaries of the field. 
-        # cosine function will return the amplitude of the field with fieldStrength
-        # if angularFrequency is 0.0
-        # phaseShift refers to the fraction of a period that the field is shifted by
-        return (math.cos(self.angularFrequency * timeElapsed 
-        + self.phaseShift * 2 * math.pi) * np.multiply(AbstractExternalFieldClass.IsParticleInField(self, affectedParticle)
-        , self.fieldStrength))
+        return AbstractExternalFieldClass.GenerateFieldAtPositions(self, timeElapsed
+        , np.array([affectedParticle.position], dtype=float))[0]
@@ -0,0 +1,57 @@
+import numpy as np
+from abc import ABC, abstractmethod
+
+class AbstractFieldSolverClass(ABC):
+    """ Abstract base class for methods of finding the electromagnetic fields that particles
+            in a bunch generate at the positions of other particles.
+
+        Class Attributes:
+            name (string): Name of the field solver
+    """
+
+    def __init__(self, name='Abstract Field Solver'):
+        """ Constructor for any field solver.
+
+            Args:
+                name (string): Name of the field solver
+        """
+        self.name = name
+
+    @abstractmethod
+    def __repr__(self):
+        return 'Field Solver: {0}'.format(self.name)
+
+    @abstractmethod
+    def GenerateBunchFields(self, sourceBunch, affectedBunch):
+        """ Abstract method for finding the electric and magnetic fields of the particles in the
+                sourceBunch at the position of every particle in the affectedBunch. Method is abstract
+                since each solver trades accuracy for speed differently.
+
+            Args:
+                sourceBunch (object: ParticleBunch): The bunch of particles that generates the fields
+                affectedBunch (object: ParticleBunch): The bunch of particles affected by the fields.
+                    If this is the sourceBunch, a particle does not interact with its own field.
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): N x 3 arrays of the electric
+                    and magnetic field at the position of each affected particle
+        """
+        pass
+
+    def GenerateFieldsAtParticles(self, sourceBunch, arrayOfIndices):
+        """ Method for finding the electric and magnetic fields of the particles in the sourceBunch
+                at the position of some of the particles of the same bunch. A particle does not
+                interact with its own field. This finds the fields of the whole bunch and keeps
+                the fields of the chosen particles, and is replaced by solvers that can find the
+                fields at some particles for less cost.
+
+            Args:
+                sourceBunch (object: ParticleBunch): The bunch of particles that generates the fields
+                arrayOfIndices (ndarray): Indices of the M particles of the sourceBunch that are affected
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): M x 3 arrays of the electric
+                    and magnetic field at the position of each chosen particle
+        """
+        fields = self.GenerateBunchFields(sourceBunch, sourceBunch)
+        return [fields[0][arrayOfIndices], fields[1][arrayOfIndices]]
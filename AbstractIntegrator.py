@@ -0,0 +1,121 @@
+import numpy as np
+import scipy.constants as const
+from abc import ABC, abstractmethod
+
+class AbstractIntegratorClass(ABC):
+    """ Abstract base class for methods of moving a bunch of particles forward by one timestep.
+
+            Apart from the Euler Cromer method, the integrators act on the state of every particle
+            as a position and a momentum per unit rest mass (Lorentz factor multiplied by velocity),
+            so that the velocity that is found from the state is always below the speed of light.
+
+        Class Attributes:
+            name (string): Name of the integrator
+            numberOfFieldEvaluations (int): The number of times the fields acting on the whole bunch
+                have been found by the integrator, which is the expensive part of a timestep
+    """
+
+    def __init__(self, name='Abstract Integrator'):
+        """ Constructor for any integrator.
+
+            Args:
+                name (string): Name of the integrator
+        """
+        self.name = name
+        self.numberOfFieldEvaluations = 0
+
+    @abstractmethod
+    def __repr__(self):
+        return 'Integrator: {0}'.format(self.name)
+
+    @abstractmethod
+    def Step(self, particleBunch, totalEMField, timeElapsed, timestep, limitVelocity:bool=True):
+        """ Abstract method for moving the particle bunch forward in time. Method is abstract since
+                each integrator trades the number of field evaluations for accuracy differently.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is moved
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): Time that the update lasts for. Adaptive integrators treat this
+                    as the longest timestep they may take.
+                limitVelocity (bool): If True, an integrator that can push a particle faster than
+                    light shortens the timestep until it does not
+
+            Returns:
+                [timestep, numberOfTimesBreakIsPrevented] (list): The timestep that was taken and the
+                    number of times that it was made 10 times smaller to stay below the speed of light
+        """
+        pass
+
+    def FindMomenta(self, particleBunch):
+        """ Method that returns the momentum per unit rest mass of every particle in the bunch.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+
+            Returns:
+                arrayOfMomenta (ndarray): N x 3 array of the Lorentz factor multiplied by velocity
+        """
+        return particleBunch.FindLorentzFactors()[:, np.newaxis] * particleBunch.arrayOfVelocities
+
+    def FindVelocities(self, arrayOfMomenta):
+        """ Method that returns the velocities that belong to an array of momenta per unit rest mass.
+
+            Args:
+                arrayOfMomenta (ndarray): N x 3 array of the Lorentz factor multiplied by velocity
+
+            Returns:
+                arrayOfVelocities (ndarray): N x 3 array of velocities, which are below the speed of light
+        """
+        lorentzFactors = np.sqrt(1 + np.einsum('ij,ij->i', arrayOfMomenta, arrayOfMomenta)
+        / (const.speed_of_light * const.speed_of_light))
+        return arrayOfMomenta / lorentzFactors[:, np.newaxis]
+
+    def FindDerivatives(self, particleBunch, totalEMField, timeElapsed, arrayOfPositions, arrayOfMomenta):
+        """ Method that places the bunch at a trial state and returns the rate of change of the position
+                and the momentum per unit rest mass of every particle. Every particle, including the
+                particles that generate the fields, is moved to the trial state.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time at which the fields are found
+                arrayOfPositions (ndarray): N x 3 array of trial positions
+                arrayOfMomenta (ndarray): N x 3 array of trial momenta per unit rest mass
+
+            Parameters:
+                electromagneticFields (list): N x 3 arrays of the electric and magnetic fields acting
+                    on each particle
+
+            Returns:
+                [arrayOfVelocities, arrayOfForces] (list): N x 3 arrays of the velocity of each particle
+                    and the Lorentz force on each particle divided by its rest mass
+        """
+        arrayOfVelocities = AbstractIntegratorClass.FindVelocities(self, arrayOfMomenta)
+        particleBunch.arrayOfPositions[:] = arrayOfPositions
+        particleBunch.arrayOfVelocities[:] = arrayOfVelocities
+
+        electromagneticFields = totalEMField.SumOfEMFieldsForBunch(particleBunch, timeElapsed)
+        self.numberOfFieldEvaluations += 1
+
+        arrayOfForces = ((particleBunch.arrayOfCharges / particleBunch.arrayOfRestMasses)[:, np.newaxis]
+        * (electromagneticFields[0] + np.cross(arrayOfVelocities, electromagneticFields[1])))
+
+        return [arrayOfVelocities, arrayOfForces]
+
+    def SetState(self, particleBunch, arrayOfInitialVelocities, arrayOfPositions, arrayOfMomenta, timestep):
+        """ Method that places the bunch at the state found at the end of a timestep.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                arrayOfInitialVelocities (ndarray): N x 3 array of velocities at the start of the timestep
+                arrayOfPositions (ndarray): N x 3 array of positions at the end of the timestep
+                arrayOfMomenta (ndarray): N x 3 array of momenta per unit rest mass at the end of the timestep
+                timestep (float): Time that the update lasted for
+        """
+        arrayOfVelocities = AbstractIntegratorClass.FindVelocities(self, arrayOfMomenta)
+        # the mean acceleration over the update is kept for methods that use acceleration
+        particleBunch.arrayOfAccelerations[:] = (arrayOfVelocities - arrayOfInitialVelocities) / timestep
+        particleBunch.arrayOfVelocities[:] = arrayOfVelocities
+        particleBunch.arrayOfPositions[:] = arrayOfPositions
@@ -1,11 +1,22 @@
 from abc import ABC, abstractmethod
 import numpy as np
+import math
 import pandas as pd
 from copy import deepcopy
 import scipy.constants as const
+import pickle
+import time
+import os
+import warnings
 from ParticleBunchClass import ParticleBunch
 from SumEMFields import EMFieldClass
 from Particle import Particle
+from EulerCromerIntegrator import EulerCromerIntegratorClass
+from BorisIntegrator import BorisIntegratorClass
+from RecordingPolicy import RecordingPolicyClass
+
+# the integrator that each push method of the deprecated pushMethod argument stands for
+dictionaryOfPushMethods = {'Cromer':EulerCromerIntegratorClass, 'Boris':BorisIntegratorClass}
 
 class AbstractSimulationClass(ABC):
     """ Abstract base class for building a simulation or set of simulations
@@ -20,10 +31,27 @@ class AbstractSimulationClass(ABC):
                 outside of the accelerating electric field
             smallTimeStep (float): The shorter timestep that is used when on average, the
                 bunch is inside of the accelerating electric field.
+            integrator (object: AbstractIntegratorClass): Method used to move the particles each timestep.
+            timestepController (object: TimestepControllerClass): Chooses each timestep from the state
+                of the bunch. If None, largeTimestep and smallTimestep are used.
+            exactGyration (object: ExactGyrationClass): Moves the bunch along exact helices while it is
+                only acted on by static uniform magnetic fields. If None, the integrator is always used.
+            recordingInterval (float): Longest time between recordings of the bunch during a jump along
+                exact helices. If None, a jump may last until the end of the simulation.
+            recordingPolicy (object: RecordingPolicyClass): Decides which steps are recorded in the
+                history of the simulation.
+            checkpointFile (string): File that the state of the simulation is saved to while it runs.
+                If None, no checkpoints are saved.
+            checkpointInterval (float): Wall clock time in seconds between checkpoints
+            lastCheckpointTime (float): Wall clock time of the last checkpoint, or of the start of the run
+            resampler (object: MacroParticleResamplerClass): Splits and merges the macro-particles of the
+                bunch as it changes shape. If None, the particles of the bunch are never changed.
 
     """
     def __init__(self, totalEMField=EMFieldClass, particleBunch=ParticleBunch, duration=1.0, largeTimestep=1e-3
-    , smallTimestep=1e-8):
+    , smallTimestep=1e-8, integrator=None
+    , timestepController=None, exactGyration=None, recordingInterval=None, recordingPolicy=None
+    , checkpointFile:str=None, checkpointInterval:float=600.0, resampler=None, pushMethod:str=None):
         """ Constructor for any simulation child class.
 
             Args:
@@ -36,12 +64,232 @@ class AbstractSimulationClass(ABC):
                     outside of the accelerating electric field
                 smallTimeStep (float): The shorter timestep that is used when on average, the
                     bunch is inside of the accelerating electric field.
+                integrator (object: AbstractIntegratorClass): Method used to move the particles each
+                    timestep. If None, the Euler Cromer method is used.
+                timestepController (object: TimestepControllerClass): Chooses each timestep from the
+                    state of the bunch. If None, smallTimestep is used while the mean x position of the
+                    bunch is inside the accelerating electric field, and largeTimestep otherwise.
+                exactGyration (object: ExactGyrationClass): Moves the bunch along exact helices while it
+                    is only acted on by static uniform magnetic fields. If None, the integrator is always used.
+                recordingInterval (float): Longest time between recordings of the bunch during a jump
+                    along exact helices. If None, a jump may last until the end of the simulation.
+                recordingPolicy (object: RecordingPolicyClass): Decides which steps are recorded in the
+                    history of the simulation. If None, every step is recorded.
+                checkpointFile (string): File that the state of the simulation is saved to while it runs,
+                    so that it can be resumed with ResumeSimulation(). If None, no checkpoints are saved.
+                checkpointInterval (float): Wall clock time in seconds between checkpoints
+                resampler (object: MacroParticleResamplerClass): Splits and merges the macro-particles of
+                    the bunch every stepInterval steps. If None, the particles of the bunch are never changed.
+                pushMethod (string): Deprecated name of the integrator from before integrators could be
+                    chosen, kept so that older scripts run. 'Cromer' is the same as an
+                    EulerCromerIntegratorClass and 'Boris' is the same as a BorisIntegratorClass.
+
+            Raises:
+                ValueError: If pushMethod is not 'Cromer' or 'Boris', or is given with an integrator
         """
         self.totalEMField = totalEMField
         self.particleBunch = particleBunch
         self.duration = duration
         self.largeTimestep = largeTimestep
         self.smallTimestep = smallTimestep
+        if pushMethod is not None:
+            if pushMethod not in dictionaryOfPushMethods:
+                raise ValueError("pushMethod must be 'Cromer' or 'Boris', not %s"%(pushMethod))
+            if integrator is not None:
+                raise ValueError("pushMethod and integrator can not both be given")
+            warnings.warn("pushMethod is deprecated, use integrator=%s() instead"
+            %(dictionaryOfPushMethods[pushMethod].__name__), DeprecationWarning, stacklevel=3)
+            integrator = dictionaryOfPushMethods[pushMethod]()
+        if integrator is None:
+            integrator = EulerCromerIntegratorClass()
+        self.integrator = integrator
+        self.timestepController = timestepController
+        self.exactGyration = exactGyration
+        self.recordingInterval = recordingInterval
+        if recordingPolicy is None:
+            recordingPolicy = RecordingPolicyClass()
+        self.recordingPolicy = recordingPolicy
+        self.checkpointFile = checkpointFile
+        self.checkpointInterval = checkpointInterval
+        self.lastCheckpointTime = None
+        self.resampler = resampler
+
+    def FindTimestep(self, timeElapsed, acceleratingFieldDimensions=None):
+        """ Method that returns the timestep for the next update of the bunch.
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the current simulation
+                acceleratingFieldDimensions (list): Minimum and maximum x dimensions of the accelerating
+                    electric field, used when there is no timestep controller. If None, largeTimestep
+                    is always used.
+
+            Parameters:
+                meanXPosition (float): The mean x position of the bunch
+
+            Returns:
+                timestep (float): The timestep of the next update
+        """
+        if self.timestepController is not None:
+            return self.timestepController.FindTimestep(self.particleBunch, self.totalEMField, timeElapsed)
+
+        timestep = self.largeTimestep
+        if acceleratingFieldDimensions is None:
+            return timestep
+
+        # this simulation accelerates a bunch of particles about the x-z plane, starting at
+        # 0.0, 0.0, 0.0 . As a result, the x position of the bunch is useful at informing 
+        # where accelerating electric fields will be.
+        meanXPosition = self.particleBunch.FindBunchMeanPosition()[0]
+
+        # if the particles are inside of the accelerating field, the simulation runs slower
+        if (meanXPosition < acceleratingFieldDimensions[1] and 
+            meanXPosition > acceleratingFieldDimensions[0]):
+                timestep = self.smallTimestep
+
+        return timestep
+
+    def FindLongestJump(self, timeElapsed):
+        """ Method that returns the longest time that the bunch may be moved along exact helices,
+                which ends at the next recording time or at the end of the simulation. The next
+                recording time is set by recordingInterval and by the timeInterval of the recording
+                policy.
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the current simulation
+
+            Returns:
+                longestJump (float): Time until the next recording time or the end of the simulation
+        """
+        longestJump = self.duration - timeElapsed
+        if self.recordingInterval is not None:
+            nextRecordingTime = (math.floor(timeElapsed / self.recordingInterval + 1e-9) + 1) * self.recordingInterval
+            longestJump = min(longestJump, nextRecordingTime - timeElapsed)
+        if self.recordingPolicy.timeInterval is not None and self.recordingPolicy.nextRecordingTime > timeElapsed:
+            longestJump = min(longestJump, self.recordingPolicy.nextRecordingTime - timeElapsed)
+
+        return longestJump
+
+    def IsRecordingStep(self, timeElapsed, timestep):
+        """ Method that returns whether the current step is recorded in the history of the simulation,
+                as decided by the recording policy.
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the current simulation
+                timestep (float): The timestep of the step
+
+            Returns:
+                isRecording (bool): True if the step is recorded
+        """
+        return self.recordingPolicy.IsRecordingStep(self, timeElapsed, timestep)
+
+    def FindListOfHistories(self):
+        """ Method that returns the lists that make up the history of the simulation, which each gain
+                one item with every record. Simulations that keep a history override this method.
+
+            Returns:
+                listOfHistories (list): The lists of the history of the simulation
+        """
+        return []
+
+    def CountRecord(self):
+        """ Method that is called after a record is added to the history of the simulation, so that
+                the recording policy can halve the history if it has reached its maximum number of records.
+        """
+        self.recordingPolicy.CountRecord(self.FindListOfHistories())
+
+    def ResampleBunch(self):
+        """ Method that is called at the start of every step, and splits and merges the macro-particles
+                of the bunch when the resampler decides that the step is a resampling step.
+
+            Returns:
+                isResampled (bool): True if the bunch was resampled
+        """
+        if self.resampler is None or not self.resampler.IsResamplingStep():
+            return False
+        self.resampler.Resample(self.particleBunch)
+        return True
+
+    def IsCheckpointDue(self):
+        """ Method that returns whether a checkpoint should be saved, which is when checkpointInterval
+                seconds of wall clock time have passed since the last checkpoint.
+
+            Returns:
+                isCheckpointDue (bool): True if a checkpoint should be saved
+        """
+        if self.checkpointFile is None:
+            return False
+        if self.lastCheckpointTime is None:
+            self.lastCheckpointTime = time.time()
+        return time.time() - self.lastCheckpointTime >= self.checkpointInterval
+
+    def CreateCheckpoint(self, timeElapsed):
+        """ Method that returns the full state of the simulation as an in-memory checkpoint. The
+                simulation is pickled, which keeps the bunch arrays, the state of the fields, integrator,
+                timestep controller, recording policy and trajectory recorder, and the history held in
+                memory, and continues exactly as if it had not been stopped.
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the current simulation, at the start of
+                    the next step
+
+            Returns:
+                checkpoint (bytes): The pickled simulation and time
+        """
+        return pickle.dumps({'timeElapsed':timeElapsed, 'simulation':self}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def SaveCheckpoint(self, timeElapsed):
+        """ Method that saves the checkpoint of CreateCheckpoint() to checkpointFile. The checkpoint
+                is written under another name and then renamed, so a crash while it is written leaves
+                the last checkpoint complete.
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the current simulation, at the start of
+                    the next step
+        """
+        self.lastCheckpointTime = time.time()
+        temporaryFileName = "%s.tmp"%(self.checkpointFile)
+        with open(temporaryFileName, 'wb') as checkpoint:
+            checkpoint.write(AbstractSimulationClass.CreateCheckpoint(self, timeElapsed))
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(temporaryFileName, self.checkpointFile)
+
+    def UpdateBunch(self, timeElapsed, timestep, limitVelocity:bool=True):
+        """ Method that moves the particle bunch forward by one timestep with the integrator of
+                the simulation. If the simulation has an exact gyration and every particle is only
+                acted on by static uniform magnetic fields, the bunch is instead moved along exact
+                helices until the first particle reaches the boundary of a field, the next recording
+                time or the end of the simulation, whenever this is longer than the timestep.
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the current simulation
+                timestep (float): Time that the update lasts for. Adaptive integrators may take a
+                    shorter timestep.
+                limitVelocity (bool): If True, the Euler Cromer timestep is made 10 times smaller until
+                    the mean velocity of the bunch after the update is below the speed of light. The
+                    other integrators never reach the speed of light so do not need this check.
+
+            Returns:
+                [timestep, numberOfTimesBreakIsPrevented] (list): The timestep that was used and the
+                    number of times that it was made 10 times smaller. The timestep is recorded by the
+                    timestep controller.
+        """
+        if self.exactGyration is not None:
+            jumpTime = self.exactGyration.Jump(self.particleBunch, self.totalEMField, timeElapsed, timestep
+            , AbstractSimulationClass.FindLongestJump(self, timeElapsed))
+            if jumpTime > 0:
+                if self.timestepController is not None:
+                    self.timestepController.lastLimit = 'exact gyration'
+                    self.timestepController.RecordTimestep(self.particleBunch, timeElapsed, jumpTime)
+                return [jumpTime, 0]
+
+        timestep, numberOfTimesBreakIsPrevented = self.integrator.Step(self.particleBunch, self.totalEMField
+        , timeElapsed, timestep, limitVelocity=limitVelocity)
+
+        if self.timestepController is not None:
+            self.timestepController.RecordTimestep(self.particleBunch, timeElapsed, timestep)
+
+        return [timestep, numberOfTimesBreakIsPrevented]
 
     @abstractmethod
     def RunSimulation(self):
@@ -51,11 +299,41 @@ class AbstractSimulationClass(ABC):
         """
     
     @abstractmethod
-    def SaveSimulation(self, fileName:str):
+    def SaveSimulation(self, fileName:str, fileFormat:str='pickle'):
         """ Abstract method for saving data from the simulation or set of simulations.
                 Method is abtract since different simulations generate results in 
-                different formats.
+                different formats. fileFormat is 'pickle' for a .pkl file of a pandas dataframe,
+                or 'columnar' for a directory in the format of ColumnarResults.
         """
     
 
+def LoadCheckpoint(checkpointFile):
+    """ Function that reads a checkpoint saved by SaveCheckpoint(), or made by CreateCheckpoint().
+
+        Args:
+            checkpointFile (string or bytes): The checkpoint file, or an in-memory checkpoint
+
+        Returns:
+            [simulation, timeElapsed] (list): The simulation and the time that had elapsed when the
+                checkpoint was saved
+    """
+    if isinstance(checkpointFile, bytes):
+        dictionary = pickle.loads(checkpointFile)
+    else:
+        with open(checkpointFile, 'rb') as checkpoint:
+            dictionary = pickle.load(checkpoint)
+    return [dictionary['simulation'], dictionary['timeElapsed']]
 
+def ResumeSimulation(checkpointFile):
+    """ Function that continues a simulation from a checkpoint until the end of its duration. The result
+            is identical, bit for bit, to a run that was never stopped.
+
+        Args:
+            checkpointFile (string or bytes): The checkpoint file, or an in-memory checkpoint
+
+        Returns:
+            simulation (object: AbstractSimulationClass): The simulation, which can then be saved
+    """
+    simulation, timeElapsed = LoadCheckpoint(checkpointFile)
+    simulation.RunSimulation(resumeTime=timeElapsed)
+    return simulation
@@ -0,0 +1,245 @@
+from AbstractFieldSolver import AbstractFieldSolverClass, np
+import CompiledKernels
+import scipy.constants as const
+
+class BarnesHutFieldSolverClass(AbstractFieldSolverClass):
+    """ Class that finds the fields between particles with a Barnes-Hut octree. Distant groups of
+            particles are replaced by a single point with their total charge and total current
+            (the sum of charge multiplied by velocity), so the cost grows as N log N rather than
+            the square of the number of particles. The affected particles walk the tree in groups of
+            nearby particles, with CompiledKernels.TreeFieldsKernel, which is compiled with Numba
+            when it is installed.
+
+        Class Attributes:
+            openingAngle (float): Ratio of the width of a node of the tree to its distance from
+                an affected particle below which the node is treated as a single point. Zero
+                gives the same result as the direct sum.
+            maximumParticlesPerLeaf (int): Largest number of particles in a node that is not
+                divided any further
+            name (string): Name of the field solver
+    """
+
+    def __init__(self, openingAngle=0.5, maximumParticlesPerLeaf:int=8, name='Barnes-Hut Field Solver'):
+        """ Constructor for the BarnesHutFieldSolverClass class.
+                Inherits the __init__ from AbstractFieldSolverClass.
+
+            Args:
+                openingAngle (float): Ratio of the width of a node of the tree to its distance from
+                    an affected particle below which the node is treated as a single point
+                maximumParticlesPerLeaf (int): Largest number of particles in a node that is not
+                    divided any further
+                name (string): Name of the field solver
+        """
+        super().__init__(name=name)
+        self.openingAngle = openingAngle
+        self.maximumParticlesPerLeaf = maximumParticlesPerLeaf
+
+    def __repr__(self):
+        return 'Barnes-Hut Field Solver: {0}, Opening Angle: {1}, Maximum Particles per Leaf: {2}'.format(
+            self.name, self.openingAngle, self.maximumParticlesPerLeaf)
+
+    def BuildTree(self, arrayOfPositions, arrayOfVelocities, arrayOfCharges):
+        """ Method that builds the octree of the source particles.
+                Each node stores its geometric centre and half width, its total charge, the centre
+                of its charge (weighted by the magnitude of each charge so that it is well defined
+                for particles of either sign) and its total current. Leaves also store the particles
+                that they contain, as a range of leafOrder.
+
+            Args:
+                arrayOfPositions (ndarray): N x 3 array of the positions of the source particles
+                arrayOfVelocities (ndarray): N x 3 array of the velocities of the source particles
+                arrayOfCharges (ndarray): Array of the N charges of the source particles
+
+            Returns:
+                tree (dict): Dictionary of arrays that describe every node in the tree
+        """
+        listOfCentres, listOfHalfWidths, listOfChildren = [], [], []
+        listOfLeafStarts, listOfLeafCounts, listOfLeafIndices = [], [], []
+        numberOfLeafParticles = 0
+
+        minimumCorner = np.min(arrayOfPositions, axis=0)
+        maximumCorner = np.max(arrayOfPositions, axis=0)
+        # the root is a cube that is slightly larger than the bunch so that no particle
+        # sits exactly on its boundary
+        rootHalfWidth = 0.5 * np.max(maximumCorner - minimumCorner) * (1 + 1e-9) + 1e-300
+        stack = [(0.5 * (minimumCorner + maximumCorner), rootHalfWidth
+        , np.arange(len(arrayOfPositions)), -1, 0)]
+
+        while stack:
+            centre, halfWidth, indices, parent, octant = stack.pop()
+            node = len(listOfCentres)
+            listOfCentres.append(centre)
+            listOfHalfWidths.append(halfWidth)
+            listOfChildren.append([-1] * 8)
+            if parent >= 0:
+                listOfChildren[parent][octant] = node
+
+            # coincident particles cannot be separated, so a node that has shrunk to nothing
+            # also becomes a leaf
+            if len(indices) <= self.maximumParticlesPerLeaf or halfWidth < 1e-12 * rootHalfWidth:
+                listOfLeafStarts.append(numberOfLeafParticles)
+                listOfLeafCounts.append(len(indices))
+                listOfLeafIndices.append(indices)
+                numberOfLeafParticles += len(indices)
+                continue
+
+            listOfLeafStarts.append(0)
+            listOfLeafCounts.append(-1) # -1 marks a node that has children
+            octants = ((arrayOfPositions[indices] > centre) * np.array([1, 2, 4])).sum(axis=1)
+            for i in np.unique(octants):
+                offset = (np.array([i & 1, (i >> 1) & 1, (i >> 2) & 1]) - 0.5) * halfWidth
+                stack.append((centre + offset, 0.5 * halfWidth, indices[octants == i], node, i))
+
+        tree = {'centre':np.array(listOfCentres), 'halfWidth':np.array(listOfHalfWidths)
+        , 'children':np.array(listOfChildren), 'leafStart':np.array(listOfLeafStarts)
+        , 'leafCount':np.array(listOfLeafCounts), 'leafOrder':np.concatenate(listOfLeafIndices)}
+
+        # the charge moments of each node are found by summing over the particles below it. Each
+        # particle is added to every node on its path from its leaf to the root.
+        numberOfNodes = len(listOfCentres)
+        parentOfNode = np.full(numberOfNodes, -1)
+        isChild = tree['children'] >= 0
+        parentOfNode[tree['children'][isChild]] = np.nonzero(isChild)[0]
+        leafNodes = np.nonzero(tree['leafCount'] >= 0)[0]
+        leafOfParticle = np.empty(len(arrayOfPositions), dtype=int)
+        leafOfParticle[tree['leafOrder']] = np.repeat(leafNodes, tree['leafCount'][leafNodes])
+
+        totalCharge = np.zeros(numberOfNodes)
+        totalAbsoluteCharge = np.zeros(numberOfNodes)
+        absoluteChargeMoment = np.zeros((numberOfNodes, 3))
+        totalCurrent = np.zeros((numberOfNodes, 3))
+        absoluteCharges = np.abs(arrayOfCharges)
+        currentNodes = leafOfParticle.copy()
+        while np.any(currentNodes >= 0):
+            active = currentNodes >= 0
+            nodes = currentNodes[active]
+            totalCharge += np.bincount(nodes, weights=arrayOfCharges[active], minlength=numberOfNodes)
+            totalAbsoluteCharge += np.bincount(nodes, weights=absoluteCharges[active], minlength=numberOfNodes)
+            for k in range(3):
+                absoluteChargeMoment[:, k] += np.bincount(nodes, weights=absoluteCharges[active]
+                * arrayOfPositions[active, k], minlength=numberOfNodes)
+                totalCurrent[:, k] += np.bincount(nodes, weights=arrayOfCharges[active]
+                * arrayOfVelocities[active, k], minlength=numberOfNodes)
+            currentNodes[active] = parentOfNode[nodes]
+
+        # a node without any charge has no field, so its geometric centre is used
+        hasCharge = totalAbsoluteCharge > 0
+        chargeCentre = tree['centre'].copy()
+        chargeCentre[hasCharge] = absoluteChargeMoment[hasCharge] / totalAbsoluteCharge[hasCharge, np.newaxis]
+
+        tree.update({'charge':totalCharge, 'chargeCentre':chargeCentre, 'current':totalCurrent})
+        return tree
+
+    def FindGroups(self, tree, arrayOfAffectedPositions):
+        """ Method that splits the affected positions into the leaves of an octree built around them, so
+                that each group of nearby positions walks the source tree together.
+
+            Args:
+                tree (dict): Octree of the affected positions returned by BuildTree()
+                arrayOfAffectedPositions (ndarray): M x 3 array of the positions where the field is found
+
+            Returns:
+                groups (dict): Dictionary of the order of the affected positions by group, the start and
+                    number of positions of each group in that order and the corners of the box around
+                    each group
+        """
+        leafNodes = np.nonzero(tree['leafCount'] >= 0)[0]
+        groupStarts = tree['leafStart'][leafNodes]
+        groupPositions = arrayOfAffectedPositions[tree['leafOrder']]
+
+        return {'order':tree['leafOrder'], 'start':groupStarts, 'count':tree['leafCount'][leafNodes]
+        , 'lowerCorner':np.minimum.reduceat(groupPositions, groupStarts, axis=0)
+        , 'upperCorner':np.maximum.reduceat(groupPositions, groupStarts, axis=0)}
+
+    def GenerateFieldsFromTree(self, tree, groups, arrayOfPositions, arrayOfVelocities, arrayOfCharges
+    , arrayOfAffectedPositions, arrayOfSelfIndices):
+        """ Method that walks the tree once for each group of affected positions, with
+                CompiledKernels.TreeFieldsKernel. A node is accepted as a single point for the whole
+                group if it is far enough from the box around the group, a leaf that is not is summed
+                directly, and any other node is replaced by its children. Walking the tree per group
+                rather than per position, with the tests of a pass done together, keeps the cost
+                growing as N log N.
+
+            Args:
+                tree (dict): Octree of the source particles returned by BuildTree()
+                groups (dict): Groups of the affected positions returned by FindGroups()
+                arrayOfPositions (ndarray): N x 3 array of the positions of the source particles
+                arrayOfVelocities (ndarray): N x 3 array of the velocities of the source particles
+                arrayOfCharges (ndarray): Array of the N charges of the source particles
+                arrayOfAffectedPositions (ndarray): M x 3 array of the positions where the field is found
+                arrayOfSelfIndices (ndarray): Array of the M indices of the source particle at each affected
+                    position, which does not interact with itself, or -1 if there is none
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): M x 3 arrays of the sum of
+                    charge times displacement over distance cubed, and of current cross displacement
+                    over distance cubed, at each affected position. These are multiplied by the
+                    constants of the electric and magnetic fields by GenerateBunchFields().
+        """
+        arrayOfElectricFields, arrayOfMagneticFields = CompiledKernels.TreeFieldsKernel(arrayOfPositions
+        , arrayOfVelocities, arrayOfCharges, arrayOfAffectedPositions, arrayOfSelfIndices, tree['centre']
+        , tree['halfWidth'], tree['children'], tree['leafStart'], tree['leafCount'], tree['leafOrder']
+        , tree['charge'], tree['chargeCentre'], tree['current'], groups['order'], groups['start']
+        , groups['count'], groups['lowerCorner'], groups['upperCorner'], float(self.openingAngle))
+
+        return [arrayOfElectricFields, arrayOfMagneticFields]
+
+    def GenerateBunchFields(self, sourceBunch, affectedBunch):
+        """ Method that returns the electric and magnetic fields of every particle in the sourceBunch
+                at the position of every particle in the affectedBunch, found with the octree. When the
+                bunches are the same, the leaves of the tree are the groups of affected particles.
+
+            Args:
+                sourceBunch (object: ParticleBunch): The bunch of particles that generates the fields
+                affectedBunch (object: ParticleBunch): The bunch of particles affected by the fields
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): N x 3 arrays of the electric
+                    and magnetic field at the position of each affected particle
+        """
+        if sourceBunch.numberOfParticles == 0 or affectedBunch.numberOfParticles == 0:
+            return [np.zeros((affectedBunch.numberOfParticles, 3)), np.zeros((affectedBunch.numberOfParticles, 3))]
+
+        sourceCharges = sourceBunch.FindSourceCharges()
+        tree = BarnesHutFieldSolverClass.BuildTree(self, sourceBunch.arrayOfPositions
+        , sourceBunch.arrayOfVelocities, sourceCharges)
+        if affectedBunch is sourceBunch:
+            groups = BarnesHutFieldSolverClass.FindGroups(self, tree, sourceBunch.arrayOfPositions)
+            arrayOfSelfIndices = np.arange(sourceBunch.numberOfParticles)
+        else:
+            groups = BarnesHutFieldSolverClass.FindGroups(self, BarnesHutFieldSolverClass.BuildTree(self
+            , affectedBunch.arrayOfPositions, affectedBunch.arrayOfVelocities
+            , np.zeros(affectedBunch.numberOfParticles)), affectedBunch.arrayOfPositions)
+            arrayOfSelfIndices = np.full(affectedBunch.numberOfParticles, -1)
+        fields = BarnesHutFieldSolverClass.GenerateFieldsFromTree(self, tree, groups, sourceBunch.arrayOfPositions
+        , sourceBunch.arrayOfVelocities, sourceCharges, affectedBunch.arrayOfPositions, arrayOfSelfIndices)
+
+        return [fields[0] / (4 * const.pi * const.epsilon_0), const.mu_0 * fields[1] / (4 * const.pi)]
+
+    def GenerateFieldsAtParticles(self, sourceBunch, arrayOfIndices):
+        """ Method that returns the electric and magnetic fields of every particle in the sourceBunch
+                at the position of some of the particles of the same bunch, found with the octree.
+                Only the chosen particles walk the tree, in groups from an octree of their positions.
+
+            Args:
+                sourceBunch (object: ParticleBunch): The bunch of particles that generates the fields
+                arrayOfIndices (ndarray): Indices of the M particles of the sourceBunch that are affected
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): M x 3 arrays of the electric
+                    and magnetic field at the position of each chosen particle
+        """
+        if sourceBunch.numberOfParticles == 0 or len(arrayOfIndices) == 0:
+            return [np.zeros((len(arrayOfIndices), 3)), np.zeros((len(arrayOfIndices), 3))]
+
+        sourceCharges = sourceBunch.FindSourceCharges()
+        tree = BarnesHutFieldSolverClass.BuildTree(self, sourceBunch.arrayOfPositions
+        , sourceBunch.arrayOfVelocities, sourceCharges)
+        affectedPositions = sourceBunch.arrayOfPositions[arrayOfIndices]
+        groups = BarnesHutFieldSolverClass.FindGroups(self, BarnesHutFieldSolverClass.BuildTree(self
+        , affectedPositions, sourceBunch.arrayOfVelocities[arrayOfIndices], np.zeros(len(arrayOfIndices)))
+        , affectedPositions)
+        fields = BarnesHutFieldSolverClass.GenerateFieldsFromTree(self, tree, groups, sourceBunch.arrayOfPositions
+        , sourceBunch.arrayOfVelocities, sourceCharges, affectedPositions, arrayOfIndices)
+
+        return [fields[0] / (4 * const.pi * const.epsilon_0), const.mu_0 * fields[1] / (4 * const.pi)]
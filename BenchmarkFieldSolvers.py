@@ -0,0 +1,71 @@
+from ParticleBunchClass import ParticleBunch
+from DirectSumFieldSolver import DirectSumFieldSolverClass
+from BarnesHutFieldSolver import BarnesHutFieldSolverClass
+from ParticleInCellFieldSolver import ParticleInCellFieldSolverClass
+import CompiledKernels
+
+import scipy.constants as const
+import numpy as np
+import time
+
+# Compares the time taken and the accuracy of the Barnes-Hut and particle-in-cell field solvers
+# against the exact direct sum for bunches of increasing size. The error is the median over all particles of the
+# norm of the difference in electric field divided by the norm of the exact electric field.
+# Every solver is timed with the NumPy form of the kernels, and with the compiled form as well if Numba is
+# installed, since the size of bunch above which the Barnes-Hut solver is faster than the direct sum
+# depends on which form is used. The direct sum with the NumPy form is skipped above
+# maximumNumPyDirectSumParticles particles, where it takes several minutes, and the errors of that form are then
+# found against the direct sum of the compiled form.
+
+listOfNumberOfParticles = [1000, 2000, 4000, 8000, 16000, 32000]
+listOfOpeningAngles = [0.3, 0.5, 0.8]
+listOfGridResolutions = [16, 32]
+maximumNumPyDirectSumParticles = 16000
+
+# the compiled form is timed first, so its exact fields can be used for the errors of the NumPy form
+listOfKernelNames = ['ElectricFieldKernel', 'MagneticFieldKernel', 'TreeFieldsKernel']
+dictionaryOfKernelForms = {}
+if CompiledKernels.isNumbaAvailable:
+    dictionaryOfKernelForms['numba'] = [getattr(CompiledKernels, i) for i in listOfKernelNames]
+dictionaryOfKernelForms['numpy'] = [getattr(CompiledKernels, i.replace('Kernel', 'NumPy')) for i in listOfKernelNames]
+
+directSumSolver = DirectSumFieldSolverClass()
+
+# the first call of a compiled kernel also compiles it, so a small bunch is solved before the timings
+warmUpBunch = ParticleBunch(numberOfParticles=100, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='Proton', seed=0)
+directSumSolver.GenerateBunchFields(warmUpBunch, warmUpBunch)
+BarnesHutFieldSolverClass().GenerateBunchFields(warmUpBunch, warmUpBunch)
+
+print("%10s %8s %12s %16s %14s" % ("Particles", "Kernels", "Solver", "Time (s)", "Median Error"))
+for numberOfParticles in listOfNumberOfParticles:
+    benchmarkBunch = ParticleBunch(numberOfParticles=numberOfParticles, bunchEnergySpread=1e-22
+    , bunchPositionSpread=1e-3, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+    , chargeOfBunch=const.elementary_charge, name='Proton', seed=0)
+    exactFields = None
+
+    for kernelForm, listOfKernels in dictionaryOfKernelForms.items():
+        for kernelName, kernel in zip(listOfKernelNames, listOfKernels):
+            setattr(CompiledKernels, kernelName, kernel)
+
+        if kernelForm == 'numba' or numberOfParticles <= maximumNumPyDirectSumParticles:
+            startTime = time.perf_counter()
+            exactFields = directSumSolver.GenerateBunchFields(benchmarkBunch, benchmarkBunch)
+            print("%10d %8s %12s %16.4f %14s" % (numberOfParticles, kernelForm, "direct"
+            , time.perf_counter() - startTime, "-"))
+
+        listOfSolvers = ([["theta=%s" % (i), BarnesHutFieldSolverClass(openingAngle=i)] for i in listOfOpeningAngles]
+        + [["grid=%s" % (i), ParticleInCellFieldSolverClass(gridResolution=i)] for i in listOfGridResolutions])
+
+        for solverName, solver in listOfSolvers:
+            startTime = time.perf_counter()
+            solverFields = solver.GenerateBunchFields(benchmarkBunch, benchmarkBunch)
+            timeTaken = time.perf_counter() - startTime
+            if exactFields is None:
+                print("%10d %8s %12s %16.4f %14s" % (numberOfParticles, kernelForm, solverName, timeTaken, "-"))
+                continue
+            medianError = np.median(np.linalg.norm(solverFields[0] - exactFields[0], axis=1)
+            / np.linalg.norm(exactFields[0], axis=1))
+            print("%10d %8s %12s %16.4f %14.2e" % (numberOfParticles, kernelForm, solverName, timeTaken
+            , medianError))
@@ -0,0 +1,148 @@
+from AbstractIntegrator import AbstractIntegratorClass, np
+from TimestepController import TimestepControllerClass
+
+class BlockTimestepIntegratorClass(AbstractIntegratorClass):
+    """ Class that moves each particle with its own timestep. The timestep given by the simulation is
+            a block that is split into power-of-two levels: a particle on level l takes steps of the
+            block divided by 2^l. The level of each particle is chosen from the timestep that the
+            timestep controller finds for that particle, so only the particles near a field
+            boundary or in a strong field take short steps.
+
+            The level of a particle is found again each time it starts a step, so a particle that
+            nears a field boundary part way through a block moves to shorter steps.
+
+            The particles are moved with the relativistic Boris method. When a particle starts a
+            step, only its own fields are found, half way through its step as BorisIntegratorClass
+            does. The other particles, which may be part way through a longer step, are moved along
+            their velocity to the same time while the fields are found.
+
+        Class Attributes:
+            timestepController (object: TimestepControllerClass): Finds the timestep of each particle,
+                and records arrays of the timestep and limit of every particle for each block
+            maximumLevel (int): The largest number of times the block may be halved
+            name (string): Name of the integrator
+            numberOfFieldEvaluations (float): The number of times the fields acting on the whole bunch
+                have been found by the integrator, where finding the fields of some of the particles
+                counts as the fraction of the bunch
+            numberOfParticleSteps (int): The number of steps taken by all particles
+            listOfLevelCounts (list): The number of particles on each level in every block
+    """
+
+    def __init__(self, timestepController=None, maximumLevel:int=10, name='Block Timestep Integrator'):
+        """ Constructor for the BlockTimestepIntegratorClass class.
+                Inherits the __init__ from AbstractIntegratorClass.
+
+            Args:
+                timestepController (object: TimestepControllerClass): Finds the timestep of each particle.
+                    If None, a TimestepControllerClass with its default limits is used.
+                maximumLevel (int): The largest number of times the block may be halved
+                name (string): Name of the integrator
+        """
+        super().__init__(name=name)
+        if timestepController is None:
+            timestepController = TimestepControllerClass()
+        self.timestepController = timestepController
+        self.maximumLevel = maximumLevel
+        self.numberOfParticleSteps = 0
+        self.listOfLevelCounts = []
+        self.endOfLastBlock = None
+
+    def __repr__(self):
+        return 'Block Timestep Integrator: {0}, Maximum Level: {1}'.format(self.name, self.maximumLevel)
+
+    def FindLevels(self, particleBunch, totalEMField, timeElapsed, timestep, arrayOfIndices=None):
+        """ Method that returns the level of each particle, which is the number of times the block
+                must be halved for the particle to take a step no longer than its own timestep.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): The length of the block
+                arrayOfIndices (ndarray): Indices of the M particles to find the level of. If None, the
+                    level of every particle is found.
+
+            Returns:
+                [arrayOfLevels, arrayOfLimits] (list): Level of each particle, between 0 and maximumLevel,
+                    and the limit that set the timestep of each particle
+        """
+        particleTimesteps, arrayOfLimits = self.timestepController.FindParticleTimesteps(particleBunch
+        , totalEMField, timeElapsed, arrayOfIndices=arrayOfIndices)
+        with np.errstate(divide='ignore'):
+            arrayOfLevels = np.ceil(np.log2(timestep / particleTimesteps))
+
+        return [np.clip(arrayOfLevels, 0, self.maximumLevel).astype(int), arrayOfLimits]
+
+    def Step(self, particleBunch, totalEMField, timeElapsed, timestep, limitVelocity:bool=True):
+        """ Method that moves every particle forward by one block, in steps of the block divided by
+                a power of two. The block is divided into 2^maximumLevel substeps. Whenever a particle
+                starts a step its level is found again: a particle may move to a shorter step at any
+                substep, but only moves to a longer step at a substep that the longer step divides.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is moved
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): The length of the block
+                limitVelocity (bool): Not used, since the Boris method never reaches the speed of light
+
+            Parameters:
+                arrayOfLevels (ndarray): Level of each particle
+                nextSubsteps (ndarray): The substep that each particle has been moved to
+                activeParticles (ndarray): Indices of the particles that start a step at this substep
+                longestLevel (int): Level of the longest step that can start at this substep
+                levelParticles (ndarray): Indices of the active particles on one level
+                levelTimestep (float): Timestep of the particles on that level
+
+            Returns:
+                [timestep, numberOfTimesBreakIsPrevented] (list): The length of the block and zero
+        """
+        # the errors of the last blocks only apply if the bunch carries on from where the last block ended
+        if timeElapsed != self.endOfLastBlock:
+            self.timestepController.Reset()
+
+        numberOfSubsteps = 2**self.maximumLevel
+        substep = timestep / numberOfSubsteps
+        arrayOfLevels, arrayOfLimits = BlockTimestepIntegratorClass.FindLevels(self, particleBunch, totalEMField
+        , timeElapsed, timestep)
+        self.listOfLevelCounts.append(np.bincount(arrayOfLevels, minlength=self.maximumLevel + 1))
+        nextSubsteps = np.zeros(particleBunch.numberOfParticles, dtype=int)
+
+        while np.min(nextSubsteps) < numberOfSubsteps:
+            k = int(np.min(nextSubsteps))
+            substepTime = timeElapsed + k * substep
+            activeParticles = np.flatnonzero(nextSubsteps == k)
+
+            if k > 0:
+                # the longest step that can start at substep k is set by the largest power of two
+                # that divides k
+                longestLevel = self.maximumLevel - ((k & -k).bit_length() - 1)
+                arrayOfLevels[activeParticles] = np.maximum(BlockTimestepIntegratorClass.FindLevels(self
+                , particleBunch, totalEMField, substepTime, timestep, arrayOfIndices=activeParticles)[0]
+                , longestLevel)
+
+            # the fields of the particles on each level are found half way through their step, with
+            # every particle moved along its velocity to that time, and then the particles are put back
+            for level in np.unique(arrayOfLevels[activeParticles]):
+                levelParticles = activeParticles[arrayOfLevels[activeParticles] == level]
+                levelTimestep = timestep / 2.0**level
+                ownPositions = particleBunch.arrayOfPositions.copy()
+                timeDifferences = (k - nextSubsteps) * substep + 0.5 * levelTimestep
+                particleBunch.arrayOfPositions += particleBunch.arrayOfVelocities * timeDifferences[:, np.newaxis]
+                electromagneticFields = totalEMField.SumOfEMFieldsAtParticles(particleBunch, levelParticles
+                , substepTime + 0.5 * levelTimestep)
+                particleBunch.arrayOfPositions[:] = ownPositions
+                self.numberOfFieldEvaluations += len(levelParticles) / particleBunch.numberOfParticles
+
+                particleBunch.UpdateBoris(levelTimestep, electromagneticFields[0], electromagneticFields[1]
+                , arrayOfIndices=levelParticles)
+                nextSubsteps[levelParticles] += 2**(self.maximumLevel - level)
+            self.numberOfParticleSteps += len(activeParticles)
+
+        # the timestep of every particle at the end of the block, and the limit that set the timestep
+        # of every particle at the start of the block, are recorded for each block
+        self.timestepController.lastLimit = arrayOfLimits
+        self.timestepController.RecordTimestep(particleBunch, timeElapsed, timestep / 2.0**arrayOfLevels)
+        self.endOfLastBlock = timeElapsed + timestep
+
+        return [timestep, 0]
@@ -0,0 +1,57 @@
+from AbstractIntegrator import AbstractIntegratorClass, np
+
+class BorisIntegratorClass(AbstractIntegratorClass):
+    """ Class that moves the bunch with the relativistic Boris method in its drift-kick-drift form.
+            The particles drift for half of the timestep, the fields are found there, the momentum is
+            updated with them and the particles drift for the second half of the timestep with the new
+            velocity. Second order in position and velocity, with one field evaluation per timestep.
+            The speed of a particle in a pure magnetic field does not change, so the method is suited
+            to long simulations of circling particles.
+
+        Class Attributes:
+            name (string): Name of the integrator
+            numberOfFieldEvaluations (int): The number of times the fields acting on the whole bunch
+                have been found by the integrator
+    """
+
+    def __init__(self, name='Boris Integrator'):
+        """ Constructor for the BorisIntegratorClass class.
+                Inherits the __init__ from AbstractIntegratorClass.
+
+            Args:
+                name (string): Name of the integrator
+        """
+        super().__init__(name=name)
+
+    def __repr__(self):
+        return 'Boris Integrator: {0}'.format(self.name)
+
+    def Step(self, particleBunch, totalEMField, timeElapsed, timestep, limitVelocity:bool=True):
+        """ Method that moves the particle bunch forward by one timestep with ParticleBunch.UpdateBoris().
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is moved
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): Time that the update lasts for
+                limitVelocity (bool): Not used, since the Boris method never reaches the speed of light
+
+            Parameters:
+                initialPositions (ndarray): N x 3 array of the positions at the start of the timestep
+                electromagneticFields (list): N x 3 arrays of the electric and magnetic fields acting
+                    on each particle half way through the timestep
+
+            Returns:
+                [timestep, numberOfTimesBreakIsPrevented] (list): The timestep that was used and zero
+        """
+        # drift, finding the fields with every particle moved along its velocity by half of the timestep
+        initialPositions = particleBunch.arrayOfPositions.copy()
+        particleBunch.arrayOfPositions += particleBunch.arrayOfVelocities * (0.5 * timestep)
+        electromagneticFields = totalEMField.SumOfEMFieldsForBunch(particleBunch, timeElapsed + 0.5 * timestep)
+        particleBunch.arrayOfPositions[:] = initialPositions
+        self.numberOfFieldEvaluations += 1
+
+        # kick and drift
+        particleBunch.UpdateBoris(timestep, electromagneticFields[0], electromagneticFields[1])
+
+        return [timestep, 0]
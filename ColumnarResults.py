@@ -0,0 +1,158 @@
+""" Columnar format for the results of a simulation, and a reader that memory-maps it.
+
+        A result is a directory that holds one NumPy .npy file for each column and a metadata.json
+        file. Every column is a float64 array whose first axis is the record, so a column of T
+        records is one of:
+            Time, Energy, Spread, Momentum, AngularMomentum, EnergyFields, EnergyParticles, Phase,
+                FinalSpread: shape (T,)
+            Energies: shape (T, N), the total energy of each of the N particles
+            Positions, Velocities, Accelerations: shape (T, N, 3)
+
+        metadata.json holds:
+            format (string): 'columnar results'
+            version (int): Version of the format, which is 1
+            simulationType (string): Name of the class that saved the result
+            numberOfRecords (int): Number of records T
+            listOfColumns (list): Names of the columns, which are the names of the .npy files
+            listOfParticleNames (list): Names of the N particles, which may be empty
+
+        metadata.json is written last, so a directory without it is not a complete result. Columns
+        are read with numpy.load(mmap_mode='r'), so opening a result only reads the metadata, and a
+        plot only reads the parts of the columns that it uses.
+"""
+import numpy as np
+import json
+import os
+
+formatName = 'columnar results'
+formatVersion = 1
+
+class ColumnarResultsClass:
+    """ Class that reads a result saved in the columnar format. Each column is memory-mapped the
+            first time it is used, and can be read as an attribute, such as results.Time, in the same
+            way as a column of the pandas dataframes saved by the simulations.
+
+        Class Attributes:
+            directoryName (string): Directory of the result
+            metadata (dictionary): The contents of metadata.json
+            listOfColumns (list): Names of the columns of the result
+            dictionaryOfColumns (dictionary): The memory-mapped arrays of the columns that have been used
+    """
+
+    def __init__(self, directoryName:str):
+        """ Constructor for the ColumnarResultsClass class.
+
+            Args:
+                directoryName (string): Directory of the result
+
+            Raises:
+                ValueError: If the directory does not hold a result in the columnar format
+        """
+        if not IsColumnarResults(directoryName):
+            raise ValueError("%s does not hold a result in the columnar format"%(directoryName))
+        self.directoryName = directoryName
+        with open(os.path.join(directoryName, 'metadata.json')) as metadataFile:
+            self.metadata = json.load(metadataFile)
+        self.listOfColumns = self.metadata['listOfColumns']
+        self.dictionaryOfColumns = {}
+
+    def __repr__(self):
+        return 'Columnar Results: {0}, Simulation: {1}, Records: {2}, Columns: {3}'.format(
+        self.directoryName, self.metadata['simulationType'], self.metadata['numberOfRecords'], self.listOfColumns)
+
+    def __getattr__(self, column):
+        # only called for names that are not attributes, which are looked up as columns
+        if column.startswith('_') or column not in self.__dict__.get('listOfColumns', []):
+            raise AttributeError("%s is not a column of the result"%(column))
+        return ColumnarResultsClass.LoadColumn(self, column)
+
+    def LoadColumn(self, column:str):
+        """ Method that returns a column of the result, which is memory-mapped so that only the parts
+                of it that are used are read from the file.
+
+            Args:
+                column (string): Name of the column
+
+            Returns:
+                arrayOfRecords (ndarray): Read only memory-mapped array of the column
+        """
+        if column not in self.dictionaryOfColumns:
+            self.dictionaryOfColumns[column] = np.load(os.path.join(self.directoryName, '%s.npy'%(column))
+            , mmap_mode='r')
+        return self.dictionaryOfColumns[column]
+
+def IsColumnarResults(directoryName:str):
+    """ Function that returns whether a directory holds a complete result in the columnar format.
+
+        Args:
+            directoryName (string): Directory to check
+
+        Returns:
+            isColumnarResults (bool): True if the directory holds a metadata.json of the columnar format
+    """
+    metadataFileName = os.path.join(directoryName, 'metadata.json')
+    if not os.path.isfile(metadataFileName):
+        return False
+    with open(metadataFileName) as metadataFile:
+        return json.load(metadataFile).get('format') == formatName
+
+def WriteMetadata(directoryName:str, simulationType:str, numberOfRecords:int, listOfColumns, listOfParticleNames=[]
+, **otherMetadata):
+    """ Function that writes the metadata.json of a result in the columnar format. The file is written
+            under another name and then renamed, so a reader never sees a partly written file.
+
+        Args:
+            directoryName (string): Directory of the result
+            simulationType (string): Name of the class that saved the result
+            numberOfRecords (int): Number of records in each column
+            listOfColumns (list): Names of the columns
+            listOfParticleNames (list): Names of the particles
+            otherMetadata: Any other values to keep in the metadata
+    """
+    metadata = dict(otherMetadata, format=formatName, version=formatVersion, simulationType=simulationType
+    , numberOfRecords=numberOfRecords, listOfColumns=list(listOfColumns)
+    , listOfParticleNames=list(listOfParticleNames))
+    temporaryFileName = os.path.join(directoryName, 'metadata.json.tmp')
+    with open(temporaryFileName, 'w') as metadataFile:
+        json.dump(metadata, metadataFile, indent=4)
+    os.replace(temporaryFileName, os.path.join(directoryName, 'metadata.json'))
+
+def WriteColumnarResults(directoryName:str, dictionaryOfColumns, simulationType:str, listOfParticleNames=[]):
+    """ Function that saves a result in the columnar format, replacing any result in the directory.
+
+        Args:
+            directoryName (string): Directory of the result, which is created if it does not exist
+            dictionaryOfColumns (dictionary): Array of each column, with the record as the first axis
+            simulationType (string): Name of the class that saved the result
+            listOfParticleNames (list): Names of the particles
+    """
+    os.makedirs(directoryName, exist_ok=True)
+    # the old metadata is removed first, so the directory is not a complete result while it is written
+    if os.path.isfile(os.path.join(directoryName, 'metadata.json')):
+        os.remove(os.path.join(directoryName, 'metadata.json'))
+
+    numberOfRecords = 0
+    for column, records in dictionaryOfColumns.items():
+        records = np.asarray(records, dtype=float)
+        np.save(os.path.join(directoryName, '%s.npy'%(column)), records)
+        numberOfRecords = len(records)
+
+    WriteMetadata(directoryName, simulationType, numberOfRecords, dictionaryOfColumns.keys(), listOfParticleNames)
+
+def ConvertStatesToColumns(listOfStates):
+    """ Function that converts the history of a simulation, saved as a list of the particles at each
+            record, into arrays of the position, velocity and acceleration of every particle.
+
+        Args:
+            listOfStates (list): List of the list of Particle objects at each record
+
+        Returns:
+            dictionaryOfColumns (dictionary): T x N x 3 arrays of the Positions, Velocities and
+                Accelerations of the particles
+    """
+    numberOfParticles = len(listOfStates[0]) if len(listOfStates) > 0 else 0
+    dictionaryOfColumns = {}
+    for column, attribute in [('Positions', 'position'), ('Velocities', 'velocity'), ('Accelerations', 'acceleration')]:
+        dictionaryOfColumns[column] = np.array([[getattr(particle, attribute) for particle in state]
+        for state in listOfStates], dtype=float).reshape(len(listOfStates), numberOfParticles, 3)
+    return dictionaryOfColumns
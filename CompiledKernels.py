@@ -0,0 +1,503 @@
+""" The innermost operations of the simulations, written twice: as explicit loops that are compiled
+        with Numba when it is installed, and as vectorized NumPy operations that are used when it is
+        not. The loops fuse each operation into one pass over the particles, so they do not create
+        the large temporary arrays of the NumPy form. The choice is made once, when this file is
+        imported, and isNumbaAvailable records which form is used.
+
+        Each kernel is named after what it finds, and the two forms of a kernel end with Loop and
+        NumPy. The Loop functions can also be run by the Python interpreter without Numba, which is
+        slow but is used to check that the two forms agree.
+"""
+import numpy as np
+import math
+import scipy.constants as const
+
+try:
+    import numba
+    isNumbaAvailable = True
+except ImportError:
+    numba = None
+    isNumbaAvailable = False
+
+speedOfLightSquared = const.speed_of_light * const.speed_of_light
+
+def ElectricFieldLoop(arrayOfSourcePositions, arrayOfSourceCharges, arrayOfAffectedPositions
+, interactionMask, isMasked, arrayOfSelfIndices, chunkSize=128):
+    """ Loop form of ElectricFieldNumPy().
+
+        Args:
+            arrayOfSourcePositions (ndarray): N x 3 array of the positions of the source particles
+            arrayOfSourceCharges (ndarray): Array of the N charges of the source particles
+            arrayOfAffectedPositions (ndarray): M x 3 array of the positions where the field is found
+            interactionMask (ndarray): M x N boolean array that is False for any pair that must not
+                interact. Not used if isMasked is False.
+            isMasked (bool): True if interactionMask is used
+            arrayOfSelfIndices (ndarray): Array of the M indices of the source particle at each affected
+                position, whose field is not found there, or -1 if there is none
+            chunkSize (int): Not used by the loop form, which does not create temporary arrays
+
+        Returns:
+            arrayOfFields (ndarray): M x 3 array of the sum of charge * displacement / distance^3
+    """
+    numberOfAffected = arrayOfAffectedPositions.shape[0]
+    numberOfSources = arrayOfSourcePositions.shape[0]
+    arrayOfFields = np.zeros((numberOfAffected, 3))
+    for i in range(numberOfAffected):
+        fieldX, fieldY, fieldZ = 0.0, 0.0, 0.0
+        for j in range(numberOfSources):
+            if (isMasked and not interactionMask[i, j]) or j == arrayOfSelfIndices[i]:
+                continue
+            dx = arrayOfAffectedPositions[i, 0] - arrayOfSourcePositions[j, 0]
+            dy = arrayOfAffectedPositions[i, 1] - arrayOfSourcePositions[j, 1]
+            dz = arrayOfAffectedPositions[i, 2] - arrayOfSourcePositions[j, 2]
+            distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+            scale = arrayOfSourceCharges[j] / (distance * distance * distance)
+            fieldX += scale * dx
+            fieldY += scale * dy
+            fieldZ += scale * dz
+        arrayOfFields[i, 0] = fieldX
+        arrayOfFields[i, 1] = fieldY
+        arrayOfFields[i, 2] = fieldZ
+
+    return arrayOfFields
+
+def ElectricFieldNumPy(arrayOfSourcePositions, arrayOfSourceCharges, arrayOfAffectedPositions
+, interactionMask, isMasked, arrayOfSelfIndices, chunkSize:int=128):
+    """ Function that returns the sum over the source particles of charge multiplied by displacement
+            divided by the cube of distance at every affected position, which is the electric field
+            without the factor of 1 / (4 pi epsilon_0).
+
+        Args:
+            arrayOfSourcePositions (ndarray): N x 3 array of the positions of the source particles
+            arrayOfSourceCharges (ndarray): Array of the N charges of the source particles
+            arrayOfAffectedPositions (ndarray): M x 3 array of the positions where the field is found
+            interactionMask (ndarray): M x N boolean array that is False for any pair that must not
+                interact. Not used if isMasked is False.
+            isMasked (bool): True if interactionMask is used
+            arrayOfSelfIndices (ndarray): Array of the M indices of the source particle at each affected
+                position, whose field is not found there, or -1 if there is none
+            chunkSize (int): Number of affected positions that are computed together, which limits
+                the size of the temporary M x N x 3 arrays.
+
+        Parameters:
+            displacement (ndarray): The vectors from every source particle to every affected position
+            inverseDistanceCubed (ndarray): One over the cube of the norm of each displacement
+
+        Returns:
+            arrayOfFields (ndarray): M x 3 array of the sum of charge * displacement / distance^3
+    """
+    arrayOfFields = np.zeros((len(arrayOfAffectedPositions), 3), dtype=float)
+
+    for start in range(0, len(arrayOfAffectedPositions), chunkSize):
+        displacement = (arrayOfAffectedPositions[start:start + chunkSize, np.newaxis, :]
+        - arrayOfSourcePositions[np.newaxis, :, :])
+        distance = np.sqrt(np.einsum('ijk,ijk->ij', displacement, displacement))
+
+        # pairs that are masked out, such as a particle with itself, have zero distance and
+        # would otherwise divide by zero
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverseDistanceCubed = 1 / (distance * distance * distance)
+        if isMasked:
+            inverseDistanceCubed = np.where(interactionMask[start:start + chunkSize]
+            , inverseDistanceCubed, 0.0)
+        selfIndices = arrayOfSelfIndices[start:start + chunkSize]
+        selfRows = np.nonzero(selfIndices >= 0)[0]
+        inverseDistanceCubed[selfRows, selfIndices[selfRows]] = 0.0
+
+        arrayOfFields[start:start + chunkSize] = np.einsum('ij,ijk->ik'
+        , arrayOfSourceCharges[np.newaxis, :] * inverseDistanceCubed, displacement)
+
+    return arrayOfFields
+
+def MagneticFieldLoop(arrayOfSourcePositions, arrayOfSourceVelocities, arrayOfSourceCharges
+, arrayOfAffectedPositions, interactionMask, isMasked, arrayOfSelfIndices, chunkSize=128):
+    """ Loop form of MagneticFieldNumPy().
+
+        Args:
+            arrayOfSourcePositions (ndarray): N x 3 array of the positions of the source particles
+            arrayOfSourceVelocities (ndarray): N x 3 array of the velocities of the source particles
+            arrayOfSourceCharges (ndarray): Array of the N charges of the source particles
+            arrayOfAffectedPositions (ndarray): M x 3 array of the positions where the field is found
+            interactionMask (ndarray): M x N boolean array that is False for any pair that must not
+                interact. Not used if isMasked is False.
+            isMasked (bool): True if interactionMask is used
+            arrayOfSelfIndices (ndarray): Array of the M indices of the source particle at each affected
+                position, whose field is not found there, or -1 if there is none
+            chunkSize (int): Not used by the loop form, which does not create temporary arrays
+
+        Returns:
+            arrayOfFields (ndarray): M x 3 array of the sum of charge * (velocity x displacement) / distance^3
+    """
+    numberOfAffected = arrayOfAffectedPositions.shape[0]
+    numberOfSources = arrayOfSourcePositions.shape[0]
+    arrayOfFields = np.zeros((numberOfAffected, 3))
+    for i in range(numberOfAffected):
+        fieldX, fieldY, fieldZ = 0.0, 0.0, 0.0
+        for j in range(numberOfSources):
+            if (isMasked and not interactionMask[i, j]) or j == arrayOfSelfIndices[i]:
+                continue
+            dx = arrayOfAffectedPositions[i, 0] - arrayOfSourcePositions[j, 0]
+            dy = arrayOfAffectedPositions[i, 1] - arrayOfSourcePositions[j, 1]
+            dz = arrayOfAffectedPositions[i, 2] - arrayOfSourcePositions[j, 2]
+            vx = arrayOfSourceVelocities[j, 0]
+            vy = arrayOfSourceVelocities[j, 1]
+            vz = arrayOfSourceVelocities[j, 2]
+            distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+            scale = arrayOfSourceCharges[j] / (distance * distance * distance)
+            fieldX += scale * (vy * dz - vz * dy)
+            fieldY += scale * (vz * dx - vx * dz)
+            fieldZ += scale * (vx * dy - vy * dx)
+        arrayOfFields[i, 0] = fieldX
+        arrayOfFields[i, 1] = fieldY
+        arrayOfFields[i, 2] = fieldZ
+
+    return arrayOfFields
+
+def MagneticFieldNumPy(arrayOfSourcePositions, arrayOfSourceVelocities, arrayOfSourceCharges
+, arrayOfAffectedPositions, interactionMask, isMasked, arrayOfSelfIndices, chunkSize:int=128):
+    """ Function that returns the sum over the source particles of charge multiplied by the cross
+            product of velocity and displacement divided by the cube of distance at every affected
+            position, which is the magnetic field without the factor of mu_0 / (4 pi).
+
+        Args:
+            arrayOfSourcePositions (ndarray): N x 3 array of the positions of the source particles
+            arrayOfSourceVelocities (ndarray): N x 3 array of the velocities of the source particles
+            arrayOfSourceCharges (ndarray): Array of the N charges of the source particles
+            arrayOfAffectedPositions (ndarray): M x 3 array of the positions where the field is found
+            interactionMask (ndarray): M x N boolean array that is False for any pair that must not
+                interact. Not used if isMasked is False.
+            isMasked (bool): True if interactionMask is used
+            arrayOfSelfIndices (ndarray): Array of the M indices of the source particle at each affected
+                position, whose field is not found there, or -1 if there is none
+            chunkSize (int): Number of affected positions that are computed together, which limits
+                the size of the temporary M x N x 3 arrays.
+
+        Parameters:
+            displacement (ndarray): The vectors from every source particle to every affected position
+            inverseDistanceCubed (ndarray): One over the cube of the norm of each displacement
+
+        Returns:
+            arrayOfFields (ndarray): M x 3 array of the sum of charge * (velocity x displacement) / distance^3
+    """
+    arrayOfFields = np.zeros((len(arrayOfAffectedPositions), 3), dtype=float)
+
+    for start in range(0, len(arrayOfAffectedPositions), chunkSize):
+        displacement = (arrayOfAffectedPositions[start:start + chunkSize, np.newaxis, :]
+        - arrayOfSourcePositions[np.newaxis, :, :])
+        distance = np.sqrt(np.einsum('ijk,ijk->ij', displacement, displacement))
+
+        # pairs that are masked out, such as a particle with itself, have zero distance and
+        # would otherwise divide by zero
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverseDistanceCubed = 1 / (distance * distance * distance)
+        if isMasked:
+            inverseDistanceCubed = np.where(interactionMask[start:start + chunkSize]
+            , inverseDistanceCubed, 0.0)
+        selfIndices = arrayOfSelfIndices[start:start + chunkSize]
+        selfRows = np.nonzero(selfIndices >= 0)[0]
+        inverseDistanceCubed[selfRows, selfIndices[selfRows]] = 0.0
+
+        arrayOfFields[start:start + chunkSize] = np.einsum('ij,ijk->ik'
+        , arrayOfSourceCharges[np.newaxis, :] * inverseDistanceCubed
+        , np.cross(arrayOfSourceVelocities[np.newaxis, :, :], displacement))
+
+    return arrayOfFields
+
+def LorentzAccelerationLoop(arrayOfVelocities, arrayOfCharges, arrayOfRestMasses, arrayOfElectricFields
+, arrayOfMagneticFields, arrayOfAccelerations):
+    """ Loop form of LorentzAccelerationNumPy().
+
+        Args:
+            arrayOfVelocities (ndarray): N x 3 array of the velocities of the particles
+            arrayOfCharges (ndarray): Array of the N charges of the particles
+            arrayOfRestMasses (ndarray): Array of the N rest masses of the particles
+            arrayOfElectricFields (ndarray): N x 3 array of the electric field acting on each particle
+            arrayOfMagneticFields (ndarray): N x 3 array of the magnetic field acting on each particle
+            arrayOfAccelerations (ndarray): N x 3 array that the accelerations are written into
+    """
+    for i in range(arrayOfVelocities.shape[0]):
+        vx = arrayOfVelocities[i, 0]
+        vy = arrayOfVelocities[i, 1]
+        vz = arrayOfVelocities[i, 2]
+        betaSquared = (vx * vx + vy * vy + vz * vz) / speedOfLightSquared
+        # the charge divided by the relativistic mass
+        scale = arrayOfCharges[i] * abs(1 - betaSquared)**0.5 / arrayOfRestMasses[i]
+        bx = arrayOfMagneticFields[i, 0]
+        by = arrayOfMagneticFields[i, 1]
+        bz = arrayOfMagneticFields[i, 2]
+        arrayOfAccelerations[i, 0] = scale * (arrayOfElectricFields[i, 0] + vy * bz - vz * by)
+        arrayOfAccelerations[i, 1] = scale * (arrayOfElectricFields[i, 1] + vz * bx - vx * bz)
+        arrayOfAccelerations[i, 2] = scale * (arrayOfElectricFields[i, 2] + vx * by - vy * bx)
+
+def LorentzAccelerationNumPy(arrayOfVelocities, arrayOfCharges, arrayOfRestMasses, arrayOfElectricFields
+, arrayOfMagneticFields, arrayOfAccelerations):
+    """ Function that writes the acceleration of each particle from the Lorentz force, divided by
+            the relativistic mass of the particle, into arrayOfAccelerations.
+
+        Args:
+            arrayOfVelocities (ndarray): N x 3 array of the velocities of the particles
+            arrayOfCharges (ndarray): Array of the N charges of the particles
+            arrayOfRestMasses (ndarray): Array of the N rest masses of the particles
+            arrayOfElectricFields (ndarray): N x 3 array of the electric field acting on each particle
+            arrayOfMagneticFields (ndarray): N x 3 array of the magnetic field acting on each particle
+            arrayOfAccelerations (ndarray): N x 3 array that the accelerations are written into
+
+        Parameters:
+            relativisticMasses (ndarray): The relativistic mass of each particle
+    """
+    betaSquared = np.einsum('ij,ij->i', arrayOfVelocities, arrayOfVelocities) / speedOfLightSquared
+    relativisticMasses = arrayOfRestMasses / np.abs(1 - betaSquared)**0.5
+    arrayOfAccelerations[:] = (arrayOfCharges[:, np.newaxis]
+    * (arrayOfElectricFields + np.cross(arrayOfVelocities, arrayOfMagneticFields))
+    / relativisticMasses[:, np.newaxis])
+
+def CromerUpdateLoop(arrayOfPositions, arrayOfVelocities, arrayOfAccelerations, deltaT):
+    """ Loop form of CromerUpdateNumPy().
+
+        Args:
+            arrayOfPositions (ndarray): N x 3 array of positions, which is updated
+            arrayOfVelocities (ndarray): N x 3 array of velocities, which is updated
+            arrayOfAccelerations (ndarray): N x 3 array of accelerations
+            deltaT (float): Time that update lasts for
+    """
+    for i in range(arrayOfPositions.shape[0]):
+        for k in range(3):
+            arrayOfVelocities[i, k] += arrayOfAccelerations[i, k] * deltaT
+            arrayOfPositions[i, k] += arrayOfVelocities[i, k] * deltaT
+
+def CromerUpdateNumPy(arrayOfPositions, arrayOfVelocities, arrayOfAccelerations, deltaT):
+    """ Function that updates the velocities and then the positions of the particles in place with
+            the Euler Cromer method.
+
+        Args:
+            arrayOfPositions (ndarray): N x 3 array of positions, which is updated
+            arrayOfVelocities (ndarray): N x 3 array of velocities, which is updated
+            arrayOfAccelerations (ndarray): N x 3 array of accelerations
+            deltaT (float): Time that update lasts for
+    """
+    arrayOfVelocities += arrayOfAccelerations * deltaT
+    arrayOfPositions += arrayOfVelocities * deltaT
+
+def TreeFieldsLoop(arrayOfSourcePositions, arrayOfSourceVelocities, arrayOfSourceCharges, arrayOfAffectedPositions
+, arrayOfSelfIndices, nodeCentres, nodeHalfWidths, nodeChildren, nodeLeafStarts, nodeLeafCounts, leafOrder
+, nodeCharges, nodeChargeCentres, nodeCurrents, groupOrder, groupStarts, groupCounts, groupLowerCorners
+, groupUpperCorners, openingAngle, chunkSize=2**16, groupsPerWalk=64):
+    """ Loop form of TreeFieldsNumPy(). Each group walks the tree with a stack of nodes.
+
+        Args:
+            The same as TreeFieldsNumPy(). chunkSize and groupsPerWalk are not used by the loop form,
+                which does not create temporary arrays.
+
+        Returns:
+            [arrayOfElectricFields, arrayOfMagneticFields] (list): M x 3 arrays of the sum of charge times
+                displacement over distance cubed, and of current cross displacement over distance cubed
+    """
+    numberOfAffected = arrayOfAffectedPositions.shape[0]
+    arrayOfElectricFields = np.zeros((numberOfAffected, 3))
+    arrayOfMagneticFields = np.zeros((numberOfAffected, 3))
+    stack = np.empty(nodeCentres.shape[0], dtype=np.int64)
+    openingAngleSquared = openingAngle * openingAngle
+
+    for group in range(groupStarts.shape[0]):
+        stack[0] = 0
+        top = 1
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            halfWidth = nodeHalfWidths[node]
+            closestDistanceSquared = 0.0
+            isOutsideNode = False
+            for k in range(3):
+                if nodeChargeCentres[node, k] < groupLowerCorners[group, k]:
+                    gap = groupLowerCorners[group, k] - nodeChargeCentres[node, k]
+                elif nodeChargeCentres[node, k] > groupUpperCorners[group, k]:
+                    gap = nodeChargeCentres[node, k] - groupUpperCorners[group, k]
+                else:
+                    gap = 0.0
+                closestDistanceSquared += gap * gap
+                if (groupLowerCorners[group, k] > nodeCentres[node, k] + halfWidth
+                or groupUpperCorners[group, k] < nodeCentres[node, k] - halfWidth):
+                    isOutsideNode = True
+
+            # a node that is far from every affected position of the group acts on them as a single
+            # point, a leaf that is not acts as the particles it contains, and any other node is opened
+            isAccepted = isOutsideNode and 4 * halfWidth * halfWidth < openingAngleSquared * closestDistanceSquared
+            if not isAccepted and nodeLeafCounts[node] < 0:
+                for octant in range(8):
+                    if nodeChildren[node, octant] >= 0:
+                        stack[top] = nodeChildren[node, octant]
+                        top += 1
+                continue
+            numberOfSources = 1 if isAccepted else nodeLeafCounts[node]
+
+            for a in range(groupStarts[group], groupStarts[group] + groupCounts[group]):
+                i = groupOrder[a]
+                for b in range(numberOfSources):
+                    if isAccepted:
+                        sourceX = nodeChargeCentres[node, 0]
+                        sourceY = nodeChargeCentres[node, 1]
+                        sourceZ = nodeChargeCentres[node, 2]
+                        charge = nodeCharges[node]
+                        currentX = nodeCurrents[node, 0]
+                        currentY = nodeCurrents[node, 1]
+                        currentZ = nodeCurrents[node, 2]
+                    else:
+                        j = leafOrder[nodeLeafStarts[node] + b]
+                        if j == arrayOfSelfIndices[i]:
+                            continue
+                        sourceX = arrayOfSourcePositions[j, 0]
+                        sourceY = arrayOfSourcePositions[j, 1]
+                        sourceZ = arrayOfSourcePositions[j, 2]
+                        charge = arrayOfSourceCharges[j]
+                        currentX = charge * arrayOfSourceVelocities[j, 0]
+                        currentY = charge * arrayOfSourceVelocities[j, 1]
+                        currentZ = charge * arrayOfSourceVelocities[j, 2]
+                    dx = arrayOfAffectedPositions[i, 0] - sourceX
+                    dy = arrayOfAffectedPositions[i, 1] - sourceY
+                    dz = arrayOfAffectedPositions[i, 2] - sourceZ
+                    distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+                    inverseDistanceCubed = 1 / (distance * distance * distance)
+                    arrayOfElectricFields[i, 0] += charge * inverseDistanceCubed * dx
+                    arrayOfElectricFields[i, 1] += charge * inverseDistanceCubed * dy
+                    arrayOfElectricFields[i, 2] += charge * inverseDistanceCubed * dz
+                    arrayOfMagneticFields[i, 0] += inverseDistanceCubed * (currentY * dz - currentZ * dy)
+                    arrayOfMagneticFields[i, 1] += inverseDistanceCubed * (currentZ * dx - currentX * dz)
+                    arrayOfMagneticFields[i, 2] += inverseDistanceCubed * (currentX * dy - currentY * dx)
+
+    return [arrayOfElectricFields, arrayOfMagneticFields]
+
+def TreeFieldsNumPy(arrayOfSourcePositions, arrayOfSourceVelocities, arrayOfSourceCharges, arrayOfAffectedPositions
+, arrayOfSelfIndices, nodeCentres, nodeHalfWidths, nodeChildren, nodeLeafStarts, nodeLeafCounts, leafOrder
+, nodeCharges, nodeChargeCentres, nodeCurrents, groupOrder, groupStarts, groupCounts, groupLowerCorners
+, groupUpperCorners, openingAngle, chunkSize:int=2**16, groupsPerWalk:int=64):
+    """ Function that returns the sums that give the electric and magnetic fields of the source particles
+            at every affected position, found with a Barnes-Hut octree of the source particles. The affected
+            positions are split into groups of nearby positions, and each group walks the tree once: a node
+            that is far from the whole box around a group acts on every position of the group as a single
+            point with the total charge and current of the node, and a leaf that is not far acts as the
+            particles it contains. Every pair of group and node of one level of the tree is tested at once.
+
+        Args:
+            arrayOfSourcePositions (ndarray): N x 3 array of the positions of the source particles
+            arrayOfSourceVelocities (ndarray): N x 3 array of the velocities of the source particles
+            arrayOfSourceCharges (ndarray): Array of the N charges of the source particles
+            arrayOfAffectedPositions (ndarray): M x 3 array of the positions where the field is found
+            arrayOfSelfIndices (ndarray): Array of the M indices of the source particle at each affected
+                position, whose field is not found there, or -1 if there is none
+            nodeCentres (ndarray): Geometric centre of each node of the tree
+            nodeHalfWidths (ndarray): Half of the width of each node of the tree
+            nodeChildren (ndarray): Index of the child of each node in each of its 8 octants, or -1
+            nodeLeafStarts (ndarray): Start of the particles of each leaf in leafOrder
+            nodeLeafCounts (ndarray): Number of particles in each leaf, or -1 for a node with children
+            leafOrder (ndarray): Indices of the source particles, ordered by leaf
+            nodeCharges (ndarray): Total charge of each node
+            nodeChargeCentres (ndarray): Centre of the charge of each node
+            nodeCurrents (ndarray): Total charge multiplied by velocity of each node
+            groupOrder (ndarray): Indices of the affected positions, ordered by group
+            groupStarts (ndarray): Start of the affected positions of each group in groupOrder
+            groupCounts (ndarray): Number of affected positions in each group
+            groupLowerCorners (ndarray): Smallest x, y and z of the affected positions of each group
+            groupUpperCorners (ndarray): Largest x, y and z of the affected positions of each group
+            openingAngle (float): Ratio of the width of a node to its distance from a group below which the
+                node is treated as a single point
+            chunkSize (int): Largest number of pairs of affected position and source that are summed
+                together, which limits the size of the temporary arrays
+            groupsPerWalk (int): Number of groups that walk the tree together
+
+        Parameters:
+            groups, nodes (ndarray): The pairs of group and node that are tested in one pass
+            closestDistanceSquared (ndarray): Square of the distance from the charge centre of each node
+                to the nearest point of the box around its group
+
+        Returns:
+            [arrayOfElectricFields, arrayOfMagneticFields] (list): M x 3 arrays of the sum of charge times
+                displacement over distance cubed, and of current cross displacement over distance cubed
+    """
+    numberOfAffected = len(arrayOfAffectedPositions)
+    arrayOfElectricFields = np.zeros((numberOfAffected, 3))
+    arrayOfMagneticFields = np.zeros((numberOfAffected, 3))
+
+    def ExpandRanges(starts, counts):
+        # returns the index of the range and the index into the ordered array of every element of the ranges
+        rangeIndices = np.repeat(np.arange(len(counts)), counts)
+        offsets = np.arange(len(rangeIndices)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return [rangeIndices, np.repeat(starts, counts) + offsets]
+
+    def AddContributions(affected, displacement, charges, currents):
+        distance = np.sqrt(np.einsum('ij,ij->i', displacement, displacement))
+        inverseDistanceCubed = 1 / (distance * distance * distance)
+        electricTerms = (charges * inverseDistanceCubed)[:, np.newaxis] * displacement
+        magneticTerms = inverseDistanceCubed[:, np.newaxis] * np.cross(currents, displacement)
+        for k in range(3):
+            arrayOfElectricFields[:, k] += np.bincount(affected, weights=electricTerms[:, k]
+            , minlength=numberOfAffected)
+            arrayOfMagneticFields[:, k] += np.bincount(affected, weights=magneticTerms[:, k]
+            , minlength=numberOfAffected)
+
+    def AddPairs(groups, nodes, isAccepted:bool):
+        # the pairs are summed a chunk at a time, each chunk holding at least one pair
+        sizes = groupCounts[groups] if isAccepted else groupCounts[groups] * nodeLeafCounts[nodes]
+        ends = np.cumsum(sizes)
+        start = 0
+        while start < len(groups):
+            stop = max(start + 1, int(np.searchsorted(ends, ends[start] - sizes[start] + chunkSize, side='right')))
+            pairIndices, slots = ExpandRanges(groupStarts[groups[start:stop]], groupCounts[groups[start:stop]])
+            affected = groupOrder[slots]
+            pairNodes = nodes[start:stop][pairIndices]
+            if isAccepted:
+                AddContributions(affected, arrayOfAffectedPositions[affected] - nodeChargeCentres[pairNodes]
+                , nodeCharges[pairNodes], nodeCurrents[pairNodes])
+            else:
+                sourceIndices, leafSlots = ExpandRanges(nodeLeafStarts[pairNodes], nodeLeafCounts[pairNodes])
+                affected, sources = affected[sourceIndices], leafOrder[leafSlots]
+                isOtherParticle = sources != arrayOfSelfIndices[affected]
+                affected, sources = affected[isOtherParticle], sources[isOtherParticle]
+                AddContributions(affected, arrayOfAffectedPositions[affected] - arrayOfSourcePositions[sources]
+                , arrayOfSourceCharges[sources], arrayOfSourceCharges[sources, np.newaxis]
+                * arrayOfSourceVelocities[sources])
+            start = stop
+
+    # the groups walk the tree a few at a time, which keeps the arrays of pairs small
+    for firstGroup in range(0, len(groupStarts), groupsPerWalk):
+        groups = np.arange(firstGroup, min(firstGroup + groupsPerWalk, len(groupStarts)))
+        nodes = np.zeros(len(groups), dtype=int)
+
+        while len(groups) > 0:
+            lowerCorners, upperCorners = groupLowerCorners[groups], groupUpperCorners[groups]
+            chargeCentres = nodeChargeCentres[nodes]
+            gaps = np.maximum(lowerCorners - chargeCentres, 0.0) + np.maximum(chargeCentres - upperCorners, 0.0)
+            closestDistanceSquared = np.einsum('ij,ij->i', gaps, gaps)
+            halfWidths = nodeHalfWidths[nodes]
+            # a node that overlaps the box around a group is never treated as a single point, which also
+            # keeps a particle from interacting with itself
+            isOutsideNode = np.any((lowerCorners > nodeCentres[nodes] + halfWidths[:, np.newaxis])
+            | (upperCorners < nodeCentres[nodes] - halfWidths[:, np.newaxis]), axis=1)
+            isAccepted = isOutsideNode & (4 * halfWidths * halfWidths < openingAngle * openingAngle
+            * closestDistanceSquared)
+            isLeaf = ~isAccepted & (nodeLeafCounts[nodes] >= 0)
+
+            AddPairs(groups[isAccepted], nodes[isAccepted], True)
+            AddPairs(groups[isLeaf], nodes[isLeaf], False)
+
+            # every other node is opened and its children are tested in the next pass
+            isOpened = ~isAccepted & ~isLeaf
+            children = nodeChildren[nodes[isOpened]]
+            isChild = children >= 0
+            groups = np.repeat(groups[isOpened], np.sum(isChild, axis=1))
+            nodes = children[isChild]
+
+    return [arrayOfElectricFields, arrayOfMagneticFields]
+
+# the kernels that the simulations use are chosen once, on import
+if isNumbaAvailable:
+    ElectricFieldKernel = numba.njit(cache=True)(ElectricFieldLoop)
+    MagneticFieldKernel = numba.njit(cache=True)(MagneticFieldLoop)
+    LorentzAccelerationKernel = numba.njit(cache=True)(LorentzAccelerationLoop)
+    CromerUpdateKernel = numba.njit(cache=True)(CromerUpdateLoop)
+    TreeFieldsKernel = numba.njit(cache=True)(TreeFieldsLoop)
+else:
+    ElectricFieldKernel = ElectricFieldNumPy
+    MagneticFieldKernel = MagneticFieldNumPy
+    LorentzAccelerationKernel = LorentzAccelerationNumPy
+    CromerUpdateKernel = CromerUpdateNumPy
+    TreeFieldsKernel = TreeFieldsNumPy
@@ -0,0 +1,124 @@
+from AbstractFieldSolver import AbstractFieldSolverClass, np
+from PointElectricField import PointElectricFieldClass
+from PointMagneticField import PointMagneticFieldClass
+import scipy.constants as const
+
+class DirectSumFieldSolverClass(AbstractFieldSolverClass):
+    """ Class that finds the fields between particles by summing the contribution of every pair
+            of particles. Exact, but the cost grows with the square of the number of particles.
+
+        Class Attributes:
+            name (string): Name of the field solver
+    """
+
+    def __init__(self, name='Direct Sum Field Solver'):
+        """ Constructor for the DirectSumFieldSolverClass class.
+                Inherits the __init__ from AbstractFieldSolverClass.
+
+            Args:
+                name (string): Name of the field solver
+        """
+        super().__init__(name=name)
+
+    def __repr__(self):
+        return 'Direct Sum Field Solver: {0}'.format(self.name)
+
+    def GenerateBunchFields(self, sourceBunch, affectedBunch):
+        """ Method that returns the electric and magnetic fields of every particle in the sourceBunch
+                at the position of every particle in the affectedBunch.
+
+            Args:
+                sourceBunch (object: ParticleBunch): The bunch of particles that generates the fields
+                affectedBunch (object: ParticleBunch): The bunch of particles affected by the fields
+
+            Parameters:
+                arrayOfSelfIndices (ndarray): Index of each affected particle in the sourceBunch, which
+                    removes the field of each particle acting on itself when the affected bunch is the
+                    source bunch, without an N x N mask.
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): N x 3 arrays of the electric
+                    and magnetic field at the position of each affected particle
+        """
+        # a particle does not interact with its own field
+        arrayOfSelfIndices = None
+        if affectedBunch is sourceBunch:
+            arrayOfSelfIndices = np.arange(affectedBunch.numberOfParticles)
+        sourceCharges = sourceBunch.FindSourceCharges()
+
+        arrayOfElectricFields = PointElectricFieldClass.GenerateFieldFromArrays(sourceBunch.arrayOfPositions
+        , sourceCharges, affectedBunch.arrayOfPositions, arrayOfSelfIndices=arrayOfSelfIndices)
+        arrayOfMagneticFields = PointMagneticFieldClass.GenerateFieldFromArrays(sourceBunch.arrayOfPositions
+        , sourceBunch.arrayOfVelocities, sourceCharges, affectedBunch.arrayOfPositions
+        , arrayOfSelfIndices=arrayOfSelfIndices)
+
+        return [arrayOfElectricFields, arrayOfMagneticFields]
+
+    def GenerateFieldsAtParticles(self, sourceBunch, arrayOfIndices):
+        """ Method that returns the electric and magnetic fields of every particle in the sourceBunch
+                at the position of some of the particles of the same bunch. The cost grows with the
+                number of chosen particles multiplied by the number of particles in the bunch.
+
+            Args:
+                sourceBunch (object: ParticleBunch): The bunch of particles that generates the fields
+                arrayOfIndices (ndarray): Indices of the M particles of the sourceBunch that are affected
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): M x 3 arrays of the electric
+                    and magnetic field at the position of each chosen particle
+        """
+        # each chosen particle does not interact with its own field
+        sourceCharges = sourceBunch.FindSourceCharges()
+
+        arrayOfElectricFields = PointElectricFieldClass.GenerateFieldFromArrays(sourceBunch.arrayOfPositions
+        , sourceCharges, sourceBunch.arrayOfPositions[arrayOfIndices], arrayOfSelfIndices=arrayOfIndices)
+        arrayOfMagneticFields = PointMagneticFieldClass.GenerateFieldFromArrays(sourceBunch.arrayOfPositions
+        , sourceBunch.arrayOfVelocities, sourceCharges, sourceBunch.arrayOfPositions[arrayOfIndices]
+        , arrayOfSelfIndices=arrayOfIndices)
+
+        return [arrayOfElectricFields, arrayOfMagneticFields]
+
+    def GenerateBatchedFields(self, arrayOfPositions, arrayOfVelocities, arrayOfCharges, chunkSize:int=128):
+        """ Method that returns the electric and magnetic fields between the particles of several
+                copies of the same bunch at once. The copies are stacked along a leading dimension,
+                and each particle only interacts with the other particles of its own copy.
+
+            Args:
+                arrayOfPositions (ndarray): P x N x 3 array of the positions of the particles of P copies
+                arrayOfVelocities (ndarray): P x N x 3 array of the velocities of the particles
+                arrayOfCharges (ndarray): Array of the N charges that generate the fields of the particles,
+                    which are their weights multiplied by their charges, and are the same in every copy
+                chunkSize (int): Number of affected particles of each copy that are computed together,
+                    which limits the size of the temporary P x chunkSize x N x 3 arrays
+
+            Parameters:
+                displacement (ndarray): P x chunkSize x N x 3 array of the vectors from every particle
+                    to every particle of the same copy
+                inverseDistanceCubed (ndarray): One over the cube of the norm of each displacement, which
+                    is zero for a particle with itself
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): P x N x 3 arrays of the electric
+                    and magnetic field at the position of each particle
+        """
+        arrayOfElectricFields = np.zeros(arrayOfPositions.shape, dtype=float)
+        arrayOfMagneticFields = np.zeros(arrayOfPositions.shape, dtype=float)
+
+        for start in range(0, arrayOfPositions.shape[1], chunkSize):
+            displacement = (arrayOfPositions[:, start:start + chunkSize, np.newaxis, :]
+            - arrayOfPositions[:, np.newaxis, :, :])
+            distance = np.sqrt(np.einsum('pijk,pijk->pij', displacement, displacement))
+
+            # a particle does not interact with its own field, which would divide by zero
+            with np.errstate(divide='ignore', invalid='ignore'):
+                inverseDistanceCubed = 1 / (distance * distance * distance)
+            chunkRows = np.arange(displacement.shape[1])
+            inverseDistanceCubed[:, chunkRows, chunkRows + start] = 0.0
+            weights = arrayOfCharges[np.newaxis, np.newaxis, :] * inverseDistanceCubed
+
+            arrayOfElectricFields[:, start:start + chunkSize] = np.einsum('pij,pijk->pik', weights, displacement)
+            arrayOfMagneticFields[:, start:start + chunkSize] = np.einsum('pij,pijk->pik', weights
+            , np.cross(arrayOfVelocities[:, np.newaxis, :, :], displacement))
+
+        return [arrayOfElectricFields / (4 * const.pi * const.epsilon_0)
+        , const.mu_0 * arrayOfMagneticFields / (4 * const.pi)]
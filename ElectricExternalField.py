@@ -47,4 +47,17 @@ class ElectricExternalFieldClass(AbstractExternalFieldClass):
             Returns:
                 Electric Field (ndarray): The electric field affecting the particle
         """
-        return super().GenerateField(timeElapsed, affectedParticle)
\ No newline at end of file
+        return super().GenerateField(timeElapsed, affectedParticle)
+
+    def GenerateFieldAtPositions(self, timeElapsed, arrayOfPositions):
+        """ Method for generating the electric field at every one of an array of positions after a certain
+                time. Uses an inherited method from the parent class AbstractExternalFieldClass
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the simulation
+                arrayOfPositions (ndarray): N x 3 array of the positions where the electric field is found
+
+            Returns:
+                Electric Field (ndarray): N x 3 array of the electric field at each position
+        """
+        return super().GenerateFieldAtPositions(timeElapsed, arrayOfPositions)
\ No newline at end of file
@@ -0,0 +1,75 @@
+from AbstractIntegrator import AbstractIntegratorClass, np, const
+
+class EulerCromerIntegratorClass(AbstractIntegratorClass):
+    """ Class that moves the bunch with the Euler Cromer method. The acceleration is found from the
+            fields at the start of the timestep, the velocity is updated and then the position is
+            updated with the new velocity. First order, with one field evaluation per timestep.
+
+        Class Attributes:
+            name (string): Name of the integrator
+            numberOfFieldEvaluations (int): The number of times the fields acting on the whole bunch
+                have been found by the integrator
+    """
+
+    def __init__(self, name='Euler Cromer Integrator'):
+        """ Constructor for the EulerCromerIntegratorClass class.
+                Inherits the __init__ from AbstractIntegratorClass.
+
+            Args:
+                name (string): Name of the integrator
+        """
+        super().__init__(name=name)
+
+    def __repr__(self):
+        return 'Euler Cromer Integrator: {0}'.format(self.name)
+
+    def Step(self, particleBunch, totalEMField, timeElapsed, timestep, limitVelocity:bool=True):
+        """ Method that moves the particle bunch forward by one timestep with the Euler Cromer method.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is moved
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): Time that the update lasts for
+                limitVelocity (bool): If True, the timestep is made 10 times smaller until the mean
+                    velocity of the bunch after the update is below the speed of light
+
+            Parameters:
+                testIfVelocityTooHigh (ndarray): numpy array that holds the expected value for the
+                    updated velocity if the current timestep is used
+                numberOfTimesBreakIsPrevented (int): The number of times that the emergency shortended 
+                    timestep was used in a row to prevent a crash
+
+            Returns:
+                [timestep, numberOfTimesBreakIsPrevented] (list): The timestep that was used and the
+                    number of times that it was made 10 times smaller
+        """
+        # give all particles correct acceleration by determining the total electric
+        # and magnetic fields that act on the particles
+        totalEMField.GiveAcceleration(particleBunch, timeElapsed)
+        self.numberOfFieldEvaluations += 1
+
+        # the following prevents a timestep that is too large causing a particle to move faster than the
+        # speed of light
+        # therefore, this check comes after updating acceleration but before applying the euler cromer
+        # method
+        numberOfTimesBreakIsPrevented = 0
+
+        while limitVelocity:
+
+            testIfVelocityTooHigh = (particleBunch.FindBunchMeanVelocity() 
+            + particleBunch.FindBunchMeanAcceleration() * timestep)
+
+            # if the velocity is lower than the speed of light, continue
+            if np.linalg.norm(testIfVelocityTooHigh) < const.speed_of_light:
+                break
+
+            else:
+                # make the timestep 10 times smaller and try again
+                timestep = 0.1 * timestep
+                numberOfTimesBreakIsPrevented += 1
+
+        # apply the euler cromer method to update the velocity and position of all particles
+        particleBunch.UpdateCromer(timestep)
+
+        return [timestep, numberOfTimesBreakIsPrevented]
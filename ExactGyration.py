@@ -0,0 +1,305 @@
+import numpy as np
+import math
+from MagneticExternalField import MagneticExternalFieldClass
+
+class ExactGyrationClass:
+    """ Class that moves a bunch along the exact helices of its particles while every particle is
+            only acted on by static uniform magnetic fields. The Lorentz factor of a particle does
+            not change in a pure magnetic field, so its velocity turns about the field at a fixed
+            angular frequency and the motion can be found for any time in closed form.
+
+            A jump lasts until the first particle reaches the boundary of an external field, or
+            until the longest jump that the simulation allows, such as the next recording time.
+            A jump is only taken if it is longer than the timestep that the simulation would
+            otherwise use, so the integrator of the simulation carries the bunch across the
+            boundary of a field.
+
+            A static uniform magnetic field is a MagneticExternalFieldClass with an angular
+            frequency of zero. A particle is not gyrating if it is inside any other external field
+            with a non-zero strength, or if the fields of the other particles exert a force larger
+            than fieldTolerance multiplied by the magnetic force on it.
+
+        Class Attributes:
+            fieldTolerance (float): Largest force from the fields of the other particles, as a fraction
+                of the magnetic force of the external fields, for which a particle is treated as gyrating
+            boundaryTolerance (float): A jump ends once the first particle is closer to the boundary of
+                a field than it travels in this fraction of the timestep of the simulation
+            maximumIterations (int): The largest number of times that the particles are moved towards
+                the boundaries of the fields while the length of a jump is found
+            name (string): Name of the exact gyration
+            numberOfJumps (int): The number of jumps that have been taken
+    """
+
+    def __init__(self, fieldTolerance=1e-3, boundaryTolerance=1e-3, maximumIterations:int=100
+    , name='Exact Gyration'):
+        """ Constructor for the ExactGyrationClass class.
+
+            Args:
+                fieldTolerance (float): Largest force from the fields of the other particles, as a
+                    fraction of the magnetic force of the external fields, for which a particle is
+                    treated as gyrating
+                boundaryTolerance (float): A jump ends once the first particle is closer to the boundary
+                    of a field than it travels in this fraction of the timestep of the simulation
+                maximumIterations (int): The largest number of times that the particles are moved towards
+                    the boundaries of the fields while the length of a jump is found
+                name (string): Name of the exact gyration
+        """
+        self.fieldTolerance = fieldTolerance
+        self.boundaryTolerance = boundaryTolerance
+        self.maximumIterations = maximumIterations
+        self.name = name
+        self.numberOfJumps = 0
+
+    def __repr__(self):
+        return 'Exact Gyration: {0}, Field Tolerance: {1}, Boundary Tolerance: {2}'.format(self.name
+        , self.fieldTolerance, self.boundaryTolerance)
+
+    def IsStaticUniformField(self, externalField):
+        """ Method that returns True if an external field is a static uniform magnetic field.
+
+            Args:
+                externalField (object: AbstractExternalFieldClass): The external field
+
+            Returns:
+                isStatic (bool): True if the field is a magnetic field with an angular frequency of zero
+        """
+        return isinstance(externalField, MagneticExternalFieldClass) and externalField.angularFrequency == 0.0
+
+    def IsBunchInStaticFields(self, particleBunch, totalEMField):
+        """ Method that returns True if every particle of the bunch is only inside static uniform
+                magnetic fields, or fields with a strength of zero. This only needs the positions of
+                the particles, so it is checked before the fields between particles.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+
+            Returns:
+                isInStaticFields (bool): True if no particle is inside any other external field
+        """
+        for externalField in totalEMField.listOfElectricFields + totalEMField.listOfMagneticFields:
+            if ExactGyrationClass.IsStaticUniformField(self, externalField):
+                continue
+            if (np.any(externalField.fieldStrength != 0)
+            and np.any(externalField.IsPositionInField(particleBunch.arrayOfPositions))):
+                return False
+        return True
+
+    def IsInteractionSmall(self, particleBunch, totalEMField, arrayOfMagneticFields):
+        """ Method that returns True if the fields of the other particles exert a force no larger than
+                fieldTolerance multiplied by the magnetic force of the external fields on every particle.
+                The fields between particles are kept by totalEMField, so if the bunch is not moved
+                along exact helices the step that follows reuses them.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                arrayOfMagneticFields (ndarray): N x 3 array of the external magnetic field acting on
+                    each particle
+
+            Parameters:
+                magneticForces (ndarray): The magnetic force of the external fields on each particle,
+                    divided by its charge
+                interactionForces (ndarray): The force of the fields of the other particles on each
+                    particle, divided by its charge
+
+            Returns:
+                isSmall (bool): True if the fields of the other particles are insignificant
+        """
+        interactionFields = totalEMField.FindInteractionFields(particleBunch, isKept=True)
+        magneticForces = np.linalg.norm(np.cross(particleBunch.arrayOfVelocities, arrayOfMagneticFields), axis=1)
+        interactionForces = np.linalg.norm(interactionFields[0]
+        + np.cross(particleBunch.arrayOfVelocities, interactionFields[1]), axis=1)
+
+        return bool(np.all(interactionForces <= self.fieldTolerance * magneticForces))
+
+    def IsBunchGyrating(self, particleBunch, totalEMField, timeElapsed):
+        """ Method that returns True if every particle of the bunch is only acted on by static
+                uniform magnetic fields.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+
+            Returns:
+                isGyrating (bool): True if the bunch can be moved along exact helices
+        """
+        if not ExactGyrationClass.IsBunchInStaticFields(self, particleBunch, totalEMField):
+            return False
+
+        return ExactGyrationClass.IsInteractionSmall(self, particleBunch, totalEMField
+        , totalEMField.SumOfExternalFieldsForBunch(particleBunch, timeElapsed)[1])
+
+    def FindHelices(self, particleBunch, arrayOfMagneticFields, arrayOfTimes):
+        """ Method that returns the position and velocity of every particle after each of an array
+                of times, moving along the exact helix about the magnetic field.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                arrayOfMagneticFields (ndarray): N x 3 array of the magnetic field acting on each particle
+                arrayOfTimes (ndarray): Array of S times after the current time, or an S x N array with
+                    a time for each particle
+
+            Parameters:
+                angularVelocities (ndarray): N x 3 array of the angular velocity that the velocity of
+                    each particle turns with, which is -qB/(Lorentz factor * rest mass)
+                parallelVelocities (ndarray): Part of each velocity along the magnetic field
+                perpendicularVelocities (ndarray): Part of each velocity across the magnetic field
+                turnedVelocities (ndarray): The perpendicular velocities turned a quarter of a circle
+                angles (ndarray): S x N array of the angle each particle has turned through
+
+            Returns:
+                [arrayOfPositions, arrayOfVelocities] (list): S x N x 3 arrays of the position and
+                    velocity of each particle at each time
+        """
+        angularVelocities = (-1 * (particleBunch.arrayOfCharges / (particleBunch.FindLorentzFactors()
+        * particleBunch.arrayOfRestMasses))[:, np.newaxis] * arrayOfMagneticFields)
+        angularFrequencies = np.linalg.norm(angularVelocities, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fieldDirections = np.nan_to_num(angularVelocities / angularFrequencies[:, np.newaxis])
+
+        velocities = particleBunch.arrayOfVelocities
+        parallelVelocities = np.einsum('ij,ij->i', velocities, fieldDirections)[:, np.newaxis] * fieldDirections
+        perpendicularVelocities = velocities - parallelVelocities
+        turnedVelocities = np.cross(fieldDirections, perpendicularVelocities)
+
+        times = np.asarray(arrayOfTimes, dtype=float)
+        times = times.reshape(len(times), -1)
+        angles = (times * angularFrequencies)[:, :, np.newaxis]
+        times = times[:, :, np.newaxis]
+        # sin(angle) / angularFrequency and (1 - cos(angle)) / angularFrequency, written so that they
+        # are also correct for a particle that is not turning
+        sineTerm = times * np.sinc(angles / math.pi)
+        cosineTerm = times * np.sin(0.5 * angles) * np.sinc(0.5 * angles / math.pi)
+
+        arrayOfPositions = (particleBunch.arrayOfPositions + parallelVelocities * times
+        + perpendicularVelocities * sineTerm + turnedVelocities * cosineTerm)
+        arrayOfVelocities = (parallelVelocities + perpendicularVelocities * np.cos(angles)
+        + turnedVelocities * np.sin(angles))
+
+        return [arrayOfPositions, arrayOfVelocities]
+
+    def FindBoundaryDistances(self, listOfBoundedFields, arrayOfPositions):
+        """ Method that returns the distance from each position to the nearest boundary of any of
+                a list of external fields.
+
+            Args:
+                listOfBoundedFields (list): External fields with a finite size
+                arrayOfPositions (ndarray): N x 3 array of positions
+
+            Parameters:
+                outsideDistances (ndarray): Distance from each position to the field, for positions
+                    outside the field
+                insideDistances (ndarray): Distance from each position to the nearest side of the field,
+                    for positions inside the field
+
+            Returns:
+                arrayOfDistances (ndarray): Distance from each position to the nearest boundary
+        """
+        arrayOfDistances = np.full(len(arrayOfPositions), math.inf)
+        for externalField in listOfBoundedFields:
+            minimumCorner = np.array([i[0] for i in externalField.listOfDimensions], dtype=float)
+            maximumCorner = np.array([i[1] for i in externalField.listOfDimensions], dtype=float)
+            outsideDistances = np.linalg.norm(np.maximum(np.maximum(minimumCorner - arrayOfPositions
+            , arrayOfPositions - maximumCorner), 0.0), axis=1)
+            insideDistances = np.min(np.minimum(arrayOfPositions - minimumCorner, maximumCorner - arrayOfPositions)
+            , axis=1)
+            arrayOfDistances = np.minimum(arrayOfDistances, np.where(externalField.IsPositionInField(
+                arrayOfPositions), insideDistances, outsideDistances))
+
+        return arrayOfDistances
+
+    def FindJumpTime(self, particleBunch, totalEMField, arrayOfMagneticFields, longestJump, timestep):
+        """ Method that returns the time until the first particle reaches the boundary of an
+                external field, or longestJump if no particle reaches a boundary before then.
+                A particle moving at a fixed speed can not reach a boundary before the time taken
+                to travel the distance to the boundary in a straight line, so each particle is moved
+                along its helix by this time until it is close to a boundary. The time returned is
+                never after a particle crosses a boundary.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                arrayOfMagneticFields (ndarray): N x 3 array of the magnetic field acting on each particle
+                longestJump (float): The longest time that may be jumped
+                timestep (float): The timestep that the simulation would otherwise take
+
+            Parameters:
+                listOfBoundedFields (list): External fields with a non-zero strength and a finite size
+                particleTimes (ndarray): For each particle, a time before which it does not reach a boundary
+                timesToBoundary (ndarray): Time for each particle to travel the distance to the nearest
+                    boundary in a straight line
+
+            Returns:
+                jumpTime (float): Time that the bunch can be moved without any particle crossing the
+                    boundary of a field
+        """
+        listOfBoundedFields = [i for i in totalEMField.listOfElectricFields + totalEMField.listOfMagneticFields
+        if np.any(i.fieldStrength != 0) and np.any(np.isfinite(np.array(i.listOfDimensions, dtype=float)))]
+        if len(listOfBoundedFields) == 0:
+            return longestJump
+
+        speeds = np.linalg.norm(particleBunch.arrayOfVelocities, axis=1)
+        particleTimes = np.zeros(particleBunch.numberOfParticles)
+        for i in range(self.maximumIterations):
+            arrayOfPositions = ExactGyrationClass.FindHelices(self, particleBunch, arrayOfMagneticFields
+            , particleTimes[np.newaxis, :])[0][0]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                timesToBoundary = np.where(speeds > 0, ExactGyrationClass.FindBoundaryDistances(self
+                , listOfBoundedFields, arrayOfPositions) / speeds, math.inf)
+
+            # every other particle reaches a boundary later than the first particle, so the jump is
+            # found once the first particle is close to its boundary
+            if timesToBoundary[np.argmin(particleTimes)] < self.boundaryTolerance * timestep:
+                break
+            # the particles are kept slightly short of the boundaries so that rounding does not
+            # carry a particle across
+            particleTimes = np.minimum(particleTimes + (1 - 1e-6) * timesToBoundary, longestJump)
+            if np.min(particleTimes) >= longestJump:
+                break
+
+        return np.min(particleTimes)
+
+    def Jump(self, particleBunch, totalEMField, timeElapsed, timestep, longestJump):
+        """ Method that moves the bunch along the exact helices of its particles, if every particle is
+                only acted on by static uniform magnetic fields and the jump is longer than timestep.
+                The conditions are checked from the cheapest to the most expensive, so the fields
+                between particles are only found when a jump is otherwise possible.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is moved
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): The timestep that the simulation would otherwise take
+                longestJump (float): The longest time that may be jumped, such as the time until the
+                    next recording time or the end of the simulation
+
+            Parameters:
+                arrayOfMagneticFields (ndarray): N x 3 array of the external magnetic field acting on
+                    each particle
+                jumpTime (float): Time until the first particle reaches the boundary of a field
+
+            Returns:
+                jumpTime (float): The time that the bunch was moved by, or zero if the bunch was not moved
+        """
+        if longestJump <= timestep or not ExactGyrationClass.IsBunchInStaticFields(self, particleBunch
+        , totalEMField):
+            return 0.0
+
+        arrayOfMagneticFields = totalEMField.SumOfExternalFieldsForBunch(particleBunch, timeElapsed)[1]
+        jumpTime = ExactGyrationClass.FindJumpTime(self, particleBunch, totalEMField, arrayOfMagneticFields
+        , longestJump, timestep)
+        if jumpTime <= timestep or not ExactGyrationClass.IsInteractionSmall(self, particleBunch, totalEMField
+        , arrayOfMagneticFields):
+            return 0.0
+
+        arrayOfPositions, arrayOfVelocities = [i[0] for i in ExactGyrationClass.FindHelices(self
+        , particleBunch, arrayOfMagneticFields, [jumpTime])]
+        # the mean acceleration over the jump is kept for methods that use acceleration
+        particleBunch.arrayOfAccelerations[:] = (arrayOfVelocities - particleBunch.arrayOfVelocities) / jumpTime
+        particleBunch.arrayOfVelocities[:] = arrayOfVelocities
+        particleBunch.arrayOfPositions[:] = arrayOfPositions
+        self.numberOfJumps += 1
+
+        return jumpTime
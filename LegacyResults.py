@@ -0,0 +1,199 @@
+""" Converter from the .pkl results saved by the simulations to the columnar format of ColumnarResults.
+
+        A .pkl result is a pandas dataframe, and the results of the standard and conservation law
+        simulations hold a list of Particle objects for every record, so reading one means unpickling
+        every particle. Converting a result reads the .pkl file once, and the position, velocity and
+        acceleration of the particles are copied one record at a time into memory-mapped .npy files,
+        releasing each record once it is copied, so the result is never held in memory twice.
+
+        The result 'name.pkl' is converted to the directory 'name' by default, which PlottingClass('name')
+        then reads in place of the .pkl file. A directory of results can be converted by a pool of
+        processes with ConvertLegacyDirectory(), or by running this file:
+            python LegacyResults.py <directory> --workers 4
+"""
+import numpy as np
+import pandas as pd
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import ColumnarResults
+
+# columns of the .pkl file saved by each simulation
+dictionaryOfLegacyColumns = {'SimulationStandardClass':['Time', 'Simulation', 'Energy', 'Spread']
+, 'SimulationPhaseChangeClass':['Phase', 'FinalSpread']
+, 'SimulationConservationLawsClass':['Time', 'Simulation', 'EnergyFields', 'Momentum', 'AngularMomentum'
+, 'EnergyParticles']}
+
+def FindLegacySimulationType(listOfColumns):
+    """ Function that returns the simulation that saved a .pkl result, from its columns.
+
+        Args:
+            listOfColumns (list): Names of the columns of the dataframe
+
+        Returns:
+            simulationType (string): Name of the simulation class, or None if the columns do not
+                match any simulation
+    """
+    for simulationType, listOfLegacyColumns in dictionaryOfLegacyColumns.items():
+        if sorted(listOfColumns) == sorted(listOfLegacyColumns):
+            return simulationType
+    return None
+
+def IsConversionCurrent(pickledFile:str, directoryName:str=None):
+    """ Function that returns whether a .pkl result has already been converted, and has not changed since.
+
+        Args:
+            pickledFile (string): File name of the result, excluding the .pkl extension
+            directoryName (string): Directory of the converted result. If None, it is pickledFile.
+
+        Returns:
+            isCurrent (bool): True if the directory holds a columnar result that is newer than the .pkl file
+    """
+    if directoryName is None:
+        directoryName = pickledFile
+    if not ColumnarResults.IsColumnarResults(directoryName):
+        return False
+    return (os.path.getmtime(os.path.join(directoryName, 'metadata.json'))
+    >= os.path.getmtime("%s.pkl"%(pickledFile)))
+
+def ConvertLegacyResults(pickledFile:str, directoryName:str=None):
+    """ Function that converts a .pkl result to the columnar format, replacing any result in the directory.
+
+        Args:
+            pickledFile (string): File name of the result, excluding the .pkl extension
+            directoryName (string): Directory of the converted result, which is created if it does not
+                exist. If None, it is pickledFile.
+
+        Parameters:
+            listOfStates (list): The list of Particle objects at each record, removed from the dataframe
+                so that each record is released once it is copied
+            dictionaryOfArrays (dictionary): Memory-mapped T x N x 3 arrays of the Positions, Velocities
+                and Accelerations of the particles
+
+        Raises:
+            ValueError: If the .pkl file is not a result saved by one of the simulations
+
+        Returns:
+            directoryName (string): Directory of the converted result
+    """
+    if directoryName is None:
+        directoryName = pickledFile
+    dataFrame = pd.read_pickle("%s.pkl"%(pickledFile))
+    simulationType = FindLegacySimulationType(list(dataFrame.columns))
+    if simulationType is None:
+        raise ValueError("%s.pkl is not a result saved by a simulation"%(pickledFile))
+
+    os.makedirs(directoryName, exist_ok=True)
+    # the old metadata is removed first, so the directory is not a complete result while it is written
+    if os.path.isfile(os.path.join(directoryName, 'metadata.json')):
+        os.remove(os.path.join(directoryName, 'metadata.json'))
+
+    listOfParticleColumns = []
+    listOfParticleNames = []
+    if 'Simulation' in dataFrame.columns:
+        listOfStates = dataFrame.pop('Simulation').tolist()
+        numberOfParticles = len(listOfStates[0]) if len(listOfStates) > 0 else 0
+        listOfParticleNames = [i.name for i in listOfStates[0]] if len(listOfStates) > 0 else []
+        dictionaryOfArrays = {column:np.lib.format.open_memmap(os.path.join(directoryName, '%s.npy'%(column))
+        , mode='w+', dtype=float, shape=(len(listOfStates), numberOfParticles, 3))
+        for column in ['Positions', 'Velocities', 'Accelerations']}
+        for i in range(len(listOfStates)):
+            for j, particle in enumerate(listOfStates[i]):
+                dictionaryOfArrays['Positions'][i, j] = particle.position
+                dictionaryOfArrays['Velocities'][i, j] = particle.velocity
+                dictionaryOfArrays['Accelerations'][i, j] = particle.acceleration
+            listOfStates[i] = None
+        for column, records in dictionaryOfArrays.items():
+            records.flush()
+            listOfParticleColumns.append(column)
+        del dictionaryOfArrays, listOfStates
+
+    for column in dataFrame.columns:
+        np.save(os.path.join(directoryName, '%s.npy'%(column)), dataFrame[column].to_numpy(dtype=float))
+
+    ColumnarResults.WriteMetadata(directoryName, simulationType, len(dataFrame)
+    , list(dataFrame.columns) + listOfParticleColumns, listOfParticleNames
+    , convertedFrom=os.path.basename("%s.pkl"%(pickledFile)))
+    return directoryName
+
+def LoadLegacyResults(pickledFile:str, directoryName:str=None):
+    """ Function that reads a .pkl result lazily, by converting it to the columnar format the first time
+            it is read, or whenever the .pkl file has changed, and memory-mapping the columns.
+
+        Args:
+            pickledFile (string): File name of the result, excluding the .pkl extension
+            directoryName (string): Directory of the converted result. If None, it is pickledFile.
+
+        Returns:
+            results (object: ColumnarResultsClass): The converted result
+    """
+    if directoryName is None:
+        directoryName = pickledFile
+    if not IsConversionCurrent(pickledFile, directoryName):
+        ConvertLegacyResults(pickledFile, directoryName)
+    return ColumnarResults.ColumnarResultsClass(directoryName)
+
+def ConvertLegacyResultsInWorker(pickledFile, directoryName, overwrite):
+    """ Function that converts one .pkl result in a worker process of ConvertLegacyDirectory().
+
+        Args:
+            pickledFile (string): File name of the result, excluding the .pkl extension
+            directoryName (string): Directory of the converted result
+            overwrite (bool): If False, a result that has already been converted is not converted again
+
+        Returns:
+            directoryName (string): Directory of the converted result, or None if the .pkl file is not
+                a result saved by a simulation
+    """
+    if not overwrite and IsConversionCurrent(pickledFile, directoryName):
+        return directoryName
+    try:
+        return ConvertLegacyResults(pickledFile, directoryName)
+    except ValueError:
+        return None
+
+def ConvertLegacyDirectory(directoryName:str, outputDirectoryName:str=None, numberOfWorkers:int=1
+, overwrite:bool=False):
+    """ Function that converts every .pkl result in a directory to the columnar format, spreading the
+            results across a pool of processes. On platforms that start processes with spawn, the
+            script that calls this function must be guarded by if __name__ == '__main__':.
+
+        Args:
+            directoryName (string): Directory that holds the .pkl results
+            outputDirectoryName (string): Directory that the converted results are written to, each
+                in a directory named after its .pkl file. If None, they are written next to the .pkl files.
+            numberOfWorkers (int): Number of processes that convert results at the same time
+            overwrite (bool): If False, results that have already been converted and have not changed
+                since are not converted again
+
+        Returns:
+            dictionaryOfResults (dictionary): The directory of the converted result for each .pkl file,
+                or None for .pkl files that are not results saved by a simulation
+    """
+    listOfPickledFiles = sorted(os.path.join(directoryName, i[:-len('.pkl')]) for i in os.listdir(directoryName)
+    if i.endswith('.pkl'))
+    if outputDirectoryName is None:
+        listOfDirectoryNames = listOfPickledFiles
+    else:
+        listOfDirectoryNames = [os.path.join(outputDirectoryName, os.path.basename(i)) for i in listOfPickledFiles]
+
+    if numberOfWorkers > 1:
+        with ProcessPoolExecutor(max_workers=numberOfWorkers) as executor:
+            listOfResults = list(executor.map(ConvertLegacyResultsInWorker, listOfPickledFiles
+            , listOfDirectoryNames, [overwrite] * len(listOfPickledFiles)))
+    else:
+        listOfResults = [ConvertLegacyResultsInWorker(i, j, overwrite)
+        for i, j in zip(listOfPickledFiles, listOfDirectoryNames)]
+
+    return {"%s.pkl"%(i):j for i, j in zip(listOfPickledFiles, listOfResults)}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Converts the .pkl results in a directory to the columnar format")
+    parser.add_argument('directoryName', help="Directory that holds the .pkl results")
+    parser.add_argument('--output', default=None, help="Directory that the converted results are written to")
+    parser.add_argument('--workers', type=int, default=1, help="Number of processes")
+    parser.add_argument('--overwrite', action='store_true', help="Convert results that are already converted")
+    arguments = parser.parse_args()
+    for pickledFile, convertedDirectory in ConvertLegacyDirectory(arguments.directoryName, arguments.output
+    , arguments.workers, arguments.overwrite).items():
+        print("%s -> %s"%(pickledFile, convertedDirectory if convertedDirectory is not None else "not a simulation result"))
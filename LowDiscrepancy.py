@@ -0,0 +1,32 @@
+""" Mapping of the points of scrambled Sobol and Halton sequences, which spread points through the unit cube
+        more evenly than random points, to normally distributed points through the inverse normal
+        cumulative distribution function.
+
+        The sequences are the engines of scipy.stats.qmc, which needs SciPy 1.7 or later. Each call starts
+        from the given index of the sequence with fast_forward(), so the points of a sequence may be made
+        in chunks of any size.
+"""
+import numpy as np
+import scipy.special
+import warnings
+
+def FindNormalPoints(sequence, start:int, stop:int):
+    """ Function that returns points of a scrambled sequence that are normally distributed, with a mean of
+            0 and a standard deviation of 1 in each dimension.
+
+        Args:
+            sequence (object: scipy.stats.qmc.QMCEngine): Scrambled Sobol or Halton sequence
+            start (int): Index of the first point
+            stop (int): Index after the last point
+
+        Returns:
+            points (ndarray): (stop - start) x number of dimensions array of points
+    """
+    sequence.reset()
+    sequence.fast_forward(start)
+    with warnings.catch_warnings():
+        # a bunch may have any number of particles, not only a power of 2
+        warnings.filterwarnings('ignore', message="The balance properties of Sobol' points")
+        points = sequence.random(stop - start)
+    # points are kept inside the open unit interval, where the inverse normal distribution is finite
+    return scipy.special.ndtri(np.clip(points, 2.0**-53, 1 - 2.0**-53))
@@ -0,0 +1,240 @@
+import numpy as np
+import scipy.constants as const
+
+class MacroParticleResamplerClass:
+    """ Class that adapts the macro-particles of a bunch as it changes shape, so the number of particles,
+            and the cost of each step, stays close to maximumNumberOfParticles.
+
+            Every stepInterval steps, if the bunch has more than maximumNumberOfParticles particles,
+            pairs of particles in its dense core are merged into one particle of their total weight.
+            Only particles of the same rest mass and charge that are close together are merged, at
+            the weighted mean of their positions and with the total momentum of the pair, so the charge
+            and momentum of the bunch do not change, and a pair is only merged if the total energy
+            changes by less than energyTolerance. If the bunch has fewer particles, particles in its
+            halo, furthest from its centre first, are split into two particles of half the weight,
+            which are moved in opposite directions from the position of the particle and keep its
+            velocity, so the charge, momentum and energy of the bunch do not change.
+
+            Distances are measured in units of the weighted standard deviation of the positions of
+            the bunch along each axis.
+
+        Class Attributes:
+            maximumNumberOfParticles (int): Number of particles that the bunch is merged down to, and
+                split up to
+            stepInterval (int): Number of steps between resamplings of the bunch
+            haloDistance (float): Distance from the centre of the bunch beyond which particles are split
+            coreDistance (float): Distance from the centre of the bunch within which particles are merged
+            mergeDistance (float): Largest distance between two particles that are merged
+            splitDistance (float): Distance that the two halves of a split particle are each moved by
+            minimumWeight (float): Smallest weight of a particle made by a split
+            energyTolerance (float): Largest change in the total energy of a pair of particles, as a
+                fraction of their energy, for them to be merged
+            seed (int): Seed of the random directions that split particles are moved in
+            name (string): Name of the resampler
+            numberOfSteps (int): Number of steps since the start of the simulation
+            numberOfSplits (int): Number of particles that have been split since the start of the simulation
+            numberOfMerges (int): Number of pairs of particles that have been merged since the start of
+                the simulation
+            energyChange (float): Total change in the energy of the bunch from merges since the start of
+                the simulation
+            randomGenerator (object: numpy.random.Generator): Generator of the directions of splits
+    """
+
+    def __init__(self, maximumNumberOfParticles:int, stepInterval:int=10, haloDistance=3.0, coreDistance=2.0
+    , mergeDistance=0.5, splitDistance=0.05, minimumWeight=1.0, energyTolerance=1e-6, seed:int=None
+    , name='Macro-Particle Resampler'):
+        """ Constructor for the MacroParticleResamplerClass class.
+
+            Args:
+                maximumNumberOfParticles (int): Number of particles that the bunch is merged down to,
+                    and split up to
+                stepInterval (int): Number of steps between resamplings of the bunch
+                haloDistance (float): Distance from the centre of the bunch, in standard deviations of
+                    its positions, beyond which particles are split
+                coreDistance (float): Distance from the centre of the bunch, in standard deviations of
+                    its positions, within which particles are merged
+                mergeDistance (float): Largest distance between two particles that are merged, in
+                    standard deviations of the positions of the bunch
+                splitDistance (float): Distance that the two halves of a split particle are each moved
+                    by, in standard deviations of the positions of the bunch
+                minimumWeight (float): Smallest weight of a particle made by a split
+                energyTolerance (float): Largest change in the total energy of a pair of particles, as
+                    a fraction of their energy, for them to be merged
+                seed (int): Seed of the random directions that split particles are moved in
+                name (string): Name of the resampler
+        """
+        self.maximumNumberOfParticles = maximumNumberOfParticles
+        self.stepInterval = stepInterval
+        self.haloDistance = haloDistance
+        self.coreDistance = coreDistance
+        self.mergeDistance = mergeDistance
+        self.splitDistance = splitDistance
+        self.minimumWeight = minimumWeight
+        self.energyTolerance = energyTolerance
+        self.seed = seed
+        self.name = name
+        MacroParticleResamplerClass.Reset(self)
+
+    def __repr__(self):
+        return 'Macro-Particle Resampler: {0}, Maximum Number of Particles: {1}, Step Interval: {2}'.format(
+        self.name, self.maximumNumberOfParticles, self.stepInterval)
+
+    def Reset(self):
+        """ Method that restores the resampler to its state at the start of a simulation.
+        """
+        self.numberOfSteps = 0
+        self.numberOfSplits = 0
+        self.numberOfMerges = 0
+        self.energyChange = 0.0
+        self.randomGenerator = np.random.default_rng(self.seed)
+
+    def IsResamplingStep(self):
+        """ Method that returns whether the bunch is resampled at the current step, and counts the step.
+
+            Returns:
+                isResampling (bool): True if the bunch is resampled
+        """
+        isResampling = self.numberOfSteps % self.stepInterval == 0
+        self.numberOfSteps += 1
+        return isResampling
+
+    def FindMomenta(self, particleBunch):
+        """ Method that returns the momentum per unit rest mass (Lorentz factor multiplied by velocity)
+                of every particle of a bunch.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+
+            Returns:
+                momenta (ndarray): N x 3 array of the momentum per unit rest mass of each particle
+        """
+        return particleBunch.FindLorentzFactors()[:, np.newaxis] * particleBunch.arrayOfVelocities
+
+    def FindMergingPairs(self, particleBunch, normalisedPositions, isCore):
+        """ Method that returns the pairs of particles in the core of a bunch that may be merged. The
+                particles are ordered by the cell of a grid of cells mergeDistance wide that they are in,
+                and each particle is paired with the next, if they have the same rest mass and charge,
+                are within mergeDistance of each other and merging them changes their energy by less
+                than energyTolerance.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                normalisedPositions (ndarray): N x 3 array of the positions of the particles from the
+                    centre of the bunch, in standard deviations of the positions
+                isCore (ndarray): Array that is True for each particle that may be merged
+
+            Parameters:
+                energies (ndarray): Total energy of each particle before the merge, divided by the rest
+                    energy
+                mergedEnergies (ndarray): Total energy of each pair after the merge, divided by the rest
+                    energy
+
+            Returns:
+                [firstIndices, secondIndices, separations, energyChanges] (list): Indices of the two
+                    particles of each pair, their distance apart in standard deviations, and the change
+                    in their total energy if they are merged, sorted by distance
+        """
+        candidates = np.flatnonzero(isCore)
+        cells = np.floor(normalisedPositions[candidates] / self.mergeDistance)
+        order = candidates[np.lexsort((cells[:, 2], cells[:, 1], cells[:, 0]))]
+        firstIndices, secondIndices = order[0:-1:2], order[1::2]
+
+        weights = particleBunch.arrayOfWeights
+        momenta = MacroParticleResamplerClass.FindMomenta(self, particleBunch) / const.speed_of_light
+        energies = np.sqrt(1 + np.einsum('ij,ij->i', momenta, momenta))
+        totalWeights = weights[firstIndices] + weights[secondIndices]
+        mergedMomenta = ((weights[firstIndices, np.newaxis] * momenta[firstIndices]
+        + weights[secondIndices, np.newaxis] * momenta[secondIndices]) / totalWeights[:, np.newaxis])
+        mergedEnergies = totalWeights * np.sqrt(1 + np.einsum('ij,ij->i', mergedMomenta, mergedMomenta))
+        pairEnergies = weights[firstIndices] * energies[firstIndices] + weights[secondIndices] * energies[secondIndices]
+        restEnergies = particleBunch.arrayOfRestMasses[firstIndices] * const.speed_of_light ** 2
+        energyChanges = (mergedEnergies - pairEnergies) * restEnergies
+
+        separations = np.linalg.norm(normalisedPositions[firstIndices] - normalisedPositions[secondIndices], axis=1)
+        isMergeable = ((separations <= self.mergeDistance)
+        & (np.abs(mergedEnergies - pairEnergies) <= self.energyTolerance * pairEnergies)
+        & (particleBunch.arrayOfRestMasses[firstIndices] == particleBunch.arrayOfRestMasses[secondIndices])
+        & (particleBunch.arrayOfCharges[firstIndices] == particleBunch.arrayOfCharges[secondIndices]))
+
+        byDistance = np.argsort(separations[isMergeable], kind='stable')
+        return [i[isMergeable][byDistance] for i in [firstIndices, secondIndices, separations, energyChanges]]
+
+    def Resample(self, particleBunch):
+        """ Method that merges particles in the core of a bunch if it has more than
+                maximumNumberOfParticles particles, or splits particles in its halo if it has fewer,
+                and replaces the particles of the bunch.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is resampled
+
+            Parameters:
+                standardDeviations (ndarray): Weighted standard deviation of the positions of the bunch
+                    along each axis
+                isKept (ndarray): Array that is False for each particle that is merged into another
+
+            Returns:
+                [numberOfSplits, numberOfMerges] (list): Number of particles that were split and number
+                    of pairs that were merged
+        """
+        numberOfParticles = particleBunch.numberOfParticles
+        if numberOfParticles < 2:
+            return [0, 0]
+
+        arrayOfPositions = particleBunch.arrayOfPositions.copy()
+        arrayOfVelocities = particleBunch.arrayOfVelocities.copy()
+        arrayOfAccelerations = particleBunch.arrayOfAccelerations.copy()
+        arrayOfWeights = particleBunch.arrayOfWeights.copy()
+        meanPosition = np.average(arrayOfPositions, axis=0, weights=arrayOfWeights)
+        standardDeviations = np.sqrt(np.average((arrayOfPositions - meanPosition) ** 2, axis=0
+        , weights=arrayOfWeights))
+        # an axis along which the bunch has no size is measured in metres
+        standardDeviations[standardDeviations == 0] = 1.0
+        normalisedPositions = (arrayOfPositions - meanPosition) / standardDeviations
+        normalisedDistances = np.linalg.norm(normalisedPositions, axis=1)
+        isKept = np.ones(numberOfParticles, dtype=bool)
+
+        numberOfMerges = 0
+        if numberOfParticles > self.maximumNumberOfParticles:
+            firstIndices, secondIndices, separations, energyChanges = MacroParticleResamplerClass.FindMergingPairs(
+            self, particleBunch, normalisedPositions, normalisedDistances <= self.coreDistance)
+            numberOfMerges = min(len(firstIndices), numberOfParticles - self.maximumNumberOfParticles)
+            firstIndices, secondIndices = firstIndices[:numberOfMerges], secondIndices[:numberOfMerges]
+
+            # the merged particle has the total weight and momentum of the pair, at their centre
+            firstWeights = arrayOfWeights[firstIndices, np.newaxis]
+            secondWeights = arrayOfWeights[secondIndices, np.newaxis]
+            totalWeights = firstWeights + secondWeights
+            momenta = MacroParticleResamplerClass.FindMomenta(self, particleBunch)
+            mergedMomenta = (firstWeights * momenta[firstIndices] + secondWeights * momenta[secondIndices]) / totalWeights
+            arrayOfVelocities[firstIndices] = mergedMomenta / np.sqrt(1 + np.einsum('ij,ij->i', mergedMomenta
+            , mergedMomenta) / const.speed_of_light ** 2)[:, np.newaxis]
+            for array in [arrayOfPositions, arrayOfAccelerations]:
+                array[firstIndices] = (firstWeights * array[firstIndices] + secondWeights * array[secondIndices]
+                ) / totalWeights
+            arrayOfWeights[firstIndices] = totalWeights[:, 0]
+            isKept[secondIndices] = False
+            self.energyChange += np.sum(energyChanges[:numberOfMerges])
+
+        # halo particles are split, furthest from the centre first, while there is room in the bunch
+        isHalo = isKept & (normalisedDistances > self.haloDistance) & (arrayOfWeights >= 2 * self.minimumWeight)
+        haloIndices = np.flatnonzero(isHalo)
+        haloIndices = haloIndices[np.argsort(-normalisedDistances[haloIndices], kind='stable')]
+        numberOfSplits = max(0, min(len(haloIndices), self.maximumNumberOfParticles - np.count_nonzero(isKept)))
+        haloIndices = haloIndices[:numberOfSplits]
+        directions = self.randomGenerator.normal(size=(numberOfSplits, 3))
+        directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+        displacements = self.splitDistance * standardDeviations * directions
+        arrayOfWeights[haloIndices] /= 2
+        splitPositions = arrayOfPositions[haloIndices] - displacements
+        arrayOfPositions[haloIndices] += displacements
+
+        particleBunch.ReplaceParticles(np.concatenate([arrayOfPositions[isKept], splitPositions])
+        , np.concatenate([arrayOfVelocities[isKept], arrayOfVelocities[haloIndices]])
+        , np.concatenate([arrayOfAccelerations[isKept], arrayOfAccelerations[haloIndices]])
+        , np.concatenate([particleBunch.arrayOfRestMasses[isKept], particleBunch.arrayOfRestMasses[haloIndices]])
+        , np.concatenate([particleBunch.arrayOfCharges[isKept], particleBunch.arrayOfCharges[haloIndices]])
+        , np.concatenate([arrayOfWeights[isKept], arrayOfWeights[haloIndices]]))
+
+        self.numberOfSplits += numberOfSplits
+        self.numberOfMerges += numberOfMerges
+        return [numberOfSplits, numberOfMerges]
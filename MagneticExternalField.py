@@ -46,4 +46,17 @@ class MagneticExternalFieldClass(AbstractExternalFieldClass):
             Returns:
                 Magnetic Field (ndarray): The magnetic field affecting the particle
         """
-        return super().GenerateField(timeElapsed, affectedParticle)
\ No newline at end of file
+        return super().GenerateField(timeElapsed, affectedParticle)
+
+    def GenerateFieldAtPositions(self, timeElapsed, arrayOfPositions):
+        """ Method for generating the magnetic field at every one of an array of positions after a certain
+                time. Uses an inherited method from the parent class AbstractExternalFieldClass
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the simulation
+                arrayOfPositions (ndarray): N x 3 array of the positions where the magnetic field is found
+
+            Returns:
+                Magnetic Field (ndarray): N x 3 array of the magnetic field at each position
+        """
+        return super().GenerateFieldAtPositions(timeElapsed, arrayOfPositions)
\ No newline at end of file
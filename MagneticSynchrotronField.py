@@ -74,4 +74,21 @@ class MagneticSynchrotronFieldClass(AbstractExternalFieldClass):
                     the required increase in magnetic field amplitude in order to keep the circular
                     radius of the bunch of particles fixed
         """
-        return super().GenerateField(timeElapsed, affectedParticle) * MagneticSynchrotronFieldClass.ConstantRadius(self)
\ No newline at end of file
+        return super().GenerateField(timeElapsed, affectedParticle) * MagneticSynchrotronFieldClass.ConstantRadius(self)
+
+    def GenerateFieldAtPositions(self, timeElapsed, arrayOfPositions):
+        """ Method for generating the magnetic field at every one of an array of positions after a
+                certain time. The multiplier that keeps the radius of the bunch fixed is found once for
+                all of the positions.
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the simulation
+                arrayOfPositions (ndarray): N x 3 array of the positions where the magnetic field is found
+
+            Returns:
+                Magnetic Field (ndarray): N x 3 array of the magnetic field at each position multipled
+                    by the required increase in magnetic field amplitude in order to keep the circular
+                    radius of the bunch of particles fixed
+        """
+        return (super().GenerateFieldAtPositions(timeElapsed, arrayOfPositions)
+        * MagneticSynchrotronFieldClass.ConstantRadius(self))
\ No newline at end of file
@@ -0,0 +1,244 @@
+import numpy as np
+import pandas as pd
+import itertools
+import re
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from ParticleBunchClass import ParticleBunch
+
+class ParameterSweepClass:
+    """ Class that runs a simulation many times with different values of any of its attributes, or the
+            attributes of its fields and bunch, and collects a table of the results.
+
+            Each parameter is named by its path from the simulation, made of attribute names and
+            indices, such as 'smallTimestep', 'particleBunch.bunchEnergySpread',
+            'totalEMField.listOfElectricFields[0].angularFrequency' or
+            'totalEMField.listOfMagneticFields[0].fieldStrength[1]'. Every run starts from its own
+            copy of the simulation. If an attribute that the particles of a bunch are created from
+            is changed, such as bunchEnergySpread, the particles of the bunch are created again.
+
+        Class Attributes:
+            simulation (object: AbstractSimulationClass): The simulation that is copied for each run
+            dictionaryOfParameters (dictionary): The values of each parameter path. For a grid, a list of
+                the values of each parameter. For a latin hypercube or random design, the lower and
+                upper bound of each parameter.
+            design (string): 'grid' runs every combination of the values, 'latin hypercube' spreads
+                numberOfSamples runs so that each parameter has one run in each of numberOfSamples
+                equal intervals, and 'random' draws numberOfSamples uniform runs.
+            numberOfSamples (int): Number of runs of a latin hypercube or random design
+            numberOfWorkers (int): Number of processes that the runs are spread across. If 1, the runs
+                are run one after another in this process.
+            seed (int): Seed of the random designs and of the particles of each run that creates its
+                bunch again. If None, the results are not repeatable.
+            measureFunction (function): Function that is given a simulation at the end of its run and
+                returns a dictionary of the results of the run. Must be defined at the top level of a
+                file to be sent to other processes.
+            name (string): Name of the sweep
+            listOfParameterSets (list): Dictionary of the value of each parameter for every run
+            resultTable (pandas dataframe): One row for each run, with the run number, the value of each
+                parameter and each result of the measureFunction
+    """
+
+    def __init__(self, simulation, dictionaryOfParameters, design='grid', numberOfSamples:int=10
+    , numberOfWorkers:int=1, seed=None, measureFunction=None, name='Parameter Sweep'):
+        """ Constructor for the ParameterSweepClass class.
+
+            Args:
+                simulation (object: AbstractSimulationClass): The simulation that is copied for each run
+                dictionaryOfParameters (dictionary): The values of each parameter path. For a grid, a list
+                    of the values of each parameter. For a latin hypercube or random design, the lower and
+                    upper bound of each parameter.
+                design (string): 'grid', 'latin hypercube' or 'random'
+                numberOfSamples (int): Number of runs of a latin hypercube or random design
+                numberOfWorkers (int): Number of processes that the runs are spread across
+                seed (int): Seed of the random designs and of the particles of each run that creates its
+                    bunch again
+                measureFunction (function): Function that is given a simulation at the end of its run and
+                    returns a dictionary of the results of the run. If None, MeasureFinalBunch is used.
+                name (string): Name of the sweep
+        """
+        if design not in ['grid', 'latin hypercube', 'random']:
+            raise ValueError("design must be 'grid', 'latin hypercube' or 'random', not %s"%(design))
+        self.simulation = simulation
+        self.dictionaryOfParameters = dictionaryOfParameters
+        self.design = design
+        self.numberOfSamples = numberOfSamples
+        self.numberOfWorkers = numberOfWorkers
+        self.seed = seed
+        if measureFunction is None:
+            measureFunction = MeasureFinalBunch
+        self.measureFunction = measureFunction
+        self.name = name
+        self.randomGenerator = np.random.default_rng(seed)
+        self.listOfParameterSets = ParameterSweepClass.CreateDesign(self)
+        self.resultTable = None
+
+    def __repr__(self):
+        return 'Parameter Sweep: {0}, Design: {1}, Number of Runs: {2}, Parameters: {3}'.format(
+        self.name, self.design, len(self.listOfParameterSets), list(self.dictionaryOfParameters))
+
+    def CreateDesign(self):
+        """ Method that returns the value of each parameter for every run of the sweep.
+
+            Parameters:
+                listOfPaths (list): The path of each parameter
+                unitSamples (ndarray): numberOfSamples x number of parameters array of values between
+                    0 and 1, which are scaled to the bounds of each parameter
+
+            Returns:
+                listOfParameterSets (list): Dictionary of the value of each parameter for every run
+        """
+        listOfPaths = list(self.dictionaryOfParameters)
+
+        if self.design == 'grid':
+            return [dict(zip(listOfPaths, values)) for values in
+            itertools.product(*[self.dictionaryOfParameters[i] for i in listOfPaths])]
+
+        numberOfParameters = len(listOfPaths)
+        if self.design == 'latin hypercube':
+            # each parameter has one sample in each of numberOfSamples equal intervals, and the intervals
+            # of different parameters are paired at random
+            unitSamples = np.stack([(self.randomGenerator.permutation(self.numberOfSamples)
+            + self.randomGenerator.random(self.numberOfSamples)) / self.numberOfSamples
+            for i in range(numberOfParameters)], axis=1)
+        else:
+            unitSamples = self.randomGenerator.random((self.numberOfSamples, numberOfParameters))
+
+        lowerBounds = np.array([self.dictionaryOfParameters[i][0] for i in listOfPaths], dtype=float)
+        upperBounds = np.array([self.dictionaryOfParameters[i][1] for i in listOfPaths], dtype=float)
+        samples = lowerBounds + unitSamples * (upperBounds - lowerBounds)
+
+        return [dict(zip(listOfPaths, i)) for i in samples.tolist()]
+
+    def RunSweep(self):
+        """ Method that runs the simulation once for each set of parameters and collects the results in
+                resultTable, in the order of listOfParameterSets. If numberOfWorkers is more than 1, the
+                runs are spread across a pool of processes, which are each sent their own copy of the
+                simulation.
+
+            Parameters:
+                listOfRunSeeds (list): Seed of the particles of each run that creates its bunch again
+                listOfResults (list): Dictionary of the results of each run
+
+            Returns:
+                resultTable (pandas dataframe): One row for each run, with the run number, the value of
+                    each parameter and each result of the measureFunction
+        """
+        numberOfRuns = len(self.listOfParameterSets)
+        listOfRunSeeds = [None] * numberOfRuns
+        if self.seed is not None:
+            listOfRunSeeds = self.randomGenerator.integers(2**32, size=numberOfRuns).tolist()
+
+        listOfResults = []
+        if self.numberOfWorkers > 1:
+            with ProcessPoolExecutor(max_workers=self.numberOfWorkers) as executor:
+                # map returns the results in the order of the runs, not the order they finish in
+                for result in executor.map(RunSweepPointInWorker, [self.simulation] * numberOfRuns
+                , self.listOfParameterSets, listOfRunSeeds, [self.measureFunction] * numberOfRuns):
+                    listOfResults.append(result)
+                    print(len(listOfResults), "runs completed")
+        else:
+            for parameterSet, runSeed in zip(self.listOfParameterSets, listOfRunSeeds):
+                listOfResults.append(RunSweepPointInWorker(deepcopy(self.simulation), parameterSet, runSeed
+                , self.measureFunction))
+                print(len(listOfResults), "runs completed")
+
+        self.resultTable = pd.DataFrame([dict(Run=i, **self.listOfParameterSets[i], **listOfResults[i])
+        for i in range(numberOfRuns)])
+        return self.resultTable
+
+    def SaveSweep(self, fileName):
+        """ Method to save the result table of the sweep to a .pkl file as a pandas dataframe
+
+            Args:
+                fileName (string): Name of the saved data file
+        """
+        self.resultTable.to_pickle("%s.pkl"%(fileName))
+
+def SplitAttributePath(path):
+    """ Function that splits a parameter path into the attribute names and indices that it is made of.
+
+        Args:
+            path (string): Path of an attribute, such as 'totalEMField.listOfElectricFields[0].fieldStrength[1]'
+
+        Returns:
+            listOfKeys (list): Each attribute name as a string and each index as an int
+    """
+    listOfKeys = [int(i[1]) if i[1] else i[0] for i in re.findall(r'(\w+)|\[(-?\d+)\]', path)]
+    if not listOfKeys:
+        raise ValueError("%s is not a path of an attribute"%(path))
+    return listOfKeys
+
+def SetAttributeFromPath(target, path, value):
+    """ Function that sets the attribute at the end of a parameter path. An element of an array is set
+            in a copy of the array that replaces it, since arrays such as a default field strength may
+            be shared by several objects. If the attribute is one that the particles of a ParticleBunch
+            are created from, the particles of the bunch are created again.
+
+        Args:
+            target (object): The object that the path starts from, which is usually a simulation
+            path (string): Path of the attribute
+            value: The new value of the attribute
+
+        Parameters:
+            listOfOwners (list): The object that each key of the path is looked up in
+    """
+    listOfKeys = SplitAttributePath(path)
+    listOfOwners = [target]
+    for key in listOfKeys[:-1]:
+        listOfOwners.append(listOfOwners[-1][key] if isinstance(key, int) else getattr(listOfOwners[-1], key))
+
+    if isinstance(listOfOwners[-1], np.ndarray) and len(listOfKeys) > 1:
+        changedArray = np.array(listOfOwners[-1], dtype=np.result_type(listOfOwners[-1], value))
+        changedArray[listOfKeys[-1]] = value
+        listOfOwners, listOfKeys, value = listOfOwners[:-1], listOfKeys[:-1], changedArray
+
+    owner, key = listOfOwners[-1], listOfKeys[-1]
+    if isinstance(key, int):
+        owner[key] = value
+    else:
+        setattr(owner, key, value)
+        if isinstance(owner, ParticleBunch) and key in ['numberOfParticles', 'bunchPositionSpread'
+        , 'bunchEnergySpread', 'bunchMeanEnergy', 'restMassOfBunch', 'chargeOfBunch', 'bunchPositionMean'
+        , 'macroParticleWeight']:
+            ParticleBunch.CreateListOfParticles(owner)
+
+def MeasureFinalBunch(simulation):
+    """ Function that returns the mean energy, the standard deviation in energy and the mean position of
+            the bunch of a simulation, which is the default measure of a parameter sweep.
+
+        Args:
+            simulation (object: AbstractSimulationClass): Simulation at the end of its run
+
+        Returns:
+            dictionaryOfResults (dictionary): The final mean energy, energy spread and mean position
+                in x, y and z of the bunch
+    """
+    particleBunch = simulation.particleBunch
+    particleBunch.UpdateBunchMeanEnergy(), particleBunch.UpdateBunchEnergySpread()
+    meanPosition = particleBunch.FindBunchMeanPosition()
+    return {'FinalMeanEnergy':particleBunch.bunchMeanEnergy, 'FinalEnergySpread':particleBunch.bunchEnergySpread
+    , 'FinalMeanX':meanPosition[0], 'FinalMeanY':meanPosition[1], 'FinalMeanZ':meanPosition[2]}
+
+def RunSweepPointInWorker(simulation, parameterSet, runSeed, measureFunction):
+    """ Function that sets the parameters of a copy of a simulation, runs it and measures the result.
+            A copy that is sent to a worker process is unpickled there, so its fields and bunch belong
+            to this run alone.
+
+        Args:
+            simulation (object: AbstractSimulationClass): Copy of the simulation, which is changed
+            parameterSet (dictionary): The value of each parameter path for this run
+            runSeed (int): Seed of the random numbers used if the bunch is created again. If None, the
+                random numbers are not seeded.
+            measureFunction (function): Function that returns a dictionary of the results of the run
+
+        Returns:
+            dictionaryOfResults (dictionary): The results of the run
+    """
+    if runSeed is not None:
+        np.random.seed(runSeed)
+    for path, value in parameterSet.items():
+        SetAttributeFromPath(simulation, path, value)
+
+    simulation.RunSimulation()
+    return measureFunction(simulation)
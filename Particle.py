@@ -3,6 +3,7 @@ import math
 import scipy.constants as const
 from PointMagneticField import PointMagneticFieldClass
 from PointElectricField import PointElectricFieldClass
+import CompiledKernels
 
 class Particle:
     """Class for generating charged particles that behave relativistcally
@@ -18,6 +19,13 @@ class Particle:
             name (string): Name of the particle
             restMass (float): Rest mass of the particle
             charge (float): Charge of the particle
+            weight (float): Number of real particles that the particle stands for. A macro-particle
+                moves as one particle of its rest mass and charge, but generates the fields of
+                weight * charge.
+            arrayIndex (int): Row of the arrays that holds the state of the particle. The
+                position, velocity, acceleration, rest mass, charge and weight of the particle are
+                views of this row of arrayOfPositions, arrayOfVelocities, arrayOfAccelerations,
+                arrayOfRestMasses, arrayOfCharges and arrayOfWeights.
     """
 
     #e = 1.6E-19C
@@ -28,7 +36,7 @@ class Particle:
     
     def __init__(self, position=np.array([0,0,0], dtype=float),
      velocity=np.array([0,0,0], dtype=float), acceleration=np.array([0,0,0],
-      dtype=float), name='A Particle', restMass=1.0, charge=const.elementary_charge):
+      dtype=float), name='A Particle', restMass=1.0, charge=const.elementary_charge, weight=1.0):
         """ The constructor for Particle Class
 
             Args:
@@ -38,18 +46,148 @@ class Particle:
                 name (string): Name of the particle
                 restMass (float): Rest mass of the particle
                 charge (float): Charge of the particle
+                weight (float): Number of real particles that the particle stands for
         """
         self.name = name
-        self.position = np.array(position, dtype=float)
-        self.velocity = np.array(velocity, dtype=float)
-        self.acceleration = np.array(acceleration, dtype=float)
-        self.restMass = restMass
-        self.charge = charge
+        # a particle that is created on its own owns single row arrays. When it is added to a
+        # ParticleBunch it is re-bound to a row of the arrays of the bunch, so that the
+        # Particle object is a view of the bunch rather than a separate copy of its state.
+        Particle.BindToArrays(self, arrayOfPositions=np.array([position], dtype=float)
+        , arrayOfVelocities=np.array([velocity], dtype=float)
+        , arrayOfAccelerations=np.array([acceleration], dtype=float)
+        , arrayOfRestMasses=np.array([restMass], dtype=float)
+        , arrayOfCharges=np.array([charge], dtype=float), arrayOfWeights=np.array([weight], dtype=float)
+        , arrayIndex=0)
         self.electricField = PointElectricFieldClass(sourceParticle=self
         , name='Field from %s'%(self.name))
         self.magneticField = PointMagneticFieldClass(sourceParticle=self
         , name='Field from %s'%(self.name))
 
+    @staticmethod
+    def CreateFromArrays(arrayOfPositions, arrayOfVelocities, arrayOfAccelerations, arrayOfRestMasses
+    , arrayOfCharges, arrayOfWeights, arrayIndex:int, name='A Particle'):
+        """ Method that creates a particle that is a view of one row of a set of arrays, without first
+                creating the single row arrays of a particle on its own. Used to create the particles
+                of large bunches.
+
+            Args:
+                arrayOfPositions (ndarray): N x 3 array of positions
+                arrayOfVelocities (ndarray): N x 3 array of velocities
+                arrayOfAccelerations (ndarray): N x 3 array of accelerations
+                arrayOfRestMasses (ndarray): Array of N rest masses
+                arrayOfCharges (ndarray): Array of N charges
+                arrayOfWeights (ndarray): Array of N weights
+                arrayIndex (int): The row of the arrays that holds the state of the particle
+                name (string): Name of the particle
+
+            Returns:
+                particle (object: Particle): The particle
+        """
+        particle = Particle.__new__(Particle)
+        particle.name = name
+        Particle.BindToArrays(particle, arrayOfPositions=arrayOfPositions, arrayOfVelocities=arrayOfVelocities
+        , arrayOfAccelerations=arrayOfAccelerations, arrayOfRestMasses=arrayOfRestMasses
+        , arrayOfCharges=arrayOfCharges, arrayOfWeights=arrayOfWeights, arrayIndex=arrayIndex)
+        particle.electricField = PointElectricFieldClass(sourceParticle=particle
+        , name='Field from %s'%(name))
+        particle.magneticField = PointMagneticFieldClass(sourceParticle=particle
+        , name='Field from %s'%(name))
+        return particle
+
+    def __setstate__(self, state):
+        """ Method to restore a particle from a pickled state.
+                Particles saved before particles were stored as rows of arrays hold their
+                position, velocity, acceleration, rest mass and charge directly, so these are
+                moved into single row arrays. Particles saved before particles had weights are
+                given a weight of 1.
+
+            Args:
+                state (dict): The pickled attributes of the particle
+        """
+        if 'position' in state:
+            legacyState = {key: state.pop(key) for key in ['position', 'velocity', 'acceleration'
+            , 'restMass', 'charge']}
+            self.__dict__.update(state)
+            Particle.BindToArrays(self, arrayOfPositions=np.array([legacyState['position']], dtype=float)
+            , arrayOfVelocities=np.array([legacyState['velocity']], dtype=float)
+            , arrayOfAccelerations=np.array([legacyState['acceleration']], dtype=float)
+            , arrayOfRestMasses=np.array([legacyState['restMass']], dtype=float)
+            , arrayOfCharges=np.array([legacyState['charge']], dtype=float)
+            , arrayOfWeights=np.ones(1), arrayIndex=0)
+        else:
+            self.__dict__.update(state)
+            if 'arrayOfWeights' not in state:
+                self.arrayOfWeights = np.ones(len(self.arrayOfPositions))
+
+    def BindToArrays(self, arrayOfPositions, arrayOfVelocities, arrayOfAccelerations, arrayOfRestMasses
+    , arrayOfCharges, arrayOfWeights, arrayIndex:int):
+        """ Method that makes the particle a view of one row of a set of arrays.
+
+            Args:
+                arrayOfPositions (ndarray): N x 3 array of positions
+                arrayOfVelocities (ndarray): N x 3 array of velocities
+                arrayOfAccelerations (ndarray): N x 3 array of accelerations
+                arrayOfRestMasses (ndarray): Array of N rest masses
+                arrayOfCharges (ndarray): Array of N charges
+                arrayOfWeights (ndarray): Array of N weights
+                arrayIndex (int): The row of the arrays that holds the state of this particle
+        """
+        self.arrayOfPositions = arrayOfPositions
+        self.arrayOfVelocities = arrayOfVelocities
+        self.arrayOfAccelerations = arrayOfAccelerations
+        self.arrayOfRestMasses = arrayOfRestMasses
+        self.arrayOfCharges = arrayOfCharges
+        self.arrayOfWeights = arrayOfWeights
+        self.arrayIndex = arrayIndex
+
+    @property
+    def position(self):
+        return self.arrayOfPositions[self.arrayIndex]
+
+    @position.setter
+    def position(self, position):
+        self.arrayOfPositions[self.arrayIndex] = position
+
+    @property
+    def velocity(self):
+        return self.arrayOfVelocities[self.arrayIndex]
+
+    @velocity.setter
+    def velocity(self, velocity):
+        self.arrayOfVelocities[self.arrayIndex] = velocity
+
+    @property
+    def acceleration(self):
+        return self.arrayOfAccelerations[self.arrayIndex]
+
+    @acceleration.setter
+    def acceleration(self, acceleration):
+        self.arrayOfAccelerations[self.arrayIndex] = acceleration
+
+    @property
+    def restMass(self):
+        return self.arrayOfRestMasses[self.arrayIndex]
+
+    @restMass.setter
+    def restMass(self, restMass):
+        self.arrayOfRestMasses[self.arrayIndex] = restMass
+
+    @property
+    def charge(self):
+        return self.arrayOfCharges[self.arrayIndex]
+
+    @charge.setter
+    def charge(self, charge):
+        self.arrayOfCharges[self.arrayIndex] = charge
+
+    @property
+    def weight(self):
+        return self.arrayOfWeights[self.arrayIndex]
+
+    @weight.setter
+    def weight(self, weight):
+        self.arrayOfWeights[self.arrayIndex] = weight
+
     def __repr__(self):
         return 'Name: {0}, Rest Mass: {1:12.3e}, Position: {2}, \
         Velocity: {3}, Acceleration: {4}, Charge: {5:12.3e}'.format(
@@ -127,8 +265,10 @@ class Particle:
             Args:
                 deltaT (float): Time that update lasts for
         """
-        self.velocity +=  self.acceleration * deltaT
-        self.position +=  self.velocity * deltaT
+        # the kernel acts on the single row of the arrays that holds this particle
+        row = slice(self.arrayIndex, self.arrayIndex + 1)
+        CompiledKernels.CromerUpdateKernel(self.arrayOfPositions[row], self.arrayOfVelocities[row]
+        , self.arrayOfAccelerations[row], deltaT)
     
     def UpdateForward(self, deltaT):
         """ Method that updates the particle's velocity and position with the Euler Forward method
@@ -2,13 +2,21 @@ import numpy as np
 import math
 import scipy.constants as const
 from Particle import Particle
+import CompiledKernels
+import LowDiscrepancy
+try:
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
 
 
 class ParticleBunch:
     """ Generates a collection of Particle objects with a random distribution in energy and position
 
         Class Attributes:
-            listOfParticles (list): List of the particle objects in the bunch
+            listOfParticles (list): List of the particle objects in the bunch, which are views of the
+                rows of the arrays of the bunch. The list is created the first time it is used, so a
+                bunch that is only moved by its arrays never creates a Particle object.
             numberOfParticles (int): The number of particles in the bunch
             bunchPositionSpread (float): The current standard deviation in the 
                 positions of the bunch
@@ -18,11 +26,35 @@ class ParticleBunch:
             restMassOfBunch (float): The rest mass of a particle in the bunch
             bunchPositionMean (float): The initial mean position of the bunch in x, y and z
             name (string): Name of the bunch of particles
+            seed (int): Seed of the random positions and energies of the particles. If None, the seed
+                is drawn from the global random state of numpy, so np.random.seed() makes the bunch
+                repeatable.
+            chunkSize (int): Largest number of particles whose random positions and energies are drawn
+                at once, which limits the size of the temporary arrays
+            samplingMethod (string): 'random' draws the positions and energies from random normal
+                distributions. 'sobol' or 'halton' map the points of a scrambled Sobol or Halton
+                sequence of scipy.stats.qmc (SciPy 1.7 or later) through the inverse normal
+                distribution, which spreads the particles more evenly, so the statistics of a small
+                bunch are closer to those asked for.
+            macroParticleWeight (float): Number of real particles that each particle of the bunch stands
+                for when it is created, so a bunch of a large number of real particles can be modelled
+                with fewer macro-particles
+            arrayOfPositions (ndarray): N x 3 array of the positions of the particles
+            arrayOfVelocities (ndarray): N x 3 array of the velocities of the particles
+            arrayOfAccelerations (ndarray): N x 3 array of the accelerations of the particles
+            arrayOfRestMasses (ndarray): Array of the rest masses of the N particles
+            arrayOfCharges (ndarray): Array of the charges of the N particles
+            arrayOfWeights (ndarray): Array of the weights of the N particles. A particle moves as one
+                particle of its rest mass and charge, but generates the fields of its weight multiplied
+                by its charge, and counts as its weight in the statistics of the bunch.
+            statisticsCache (list): Copies of the state arrays that the statistics of the bunch were last
+                found from, and the statistics, which are reused until the state of the bunch changes
     """
 
     def __init__(self, numberOfParticles:int=1, bunchPositionSpread=1.0, bunchEnergySpread=0.0
     , bunchMeanEnergy=0.0, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
-    , bunchPositionMean = 0.0, name='Bunch Name'):
+    , bunchPositionMean = 0.0, name='Bunch Name', seed:int=None, chunkSize:int=1000000
+    , samplingMethod:str='random', macroParticleWeight:float=1.0):
         """ Constructor for the ParticleBunch class. 
                 Runs the CreateListOfParticles method upon ParticleBunch initialisation.
             
@@ -36,7 +68,23 @@ class ParticleBunch:
                 restMassOfBunch (float): The rest mass of a particle in the bunch
                 bunchPositionMean (float): The initial mean position of the bunch in x, y and z
                 name (string): Name of the bunch of particles
+                seed (int): Seed of the random positions and energies of the particles. If None, the
+                    seed is drawn from the global random state of numpy.
+                chunkSize (int): Largest number of particles whose random positions and energies are
+                    drawn at once
+                samplingMethod (string): 'random', 'sobol' or 'halton'
+                macroParticleWeight (float): Number of real particles that each particle of the bunch
+                    stands for
+
+            Raises:
+                ValueError: If samplingMethod is not 'random', 'sobol' or 'halton'
+                ImportError: If samplingMethod is 'sobol' or 'halton' and scipy.stats.qmc is not
+                    available
         """
+        if samplingMethod not in ['random', 'sobol', 'halton']:
+            raise ValueError("samplingMethod must be 'random', 'sobol' or 'halton', not %s"%(samplingMethod))
+        if samplingMethod != 'random' and qmc is None:
+            raise ImportError("samplingMethod='%s' needs scipy.stats.qmc, from SciPy 1.7 or later"%(samplingMethod))
         self.numberOfParticles = numberOfParticles
         self.bunchEnergySpread = bunchEnergySpread
         self.bunchMeanEnergy = bunchMeanEnergy
@@ -45,7 +93,11 @@ class ParticleBunch:
         self.chargeOfBunch = chargeOfBunch
         self.bunchPositionSpread = bunchPositionSpread
         self.bunchPositionMean = bunchPositionMean
-        # Instansiates the particle objects and adds them to the attribute: self.listOfParticles
+        self.seed = seed
+        self.chunkSize = chunkSize
+        self.samplingMethod = samplingMethod
+        self.macroParticleWeight = macroParticleWeight
+        # Fills the arrays of the particles, whose objects are made when self.listOfParticles is first used
         ParticleBunch.CreateListOfParticles(self)
 
     def __repr__(self):
@@ -53,158 +105,461 @@ class ParticleBunch:
         , Mean Energy of Bunch: {3}'.format(
         self.name, self.listOfParticles, self.bunchEnergySpread, self.bunchMeanEnergy)
     
+    def CreateRandomGenerators(self):
+        """ Method that returns the random number generators of the positions and of the energies of
+                the particles. The two generators are independent streams of the seed, so the particles
+                do not depend on how many are drawn at once.
+
+            Returns:
+                [positionGenerator, energyGenerator] (list): numpy.random.Generator of the positions and
+                    of the energies
+        """
+        seed = self.seed
+        if seed is None:
+            seed = np.random.randint(2**32, dtype=np.int64)
+        return [np.random.default_rng(i) for i in np.random.SeedSequence(seed).spawn(2)]
+
+    def CreateSequence(self, positionGenerator):
+        """ Method that creates the scrambled low-discrepancy sequence of the bunch, which is shared by
+                every chunk of particles. The scrambling is drawn from the generator of the positions.
+
+            Args:
+                positionGenerator (object: numpy.random.Generator): Generator of the positions
+
+            Returns:
+                sequence (object: scipy.stats.qmc.QMCEngine): Sequence of the x, y and z positions and
+                    the energy, or None if samplingMethod is 'random'
+        """
+        if self.samplingMethod == 'random':
+            return None
+        if self.samplingMethod == 'sobol':
+            return qmc.Sobol(d=4, scramble=True, seed=positionGenerator)
+        return qmc.Halton(d=4, scramble=True, seed=positionGenerator)
+
+    def DrawPositionsAndEnergies(self, start, stop, positionGenerator, energyGenerator, sequence):
+        """ Method that returns the positions and total energies of the particles from index start to
+                index stop, with the sampling method of the bunch.
+
+            Args:
+                start (int): Index of the first particle
+                stop (int): Index after the last particle
+                positionGenerator (object: numpy.random.Generator): Generator of the positions
+                energyGenerator (object: numpy.random.Generator): Generator of the energies
+                sequence (object: scipy.stats.qmc.QMCEngine): Sequence from CreateSequence()
+
+            Returns:
+                [arrayOfPositions, arrayOfEnergies] (list): (stop - start) x 3 array of the positions and
+                    array of the energies of the particles
+        """
+        if self.samplingMethod == 'random':
+            return [positionGenerator.normal(loc=self.bunchPositionMean, scale=self.bunchPositionSpread
+            , size=(stop - start, 3)), energyGenerator.normal(loc=self.bunchMeanEnergy
+            , scale=self.bunchEnergySpread, size=stop - start)]
+
+        # each particle is one point of a four dimensional sequence, so the positions and energies
+        # are evenly spread together
+        normalPoints = LowDiscrepancy.FindNormalPoints(sequence, start, stop)
+        return [self.bunchPositionMean + self.bunchPositionSpread * normalPoints[:, :3]
+        , self.bunchMeanEnergy + self.bunchEnergySpread * normalPoints[:, 3]]
+
+    def ConvertEnergiesToSpeeds(self, arrayOfEnergies):
+        """ Method to convert the total energies of particles of the bunch to their speeds.
+
+            Args:
+                arrayOfEnergies (ndarray): Total energy of each particle
+
+            Raises:
+                ValueError: If an energy is below the rest energy of a particle of the bunch
+
+            Returns:
+                arrayOfSpeeds (ndarray): Speed of each particle
+        """
+        arrayOfEnergies = np.asarray(arrayOfEnergies, dtype=float)
+        if np.any(np.abs(arrayOfEnergies) < self.restMassOfBunch * const.speed_of_light ** 2):
+            raise ValueError("The energy of a particle of %s is below its rest energy"%(self.name))
+        return np.sqrt(const.speed_of_light ** 2
+        - (self.restMassOfBunch ** 2 * const.speed_of_light ** 6) / arrayOfEnergies ** 2)
+
     def CreateVelocitySpread(self):
         """ Method to convert initial total energy of particles to a starting velocity
                 Particles are initialised with parallel trajectories in the x axis.
             
             Parameters: 
-                listOfRandomEnergies (list): Normal distribution of energies with mean,
-                    standard deviation and size determined by class arguments.
-                listOfRandomVelocities (list) : Calculates the velocity corresponding to
-                    total energy and rest mass and makes a list of the values.
+                listOfRandomEnergies (ndarray): Normal distribution of energies with mean,
+                    standard deviation and size determined by class arguments, drawn with the
+                    sampling method of the bunch.
             Returns:
-                listOfRandomVelocities (list): List of random velocities with mean and
+                listOfRandomVelocities (ndarray): Random velocities with mean and
                     standard deviation correlated to class arguments of bunchMeanEnergy
                     and bunchEnergySpread
         """
         # create initial energy spread of particles in bunch
-        listOfRandomEnergies = np.random.normal(loc=self.bunchMeanEnergy
-        , scale=self.bunchEnergySpread, size=self.numberOfParticles)
+        positionGenerator, energyGenerator = ParticleBunch.CreateRandomGenerators(self)
+        listOfRandomEnergies = ParticleBunch.DrawPositionsAndEnergies(self, 0, self.numberOfParticles
+        , positionGenerator, energyGenerator, ParticleBunch.CreateSequence(self, positionGenerator))[1]
 
         # determine velocity of particles in the bunch using their energy
-        listOfRandomVelocities = [math.sqrt(const.speed_of_light ** 2 
-        - (self.restMassOfBunch ** 2 * const.speed_of_light ** 6) 
-        / listOfRandomEnergies[i] ** 2) for i in range(self.numberOfParticles)]
-
-        return listOfRandomVelocities
+        return ParticleBunch.ConvertEnergiesToSpeeds(self, listOfRandomEnergies)
        
     def CreateListOfParticles(self):
-        """ Method to initialise Particle objects and append them to the class attribute
-                listOfParticles.
-            
+        """ Method to fill the arrays of the bunch with particles that have random positions and
+                energies. The positions and energies are drawn chunkSize particles at a time, directly
+                into the arrays. The Particle objects that are views of each row are made when
+                listOfParticles is first used.
+
             Parameters:
+                positionGenerator (object: numpy.random.Generator): Generator of the positions
+                energyGenerator (object: numpy.random.Generator): Generator of the energies
+                sequence (object: scipy.stats.qmc.QMCEngine): Low-discrepancy sequence, if it is used
+        """
+        numberOfParticles = self.numberOfParticles
+        positionGenerator, energyGenerator = ParticleBunch.CreateRandomGenerators(self)
+        sequence = ParticleBunch.CreateSequence(self, positionGenerator)
+
+        # particles have a random position in three dimensions, zero acceleration and a parallel
+        # velocity in the x direction, no initial velocity in y or z
+        self.arrayOfPositions = np.empty((numberOfParticles, 3))
+        self.arrayOfVelocities = np.zeros((numberOfParticles, 3))
+        self.arrayOfAccelerations = np.zeros((numberOfParticles, 3))
+        self.arrayOfRestMasses = np.full(numberOfParticles, self.restMassOfBunch, dtype=float)
+        self.arrayOfCharges = np.full(numberOfParticles, self.chargeOfBunch, dtype=float)
+        self.arrayOfWeights = np.full(numberOfParticles, self.macroParticleWeight, dtype=float)
+        for start in range(0, numberOfParticles, self.chunkSize):
+            stop = min(start + self.chunkSize, numberOfParticles)
+            self.arrayOfPositions[start:stop], arrayOfEnergies = ParticleBunch.DrawPositionsAndEnergies(self
+            , start, stop, positionGenerator, energyGenerator, sequence)
+            self.arrayOfVelocities[start:stop, 0] = ParticleBunch.ConvertEnergiesToSpeeds(self, arrayOfEnergies)
+
+        ParticleBunch.CreateParticleViews(self)
+
+    def CreateParticleViews(self):
+        """ Method to mark the Particle objects of the bunch to be created again as views of each row of
+                the arrays of the bunch, the next time listOfParticles is used.
+        """
+        self.__dict__['listOfParticles'] = None
+        self.statisticsCache = None
+
+    def FindParticleNames(self):
+        """ Method that returns the name of every particle of the bunch, without creating the Particle
+                objects if they have not been created yet.
+
+            Returns:
+                listOfParticleNames (list): Name of each particle
+        """
+        if self.__dict__.get('listOfParticles') is None:
+            return ["%s %s"%(self.name, i+1) for i in range(len(self.arrayOfPositions))]
+        return [i.name for i in self.__dict__['listOfParticles']]
+
+    def ReplaceParticles(self, arrayOfPositions, arrayOfVelocities, arrayOfAccelerations, arrayOfRestMasses
+    , arrayOfCharges, arrayOfWeights):
+        """ Method to replace the particles of the bunch with a new set of particles, which may have a
+                different number of particles, such as after macro-particles have been split or merged.
+                The bunch takes the arrays, and new Particle objects are created as views of their rows.
+
+            Args:
+                arrayOfPositions (ndarray): N x 3 array of the positions of the particles
+                arrayOfVelocities (ndarray): N x 3 array of the velocities of the particles
+                arrayOfAccelerations (ndarray): N x 3 array of the accelerations of the particles
+                arrayOfRestMasses (ndarray): Array of the rest masses of the N particles
+                arrayOfCharges (ndarray): Array of the charges of the N particles
+                arrayOfWeights (ndarray): Array of the weights of the N particles
+        """
+        self.arrayOfPositions = np.ascontiguousarray(arrayOfPositions, dtype=float)
+        self.arrayOfVelocities = np.ascontiguousarray(arrayOfVelocities, dtype=float)
+        self.arrayOfAccelerations = np.ascontiguousarray(arrayOfAccelerations, dtype=float)
+        self.arrayOfRestMasses = np.ascontiguousarray(arrayOfRestMasses, dtype=float)
+        self.arrayOfCharges = np.ascontiguousarray(arrayOfCharges, dtype=float)
+        self.arrayOfWeights = np.ascontiguousarray(arrayOfWeights, dtype=float)
+        self.numberOfParticles = len(self.arrayOfPositions)
+        ParticleBunch.CreateParticleViews(self)
+
+    def __setstate__(self, state):
+        """ Method to restore a bunch from a pickled state.
+                Bunches saved before particles had weights are given a weight of 1 for every
+                particle, which their particles are bound to.
+
+            Args:
+                state (dict): The pickled attributes of the bunch
+        """
+        self.__dict__.update(state)
+        if 'arrayOfWeights' not in state and 'arrayOfPositions' in state:
+            self.arrayOfWeights = np.ones(len(self.arrayOfPositions))
+            self.macroParticleWeight = 1.0
+            for particle in self.listOfParticles:
+                particle.arrayOfWeights = self.arrayOfWeights
+
+    @property
+    def listOfParticles(self):
+        if self.__dict__.get('listOfParticles') is None:
+            # saves a new name for every particle object
+            self.__dict__['listOfParticles'] = [Particle.CreateFromArrays(self.arrayOfPositions
+            , self.arrayOfVelocities, self.arrayOfAccelerations, self.arrayOfRestMasses, self.arrayOfCharges
+            , self.arrayOfWeights, i, name="%s %s"%(self.name, i+1))
+            for i in range(len(self.arrayOfPositions))]
+        return self.__dict__['listOfParticles']
+
+    @listOfParticles.setter
+    def listOfParticles(self, listOfParticles):
+        ParticleBunch.BindParticles(self, listOfParticles)
+
+    def BindParticles(self, listOfParticles):
+        """ Method to copy the state of a list of particles into contiguous arrays that are owned
+                by the bunch. Each Particle object is then re-bound to its row of the arrays, so
+                particles act as views of the bunch and bunch operations work on whole arrays.
+
+            Args:
                 listOfParticles (list): List of the Particle objects in the bunch
-                listOfRandomPositions (list): List of random positions centred about
-                    the origin. Standard deviation is determined by class argument.
-        """
-        listOfParticles = [] # list that will contain particle objects
-        # randomly generated initial positions of particles
-        listOfRandomPositions = np.random.normal(loc=self.bunchPositionMean, scale=self.bunchPositionSpread
-        , size=3*self.numberOfParticles)
-
-        # appends a particle object with a random position in three dimensions, zero acceleration
-        # and a parallel velocity in the x direction, no initial velocity in y or z
-        # also saves a new name for every particle object
-        for i in range(self.numberOfParticles):
-            listOfParticles.append(
-                Particle(position=np.array([listOfRandomPositions[3*i]
-                , listOfRandomPositions[3*i+1], listOfRandomPositions[3*i+2]])
-                , velocity=np.array([ParticleBunch.CreateVelocitySpread(self)[i], 0.0, 0.0])
-                , acceleration=np.array([0.0, 0.0, 0.0]), restMass=self.restMassOfBunch
-                , charge=self.chargeOfBunch, name="%s %s"%(self.name, i+1)))
-
-        # adds listOfParticles as a class attribute
-        self.listOfParticles = listOfParticles
-        
+        """
+        self.arrayOfPositions = np.array([i.position for i in listOfParticles], dtype=float).reshape(-1, 3)
+        self.arrayOfVelocities = np.array([i.velocity for i in listOfParticles], dtype=float).reshape(-1, 3)
+        self.arrayOfAccelerations = np.array([i.acceleration for i in listOfParticles]
+        , dtype=float).reshape(-1, 3)
+        self.arrayOfRestMasses = np.array([i.restMass for i in listOfParticles], dtype=float)
+        self.arrayOfCharges = np.array([i.charge for i in listOfParticles], dtype=float)
+        self.arrayOfWeights = np.array([i.weight for i in listOfParticles], dtype=float)
+
+        for index, particle in enumerate(listOfParticles):
+            particle.BindToArrays(arrayOfPositions=self.arrayOfPositions
+            , arrayOfVelocities=self.arrayOfVelocities, arrayOfAccelerations=self.arrayOfAccelerations
+            , arrayOfRestMasses=self.arrayOfRestMasses, arrayOfCharges=self.arrayOfCharges
+            , arrayOfWeights=self.arrayOfWeights, arrayIndex=index)
+
+        self.__dict__['listOfParticles'] = listOfParticles
+        self.numberOfParticles = len(listOfParticles)
+        self.statisticsCache = None
+
+    def UpdateCromer(self, deltaT):
+        """ Method that updates the velocity and position of every particle in the bunch with the
+                Euler Cromer method.
 
-    def UpdateBunchMeanEnergy(self):
-        """ Method to update the bunchMeanEnergy class attribute.
+            Args:
+                deltaT (float): Time that update lasts for
+        """
+        CompiledKernels.CromerUpdateKernel(self.arrayOfPositions, self.arrayOfVelocities, self.arrayOfAccelerations
+        , deltaT)
+
+    def UpdateForward(self, deltaT):
+        """ Method that updates the velocity and position of every particle in the bunch with the
+                Euler Forward method.
+
+            Args:
+                deltaT (float): Time that update lasts for
+        """
+        self.arrayOfPositions += self.arrayOfVelocities * deltaT
+        self.arrayOfVelocities += self.arrayOfAccelerations * deltaT
+
+    def UpdateBoris(self, deltaT, arrayOfElectricFields, arrayOfMagneticFields, arrayOfIndices=None):
+        """ Method that updates the velocity and position of every particle in the bunch with the
+                relativistic Boris method. The update acts on the momentum per unit rest mass
+                (Lorentz factor multiplied by velocity): half of the electric impulse is applied,
+                the momentum is rotated about the magnetic field and the second half of the
+                electric impulse is applied. The rotation keeps the size of the momentum fixed in
+                a pure magnetic field and the velocity that is found from the momentum is always
+                below the speed of light. Each particle is then moved by the mean of its velocity
+                before and after the update, so the update is second order in position as well as
+                in velocity when the fields are found half way through the update, with the
+                particles moved along their velocity by half of deltaT, as BorisIntegratorClass does.
+
+            Args:
+                deltaT (float): Time that update lasts for. May be an array of M times, one for each
+                    particle that is updated.
+                arrayOfElectricFields (ndarray): N x 3 (or M x 3) array of the electric field acting on
+                    each particle that is updated
+                arrayOfMagneticFields (ndarray): N x 3 (or M x 3) array of the magnetic field acting on
+                    each particle that is updated
+                arrayOfIndices (ndarray): Indices of the M particles to update. If None, every particle
+                    is updated.
 
             Parameters:
-                totalEnergy (float): Sum of the energy of all particles in the bunch
+                momentum (ndarray): Array of the Lorentz factor multiplied by velocity
+                halfElectricImpulse (ndarray): Change in momentum from the electric field in half of deltaT
+                rotationVector (ndarray): Vector along the magnetic field with size tan(theta/2), where
+                    theta is the angle that the momentum is rotated by
+                maximumSpeed (float): The largest speed that a particle is given, a few units in the last
+                    place below the speed of light, so that its Lorentz factor is finite
+        """
+        if arrayOfIndices is None:
+            arrayOfIndices = slice(None)
+        if np.ndim(deltaT) > 0:
+            deltaT = np.asarray(deltaT)[:, np.newaxis]
+
+        speedOfLightSquared = const.speed_of_light * const.speed_of_light
+        chargeOverMass = (self.arrayOfCharges[arrayOfIndices] / self.arrayOfRestMasses[arrayOfIndices])[:, np.newaxis]
+        initialVelocities = self.arrayOfVelocities[arrayOfIndices]
+        momentum = ParticleBunch.FindLorentzFactors(self)[arrayOfIndices, np.newaxis] * initialVelocities
+
+        halfElectricImpulse = chargeOverMass * arrayOfElectricFields * (0.5 * deltaT)
+        momentum += halfElectricImpulse
+
+        lorentzFactors = np.sqrt(1 + np.einsum('ij,ij->i', momentum, momentum) / speedOfLightSquared)
+        rotationVector = chargeOverMass * arrayOfMagneticFields * (0.5 * deltaT) / lorentzFactors[:, np.newaxis]
+        scaledRotationVector = (2 * rotationVector
+        / (1 + np.einsum('ij,ij->i', rotationVector, rotationVector))[:, np.newaxis])
+        momentum += np.cross(momentum + np.cross(momentum, rotationVector), scaledRotationVector)
+
+        momentum += halfElectricImpulse
+
+        lorentzFactors = np.sqrt(1 + np.einsum('ij,ij->i', momentum, momentum) / speedOfLightSquared)
+        newVelocities = momentum / lorentzFactors[:, np.newaxis]
+
+        # the speed c |u| / sqrt(c^2 + |u|^2) is below the speed of light, but rounds to it for a very
+        # large momentum, so the fastest particles are slowed to the largest speed that keeps the
+        # Lorentz factor of the next update finite
+        maximumSpeed = const.speed_of_light * (1 - 2.0**-48)
+        speeds = np.sqrt(np.einsum('ij,ij->i', newVelocities, newVelocities))
+        isTooFast = speeds > maximumSpeed
+        if np.any(isTooFast):
+            newVelocities[isTooFast] *= (maximumSpeed / speeds[isTooFast])[:, np.newaxis]
+
+        # the mean acceleration over the update is kept for methods that use acceleration
+        self.arrayOfAccelerations[arrayOfIndices] = (newVelocities - initialVelocities) / deltaT
+        # drift for the second half of the update, after the drift for the first half that the fields were
+        # found at, so the position moves by the mean of the velocities before and after the update
+        self.arrayOfPositions[arrayOfIndices] += 0.5 * (initialVelocities + newVelocities) * deltaT
+        self.arrayOfVelocities[arrayOfIndices] = newVelocities
+
+    def FindSourceCharges(self):
+        """ Method to return the charge that generates the fields of every particle in the bunch.
+
+            Returns:
+                Source Charges (ndarray): Array of the weight multiplied by the charge of each of the
+                    N particles
         """
-        totalEnergy = 0.0 # dummy variable
+        return self.arrayOfWeights * self.arrayOfCharges
+
+    def FindLorentzFactors(self):
+        """ Method to return the Lorentz factor of every particle in the bunch.
 
-        for i in range(len(self.listOfParticles)):
-            totalEnergy += self.listOfParticles[i].TotalEnergy()
+            Returns:
+                Lorentz Factors (ndarray): Array of the Lorentz factors of the N particles,
+                    calculated in the same way as Particle.LorentzFactor()
+        """
+        betaSquared = (np.einsum('ij,ij->i', self.arrayOfVelocities, self.arrayOfVelocities)
+        / (const.speed_of_light * const.speed_of_light))
+        return 1 / np.abs(1 - betaSquared)**0.5
 
-        self.bunchMeanEnergy = (totalEnergy / float(len(self.listOfParticles)))
+    def FindTotalEnergies(self):
+        """ Method to return the total energy of every particle in the bunch.
+
+            Returns:
+                Total Energies (ndarray): Array of the total energies of the N particles, calculated
+                    in the same way as Particle.TotalEnergy()
+        """
+        speeds = np.linalg.norm(self.arrayOfVelocities, axis=1)
+        betaVelocities = speeds / const.speed_of_light
+        lorentzFactors = 1 / np.abs(1 - betaVelocities * betaVelocities)**0.5
+        restEnergies = self.arrayOfRestMasses * const.speed_of_light * const.speed_of_light
+        momenta = lorentzFactors * speeds * self.arrayOfRestMasses
+        return np.sqrt(restEnergies ** 2 + (momenta * const.speed_of_light) ** 2)
+
+    def FindBunchStatistics(self):
+        """ Method to return the statistics of the bunch, which are all found from the arrays of the bunch
+                in one pass. Each particle counts as its weight, so the statistics are those of the real
+                particles that the bunch stands for. The statistics are kept until the position, velocity,
+                acceleration, rest mass or weight of any particle changes, so the methods that use them
+                may be called many times in a step for the cost of one.
 
-    def UpdateBunchEnergySpread(self):
-        """ Method to update the bunchEnergySpread class attribute.
-        
             Parameters:
-                spreadArray (ndarray): Array of values of the total energy of
-                    each particle in the bunch.
+                listOfStateArrays (list): The arrays that the statistics are found from
+                momenta (ndarray): N x 3 array of the momentum of each particle
+                deviations (ndarray): N x 3 array of the position of each particle from the mean position
+                momentumDeviations (ndarray): N x 3 array of the momentum per unit rest mass and speed of
+                    light (Lorentz factor multiplied by beta) of each particle from its mean
+
+            Returns:
+                dictionaryOfStatistics (dictionary): MeanEnergy and EnergySpread (float), the mean and
+                    standard deviation of the total energy of the particles; MeanPosition, MeanVelocity,
+                    MeanAcceleration and MeanMomentum (ndarray), the mean of each in x, y and z; and
+                    Emittance (ndarray), the normalised rms emittance of the bunch in x, y and z, which
+                    is the area of the phase space of each axis taken up by the particles, in m
         """
-        spreadArray = np.array([]) # dummy variable
+        listOfStateArrays = [self.arrayOfPositions, self.arrayOfVelocities, self.arrayOfAccelerations
+        , self.arrayOfRestMasses, self.arrayOfWeights]
+        statisticsCache = getattr(self, 'statisticsCache', None)
+        if statisticsCache is not None and all(np.array_equal(i, j)
+        for i, j in zip(statisticsCache[0], listOfStateArrays)):
+            return statisticsCache[1]
+
+        totalEnergies = ParticleBunch.FindTotalEnergies(self)
+        lorentzFactors = ParticleBunch.FindLorentzFactors(self)
+        momenta = (lorentzFactors * self.arrayOfRestMasses)[:, np.newaxis] * self.arrayOfVelocities
+        weights = self.arrayOfWeights
+        meanPosition = np.average(self.arrayOfPositions, axis=0, weights=weights)
+
+        # the emittance of each axis is the square root of the determinant of the covariance of the
+        # position and momentum of that axis
+        deviations = self.arrayOfPositions - meanPosition
+        momentumDeviations = lorentzFactors[:, np.newaxis] * self.arrayOfVelocities / const.speed_of_light
+        momentumDeviations = momentumDeviations - np.average(momentumDeviations, axis=0, weights=weights)
+        emittance = np.sqrt(np.abs(np.average(deviations * deviations, axis=0, weights=weights)
+        * np.average(momentumDeviations * momentumDeviations, axis=0, weights=weights)
+        - np.average(deviations * momentumDeviations, axis=0, weights=weights) ** 2))
+
+        meanEnergy = np.average(totalEnergies, weights=weights)
+        dictionaryOfStatistics = {'MeanEnergy':meanEnergy
+        , 'EnergySpread':np.sqrt(np.average((totalEnergies - meanEnergy) ** 2, weights=weights))
+        , 'MeanPosition':meanPosition, 'MeanVelocity':np.average(self.arrayOfVelocities, axis=0, weights=weights)
+        , 'MeanAcceleration':np.average(self.arrayOfAccelerations, axis=0, weights=weights)
+        , 'MeanMomentum':np.average(momenta, axis=0, weights=weights), 'Emittance':emittance}
+        self.statisticsCache = [[i.copy() for i in listOfStateArrays], dictionaryOfStatistics]
+        return dictionaryOfStatistics
 
-        for i in range(len(self.listOfParticles)):
-            spreadArray = np.append(spreadArray, self.listOfParticles[i].TotalEnergy())
+    def UpdateBunchMeanEnergy(self):
+        """ Method to update the bunchMeanEnergy class attribute.
+        """
+        self.bunchMeanEnergy = ParticleBunch.FindBunchStatistics(self)['MeanEnergy']
 
-        self.bunchEnergySpread = np.std(spreadArray)
+    def UpdateBunchEnergySpread(self):
+        """ Method to update the bunchEnergySpread class attribute.
+        """
+        self.bunchEnergySpread = ParticleBunch.FindBunchStatistics(self)['EnergySpread']
 
     def FindBunchMeanVelocity(self):
         """ Method to return the mean velocity of the particles in the bunch.
 
-            Parameters: 
-                totalVelocity (ndarray): Sum of the velocities of each particle
-                    in the bunch
             Returns:
                 Mean Velocity of Bunch (ndarray): The sum of all of the velocities
                     of particles in the bunch divided by the number of particles in the
                     bunch.
         """
-        totalVelocity = np.array([0.0, 0.0, 0.0], dtype=float) # dummy variable
-
-        for i in range(len(self.listOfParticles)):
-            totalVelocity += self.listOfParticles[i].velocity
-
-        return (totalVelocity / float(len(self.listOfParticles)))
+        return ParticleBunch.FindBunchStatistics(self)['MeanVelocity'].copy()
     
     def FindBunchMeanPosition(self):
         """ Method to return the mean position of the particles in the bunch.
 
-            Parameters: 
-                totalPosition (ndarray): Sum of the velocities of each particle
-                    in the bunch
             Returns:
                 Mean position of Bunch (ndarray): The sum of all of the positions
                     of particles in the bunch divided by the number of particles in the
                     bunch.
         """
-        totalPosition = np.array([0.0, 0.0, 0.0], dtype=float) # dummy variable
-
-        for i in range(len(self.listOfParticles)):
-            totalPosition += self.listOfParticles[i].position
-
-        return (totalPosition / float(len(self.listOfParticles)))
+        return ParticleBunch.FindBunchStatistics(self)['MeanPosition'].copy()
     
     def FindBunchMeanAcceleration(self):
         """ Method to return the mean acceleration of the particles in the bunch.
 
-            Parameters: 
-                totalAcceleration (ndarray): Sum of the accelerations of each particle
-                    in the bunch
             Returns:
                 Mean acceleration of Bunch (ndarray): The sum of all of the accelerations
                     of particles in the bunch divided by the number of particles in the
                     bunch.
         """
-        totalAcceleration = np.array([0.0, 0.0, 0.0], dtype=float) # dummy variable
-
-        for i in range(len(self.listOfParticles)):
-            totalAcceleration += self.listOfParticles[i].acceleration
-
-        return (totalAcceleration / float(len(self.listOfParticles)))
+        return ParticleBunch.FindBunchStatistics(self)['MeanAcceleration'].copy()
 
     def FindBunchMeanMomentum(self):
         """ Method to return the mean momentum of the particles in the bunch.
 
-            Parameters: 
-                totalMomentum (ndarray): Sum of the momentums of each particle
-                    in the bunch
             Returns:
                 Mean Momentum of Bunch (ndarray): The sum of all of the momenta
                     of particles in the bunch divided by the number of particles in the
                     bunch.
         """
-        totalMomentum = np.array([0.0, 0.0, 0.0], dtype=float) # dummy variable
-
-        for i in range(len(self.listOfParticles)):
-            totalMomentum += self.listOfParticles[i].Momentum()
-            
-        return (totalMomentum / float(len(self.listOfParticles)))
-
+        return ParticleBunch.FindBunchStatistics(self)['MeanMomentum'].copy()
 
+    def FindBunchEmittance(self):
+        """ Method to return the normalised rms emittance of the bunch in x, y and z.
 
+            Returns:
+                Emittance of Bunch (ndarray): The square root of the determinant of the covariance of
+                    the position and the momentum per unit rest mass and speed of light of the
+                    particles along each axis, in m
+        """
+        return ParticleBunch.FindBunchStatistics(self)['Emittance'].copy()
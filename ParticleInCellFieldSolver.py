@@ -0,0 +1,202 @@
+from AbstractFieldSolver import AbstractFieldSolverClass, np
+import scipy.constants as const
+
+class ParticleInCellFieldSolverClass(AbstractFieldSolverClass):
+    """ Class that finds the fields between particles with a particle-in-cell mesh. The charge and
+            current of the bunch are deposited onto a 3D grid. Poisson's equation for the electric
+            potential and the magnetic vector potential is then solved with fast Fourier transforms,
+            and the grid fields are interpolated back to the particles. The cost grows with the
+            number of grid points rather than the square of the number of particles.
+
+            The grid is isolated rather than periodic. Hockney's method is used, where the grid
+            is doubled in every dimension and convolved with the Green's function of free space.
+            Structure smaller than a grid cell is not resolved.
+
+        Class Attributes:
+            gridResolution (int): Number of grid points along each dimension
+            gridPadding (float): Fraction of the width of the bunch that is added to the grid on
+                every side so that the particles are not at the edge of the grid
+            name (string): Name of the field solver
+    """
+
+    # mean of 1/r over a cube of unit side length centred on the origin, used in place of the
+    # infinite value of the Green's function where a grid point meets its own charge
+    selfGreensFunction = 2.3800774
+
+    def __init__(self, gridResolution:int=32, gridPadding=0.1, name='Particle-in-Cell Field Solver'):
+        """ Constructor for the ParticleInCellFieldSolverClass class.
+                Inherits the __init__ from AbstractFieldSolverClass.
+
+            Args:
+                gridResolution (int): Number of grid points along each dimension
+                gridPadding (float): Fraction of the width of the bunch that is added to the grid on
+                    every side
+                name (string): Name of the field solver
+        """
+        super().__init__(name=name)
+        self.gridResolution = gridResolution
+        self.gridPadding = gridPadding
+
+    def __repr__(self):
+        return 'Particle-in-Cell Field Solver: {0}, Grid Resolution: {1}, Grid Padding: {2}'.format(
+            self.name, self.gridResolution, self.gridPadding)
+
+    def CreateGrid(self, arrayOfPositions):
+        """ Method that returns the corner and the spacing of a cubic grid that contains every position.
+
+            Args:
+                arrayOfPositions (ndarray): N x 3 array of positions that the grid must contain
+
+            Returns:
+                [gridOrigin, gridSpacing] (list): The position of the first grid point and the distance
+                    between neighbouring grid points
+        """
+        minimumCorner = np.min(arrayOfPositions, axis=0)
+        maximumCorner = np.max(arrayOfPositions, axis=0)
+        # a single particle, or a bunch in a plane, still needs a grid with a non-zero width
+        width = np.max(maximumCorner - minimumCorner)
+        if width == 0.0:
+            width = max(np.max(np.abs(maximumCorner)), 1.0) * 1e-6
+        width *= 1 + 2 * self.gridPadding
+        gridSpacing = width / (self.gridResolution - 1)
+        gridOrigin = 0.5 * (minimumCorner + maximumCorner) - 0.5 * width
+
+        return [gridOrigin, gridSpacing]
+
+    def FindCloudInCellWeights(self, arrayOfPositions, gridOrigin, gridSpacing):
+        """ Method that returns the eight grid points around each position and the cloud-in-cell
+                (trilinear) weight of each of these points.
+
+            Args:
+                arrayOfPositions (ndarray): N x 3 array of positions
+                gridOrigin (ndarray): The position of the first grid point
+                gridSpacing (float): The distance between neighbouring grid points
+
+            Returns:
+                [listOfIndices, listOfWeights] (list): Eight arrays of the flattened index of a
+                    neighbouring grid point for each position, and eight arrays of their weights
+        """
+        gridCoordinates = (arrayOfPositions - gridOrigin) / gridSpacing
+        lowerIndices = np.clip(np.floor(gridCoordinates).astype(int), 0, self.gridResolution - 2)
+        fractions = np.clip(gridCoordinates - lowerIndices, 0.0, 1.0)
+
+        listOfIndices, listOfWeights = [], []
+        for corner in range(8):
+            offset = np.array([corner & 1, (corner >> 1) & 1, (corner >> 2) & 1])
+            indices = lowerIndices + offset
+            listOfIndices.append(np.ravel_multi_index(indices.T, (self.gridResolution,) * 3))
+            listOfWeights.append(np.prod(np.where(offset == 1, fractions, 1.0 - fractions), axis=1))
+
+        return [listOfIndices, listOfWeights]
+
+    def DepositOnGrid(self, arrayOfValues, listOfIndices, listOfWeights):
+        """ Method that spreads a value carried by each particle onto the grid.
+
+            Args:
+                arrayOfValues (ndarray): The value carried by each of the N particles
+                listOfIndices (list): The neighbouring grid points of each particle
+                listOfWeights (list): The cloud-in-cell weights of the neighbouring grid points
+
+            Returns:
+                Grid (ndarray): The deposited values on the grid
+        """
+        numberOfGridPoints = self.gridResolution ** 3
+        grid = sum([np.bincount(listOfIndices[i], weights=listOfWeights[i] * arrayOfValues
+        , minlength=numberOfGridPoints) for i in range(8)])
+
+        return grid.reshape((self.gridResolution,) * 3)
+
+    def InterpolateFromGrid(self, grid, listOfIndices, listOfWeights):
+        """ Method that interpolates a grid value to each particle, using the same weights as the
+                deposit so that particles do not push themselves.
+
+            Args:
+                grid (ndarray): The values on the grid
+                listOfIndices (list): The neighbouring grid points of each particle
+                listOfWeights (list): The cloud-in-cell weights of the neighbouring grid points
+
+            Returns:
+                Interpolated values (ndarray): The value of the grid at each of the N particles
+        """
+        flatGrid = grid.ravel()
+        return sum([listOfWeights[i] * flatGrid[listOfIndices[i]] for i in range(8)])
+
+    def SolvePoisson(self, listOfGrids, gridSpacing):
+        """ Method that convolves grids of charge or current with the Green's function 1/r of
+                free space using fast Fourier transforms on a grid doubled in every dimension.
+
+            Args:
+                listOfGrids (list): Grids of deposited charge or current
+                gridSpacing (float): The distance between neighbouring grid points
+
+            Returns:
+                listOfPotentials (list): The sum of each grid value divided by distance, at every
+                    grid point
+        """
+        n = self.gridResolution
+        # distances on the doubled grid wrap around so that the convolution is not periodic
+        distances = np.minimum(np.arange(2 * n), 2 * n - np.arange(2 * n)) * gridSpacing
+        distanceGrid = np.sqrt(distances[:, np.newaxis, np.newaxis] ** 2
+        + distances[np.newaxis, :, np.newaxis] ** 2 + distances[np.newaxis, np.newaxis, :] ** 2)
+        distanceGrid[0, 0, 0] = gridSpacing / ParticleInCellFieldSolverClass.selfGreensFunction
+        transformedGreensFunction = np.fft.rfftn(1 / distanceGrid)
+
+        listOfPotentials = []
+        for grid in listOfGrids:
+            potential = np.fft.irfftn(np.fft.rfftn(grid, s=(2 * n,) * 3) * transformedGreensFunction
+            , s=(2 * n,) * 3)
+            listOfPotentials.append(potential[:n, :n, :n])
+
+        return listOfPotentials
+
+    def GenerateBunchFields(self, sourceBunch, affectedBunch):
+        """ Method that returns the electric and magnetic fields of the particles in the sourceBunch
+                at the position of every particle in the affectedBunch, found on the grid.
+
+            Args:
+                sourceBunch (object: ParticleBunch): The bunch of particles that generates the fields
+                affectedBunch (object: ParticleBunch): The bunch of particles affected by the fields
+
+            Parameters:
+                electricPotential (ndarray): Electric potential at each grid point
+                vectorPotential (list): The three components of the magnetic vector potential at
+                    each grid point
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): N x 3 arrays of the electric
+                    and magnetic field at the position of each affected particle
+        """
+        if sourceBunch.numberOfParticles == 0 or affectedBunch.numberOfParticles == 0:
+            return [np.zeros((affectedBunch.numberOfParticles, 3)), np.zeros((affectedBunch.numberOfParticles, 3))]
+
+        gridOrigin, gridSpacing = ParticleInCellFieldSolverClass.CreateGrid(self, np.concatenate(
+            [sourceBunch.arrayOfPositions, affectedBunch.arrayOfPositions]))
+
+        # charge and current (charge multiplied by velocity) of the source particles on the grid
+        sourceIndices, sourceWeights = ParticleInCellFieldSolverClass.FindCloudInCellWeights(self
+        , sourceBunch.arrayOfPositions, gridOrigin, gridSpacing)
+        sourceCharges = sourceBunch.FindSourceCharges()
+        listOfGrids = [ParticleInCellFieldSolverClass.DepositOnGrid(self, sourceCharges
+        , sourceIndices, sourceWeights)]
+        for k in range(3):
+            listOfGrids.append(ParticleInCellFieldSolverClass.DepositOnGrid(self
+            , sourceCharges * sourceBunch.arrayOfVelocities[:, k], sourceIndices, sourceWeights))
+
+        listOfPotentials = ParticleInCellFieldSolverClass.SolvePoisson(self, listOfGrids, gridSpacing)
+        electricPotential = listOfPotentials[0] / (4 * const.pi * const.epsilon_0)
+        vectorPotential = [const.mu_0 * i / (4 * const.pi) for i in listOfPotentials[1:]]
+
+        # E = -grad(phi) and B = curl(A) with central differences
+        electricGrid = [-1 * i for i in np.gradient(electricPotential, gridSpacing)]
+        gradientOfA = [np.gradient(i, gridSpacing) for i in vectorPotential] # gradientOfA[i][j] = dA_i/dx_j
+        magneticGrid = [gradientOfA[2][1] - gradientOfA[1][2], gradientOfA[0][2] - gradientOfA[2][0]
+        , gradientOfA[1][0] - gradientOfA[0][1]]
+
+        affectedIndices, affectedWeights = ParticleInCellFieldSolverClass.FindCloudInCellWeights(self
+        , affectedBunch.arrayOfPositions, gridOrigin, gridSpacing)
+        arrayOfElectricFields = np.stack([ParticleInCellFieldSolverClass.InterpolateFromGrid(self
+        , i, affectedIndices, affectedWeights) for i in electricGrid], axis=1)
+        arrayOfMagneticFields = np.stack([ParticleInCellFieldSolverClass.InterpolateFromGrid(self
+        , i, affectedIndices, affectedWeights) for i in magneticGrid], axis=1)
+
+        return [arrayOfElectricFields, arrayOfMagneticFields]
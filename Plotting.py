@@ -4,6 +4,7 @@ import matplotlib as mpl
 import math as math
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
+from ColumnarResults import ColumnarResultsClass, IsColumnarResults
 
 class PlottingClass:
     """ Class that contains all plotting methods.
@@ -11,7 +12,8 @@ class PlottingClass:
         Class Attributes:
             fileName (string): Name of the file that will be used to
                 generate plots
-            LoadSim (file): Data from the file read by pandas.
+            LoadSim (file): Data from the file read by pandas, or the memory-mapped
+                columns of a result in the columnar format.
     """
 
     def __init__(self, pickledFile:str):
@@ -20,20 +22,50 @@ class PlottingClass:
             Args:
                 pickledFile (string): File name of the file that will 
                     be used to generate plots. Exluding file extension
-                    and assumes data is saved as a .pkl file.
+                    and assumes data is saved as a .pkl file, unless it is
+                    the directory of a result in the columnar format.
         """
         self.fileName = pickledFile
-        self.LoadSim = pd.read_pickle("%s.pkl"%(pickledFile))
+        if IsColumnarResults(pickledFile):
+            # only the metadata is read, and each column is memory-mapped when it is plotted
+            self.LoadSim = ColumnarResultsClass(pickledFile)
+        else:
+            self.LoadSim = pd.read_pickle("%s.pkl"%(pickledFile))
+
+    def FindParticleColumn(self, column:str):
+        """ Method that returns the position or velocity of every particle at every record
+                as one array, for either format of saved data.
+
+            Args:
+                column (string): 'Positions' or 'Velocities'
+
+            Returns:
+                arrayOfRecords (ndarray): T x N x 3 array of the column
+        """
+        if isinstance(self.LoadSim, ColumnarResultsClass):
+            return getattr(self.LoadSim, column)
+
+        attribute = {'Positions':'position', 'Velocities':'velocity'}[column]
+        return np.array([[getattr(particle, attribute) for particle in state]
+        for state in self.LoadSim.Simulation], dtype=float)
+
+    def FindParticleNames(self):
+        """ Method that returns the name of every particle, for either format of saved data.
+
+            Returns:
+                listOfParticleNames (list): The name of each particle
+        """
+        if isinstance(self.LoadSim, ColumnarResultsClass):
+            return self.LoadSim.metadata['listOfParticleNames']
+        return [particle.name for particle in self.LoadSim.Simulation[0]]
 
     def ThreeDPositionPlot(self):
         """ Method to generate a 3D plot of position of Particles over time.
         
             Parameters:
-                numberOfParticles (int): Number of particles in the simulation
-                lengthOfSimulation (int): Number of timesteps that the simulation
-                    ran for
-                inputData (list): List containing three lists (x, y and z position)
-                    for each of the particles in the simulation
+                arrayOfPositions (ndarray): T x N x 3 array of the position of each
+                    particle at each record
+                listOfParticleNames (list): The name of each particle
             
             Exceptions:
                 Attribute Error: If pandas does not detect LoadSim.Simulation, an 
@@ -41,20 +73,14 @@ class PlottingClass:
                     from triggering and presents no plot.
         """
         try:
-            numberOfParticles = len(self.LoadSim.Simulation[0])
-            lengthOfSimulation = len(self.LoadSim.Time)
-            # creates a list of three lists per particle.
-            inputData = [[[], [], []] for i in range(numberOfParticles)]
-            for i in range(lengthOfSimulation):
-                for j in range(numberOfParticles):
-                    for k in range(3):
-                        inputData[j][k].append(self.LoadSim.Simulation[i][j].position[k])
+            arrayOfPositions = PlottingClass.FindParticleColumn(self, 'Positions')
+            listOfParticleNames = PlottingClass.FindParticleNames(self)
 
             fig = plt.figure()
             ax = fig.gca(projection='3d')
-            for j in range(numberOfParticles):
-                ax.plot(inputData[j][0], inputData[j][1], inputData[j][2]
-                , label='%s'%(self.LoadSim.Simulation[0][j].name))
+            for j in range(arrayOfPositions.shape[1]):
+                ax.plot(arrayOfPositions[:, j, 0], arrayOfPositions[:, j, 1], arrayOfPositions[:, j, 2]
+                , label='%s'%(listOfParticleNames[j]))
             plt.title("Position of particles over time")
             ax.set_xlabel("x position (m)"), ax.set_ylabel("y position (m)"), ax.set_zlabel("z position (m)")
             ax.legend()
@@ -111,13 +137,8 @@ class PlottingClass:
         """ Method to plot the mean velocity of particles in the simulation over time
 
             Parameters:
-                lengthOfSimulation (int): Number of timesteps that the simulation
-                        ran for
-                numberOfParticles (int): Number of particles in the simulation
-                velocitySum (ndarray): Numpy array that contains the sum total of the
-                    velocity of particles in the simulation
-                inputData (list): List containing the norm of the mean velocity of
-                    particles in the simulation
+                inputData (ndarray): The norm of the mean velocity of particles in
+                    the simulation at each record
 
             Exceptions:
                     Attribute Error: If pandas does not detect LoadSim.Time, an 
@@ -125,12 +146,8 @@ class PlottingClass:
                         from triggering and presents no plot.
         """
         try:
-            lengthOfSimulation = len(self.LoadSim.Time)
-            numberOfParticles = len(self.LoadSim.Simulation[0])
-            inputData = []
-            for i in range(lengthOfSimulation):
-                velocitySum = sum([self.LoadSim.Simulation[i][j].velocity for j in range(numberOfParticles)])
-                inputData.append(np.linalg.norm(velocitySum / numberOfParticles))
+            inputData = np.linalg.norm(np.mean(PlottingClass.FindParticleColumn(self, 'Velocities'), axis=1)
+            , axis=1)
 
             fig = plt.figure()
             plt.plot(self.LoadSim.Time, inputData)
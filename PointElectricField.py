@@ -1,6 +1,7 @@
 import numpy as np 
 from AbstractPointField import AbstractPointFieldClass
 import scipy.constants as const
+import CompiledKernels
 
 class PointElectricFieldClass(AbstractPointFieldClass):
     """ Class that generates an electric field originating from a point particle
@@ -29,7 +30,8 @@ class PointElectricFieldClass(AbstractPointFieldClass):
     
     def GenerateField(self, affectedParticle):
         """ Method that returns the electric field generated by the source particle
-                that affects the affectedParticle.
+                that affects the affectedParticle. A source macro-particle generates the field of
+                its weight multiplied by its charge.
             
             Args:
                 affectedParticle (object: Particle): The particle being affected by the
@@ -47,5 +49,45 @@ class PointElectricFieldClass(AbstractPointFieldClass):
         displacement = affectedParticle.position - self.sourceParticle.position
         distance = np.linalg.norm(displacement)
         
-        return (self.sourceParticle.charge * displacement / (4 * const.pi * const.epsilon_0  
-        * distance * distance * distance))
\ No newline at end of file
+        return (self.sourceParticle.weight * self.sourceParticle.charge * displacement / (4 * const.pi * const.epsilon_0  
+        * distance * distance * distance))
+
+    @staticmethod
+    def GenerateFieldFromArrays(arrayOfSourcePositions, arrayOfSourceCharges, arrayOfAffectedPositions
+    , interactionMask=None, arrayOfSelfIndices=None
+    , chunkSize:int=128):
+        """ Method that returns the electric field generated by a set of source particles at
+                every affected position, computed with array operations instead of one pair of
+                particles at a time.
+
+            Args:
+                arrayOfSourcePositions (ndarray): N x 3 array of the positions of the source particles
+                arrayOfSourceCharges (ndarray): Array of the N charges of the source particles, which
+                    for macro-particles are their weights multiplied by their charges
+                arrayOfAffectedPositions (ndarray): M x 3 array of the positions where the field is found
+                interactionMask (ndarray): Optional M x N boolean array that is False for any pair of
+                    affected position and source particle that must not interact, such as a particle
+                    and its own field.
+                arrayOfSelfIndices (ndarray): Optional array of the M indices of the source particle at
+                    each affected position, whose field is not found there, or -1 if there is none. Unlike
+                    an interactionMask, it does not need an M x N array, so it is used to remove the field
+                    of each particle of a bunch acting on itself.
+                chunkSize (int): Number of affected positions that are computed together, which limits
+                    the size of the temporary M x N x 3 arrays when Numba is not installed.
+
+            Parameters:
+                isMasked (bool): True if an interactionMask is given
+
+            Returns:
+                Electric Field (ndarray): M x 3 array of the electric field at each affected position
+        """
+        isMasked = interactionMask is not None
+        if not isMasked:
+            interactionMask = np.ones((0, 0), dtype=bool)
+        if arrayOfSelfIndices is None:
+            arrayOfSelfIndices = np.full(len(arrayOfAffectedPositions), -1, dtype=np.int64)
+        arrayOfFields = CompiledKernels.ElectricFieldKernel(arrayOfSourcePositions, arrayOfSourceCharges
+        , arrayOfAffectedPositions, interactionMask, isMasked
+        , np.asarray(arrayOfSelfIndices, dtype=np.int64), chunkSize)
+
+        return arrayOfFields / (4 * const.pi * const.epsilon_0)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import numpy as np 
 from AbstractPointField import AbstractPointFieldClass
 import scipy.constants as const
+import CompiledKernels
 
 class PointMagneticFieldClass(AbstractPointFieldClass):
     """ Class that generates an magnetic field originating from a point particle
@@ -29,7 +30,8 @@ class PointMagneticFieldClass(AbstractPointFieldClass):
     
     def GenerateField(self, affectedParticle):
         """ Method that returns the magnetic field generated by the source particle
-                that affects the affectedParticle.
+                that affects the affectedParticle. A source macro-particle generates the field of
+                its weight multiplied by its charge.
             
             Args:
                 affectedParticle (object: Particle): The particle being affected by the
@@ -47,7 +49,47 @@ class PointMagneticFieldClass(AbstractPointFieldClass):
         displacement = affectedParticle.position - self.sourceParticle.position
         distance = np.linalg.norm(displacement)
         
-        return (const.mu_0 * self.sourceParticle.charge * np.cross(
+        return (const.mu_0 * self.sourceParticle.weight * self.sourceParticle.charge * np.cross(
         self.sourceParticle.velocity, displacement) / (4 * const.pi  
         * distance * distance * distance))
-        
\ No newline at end of file
+
+    @staticmethod
+    def GenerateFieldFromArrays(arrayOfSourcePositions, arrayOfSourceVelocities, arrayOfSourceCharges
+    , arrayOfAffectedPositions, interactionMask=None, arrayOfSelfIndices=None
+    , chunkSize:int=128):
+        """ Method that returns the magnetic field generated by a set of moving source particles at
+                every affected position, computed with array operations instead of one pair of
+                particles at a time.
+
+            Args:
+                arrayOfSourcePositions (ndarray): N x 3 array of the positions of the source particles
+                arrayOfSourceVelocities (ndarray): N x 3 array of the velocities of the source particles
+                arrayOfSourceCharges (ndarray): Array of the N charges of the source particles, which
+                    for macro-particles are their weights multiplied by their charges
+                arrayOfAffectedPositions (ndarray): M x 3 array of the positions where the field is found
+                interactionMask (ndarray): Optional M x N boolean array that is False for any pair of
+                    affected position and source particle that must not interact, such as a particle
+                    and its own field.
+                arrayOfSelfIndices (ndarray): Optional array of the M indices of the source particle at
+                    each affected position, whose field is not found there, or -1 if there is none. Unlike
+                    an interactionMask, it does not need an M x N array, so it is used to remove the field
+                    of each particle of a bunch acting on itself.
+                chunkSize (int): Number of affected positions that are computed together, which limits
+                    the size of the temporary M x N x 3 arrays when Numba is not installed.
+
+            Parameters:
+                isMasked (bool): True if an interactionMask is given
+
+            Returns:
+                Magnetic Field (ndarray): M x 3 array of the magnetic field at each affected position
+        """
+        isMasked = interactionMask is not None
+        if not isMasked:
+            interactionMask = np.ones((0, 0), dtype=bool)
+        if arrayOfSelfIndices is None:
+            arrayOfSelfIndices = np.full(len(arrayOfAffectedPositions), -1, dtype=np.int64)
+        arrayOfFields = CompiledKernels.MagneticFieldKernel(arrayOfSourcePositions, arrayOfSourceVelocities
+        , arrayOfSourceCharges, arrayOfAffectedPositions, interactionMask, isMasked
+        , np.asarray(arrayOfSelfIndices, dtype=np.int64), chunkSize)
+
+        return const.mu_0 * arrayOfFields / (4 * const.pi)
\ No newline at end of file
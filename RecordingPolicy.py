@@ -0,0 +1,133 @@
+import math
+
+class RecordingPolicyClass:
+    """ Class that decides which steps of a simulation are recorded in its history.
+
+            A step is recorded if any of the chosen conditions is met: the number of steps since the
+            start of the simulation is a multiple of stepInterval, the time has reached the next
+            multiple of timeInterval, or the eventFunction returns True. If no condition is chosen,
+            every step is recorded.
+
+            If maximumRecords is given, the history kept in memory is halved whenever it reaches
+            maximumRecords, by removing every second record made by stepInterval or timeInterval, and
+            stepInterval and timeInterval are doubled, so a simulation of any duration keeps fewer than
+            maximumRecords of these records, spread over its whole duration. Records made by the
+            eventFunction are always kept. If the history is streamed to files by a trajectory recorder,
+            the records already written are kept, so only stepInterval and timeInterval are doubled,
+            and the number of records grows with the logarithm of the duration instead.
+
+        Class Attributes:
+            stepInterval (int): Number of steps between records
+            timeInterval (float): Time between records
+            eventFunction (function): Function that is given the simulation, the time that has elapsed
+                and the timestep of the step, and returns True if the step must be recorded
+            maximumRecords (int): Largest number of records kept in memory. If None, the history is
+                never halved.
+            name (string): Name of the recording policy
+            numberOfSteps (int): Number of steps since the start of the simulation
+            numberOfRecords (int): Number of records kept in memory
+            numberOfHalvings (int): Number of times that the history has been halved
+            nextRecordingTime (float): Time at which the next record is made for the timeInterval
+            isEventStep (bool): True if the last step was recorded because of the eventFunction
+            listOfIsEventRecords (list): Whether each record kept in memory was made by the eventFunction
+    """
+
+    def __init__(self, stepInterval:int=None, timeInterval=None, eventFunction=None, maximumRecords:int=None
+    , name='Recording Policy'):
+        """ Constructor for the RecordingPolicyClass class.
+
+            Args:
+                stepInterval (int): Number of steps between records. If None, and no other condition is
+                    chosen, every step is recorded.
+                timeInterval (float): Time between records. If None, records are not made by time.
+                eventFunction (function): Function that is given the simulation, the time that has
+                    elapsed and the timestep of the step, and returns True if the step must be recorded.
+                    If None, records are not made by events.
+                maximumRecords (int): Largest number of records kept in memory. If None, the history
+                    is never halved.
+                name (string): Name of the recording policy
+        """
+        if stepInterval is None and timeInterval is None and eventFunction is None:
+            stepInterval = 1
+        self.initialStepInterval = stepInterval
+        self.initialTimeInterval = timeInterval
+        self.eventFunction = eventFunction
+        self.maximumRecords = maximumRecords
+        self.name = name
+        RecordingPolicyClass.Reset(self)
+
+    def __repr__(self):
+        return 'Recording Policy: {0}, Step Interval: {1}, Time Interval: {2}, Maximum Records: {3}'.format(
+        self.name, self.stepInterval, self.timeInterval, self.maximumRecords)
+
+    def Reset(self):
+        """ Method that restores the policy to its state at the start of a simulation.
+        """
+        self.stepInterval = self.initialStepInterval
+        self.timeInterval = self.initialTimeInterval
+        self.numberOfSteps = 0
+        self.numberOfRecords = 0
+        self.numberOfHalvings = 0
+        self.nextRecordingTime = 0.0
+        self.isEventStep = False
+        self.listOfIsEventRecords = []
+
+    def IsRecordingStep(self, simulation, timeElapsed, timestep):
+        """ Method that returns whether the current step of a simulation is recorded, and counts the step.
+
+            Args:
+                simulation (object: AbstractSimulationClass): The simulation that is recorded
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): The timestep of the step
+
+            Returns:
+                isRecording (bool): True if the step is recorded
+        """
+        isRecording = False
+        if self.stepInterval is not None and self.numberOfSteps % self.stepInterval == 0:
+            isRecording = True
+
+        # the small tolerance stops rounding in the sum of the timesteps from missing a record
+        if self.timeInterval is not None and timeElapsed >= self.nextRecordingTime - 1e-9 * self.timeInterval:
+            isRecording = True
+            self.nextRecordingTime = (math.floor(timeElapsed / self.timeInterval + 1e-9) + 1) * self.timeInterval
+
+        self.isEventStep = self.eventFunction is not None and bool(self.eventFunction(simulation, timeElapsed
+        , timestep))
+        if self.isEventStep:
+            isRecording = True
+
+        self.numberOfSteps += 1
+        return isRecording
+
+    def CountRecord(self, listOfHistories):
+        """ Method that counts a record of the step last given to IsRecordingStep(), and halves the
+                history if it has reached maximumRecords.
+
+            Args:
+                listOfHistories (list): The lists that make up the history of the simulation kept in
+                    memory, which each gain one item with every record. Empty if the history is
+                    streamed to files.
+        """
+        self.listOfIsEventRecords.append(self.isEventStep)
+        self.numberOfRecords += 1
+        if self.maximumRecords is None or self.numberOfRecords < self.maximumRecords:
+            return
+
+        # every second record made by the intervals is removed, keeping the first record of the
+        # simulation and every record made by the eventFunction
+        listOfIntervalRecords = [i for i, isEvent in enumerate(self.listOfIsEventRecords) if not isEvent]
+        setOfRemovedRecords = set(listOfIntervalRecords[1::2])
+        for history in listOfHistories:
+            history[:] = [record for i, record in enumerate(history) if i not in setOfRemovedRecords]
+        self.listOfIsEventRecords = [isEvent for i, isEvent in enumerate(self.listOfIsEventRecords)
+        if i not in setOfRemovedRecords]
+        self.numberOfRecords = len(self.listOfIsEventRecords)
+        self.numberOfHalvings += 1
+
+        # records are made half as often from now on
+        if self.stepInterval is not None:
+            self.stepInterval *= 2
+        if self.timeInterval is not None:
+            self.timeInterval *= 2
+            self.nextRecordingTime = math.ceil(self.nextRecordingTime / self.timeInterval - 1e-9) * self.timeInterval
@@ -0,0 +1,155 @@
+from AbstractIntegrator import AbstractIntegratorClass, np
+
+class RungeKutta45IntegratorClass(AbstractIntegratorClass):
+    """ Class that moves the bunch with the embedded Dormand-Prince Runge-Kutta 5(4) method. The fifth
+            and fourth order solutions of each timestep are compared to estimate the error. If the
+            error is too large the timestep is rejected and tried again with a shorter timestep,
+            otherwise the next timestep is made as long as the error allows.
+
+            The last stage of an accepted timestep is the first stage of the next one, so each
+            accepted timestep costs six field evaluations as long as the bunch is not changed
+            between timesteps.
+
+        Class Attributes:
+            relativeTolerance (float): Largest error allowed relative to the size of each component
+                of the position and momentum per unit rest mass
+            absolutePositionTolerance (float): Largest error allowed in position, in metres, where
+                the position is close to zero
+            absoluteMomentumTolerance (float): Largest error allowed in momentum per unit rest mass,
+                in metres per second, where the momentum is close to zero
+            minimumTimestep (float): Timestep that is accepted even if the error is too large
+            nextTimestep (float): Timestep that is expected to meet the tolerances in the next step
+            numberOfRejectedSteps (int): The number of timesteps that were tried again
+            name (string): Name of the integrator
+            numberOfFieldEvaluations (int): The number of times the fields acting on the whole bunch
+                have been found by the integrator
+    """
+
+    # Dormand-Prince coefficients
+    stageFractions = [0.0, 1/5, 3/10, 4/5, 8/9, 1.0, 1.0]
+    stageCoefficients = [[], [1/5], [3/40, 9/40], [44/45, -56/15, 32/9]
+    , [19372/6561, -25360/2187, 64448/6561, -212/729]
+    , [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]
+    , [35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84]]
+    fifthOrderCoefficients = [35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84, 0.0]
+    fourthOrderCoefficients = [5179/57600, 0.0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40]
+
+    def __init__(self, relativeTolerance=1e-6, absolutePositionTolerance=1e-9, absoluteMomentumTolerance=1e-6
+    , minimumTimestep=0.0, name='Runge-Kutta 45 Integrator'):
+        """ Constructor for the RungeKutta45IntegratorClass class.
+                Inherits the __init__ from AbstractIntegratorClass.
+
+            Args:
+                relativeTolerance (float): Largest error allowed relative to the size of each component
+                    of the position and momentum per unit rest mass
+                absolutePositionTolerance (float): Largest error allowed in position near zero
+                absoluteMomentumTolerance (float): Largest error allowed in momentum per unit rest
+                    mass near zero
+                minimumTimestep (float): Timestep that is accepted even if the error is too large
+                name (string): Name of the integrator
+        """
+        super().__init__(name=name)
+        self.relativeTolerance = relativeTolerance
+        self.absolutePositionTolerance = absolutePositionTolerance
+        self.absoluteMomentumTolerance = absoluteMomentumTolerance
+        self.minimumTimestep = minimumTimestep
+        self.nextTimestep = None
+        self.numberOfRejectedSteps = 0
+        self.lastStage = None # [time, positions, velocities, derivatives] at the end of the last step
+
+    def __repr__(self):
+        return 'Runge-Kutta 45 Integrator: {0}, Relative Tolerance: {1}'.format(self.name, self.relativeTolerance)
+
+    def FindErrorRatio(self, initialState, finalState, errorEstimate):
+        """ Method that returns the largest error of any component of the state, divided by the
+                error that is allowed for that component.
+
+            Args:
+                initialState (list): N x 3 arrays of position and momentum per unit rest mass at the
+                    start of the timestep
+                finalState (list): N x 3 arrays of position and momentum per unit rest mass at the
+                    end of the timestep
+                errorEstimate (list): N x 3 arrays of the difference between the fifth and fourth
+                    order solutions
+
+            Returns:
+                errorRatio (float): Less than or equal to one if the timestep meets the tolerances
+        """
+        errorRatio = 0.0
+        for i, absoluteTolerance in enumerate([self.absolutePositionTolerance, self.absoluteMomentumTolerance]):
+            allowedError = absoluteTolerance + self.relativeTolerance * np.maximum(np.abs(initialState[i])
+            , np.abs(finalState[i]))
+            errorRatio = max(errorRatio, np.max(np.abs(errorEstimate[i]) / allowedError))
+
+        return errorRatio
+
+    def Step(self, particleBunch, totalEMField, timeElapsed, timestep, limitVelocity:bool=True):
+        """ Method that moves the particle bunch forward by one accepted timestep, which is no longer
+                than the timestep given.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is moved
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): The longest timestep that may be taken
+                limitVelocity (bool): Not used, since the velocity is found from the momentum
+
+            Parameters:
+                trialTimestep (float): The timestep that is being tried
+                listOfDerivatives (list): The rate of change of position and momentum per unit rest
+                    mass at each of the seven stages
+                errorRatio (float): Size of the error estimate compared to the tolerances
+
+            Returns:
+                [trialTimestep, numberOfTimesBreakIsPrevented] (list): The timestep that was taken and zero
+        """
+        initialPositions = particleBunch.arrayOfPositions.copy()
+        initialVelocities = particleBunch.arrayOfVelocities.copy()
+        initialMomenta = RungeKutta45IntegratorClass.FindMomenta(self, particleBunch)
+
+        # the last stage of the previous step can only be used if the bunch has not been changed since
+        if (self.lastStage is not None and self.lastStage[0] == timeElapsed
+        and np.array_equal(self.lastStage[1], initialPositions) and np.array_equal(self.lastStage[2], initialVelocities)):
+            firstDerivatives = self.lastStage[3]
+            trialTimestep = min(timestep, self.nextTimestep)
+        else:
+            firstDerivatives = RungeKutta45IntegratorClass.FindDerivatives(self, particleBunch, totalEMField
+            , timeElapsed, initialPositions, initialMomenta)
+            trialTimestep = timestep
+
+        while True:
+            listOfDerivatives = [firstDerivatives]
+            for i in range(1, 7):
+                stagePositions = initialPositions + trialTimestep * sum([coefficient * listOfDerivatives[j][0]
+                for j, coefficient in enumerate(RungeKutta45IntegratorClass.stageCoefficients[i]) if coefficient != 0.0])
+                stageMomenta = initialMomenta + trialTimestep * sum([coefficient * listOfDerivatives[j][1]
+                for j, coefficient in enumerate(RungeKutta45IntegratorClass.stageCoefficients[i]) if coefficient != 0.0])
+                listOfDerivatives.append(RungeKutta45IntegratorClass.FindDerivatives(self, particleBunch
+                , totalEMField, timeElapsed + RungeKutta45IntegratorClass.stageFractions[i] * trialTimestep
+                , stagePositions, stageMomenta))
+
+            # the seventh stage is found at the fifth order solution
+            errorEstimate = [trialTimestep * sum([(RungeKutta45IntegratorClass.fifthOrderCoefficients[j]
+            - RungeKutta45IntegratorClass.fourthOrderCoefficients[j]) * listOfDerivatives[j][k] for j in range(7)])
+            for k in range(2)]
+            errorRatio = RungeKutta45IntegratorClass.FindErrorRatio(self, [initialPositions, initialMomenta]
+            , [stagePositions, stageMomenta], errorEstimate)
+
+            if errorRatio <= 1.0 or trialTimestep <= self.minimumTimestep:
+                break
+
+            # the error falls with the fifth power of the timestep
+            self.numberOfRejectedSteps += 1
+            trialTimestep = max(trialTimestep * max(0.2, 0.9 * errorRatio**-0.2), self.minimumTimestep)
+
+        if errorRatio == 0.0:
+            self.nextTimestep = 5 * trialTimestep
+        else:
+            self.nextTimestep = trialTimestep * min(5.0, 0.9 * errorRatio**-0.2)
+
+        RungeKutta45IntegratorClass.SetState(self, particleBunch, initialVelocities, stagePositions
+        , stageMomenta, trialTimestep)
+        self.lastStage = [timeElapsed + trialTimestep, particleBunch.arrayOfPositions.copy()
+        , particleBunch.arrayOfVelocities.copy(), listOfDerivatives[6]]
+
+        return [trialTimestep, 0]
@@ -0,0 +1,66 @@
+from AbstractIntegrator import AbstractIntegratorClass, np
+
+class RungeKutta4IntegratorClass(AbstractIntegratorClass):
+    """ Class that moves the bunch with the classical fourth order Runge-Kutta method. Four field
+            evaluations per timestep, but the error falls with the fourth power of the timestep so
+            a much longer timestep can be used for the same accuracy.
+
+        Class Attributes:
+            name (string): Name of the integrator
+            numberOfFieldEvaluations (int): The number of times the fields acting on the whole bunch
+                have been found by the integrator
+    """
+
+    def __init__(self, name='Runge-Kutta 4 Integrator'):
+        """ Constructor for the RungeKutta4IntegratorClass class.
+                Inherits the __init__ from AbstractIntegratorClass.
+
+            Args:
+                name (string): Name of the integrator
+        """
+        super().__init__(name=name)
+
+    def __repr__(self):
+        return 'Runge-Kutta 4 Integrator: {0}'.format(self.name)
+
+    def Step(self, particleBunch, totalEMField, timeElapsed, timestep, limitVelocity:bool=True):
+        """ Method that moves the particle bunch forward by one timestep with the fourth order
+                Runge-Kutta method.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is moved
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): Time that the update lasts for
+                limitVelocity (bool): Not used, since the velocity is found from the momentum
+
+            Parameters:
+                listOfDerivatives (list): The rate of change of position and momentum per unit rest
+                    mass at each of the four stages
+
+            Returns:
+                [timestep, numberOfTimesBreakIsPrevented] (list): The timestep that was used and zero
+        """
+        initialPositions = particleBunch.arrayOfPositions.copy()
+        initialVelocities = particleBunch.arrayOfVelocities.copy()
+        initialMomenta = RungeKutta4IntegratorClass.FindMomenta(self, particleBunch)
+
+        listOfDerivatives = []
+        for stageFraction in [0.0, 0.5, 0.5, 1.0]:
+            if len(listOfDerivatives) == 0:
+                stagePositions, stageMomenta = initialPositions, initialMomenta
+            else:
+                stagePositions = initialPositions + stageFraction * timestep * listOfDerivatives[-1][0]
+                stageMomenta = initialMomenta + stageFraction * timestep * listOfDerivatives[-1][1]
+            listOfDerivatives.append(RungeKutta4IntegratorClass.FindDerivatives(self, particleBunch
+            , totalEMField, timeElapsed + stageFraction * timestep, stagePositions, stageMomenta))
+
+        finalPositions = initialPositions + timestep / 6 * (listOfDerivatives[0][0]
+        + 2 * listOfDerivatives[1][0] + 2 * listOfDerivatives[2][0] + listOfDerivatives[3][0])
+        finalMomenta = initialMomenta + timestep / 6 * (listOfDerivatives[0][1]
+        + 2 * listOfDerivatives[1][1] + 2 * listOfDerivatives[2][1] + listOfDerivatives[3][1])
+
+        RungeKutta4IntegratorClass.SetState(self, particleBunch, initialVelocities, finalPositions
+        , finalMomenta, timestep)
+
+        return [timestep, 0]
@@ -4,6 +4,7 @@ from ParticleBunchClass import ParticleBunch
 from Particle import Particle
 import scipy
 import math
+import ColumnarResults
 
 class SimulationConservationLawsClass(AbstractSimulationClass):
     """ Simulation without external fields that measures conservation of momentum, conservation
@@ -35,10 +36,18 @@ class SimulationConservationLawsClass(AbstractSimulationClass):
                 throughout the simulation
             duration (float): Duration of the simulation
             largeTimestep (float): The timestep that is throughout the simulation
+            integrator (object: AbstractIntegratorClass): Method used to move the particles each timestep.
+            timestepController (object: TimestepControllerClass): Chooses each timestep from the state
+                of the bunch. If None, the simulation chooses its timesteps as before.
+            recordingPolicy (object: RecordingPolicyClass): Decides which steps are recorded in the
+                history of the simulation.
+            resampler (object: MacroParticleResamplerClass): Splits and merges the macro-particles of the
+                bunch as it changes shape.
 
     """
     def __init__(self, totalEMField=EMFieldClass, particleBunch=ParticleBunch, duration=1e-4
-    , largeTimestep=1e-6, spaceResolution=10):
+    , largeTimestep=1e-6, spaceResolution=10, integrator=None
+    , timestepController=None, recordingPolicy=None, resampler=None, pushMethod:str=None):
         """ Constructor for the SimulationConservationLawsClass class.
                 Inherits the __init__ from AbstractSimulationClass.
 
@@ -51,9 +60,22 @@ class SimulationConservationLawsClass(AbstractSimulationClass):
                 largeTimeStep (float): The timestep that is throughout the simulation
                 spaceResolution (int): The number of segements each dimension will be split into 
                     for the field energy calculation
+                integrator (object: AbstractIntegratorClass): Method used to move the particles each
+                    timestep. If None, the Euler Cromer method is used.
+                timestepController (object: TimestepControllerClass): Chooses each timestep from the
+                    state of the bunch. If None, the simulation chooses its timesteps as before.
+                recordingPolicy (object: RecordingPolicyClass): Decides which steps are recorded in the
+                    history of the simulation. If None, every step is recorded.
+                resampler (object: MacroParticleResamplerClass): Splits and merges the macro-particles of
+                    the bunch every stepInterval steps. If None, the particles of the bunch are never changed.
+                pushMethod (string): Deprecated name of the integrator from before integrators could be
+                    chosen, kept so that older scripts run. 'Cromer' is the same as an
+                    EulerCromerIntegratorClass and 'Boris' is the same as a BorisIntegratorClass.
         """
         super().__init__(totalEMField=totalEMField, particleBunch=particleBunch, duration=duration
-        , largeTimestep=largeTimestep, smallTimestep=largeTimestep)
+        , largeTimestep=largeTimestep, smallTimestep=largeTimestep, integrator=integrator
+        , timestepController=timestepController, recordingPolicy=recordingPolicy, resampler=resampler
+        , pushMethod=pushMethod)
         self.spaceResolution = spaceResolution
         self.inverseResolution = 1 / spaceResolution
 
@@ -221,7 +243,7 @@ class SimulationConservationLawsClass(AbstractSimulationClass):
 
             Parameters:
                 timeElapsed (float): Time that has elapsed in the current simulation
-                timeStep (float): Equal to largeTimeStep
+                timeStep (float): Equal to largeTimeStep, unless there is a timestep controller
                 particlesOutOfBounds (int): The number of particles in the simulation that
                     are out of the boundaries of the testing fields
                 simulationMomentum (float): Norm of the sum of linear momentum of particles
@@ -232,6 +254,8 @@ class SimulationConservationLawsClass(AbstractSimulationClass):
                 simulationEnergyFields (float): Energy of the simulation that is stored in the fields
                 simulationEnergyParticles (float): Energy of the simulation that is stored in the
                     kinetic energy of the particles, the total energy minus the rest energy
+                The momentum, angular momentum and energy of each particle are multiplied by its
+                    weight, so they are those of the real particles that the bunch stands for.
         """
         # stops the simulation if external fields are added
         if (len(self.totalEMField.listOfElectricFields) != 0 or
@@ -240,7 +264,11 @@ class SimulationConservationLawsClass(AbstractSimulationClass):
             return None
 
         timeElapsed = 0.0
-        timestep = self.largeTimestep # only the largeTimestep is used in this simulation
+        if self.timestepController is not None:
+            self.timestepController.Reset()
+        if self.resampler is not None:
+            self.resampler.Reset()
+        self.recordingPolicy.Reset()
 
         # number of particles that are out of bounds of the simulation. If greater than 0
         # the simulation is stopped
@@ -264,44 +292,60 @@ class SimulationConservationLawsClass(AbstractSimulationClass):
                 %(timeElapsed))
                 break
 
-            self.simulationTime.append(deepcopy(timeElapsed)) # save elapsed time
-            self.simulationState.append(deepcopy(self.particleBunch.listOfParticles)) # save state of all particles
+            # the macro-particles are split and merged before the step is recorded
+            SimulationConservationLawsClass.ResampleBunch(self)
 
-            # save total momentum of all particles
-            simulationMomentum = np.linalg.norm(sum([self.particleBunch.listOfParticles[i].Momentum() 
-            for i in range(self.particleBunch.numberOfParticles)]))
-            self.simulationMomentum.append(deepcopy(simulationMomentum)) 
+            # only the largeTimestep is used in this simulation, unless there is a timestep controller
+            timestep = SimulationConservationLawsClass.FindTimestep(self, timeElapsed)
 
-            # save total angular momentum of all particle
-            simulationAngularMomentum = np.linalg.norm(sum([np.cross(
-            self.particleBunch.listOfParticles[i].position, self.particleBunch.listOfParticles[i].Momentum()) 
-            for i in range(self.particleBunch.numberOfParticles)]))
-            self.simulationAngularMomentum.append(deepcopy(simulationAngularMomentum)) 
+            # the recording policy decides whether this step is saved in the history
+            if SimulationConservationLawsClass.IsRecordingStep(self, timeElapsed, timestep):
+                self.simulationTime.append(deepcopy(timeElapsed)) # save elapsed time
+                self.simulationState.append(deepcopy(self.particleBunch.listOfParticles)) # save state of all particles
 
-            # save total potential energy in electromagnetic fields in the simulation space
-            simulationEnergyFields = SimulationConservationLawsClass.IntegrateEnergyDensity(self, timeElapsed=timeElapsed)
-            self.simulationEnergyFields.append(deepcopy(simulationEnergyFields))
+                # save total momentum of all particles
+                simulationMomentum = np.linalg.norm(sum([self.particleBunch.listOfParticles[i].weight
+                * self.particleBunch.listOfParticles[i].Momentum() for i in range(self.particleBunch.numberOfParticles)]))
+                self.simulationMomentum.append(deepcopy(simulationMomentum)) 
 
-            # save total kinetic energy of all particles
-            simulationEnergyParticles = sum([self.particleBunch.listOfParticles[i].KineticEnergy() for i in 
-            range(self.particleBunch.numberOfParticles)])
-            self.simulationEnergyParticles.append(deepcopy(simulationEnergyParticles))
-            
-            # give all particles correct acceleration by determining the total electric
-            # and magnetic fields that act on the particles
-            self.totalEMField.GiveAcceleration(self.particleBunch, timeElapsed)
+                # save total angular momentum of all particle
+                simulationAngularMomentum = np.linalg.norm(sum([self.particleBunch.listOfParticles[i].weight
+                * np.cross(self.particleBunch.listOfParticles[i].position, self.particleBunch.listOfParticles[i].Momentum())
+                for i in range(self.particleBunch.numberOfParticles)]))
+                self.simulationAngularMomentum.append(deepcopy(simulationAngularMomentum)) 
+
+                # save total potential energy in electromagnetic fields in the simulation space
+                simulationEnergyFields = SimulationConservationLawsClass.IntegrateEnergyDensity(self, timeElapsed=timeElapsed)
+                self.simulationEnergyFields.append(deepcopy(simulationEnergyFields))
 
-            # apply the euler cromer method to update the velocity and position of all particles
-            for i in range(len(self.particleBunch.listOfParticles)):
-                self.particleBunch.listOfParticles[i].UpdateCromer(timestep)
+                # save total kinetic energy of all particles
+                simulationEnergyParticles = sum([self.particleBunch.listOfParticles[i].weight
+                * self.particleBunch.listOfParticles[i].KineticEnergy() for i in range(self.particleBunch.numberOfParticles)])
+                self.simulationEnergyParticles.append(deepcopy(simulationEnergyParticles))
+                SimulationConservationLawsClass.CountRecord(self)
+
+            # move the particles forward with the integrator of the simulation
+            timestep = SimulationConservationLawsClass.UpdateBunch(self, timeElapsed, timestep, limitVelocity=False)[0]
 
             timeElapsed += timestep
 
-    def SaveSimulation(self, fileName):
-        """ Method to save the simulation data to a .pkl file as a pandas dataframe
+    def FindListOfHistories(self):
+        """ Method that returns the lists that make up the history of the simulation.
+
+            Returns:
+                listOfHistories (list): The lists of the time, state, momentum, angular momentum and
+                    the energy of the fields and the particles
+        """
+        return [self.simulationTime, self.simulationState, self.simulationMomentum, self.simulationAngularMomentum
+        , self.simulationEnergyFields, self.simulationEnergyParticles]
+
+    def SaveSimulation(self, fileName, fileFormat:str='pickle'):
+        """ Method to save the simulation data to a .pkl file as a pandas dataframe, or to a directory
+                in the columnar format
 
             Args:
-                fileName (string): Name of the saved data file
+                fileName (string): Name of the saved data file, or of the directory of the columnar format
+                fileFormat (string): 'pickle' or 'columnar'
             
             Parameters:
                 dictionary (dictionary): Dictionary that contains data for the elapsed time, total
@@ -314,6 +358,13 @@ class SimulationConservationLawsClass(AbstractSimulationClass):
         , 'AngularMomentum': self.simulationAngularMomentum
         , 'EnergyParticles':self.simulationEnergyParticles}
 
+        if fileFormat == 'columnar':
+            dictionaryOfColumns = {i:dictionary[i] for i in dictionary if i != 'Simulation'}
+            dictionaryOfColumns.update(ColumnarResults.ConvertStatesToColumns(self.simulationState))
+            ColumnarResults.WriteColumnarResults(fileName, dictionaryOfColumns, type(self).__name__
+            , self.particleBunch.FindParticleNames())
+            return
+
         dataFrame = pd.DataFrame(dictionary)
         dataFrame.to_pickle("%s.pkl"%(fileName))
         
\ No newline at end of file
@@ -0,0 +1,165 @@
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from AbstractSimulation import LoadCheckpoint
+from ParameterSweep import SetAttributeFromPath, MeasureFinalBunch
+from SimulationStandard import SimulationStandardClass
+
+class SimulationForkClass:
+    """ Class that continues a simulation from one checkpoint as several branches, which each change
+            some of the attributes of the simulation before they continue, so the part of the simulation
+            that the branches share is only run once.
+
+            The changes of each branch are named by their path from the simulation, in the same way as
+            the parameters of ParameterSweepClass, such as
+            'totalEMField.listOfElectricFields[0].angularFrequency'. Every branch continues from its own
+            copy of the checkpoint, until the end of the duration of the simulation. If the simulation has
+            a trajectory recorder, the records written before the checkpoint are copied to a directory
+            for each branch, named '<directory> branch <number>', and if it has a checkpoint file, each
+            branch saves its checkpoints to '<file> branch <number>'.
+
+            Only SimulationStandardClass can be paused at the fork and resumed in the branches, so only
+            its simulations can be forked. The RunSimulation() of the other simulations runs from the
+            start to the end of the duration.
+
+        Class Attributes:
+            checkpoint (string or bytes): The checkpoint file, or the in-memory checkpoint made by
+                CreateCheckpoint() or RunToForkTime(), that every branch continues from
+            listOfOverrides (list): Dictionary of the new value of each attribute path for every branch
+            numberOfWorkers (int): Number of processes that the branches are spread across. If 1, the
+                branches are run one after another in this process.
+            measureFunction (function): Function that is given a simulation at the end of its run and
+                returns a dictionary of the results of the branch. Must be defined at the top level of a
+                file to be sent to other processes.
+            name (string): Name of the fork
+            resultTable (pandas dataframe): One row for each branch, with the branch number, the value of
+                each changed attribute and each result of the measureFunction
+    """
+
+    def __init__(self, checkpoint, listOfOverrides, numberOfWorkers:int=1, measureFunction=None
+    , name='Simulation Fork'):
+        """ Constructor for the SimulationForkClass class.
+
+            Args:
+                checkpoint (string or bytes): The checkpoint file, or an in-memory checkpoint
+                listOfOverrides (list): Dictionary of the new value of each attribute path for every branch
+                numberOfWorkers (int): Number of processes that the branches are spread across
+                measureFunction (function): Function that is given a simulation at the end of its run and
+                    returns a dictionary of the results of the branch. If None, MeasureFinalBunch is used.
+                name (string): Name of the fork
+        """
+        self.checkpoint = checkpoint
+        self.listOfOverrides = listOfOverrides
+        self.numberOfWorkers = numberOfWorkers
+        if measureFunction is None:
+            measureFunction = MeasureFinalBunch
+        self.measureFunction = measureFunction
+        self.name = name
+        self.resultTable = None
+
+    def __repr__(self):
+        return 'Simulation Fork: {0}, Number of Branches: {1}, Number of Workers: {2}'.format(
+        self.name, len(self.listOfOverrides), self.numberOfWorkers)
+
+    def RunBranches(self):
+        """ Method that continues every branch from the checkpoint and collects the results in resultTable,
+                in the order of listOfOverrides. If numberOfWorkers is more than 1, the branches are spread
+                across a pool of processes, which are each sent the checkpoint.
+
+            Parameters:
+                listOfResults (list): Dictionary of the results of each branch
+
+            Returns:
+                resultTable (pandas dataframe): One row for each branch, with the branch number, the value
+                    of each changed attribute and each result of the measureFunction
+        """
+        numberOfBranches = len(self.listOfOverrides)
+        listOfResults = []
+        if self.numberOfWorkers > 1:
+            with ProcessPoolExecutor(max_workers=self.numberOfWorkers) as executor:
+                # map returns the results in the order of the branches, not the order they finish in
+                for result in executor.map(RunBranchInWorker, [self.checkpoint] * numberOfBranches
+                , self.listOfOverrides, range(numberOfBranches), [self.measureFunction] * numberOfBranches):
+                    listOfResults.append(result)
+                    print(len(listOfResults), "branches completed")
+        else:
+            for i in range(numberOfBranches):
+                listOfResults.append(RunBranchInWorker(self.checkpoint, self.listOfOverrides[i], i
+                , self.measureFunction))
+                print(len(listOfResults), "branches completed")
+
+        self.resultTable = pd.DataFrame([dict(Branch=i, **self.listOfOverrides[i], **listOfResults[i])
+        for i in range(numberOfBranches)])
+        return self.resultTable
+
+    def SaveBranches(self, fileName):
+        """ Method to save the result table of the branches to a .pkl file as a pandas dataframe
+
+            Args:
+                fileName (string): Name of the saved data file
+        """
+        self.resultTable.to_pickle("%s.pkl"%(fileName))
+
+def CheckSimulationCanFork(simulation):
+    """ Function that checks that a simulation can be paused and resumed, which only
+            SimulationStandardClass can, so that it can be forked.
+
+        Args:
+            simulation (object: AbstractSimulationClass): The simulation
+
+        Raises:
+            TypeError: If the simulation is not a SimulationStandardClass
+    """
+    if not isinstance(simulation, SimulationStandardClass):
+        raise TypeError("%s can not be paused and resumed, so it can not be forked. Only "
+        "SimulationStandardClass can be forked"%(type(simulation).__name__))
+
+def RunToForkTime(simulation, forkTime):
+    """ Function that runs a simulation from its start until the time at which its branches split, and
+            returns an in-memory checkpoint that the branches continue from. The simulation must be
+            able to pause and resume, as SimulationStandardClass can.
+
+        Args:
+            simulation (object: SimulationStandardClass): The simulation, which is run until forkTime
+            forkTime (float): Time at which the branches split, which is the start of the first step at
+                or after forkTime
+
+        Raises:
+            TypeError: If the simulation can not be paused and resumed
+
+        Returns:
+            checkpoint (bytes): The in-memory checkpoint of the simulation at the fork
+    """
+    CheckSimulationCanFork(simulation)
+    timeElapsed = simulation.RunSimulation(stopTime=forkTime)
+    return simulation.CreateCheckpoint(timeElapsed)
+
+def RunBranchInWorker(checkpoint, overrides, branchNumber, measureFunction):
+    """ Function that loads a copy of the simulation from the checkpoint, changes its attributes and
+            continues it until the end of its duration.
+
+        Args:
+            checkpoint (string or bytes): The checkpoint file, or an in-memory checkpoint
+            overrides (dictionary): The new value of each attribute path for this branch
+            branchNumber (int): Number of the branch, which names its recording and checkpoint file
+            measureFunction (function): Function that returns a dictionary of the results of the branch
+
+        Raises:
+            TypeError: If the simulation of the checkpoint can not be resumed
+
+        Returns:
+            dictionaryOfResults (dictionary): The results of the branch
+    """
+    simulation, timeElapsed = LoadCheckpoint(checkpoint)
+    CheckSimulationCanFork(simulation)
+    for path, value in overrides.items():
+        SetAttributeFromPath(simulation, path, value)
+
+    # the branches must not write over the recording and checkpoints of each other
+    if getattr(simulation, 'trajectoryRecorder', None) is not None:
+        simulation.trajectoryRecorder.CopyTo("%s branch %d"%(simulation.trajectoryRecorder.directoryName
+        , branchNumber))
+    if simulation.checkpointFile is not None:
+        simulation.checkpointFile = "%s branch %d"%(simulation.checkpointFile, branchNumber)
+
+    simulation.RunSimulation(resumeTime=timeElapsed)
+    return measureFunction(simulation)
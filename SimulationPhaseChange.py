@@ -1,7 +1,13 @@
 from AbstractSimulation import AbstractSimulationClass, np, pd, deepcopy, const
 from SumEMFields import EMFieldClass
 from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
 from ParticleBunchClass import ParticleBunch
+from EulerCromerIntegrator import EulerCromerIntegratorClass
+from DirectSumFieldSolver import DirectSumFieldSolverClass
+import CompiledKernels
+import ColumnarResults
+from concurrent.futures import ProcessPoolExecutor
 
 class SimulationPhaseChangeClass(AbstractSimulationClass):
     """ Class that compares the result of altering the phase of accelerating electric fields in a cyclotron.
@@ -23,11 +29,26 @@ class SimulationPhaseChangeClass(AbstractSimulationClass):
                 outside of the accelerating electric field
             smallTimeStep (float): The shorter timestep that is used when on average, the
                 bunch is inside of the accelerating electric field.
+            integrator (object: AbstractIntegratorClass): Method used to move the particles each timestep.
+            timestepController (object: TimestepControllerClass): Chooses each timestep from the state
+                of the bunch. If None, the simulation chooses its timesteps as before.
+            exactGyration (object: ExactGyrationClass): Moves the bunch along exact helices while it is
+                only acted on by static uniform magnetic fields. If None, the integrator is always used.
+            recordingInterval (float): Longest time between recordings of the bunch during a jump along
+                exact helices. If None, a jump may last until the end of the simulation.
+            numberOfWorkers (int): Number of processes that the simulations of different phase shifts are
+                spread across. If 1, the simulations are run one after another in this process.
+            batchPhases (bool): If True, the simulations of every phase shift are run at the same time,
+                with the phase shift as the leading dimension of the arrays of the bunch.
+            resampler (object: MacroParticleResamplerClass): Splits and merges the macro-particles of the
+                bunch as it changes shape. Each simulation starts from the particles of the first.
     """
 
     def __init__(self, listOfPhaseChangingFields=[ElectricExternalFieldClass], phaseResolution:int=50
     , totalEMField=EMFieldClass, particleBunch=ParticleBunch, duration=0.1, largeTimestep=1e-3
-    , smallTimestep=1e-8):
+    , smallTimestep=1e-8, integrator=None
+    , timestepController=None, exactGyration=None, recordingInterval=None, numberOfWorkers:int=1
+    , batchPhases:bool=False, resampler=None, pushMethod:str=None):
         """ Constructor for the SimulationPhaseChangeClass class.
                 Inherits the __init__ from AbstractSimulationClass.
             
@@ -45,111 +66,327 @@ class SimulationPhaseChangeClass(AbstractSimulationClass):
                     outside of the accelerating electric field
                 smallTimeStep (float): The shorter timestep that is used when on average, the
                     bunch is inside of the accelerating electric field.
+                integrator (object: AbstractIntegratorClass): Method used to move the particles each
+                    timestep. If None, the Euler Cromer method is used.
+                timestepController (object: TimestepControllerClass): Chooses each timestep from the
+                    state of the bunch. If None, the simulation chooses its timesteps as before.
+                exactGyration (object: ExactGyrationClass): Moves the bunch along exact helices while it
+                    is only acted on by static uniform magnetic fields. If None, the integrator is always used.
+                recordingInterval (float): Longest time between recordings of the bunch during a jump
+                    along exact helices. If None, a jump may last until the end of the simulation.
+                numberOfWorkers (int): Number of processes that the simulations of different phase shifts
+                    are spread across. If 1, the simulations are run one after another in this process.
+                batchPhases (bool): If True, the simulations of every phase shift are run at the same
+                    time, with the phase shift as the leading dimension of the arrays of the bunch.
+                    Takes priority over numberOfWorkers.
+                resampler (object: MacroParticleResamplerClass): Splits and merges the macro-particles of
+                    the bunch every stepInterval steps of each simulation. Can not be used with batchPhases.
+                    If None, the particles of the bunch are never changed.
+                pushMethod (string): Deprecated name of the integrator from before integrators could be
+                    chosen, kept so that older scripts run. 'Cromer' is the same as an
+                    EulerCromerIntegratorClass and 'Boris' is the same as a BorisIntegratorClass.
         """
         super().__init__(totalEMField=totalEMField, particleBunch=particleBunch, duration=duration
-        , largeTimestep=largeTimestep, smallTimestep=smallTimestep)
+        , largeTimestep=largeTimestep, smallTimestep=smallTimestep, integrator=integrator
+        , timestepController=timestepController, exactGyration=exactGyration
+        , recordingInterval=recordingInterval, resampler=resampler, pushMethod=pushMethod)
         self.listOfPhaseChangingFields = listOfPhaseChangingFields
         self.phaseResolution = phaseResolution
         self.simulationFinalSpread = [] # y axis data
         self.simulationPhaseShift = [] # x axis data
+        self.numberOfWorkers = numberOfWorkers
+        self.batchPhases = batchPhases
 
     def RunSimulation(self):
         """Method that runs the series of simulations that determine the impact of altering phase shift.
+                If numberOfWorkers is more than 1, the simulations are spread across a pool of processes.
+                Each process is sent its own copy of the simulation, so it has its own fields and bunch,
+                and the results are gathered in order of phase shift. If batchPhases is True and
+                CanBatchPhases() is True, every simulation is instead run at the same time by
+                RunBatchedPhases(). Otherwise batchPhases is ignored.
 
             Paramaters:
                 initialListOfParticles (list): Deepcopy of the initial conditions of the first simulation,
                     so that these can be re-created for following simulations.
+                listOfResults (list): The final energy spread and phase shift of each simulation
+        """
+        isBatched = self.batchPhases and SimulationPhaseChangeClass.CanBatchPhases(self)
+        if self.batchPhases and not isBatched:
+            print("These simulations can not be batched, so they are run one after another")
+
+        if isBatched:
+            finalSpreads, phaseShifts = SimulationPhaseChangeClass.RunBatchedPhases(self)
+            self.simulationFinalSpread.extend(finalSpreads.tolist())
+            self.simulationPhaseShift.extend(phaseShifts.tolist())
+            print(self.phaseResolution, "simulations completed")
+
+            # the fields are left with the phase shift of the last simulation, as in a serial run
+            SimulationPhaseChangeClass.CreatePhaseShiftedFields(self, self.phaseResolution - 1)
+        elif self.numberOfWorkers > 1:
+            with ProcessPoolExecutor(max_workers=self.numberOfWorkers) as executor:
+                # map returns the results in the order of the phase shifts, not the order they finish in
+                listOfResults = executor.map(RunPhaseInWorker, [self] * self.phaseResolution
+                , range(self.phaseResolution))
+                for j, result in enumerate(listOfResults):
+                    self.simulationFinalSpread.append(result[0])
+                    self.simulationPhaseShift.append(result[1])
+                    print(j+1, "simulations completed")
+
+            # the fields are left with the phase shift of the last simulation, as in a serial run
+            SimulationPhaseChangeClass.CreatePhaseShiftedFields(self, self.phaseResolution - 1)
+        else:
+            #creates a copy of the initial state of the system
+            initialListOfParticles = deepcopy(self.particleBunch.listOfParticles)
+
+            # Runs a new simulation each time this for loop is iterated
+            for j in range(self.phaseResolution):
+                finalSpread, phaseShift = SimulationPhaseChangeClass.RunPhase(self, j)
+                self.simulationFinalSpread.append(finalSpread)
+                self.simulationPhaseShift.append(phaseShift)
+
+                # at the end of each simulation, the initial particle state is restored
+                self.particleBunch.listOfParticles = deepcopy(initialListOfParticles)
+                print(j+1, "simulations completed")
+
+        # at the end of all the simulations, the first value is added to the end.
+        # This ensures the radial graph forms a complete circle
+        self.simulationFinalSpread.append(deepcopy(self.simulationFinalSpread[0]))
+        self.simulationPhaseShift.append(deepcopy(self.simulationPhaseShift[0]+1.0))
+
+    def RunPhase(self, iterationOfSimulation:int):
+        """Method that runs the simulation of a single phase shift from the current state of the bunch.
+
+            Args:
+                iterationOfSimulation (int): The number of simulations that have been completed
+
+            Parameters:
                 timeElapsed (float): Time that has elapsed in the current simulation
                 timeStep (float): Either refers to smallTimeStep or largeTimeStep depending on the mean
                     x position of particles in the simulation.
                 acceleratingFieldDimensions (list): Dimensions of the first phase changing field.
+
+            Returns:
+                [finalSpread, phaseShift] (list): The standard deviation in the energy of particles at the
+                    end of the simulation, and the phase shift of the phase changing fields
         """
-        #creates a copy of the initial state of the system
-        initialListOfParticles = deepcopy(self.particleBunch.listOfParticles)
+        # shifts all phase shifted fields for the next simulation
+        SimulationPhaseChangeClass.CreatePhaseShiftedFields(self, iterationOfSimulation)
+
+        timeElapsed = 0.0
+        if self.timestepController is not None:
+            self.timestepController.Reset()
+        if self.resampler is not None:
+            self.resampler.Reset()
+
+        while timeElapsed < self.duration:
+            SimulationPhaseChangeClass.ResampleBunch(self)
 
-        # Runs a new simulation each time this for loop is iterated
-        for j in range(self.phaseResolution): 
+            # It is assumed that the acceleratingFieldDimensions is similar to the dimensions 
+            # of other accelerating electric fields.
+            # If these dimensions differ greatly, the time-steps of the simulation will not be
+            # adjusted accurately.
+            acceleratingFieldDimensions = self.listOfPhaseChangingFields[0].listOfDimensions[0]
+            timestep = SimulationPhaseChangeClass.FindTimestep(self, timeElapsed, acceleratingFieldDimensions)
+               
+            # update the mean energy and std. dev. in energy of the bunch with the current values
+            self.particleBunch.UpdateBunchMeanEnergy(), self.particleBunch.UpdateBunchEnergySpread()
+
+            # move the particles forward with the integrator of the simulation, which may need to
+            # shorten the timestep to stop particles moving faster than the speed of light
+            timestep, numberOfTimesBreakIsPrevented = SimulationPhaseChangeClass.UpdateBunch(self, timeElapsed, timestep)
             
-            # shifts all phase shifted fields for the next simulation
-            SimulationPhaseChangeClass.CreatePhaseShiftedFields(self, j)
+            # if the timestep needed to be made 1e5 times smaller in order to move the simulation
+            # forward another timestep, then the simulation should stop and save instead of generating
+            # corrupted data.
+            if numberOfTimesBreakIsPrevented == 5:
+                print("The simulation was halted after %s secs as relativistic effects began to break down."
+                %(timeElapsed))
+                break
+            timeElapsed += timestep
 
-            timeElapsed = 0.0
-    
-            while timeElapsed < self.duration:
-                timestep = self.largeTimestep
-
-                # this simulation accelerates a bunch of particles about the x-z plane, starting at
-                # 0.0, 0.0, 0.0 . As a result, the x position of the bunch is useful at informing 
-                # where accelerating electric fields will be.
-                meanXPosition = (sum([self.particleBunch.listOfParticles[i].position[0] 
-                for i in range(self.particleBunch.numberOfParticles)]) 
-                / float(self.particleBunch.numberOfParticles))
-
-                # It is assumed that the acceleratingFieldDimensions is similar to the dimensions 
-                # of other accelerating electric fields.
-                # If these dimensions differ greatly, the time-steps of the simulation will not be
-                # adjusted accurately.
-                acceleratingFieldDimensions = self.listOfPhaseChangingFields[0].listOfDimensions[0]
-                
-                # if the particles are inside of the accelerating field, the simulation runs slower
-                if (meanXPosition < acceleratingFieldDimensions[1] and 
-                meanXPosition > acceleratingFieldDimensions[0]):
-                    timestep = self.smallTimestep
-                   
-                # give all particles correct acceleration by determining the total electric
-                # and magnetic fields that act on the particles
-                self.totalEMField.GiveAcceleration(self.particleBunch, timeElapsed)
-                # update the mean energy and std. dev. in energy of the bunch with the current values
-                self.particleBunch.UpdateBunchMeanEnergy(), self.particleBunch.UpdateBunchEnergySpread()
-
-                # the following prevents a timestep that is too large causing a particle to move faster than the
-                # speed of light
-                # therefore, this check comes after updating acceleration but before applying the euler cromer
-                # method
-                numberOfTimesBreakIsPrevented = 0
-
-                while True:
-
-                    testIfVelocityTooHigh = (self.particleBunch.FindBunchMeanVelocity() 
-                    + self.particleBunch.FindBunchMeanAcceleration() * timestep)
-
-                    # if the velocity is lower than the speed of light, continue
-                    if np.linalg.norm(testIfVelocityTooHigh) < const.speed_of_light:
-                        break
-
-                    else:
-                        # make the timestep 10 times smaller and try again
-                        timestep = 0.1 * timestep
-                        numberOfTimesBreakIsPrevented += 1
-
-                # apply the euler cromer method to update the velocity and position of all particles                
-                for i in range(self.particleBunch.numberOfParticles):
-                    self.particleBunch.listOfParticles[i].UpdateCromer(timestep)
-                
-                # if the timestep needed to be made 1e5 times smaller in order to move the simulation
-                # forward another timestep, then the simulation should stop and save instead of generating
-                # corrupted data.
-                if numberOfTimesBreakIsPrevented == 5:
-                    print("The simulation was halted after %s secs as relativistic effects began to break down."
-                    %(timeElapsed))
+        # save the final energy spread of the bunch and the phase shift of the first alternating
+        # electromagnetic field. All phase changing fields have the same phase shift in any simulation
+        return [deepcopy(self.particleBunch.bunchEnergySpread)
+        , deepcopy(self.listOfPhaseChangingFields[0].phaseShift)]
+        
+    def CanBatchPhases(self):
+        """ Method that returns whether RunBatchedPhases() moves the bunch in the same way as RunPhase().
+                Only the simulations that RunPhase() runs with its default choices can be batched: the
+                Euler Cromer integrator, the timesteps chosen from the mean x position of the bunch,
+                no exact gyration or resampler, the direct sum of the fields between particles, the
+                particles of the bunch of the simulation as the source of those fields, and external
+                fields that are plain ElectricExternalFieldClass and MagneticExternalFieldClass fields.
+                Fields such as MagneticSynchrotronFieldClass follow the state of a bunch that is not
+                one of the batched copies, so they are not batched.
+
+            Returns:
+                canBatch (bool): True if the phases can be batched
+        """
+        return (type(self.integrator) is EulerCromerIntegratorClass and self.timestepController is None
+        and self.exactGyration is None and isinstance(self.totalEMField.fieldSolver, DirectSumFieldSolverClass)
+        and self.totalEMField.bunchOfParticles is self.particleBunch and self.resampler is None
+        and all(type(i) is ElectricExternalFieldClass for i in self.totalEMField.listOfElectricFields)
+        and all(type(i) is MagneticExternalFieldClass for i in self.totalEMField.listOfMagneticFields))
+
+    def RunBatchedPhases(self):
+        """ Method that runs the simulations of every phase shift at the same time. The bunch of each
+                simulation is a copy of the initial bunch, stacked along the leading dimension of the
+                P x N x 3 arrays of positions, velocities and accelerations, so the external fields,
+                the fields between particles and the Euler Cromer update are found for every phase
+                shift in one vectorized step. Each simulation keeps its own time and timestep, chosen
+                in the same way as in RunPhase(), and stops moving once it reaches the duration.
+
+                Only the simulations that RunPhase() runs with its default choices can be batched, as
+                checked by CanBatchPhases(). Each particle counts as its weight in the mean positions,
+                velocities and accelerations and in the energy spread, as in FindBunchStatistics().
+
+            Raises:
+                ValueError: If the phases can not be batched
+
+            Parameters:
+                timesElapsed (ndarray): Time that has elapsed in each simulation
+                isRunning (ndarray): True for each simulation that is still being moved
+                running (ndarray): Indices of the simulations that are moved in this step
+                timesteps (ndarray): Timestep of each running simulation
+
+            Returns:
+                [finalSpreads, phaseShifts] (list): Arrays of the standard deviation in the energy of
+                    particles at the end of each simulation, and of the phase shift of each simulation
+        """
+        if not SimulationPhaseChangeClass.CanBatchPhases(self):
+            raise ValueError("Batched phases need the Euler Cromer integrator, no timestep controller, exact "
+            "gyration or resampler, the direct sum field solver, the bunch of the simulation as the source "
+            "of the fields, and plain electric and magnetic external fields")
+
+        inverseOfResolution = 1 / self.phaseResolution
+        phaseShifts = np.round(inverseOfResolution + inverseOfResolution * np.arange(self.phaseResolution)
+        , decimals = 5)
+        numberOfPhases = self.phaseResolution
+        arrayOfPositions = np.repeat(self.particleBunch.arrayOfPositions[np.newaxis], numberOfPhases, axis=0)
+        arrayOfVelocities = np.repeat(self.particleBunch.arrayOfVelocities[np.newaxis], numberOfPhases, axis=0)
+        arrayOfAccelerations = np.repeat(self.particleBunch.arrayOfAccelerations[np.newaxis], numberOfPhases
+        , axis=0)
+        arrayOfCharges = self.particleBunch.arrayOfCharges
+        arrayOfSourceCharges = self.particleBunch.FindSourceCharges()
+        arrayOfRestMasses = self.particleBunch.arrayOfRestMasses
+        arrayOfWeights = self.particleBunch.arrayOfWeights
+
+        timesElapsed = np.zeros(numberOfPhases)
+        finalSpreads = np.full(numberOfPhases, self.particleBunch.bunchEnergySpread, dtype=float)
+        isRunning = timesElapsed < self.duration
+        acceleratingFieldDimensions = self.listOfPhaseChangingFields[0].listOfDimensions[0]
+
+        while np.any(isRunning):
+            running = np.flatnonzero(isRunning)
+            positions = arrayOfPositions[running]
+            velocities = arrayOfVelocities[running]
+            accelerations = arrayOfAccelerations[running]
+
+            # the timestep of each simulation is chosen from the mean x position of its bunch
+            meanXPositions = np.average(positions[:, :, 0], axis=1, weights=arrayOfWeights)
+            timesteps = np.where((meanXPositions < acceleratingFieldDimensions[1])
+            & (meanXPositions > acceleratingFieldDimensions[0]), self.smallTimestep, self.largeTimestep)
+
+            # the energy spread is found before the bunch is moved, as in RunPhase()
+            totalEnergies = SimulationPhaseChangeClass.FindBatchedEnergies(self, velocities)
+            meanEnergies = np.average(totalEnergies, axis=1, weights=arrayOfWeights)
+            finalSpreads[running] = np.sqrt(np.average((totalEnergies - meanEnergies[:, np.newaxis]) ** 2
+            , axis=1, weights=arrayOfWeights))
+
+            # the fields between particles and the external fields acting on every particle
+            sumE, sumB = self.totalEMField.fieldSolver.GenerateBatchedFields(positions, velocities
+            , arrayOfSourceCharges)
+            externalFields = SimulationPhaseChangeClass.FindBatchedExternalFields(self, positions
+            , timesElapsed[running], phaseShifts[running])
+            sumE += externalFields[0]
+            sumB += externalFields[1]
+
+            # the N x 3 Lorentz acceleration kernel acts on all of the simulations flattened together
+            numberOfRunning, numberOfParticles = positions.shape[:2]
+            flatAccelerations = np.empty((numberOfRunning * numberOfParticles, 3))
+            CompiledKernels.LorentzAccelerationKernel(velocities.reshape(-1, 3)
+            , np.tile(arrayOfCharges, numberOfRunning), np.tile(arrayOfRestMasses, numberOfRunning)
+            , sumE.reshape(-1, 3), sumB.reshape(-1, 3), flatAccelerations)
+            accelerations = flatAccelerations.reshape(numberOfRunning, numberOfParticles, 3)
+
+            # the timestep of any simulation whose mean velocity would reach the speed of light is made
+            # 10 times smaller until it does not, as in EulerCromerIntegratorClass.Step()
+            numberOfTimesBreakIsPrevented = np.zeros(numberOfRunning, dtype=int)
+            meanVelocities = np.average(velocities, axis=1, weights=arrayOfWeights)
+            meanAccelerations = np.average(accelerations, axis=1, weights=arrayOfWeights)
+            while True:
+                isTooFast = (np.linalg.norm(meanVelocities + meanAccelerations * timesteps[:, np.newaxis], axis=1)
+                >= const.speed_of_light)
+                if not np.any(isTooFast):
                     break
-                timeElapsed += timestep
+                timesteps = np.where(isTooFast, 0.1 * timesteps, timesteps)
+                numberOfTimesBreakIsPrevented += isTooFast
 
-            # save the final energy spread of the bunch
-            self.simulationFinalSpread.append(deepcopy(self.particleBunch.bunchEnergySpread))
-            # save the phase shift of the first alternating electromagnetic field
-            # all phase changing fields have the same phase shift in any simulation
-            self.simulationPhaseShift.append(deepcopy(self.listOfPhaseChangingFields[0].phaseShift))
+            # the euler cromer method updates the velocity and position of every particle
+            velocities += accelerations * timesteps[:, np.newaxis, np.newaxis]
+            positions += velocities * timesteps[:, np.newaxis, np.newaxis]
+            arrayOfPositions[running] = positions
+            arrayOfVelocities[running] = velocities
+            arrayOfAccelerations[running] = accelerations
 
-            # at the end of each simulation, the initial particle state is restored
-            self.particleBunch.listOfParticles = deepcopy(initialListOfParticles)
-            print(j+1, "simulations completed")
+            # a simulation whose timestep needed to be made 1e5 times smaller is halted, as in RunPhase()
+            isHalted = numberOfTimesBreakIsPrevented == 5
+            for i in running[isHalted]:
+                print("The simulation was halted after %s secs as relativistic effects began to break down."
+                %(timesElapsed[i]))
+            timesElapsed[running] += np.where(isHalted, 0.0, timesteps)
+            isRunning[running] = ~isHalted & (timesElapsed[running] < self.duration)
+
+        return [finalSpreads, phaseShifts]
+
+    def FindBatchedExternalFields(self, arrayOfPositions, timesElapsed, phaseShifts):
+        """ Method that returns the external electric and magnetic fields acting on every particle of
+                several simulations, which each have their own time and phase shift.
+
+            Args:
+                arrayOfPositions (ndarray): P x N x 3 array of the positions of the particles
+                timesElapsed (ndarray): Time that has elapsed in each of the P simulations
+                phaseShifts (ndarray): Phase shift of the phase changing fields in each simulation
+
+            Parameters:
+                fieldPhaseShifts (ndarray): Phase shift of a field in each simulation
+                cosineFactors (ndarray): The value of the cosine function of a field in each simulation
+
+            Returns:
+                [sumE, sumB] (list): P x N x 3 arrays of the external electric and magnetic fields
+        """
+        listOfSums = []
+        for listOfFields in [self.totalEMField.listOfElectricFields, self.totalEMField.listOfMagneticFields]:
+            fieldSum = np.zeros(arrayOfPositions.shape)
+            for field in listOfFields:
+                # the phase changing fields take the phase shift of each simulation
+                fieldPhaseShifts = np.full(len(timesElapsed), field.phaseShift, dtype=float)
+                if any(field is i for i in self.listOfPhaseChangingFields):
+                    fieldPhaseShifts = phaseShifts
+                cosineFactors = np.cos(field.angularFrequency * timesElapsed + fieldPhaseShifts * 2 * np.pi)
+                fieldSum += cosineFactors[:, np.newaxis, np.newaxis] * (field.IsPositionInField(arrayOfPositions)
+                [..., np.newaxis] * field.fieldStrength)
+            listOfSums.append(fieldSum)
+
+        return listOfSums
+
+    def FindBatchedEnergies(self, arrayOfVelocities):
+        """ Method that returns the total energy of every particle of several simulations, found in the
+                same way as Particle.TotalEnergy().
+
+            Args:
+                arrayOfVelocities (ndarray): P x N x 3 array of the velocities of the particles
+
+            Returns:
+                totalEnergies (ndarray): P x N array of the total energy of each particle
+        """
+        restMasses = self.particleBunch.arrayOfRestMasses
+        betaVelocities = np.linalg.norm(arrayOfVelocities, axis=-1) / const.speed_of_light
+        lorentzFactors = 1 / np.abs(1 - betaVelocities * betaVelocities)**0.5
+        restEnergies = restMasses * const.speed_of_light * const.speed_of_light
+        momenta = lorentzFactors * np.linalg.norm(arrayOfVelocities, axis=-1) * restMasses
+        return np.sqrt(restEnergies ** 2 + (momenta * const.speed_of_light) ** 2)
 
-        # at the end of all the simulations, the first value is added to the end.
-        # This ensures the radial graph forms a complete circle
-        self.simulationFinalSpread.append(deepcopy(self.simulationFinalSpread[0]))
-        self.simulationPhaseShift.append(deepcopy(self.simulationPhaseShift[0]+1.0))
-        
     def CreatePhaseShiftedFields(self, iterationOfSimulation:int):
         """ Method to shift the phase of fields in listOfPhaseChangingFields
 
@@ -165,11 +402,13 @@ class SimulationPhaseChangeClass(AbstractSimulationClass):
         for i in self.listOfPhaseChangingFields:
             i.phaseShift = np.round(inverseOfResolution + inverseOfResolution * iterationOfSimulation, decimals = 5)
     
-    def SaveSimulation(self, fileName):
-        """ Method to save the simulation data to a .pkl file as a pandas dataframe
+    def SaveSimulation(self, fileName, fileFormat:str='pickle'):
+        """ Method to save the simulation data to a .pkl file as a pandas dataframe, or to a directory
+                in the columnar format
 
             Args:
-                fileName (string): Name of the saved data file
+                fileName (string): Name of the saved data file, or of the directory of the columnar format
+                fileFormat (string): 'pickle' or 'columnar'
             
             Parameters:
                 dictionary (dictionary): Dictionary that contains phase shift data and the final standard deviation
@@ -177,6 +416,23 @@ class SimulationPhaseChangeClass(AbstractSimulationClass):
                 dataFrame (pandas dataframe): Dataframe of dictionary
         """
         dictionary = {'Phase':self.simulationPhaseShift, 'FinalSpread':self.simulationFinalSpread}
+        if fileFormat == 'columnar':
+            ColumnarResults.WriteColumnarResults(fileName, dictionary, type(self).__name__)
+            return
 
         dataFrame = pd.DataFrame(dictionary)
-        dataFrame.to_pickle("%s.pkl"%(fileName))
\ No newline at end of file
+        dataFrame.to_pickle("%s.pkl"%(fileName))
+
+def RunPhaseInWorker(simulation, iterationOfSimulation:int):
+    """ Function that runs the simulation of a single phase shift in a worker process.
+            The simulation is unpickled in the worker, so its fields and bunch are copies that belong
+            to this simulation alone, and start from the initial state of the bunch.
+
+        Args:
+            simulation (object: SimulationPhaseChangeClass): Copy of the phase change simulation
+            iterationOfSimulation (int): The number of simulations that come before this one
+
+        Returns:
+            [finalSpread, phaseShift] (list): The final energy spread and phase shift of the simulation
+    """
+    return SimulationPhaseChangeClass.RunPhase(simulation, iterationOfSimulation)
\ No newline at end of file
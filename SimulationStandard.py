@@ -1,6 +1,8 @@
 from AbstractSimulation import AbstractSimulationClass, np, pd, deepcopy, const
 from SumEMFields import EMFieldClass
 from ParticleBunchClass import ParticleBunch
+import ColumnarResults
+import warnings
 
 
 
@@ -23,10 +25,29 @@ class SimulationStandardClass(AbstractSimulationClass):
                 outside of the accelerating electric field
             smallTimeStep (float): The shorter timestep that is used when on average, the
                 bunch is inside of the accelerating electric field.
+            integrator (object: AbstractIntegratorClass): Method used to move the particles each timestep.
+            timestepController (object: TimestepControllerClass): Chooses each timestep from the state
+                of the bunch. If None, the simulation chooses its timesteps as before.
+            exactGyration (object: ExactGyrationClass): Moves the bunch along exact helices while it is
+                only acted on by static uniform magnetic fields. If None, the integrator is always used.
+            recordingInterval (float): Longest time between recordings of the bunch during a jump along
+                exact helices. If None, a jump may last until the end of the simulation.
+            trajectoryRecorder (object: TrajectoryRecorderClass): Streams the history of the simulation
+                to files while it runs. If None, the history is kept in the lists of the simulation.
+            recordingPolicy (object: RecordingPolicyClass): Decides which steps are recorded in the
+                history of the simulation.
+            checkpointFile (string): File that the state of the simulation is saved to while it runs.
+                If None, no checkpoints are saved.
+            checkpointInterval (float): Wall clock time in seconds between checkpoints
+            resampler (object: MacroParticleResamplerClass): Splits and merges the macro-particles of the
+                bunch as it changes shape. Can not be used with a trajectory recorder, which needs a
+                fixed number of particles.
     """
 
     def __init__(self, totalEMField=EMFieldClass, particleBunch=ParticleBunch, duration=1.0
-    , largeTimestep=1e-3, smallTimestep=1e-8):
+    , largeTimestep=1e-3, smallTimestep=1e-8, integrator=None
+    , timestepController=None, exactGyration=None, recordingInterval=None, trajectoryRecorder=None
+    , recordingPolicy=None, checkpointFile:str=None, checkpointInterval:float=600.0, resampler=None, pushMethod:str=None):
         """ Constructor for the SimulationStandardClass class.
                 Inherits the __init__ from AbstractSimulationClass.
             
@@ -40,85 +61,121 @@ class SimulationStandardClass(AbstractSimulationClass):
                     outside of the accelerating electric field
                 smallTimeStep (float): The shorter timestep that is used when on average, the
                     bunch is inside of the accelerating electric field.
+                integrator (object: AbstractIntegratorClass): Method used to move the particles each
+                    timestep. If None, the Euler Cromer method is used.
+                timestepController (object: TimestepControllerClass): Chooses each timestep from the
+                    state of the bunch. If None, the simulation chooses its timesteps as before.
+                exactGyration (object: ExactGyrationClass): Moves the bunch along exact helices while it
+                    is only acted on by static uniform magnetic fields. If None, the integrator is always used.
+                recordingInterval (float): Longest time between recordings of the bunch during a jump
+                    along exact helices. If None, a jump may last until the end of the simulation.
+                trajectoryRecorder (object: TrajectoryRecorderClass): Streams the history of the
+                    simulation to files while it runs, so the memory used does not grow with the
+                    duration. If None, the state of every particle is copied into simulationState.
+                recordingPolicy (object: RecordingPolicyClass): Decides which steps are recorded in the
+                    history of the simulation. If None, every step is recorded.
+                checkpointFile (string): File that the state of the simulation is saved to while it runs,
+                    so that it can be resumed with ResumeSimulation(). If None, no checkpoints are saved.
+                checkpointInterval (float): Wall clock time in seconds between checkpoints
+                resampler (object: MacroParticleResamplerClass): Splits and merges the macro-particles of
+                    the bunch every stepInterval steps. If None, the particles of the bunch are never changed.
+                pushMethod (string): Deprecated name of the integrator from before integrators could be
+                    chosen, kept so that older scripts run. 'Cromer' is the same as an
+                    EulerCromerIntegratorClass and 'Boris' is the same as a BorisIntegratorClass.
         """
         super().__init__(totalEMField=totalEMField, particleBunch=particleBunch, duration=duration
-        , largeTimestep=largeTimestep, smallTimestep=smallTimestep)
+        , largeTimestep=largeTimestep, smallTimestep=smallTimestep, integrator=integrator
+        , timestepController=timestepController, exactGyration=exactGyration
+        , recordingInterval=recordingInterval, recordingPolicy=recordingPolicy
+        , checkpointFile=checkpointFile, checkpointInterval=checkpointInterval, resampler=resampler
+        , pushMethod=pushMethod)
         
         self.simulationState = [] # position, velocity, acceleration data
         self.simulationEnergy = [] # mean of enery of particles in simulation
         self.simulationSpread = [] # std deviation of energy of particles in simulation
         self.simulationTime = [] # time of simulation (x axis)
+        self.trajectoryRecorder = trajectoryRecorder
 
-    def RunSimulation(self):
-        """Method that runs the standard simulation.
+    def RunSimulation(self, resumeTime=None, stopTime=None):
+        """Method that runs the standard simulation. If the simulation has a checkpointFile, its
+                state is saved every checkpointInterval seconds at the start of a step.
+
+            Args:
+                resumeTime (float): Time that had elapsed when the simulation was saved to a checkpoint,
+                    from which it continues. If None, the simulation starts from the beginning.
+                stopTime (float): Time at which the simulation is paused before the end of its duration,
+                    at the start of the first step at or after stopTime, so that it can be checkpointed
+                    and continued. The trajectory recorder is not closed. If None, the simulation runs
+                    until the end of its duration.
 
             Paramaters:
                 timeElapsed (float): Time that has elapsed in the current simulation
                 timeStep (float): Either refers to smallTimeStep or largeTimeStep depending on the mean
                     x position of particles in the simulation.
                 acceleratingFieldDimensions (list): Dimensions of the first phase changing field.
-                testIfVelocityTooHigh (ndarray): numpy array that holds the expected value for the
-                    updated velocity if the current timestep is used
                 numberOfTimesBreakIsPrevented (int): The number of times that the emergency shortended 
                     timestep was used in a row to prevent a crash
+
+            Raises:
+                ValueError: If the simulation has both a resampler and a trajectory recorder
+
+            Returns:
+                timeElapsed (float): Time that has elapsed when the simulation ends or is paused
         """
-        timeElapsed = 0.0
-    
+        if self.resampler is not None and self.trajectoryRecorder is not None:
+            raise ValueError("A trajectory recorder needs a fixed number of particles, so can not be used with a "
+            "resampler")
+
+        if resumeTime is None:
+            timeElapsed = 0.0
+            if self.timestepController is not None:
+                self.timestepController.Reset()
+            if self.resampler is not None:
+                self.resampler.Reset()
+            self.recordingPolicy.Reset()
+        else:
+            # the rest of the state of the simulation was restored from the checkpoint
+            timeElapsed = resumeTime
+            if self.trajectoryRecorder is not None:
+                self.trajectoryRecorder.Restore()
+        self.lastCheckpointTime = None
+
         while timeElapsed < self.duration:
-            timestep = self.largeTimestep
-            
-            # this simulation accelerates a bunch of particles about the x-z plane, starting at
-            # 0.0, 0.0, 0.0 . As a result, the x position of the bunch is useful at informing 
-            # where accelerating electric fields will be.
-            meanXPosition = (sum([self.particleBunch.listOfParticles[i].position[0] 
-            for i in range(self.particleBunch.numberOfParticles)]) 
-            / float(self.particleBunch.numberOfParticles))
+            if stopTime is not None and timeElapsed >= stopTime:
+                return timeElapsed
+            if SimulationStandardClass.IsCheckpointDue(self):
+                SimulationStandardClass.SaveCheckpoint(self, timeElapsed)
+
+            # the macro-particles are split and merged before the step is recorded
+            SimulationStandardClass.ResampleBunch(self)
 
             # It is assumed that the acceleratingFieldDimensions is similar to the dimensions 
             # of other accelerating electric fields.
             # If these dimensions differ greatly, the time-steps of the simulation will not be
             # adjusted accurately.
             acceleratingFieldDimensions = self.totalEMField.listOfElectricFields[0].listOfDimensions[0]
+            timestep = SimulationStandardClass.FindTimestep(self, timeElapsed, acceleratingFieldDimensions)
+
+            # the recording policy decides whether this step is saved in the history
+            isRecording = SimulationStandardClass.IsRecordingStep(self, timeElapsed, timestep)
+            if isRecording and self.trajectoryRecorder is not None:
+                # the state of the bunch is streamed to files in chunks
+                self.trajectoryRecorder.Record(timeElapsed, self.particleBunch)
+                # the records already written are kept, so only the recording intervals are doubled
+                SimulationStandardClass.CountRecord(self)
+            elif isRecording:
+                self.simulationTime.append(deepcopy(timeElapsed)) # save elapsed time
+                self.simulationState.append(deepcopy(self.particleBunch.listOfParticles)) # save state of all particles
+                self.simulationEnergy.append(deepcopy(self.particleBunch.bunchMeanEnergy)) # save mean energy of bunch
+                self.simulationSpread.append(deepcopy(self.particleBunch.bunchEnergySpread)) # save std. dev. in energy of bunch
+                SimulationStandardClass.CountRecord(self)
             
-            # if the particles are inside of the accelerating field, the simulation runs slower
-            if (meanXPosition < acceleratingFieldDimensions[1] and 
-                meanXPosition > acceleratingFieldDimensions[0]):
-                    timestep = self.smallTimestep
-
-            self.simulationTime.append(deepcopy(timeElapsed)) # save elapsed time
-            self.simulationState.append(deepcopy(self.particleBunch.listOfParticles)) # save state of all particles
-            self.simulationEnergy.append(deepcopy(self.particleBunch.bunchMeanEnergy)) # save mean energy of bunch
-            self.simulationSpread.append(deepcopy(self.particleBunch.bunchEnergySpread)) # save std. dev. in energy of bunch
-            
-            # give all particles correct acceleration by determining the total electric
-            # and magnetic fields that act on the particles
-            self.totalEMField.GiveAcceleration(self.particleBunch, timeElapsed)
             # update the mean energy and std. dev. in energy of the bunch with the current values
             self.particleBunch.UpdateBunchMeanEnergy(), self.particleBunch.UpdateBunchEnergySpread()
 
-            # the following prevents a timestep that is too large causing a particle to move faster than the
-            # speed of light
-            # therefore, this check comes after updating acceleration but before applying the euler cromer
-            # method
-            numberOfTimesBreakIsPrevented = 0
-
-            while True:
-
-                testIfVelocityTooHigh = (self.particleBunch.FindBunchMeanVelocity() 
-                + self.particleBunch.FindBunchMeanAcceleration() * timestep)
-
-                # if the velocity is lower than the speed of light, continue
-                if np.linalg.norm(testIfVelocityTooHigh) < const.speed_of_light:
-                    break
-
-                else:
-                    # make the timestep 10 times smaller and try again
-                    timestep = 0.1 * timestep
-                    numberOfTimesBreakIsPrevented += 1
-
-            # apply the euler cromer method to update the velocity and position of all particles                
-            for i in range(self.particleBunch.numberOfParticles):
-                self.particleBunch.listOfParticles[i].UpdateCromer(timestep)
+            # move the particles forward with the integrator of the simulation, which may need to
+            # shorten the timestep to stop particles moving faster than the speed of light
+            timestep, numberOfTimesBreakIsPrevented = SimulationStandardClass.UpdateBunch(self, timeElapsed, timestep)
             
             # if the timestep needed to be made 1e5 times smaller in order to move the simulation
             # forward another timestep, then the simulation should stop and save instead of generating
@@ -130,11 +187,30 @@ class SimulationStandardClass(AbstractSimulationClass):
             
             timeElapsed += timestep
 
-    def SaveSimulation(self, fileName):
-        """ Method to save the simulation data to a .pkl file as a pandas dataframe
+        # the last records held in memory by the recorder are written
+        if self.trajectoryRecorder is not None:
+            self.trajectoryRecorder.Close()
+        return timeElapsed
+
+    def FindListOfHistories(self):
+        """ Method that returns the lists that make up the history of the simulation.
+
+            Returns:
+                listOfHistories (list): The lists of the time, state, mean energy and energy spread
+        """
+        return [self.simulationTime, self.simulationState, self.simulationEnergy, self.simulationSpread]
+
+    def SaveSimulation(self, fileName, fileFormat:str='pickle'):
+        """ Method to save the simulation data to a .pkl file as a pandas dataframe, or to a directory
+                in the columnar format. If the simulation has a trajectory recorder, its history has
+                already been written to the directory of the recorder in the columnar format, so the
+                recorder is closed and, with fileFormat 'columnar', the recording is copied to
+                fileName. A .pkl file would need the whole history in memory, so with fileFormat
+                'pickle' a warning is given and no file is saved.
 
             Args:
-                fileName (string): Name of the saved data file
+                fileName (string): Name of the saved data file, or of the directory of the columnar format
+                fileFormat (string): 'pickle' or 'columnar'
             
             Parameters:
                 dictionary (dictionary): Dictionary that contains data for the elapsed time, state
@@ -142,6 +218,24 @@ class SimulationStandardClass(AbstractSimulationClass):
                     of particle energy for each timestep in the simulation.
                 dataFrame (pandas dataframe): Dataframe of dictionary
         """
+        if self.trajectoryRecorder is not None:
+            self.trajectoryRecorder.Close()
+            if fileFormat == 'columnar':
+                self.trajectoryRecorder.SaveColumnarCopy(fileName, type(self).__name__)
+            else:
+                warnings.warn("The history of the simulation was streamed to %s in the columnar format, so "
+                "%s.pkl is not saved. Use fileFormat='columnar' to copy the recording to %s"%(
+                self.trajectoryRecorder.directoryName, fileName, fileName))
+            return
+
+        if fileFormat == 'columnar':
+            dictionaryOfColumns = {'Time':self.simulationTime, 'Energy':self.simulationEnergy
+            , 'Spread':self.simulationSpread}
+            dictionaryOfColumns.update(ColumnarResults.ConvertStatesToColumns(self.simulationState))
+            ColumnarResults.WriteColumnarResults(fileName, dictionaryOfColumns, type(self).__name__
+            , self.particleBunch.FindParticleNames())
+            return
+
         dictionary = {'Time':self.simulationTime, 'Simulation':self.simulationState
         , 'Energy':self.simulationEnergy, 'Spread':self.simulationSpread}
         
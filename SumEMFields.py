@@ -6,6 +6,8 @@ from PointMagneticField import PointMagneticFieldClass
 from ElectricExternalField import ElectricExternalFieldClass
 from MagneticExternalField import MagneticExternalFieldClass
 from ParticleBunchClass import ParticleBunch, Particle
+from DirectSumFieldSolver import DirectSumFieldSolverClass
+import CompiledKernels
 
 class EMFieldClass:
     """ Class that conatins the external and point-sourced EM fields and combines them to determine acceleration
@@ -15,11 +17,17 @@ class EMFieldClass:
                 field. 
             listOfElectricFields (list): List of the external electric fields in the simulation
             listOfMagneticFields (list): List of the external magnetic fields in the simulation
+            fieldSolver (object: AbstractFieldSolverClass): Method used to find the fields between the
+                particles of the bunch, such as DirectSumFieldSolverClass or BarnesHutFieldSolverClass
             name (string): Name of the collection of electromagnetic fields
+            interactionFieldsCache (list): The affected bunch, copies of the state arrays and the fields
+                between particles of the last solve that was kept, which the next solve for the same
+                state reuses once
     """
 
     def __init__(self, bunchOfParticles=ParticleBunch, listOfElectricFields=[ElectricExternalFieldClass]
-    , listOfMagneticFields=[MagneticExternalFieldClass], name='Collection of ElectroMagnetic Fields'):
+    , listOfMagneticFields=[MagneticExternalFieldClass], name='Collection of ElectroMagnetic Fields'
+    , fieldSolver=None):
         """ Constructor for the EMFieldClass class.
                 Args:
                     bunchOfParticles (object: ParticleBunch): The bunch of particles, where each Particle object produces an EM
@@ -27,11 +35,17 @@ class EMFieldClass:
                     listOfElectricFields (list): List of the external electric fields in the simulation
                     listOfMagneticFields (list): List of the external magnetic fields in the simulation
                     name (string): Name of the collection of electromagnetic fields
+                    fieldSolver (object: AbstractFieldSolverClass): Method used to find the fields between
+                        the particles of the bunch. The exact direct sum is used if no solver is given.
         """
         self.bunchOfParticles = bunchOfParticles
         self.listOfElectricFields = listOfElectricFields
         self.listOfMagneticFields = listOfMagneticFields
         self.name = name
+        if fieldSolver is None:
+            fieldSolver = DirectSumFieldSolverClass()
+        self.fieldSolver = fieldSolver
+        self.interactionFieldsCache = None
     
     def __repr__(self):
         return 'EM Field Collection: {0}, Constituent Fields: {1}'.format(
@@ -52,6 +66,8 @@ class EMFieldClass:
                     external fields.
                 sumB (ndarray): Stores the sum of the magnetic field from all other particles and any
                     external fields.
+                interactionMask (ndarray): 1 x N array that removes the field of the affected particle
+                    from the sum if the affected particle is part of the bunch.
             
             Returns:
                 [sumE, sumB] (list): List containing the total electric and magnetic fields that are affecting
@@ -59,24 +75,135 @@ class EMFieldClass:
         """
         # adds the external electric fields affecting the particle.
         sumE = sum([self.listOfElectricFields[i].GenerateField(timeElapsed, affectedParticle) 
-        for i in range(len(self.listOfElectricFields))])
+        for i in range(len(self.listOfElectricFields))], np.zeros(3, dtype=float))
 
         # adds the external magnetic fields affecting the particle
         sumB = sum([self.listOfMagneticFields[i].GenerateField(timeElapsed, affectedParticle) 
-        for i in range(len(self.listOfMagneticFields))])
+        for i in range(len(self.listOfMagneticFields))], np.zeros(3, dtype=float))
         
         # if the source particle of the point EM is not the affected particle by the EM field, the contributing
         # fields are added.
-        for k in range(len(self.bunchOfParticles.listOfParticles)):
+        interactionMask = np.ones((1, self.bunchOfParticles.numberOfParticles), dtype=bool)
+        if affectedParticle.arrayOfPositions is self.bunchOfParticles.arrayOfPositions:
+            interactionMask[0, affectedParticle.arrayIndex] = False
 
-            if affectedParticle != self.bunchOfParticles.listOfParticles[k]:
-                sumE += self.bunchOfParticles.listOfParticles[k].GenerateElectricField(affectedParticle)
-                sumB += self.bunchOfParticles.listOfParticles[k].GenerateMagneticField(affectedParticle)
-
-            else:
-                pass
+        sumE += PointElectricFieldClass.GenerateFieldFromArrays(self.bunchOfParticles.arrayOfPositions
+        , self.bunchOfParticles.FindSourceCharges(), np.array([affectedParticle.position])
+        , interactionMask=interactionMask)[0]
+        sumB += PointMagneticFieldClass.GenerateFieldFromArrays(self.bunchOfParticles.arrayOfPositions
+        , self.bunchOfParticles.arrayOfVelocities, self.bunchOfParticles.FindSourceCharges()
+        , np.array([affectedParticle.position]), interactionMask=interactionMask)[0]
         
         return [sumE, sumB]
+
+    def FindInteractionFields(self, particleBunch:ParticleBunch, isKept:bool=False):
+        """ Method to return the fields of the particles of bunchOfParticles at the position of every
+                particle of a bunch, found by the fieldSolver. A solve that is kept is reused once by
+                the next call if the positions, velocities and charges of the particles have not
+                changed, so a check of the fields before a step does not cost a second solve in the step.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles being affected by the
+                    fields between particles
+                isKept (bool): If True, the fields are kept for the next call
+
+            Parameters:
+                listOfStateArrays (list): The arrays of the state that the fields are found from
+
+            Returns:
+                [arrayOfElectricFields, arrayOfMagneticFields] (list): N x 3 arrays of the electric
+                    and magnetic field of the other particles at the position of each particle
+        """
+        listOfStateArrays = [self.bunchOfParticles.arrayOfPositions, self.bunchOfParticles.arrayOfVelocities
+        , self.bunchOfParticles.FindSourceCharges(), particleBunch.arrayOfPositions]
+        interactionFieldsCache = getattr(self, 'interactionFieldsCache', None)
+        self.interactionFieldsCache = None
+        if (interactionFieldsCache is not None and interactionFieldsCache[0] is particleBunch
+        and all(np.array_equal(i, j) for i, j in zip(interactionFieldsCache[1], listOfStateArrays))):
+            return interactionFieldsCache[2]
+
+        interactionFields = self.fieldSolver.GenerateBunchFields(self.bunchOfParticles, particleBunch)
+        if isKept:
+            self.interactionFieldsCache = [particleBunch, [i.copy() for i in listOfStateArrays], interactionFields]
+        return interactionFields
+
+    def SumOfEMFieldsForBunch(self, particleBunch:ParticleBunch, timeElapsed):
+        """ Method to add the contributions of electric and magnetic fields from external sources
+                and from the particles in the simulation for every particle of a bunch at once.
+                The fields between particles are found by the fieldSolver for the whole bunch.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles being affected by the
+                    electromagnetic fields.
+                timeElapsed (float): Time that has elapsed in the simulation
+
+            Returns:
+                [sumE, sumB] (list): List containing N x 3 arrays of the total electric and magnetic
+                    fields that are affecting each particle at timeElapsed in the simulation.
+        """
+        # the fields between particles are found by the field solver, and a particle does not
+        # interact with its own field
+        sumE, sumB = EMFieldClass.FindInteractionFields(self, particleBunch)
+
+        # adds the external electric and magnetic fields affecting each particle
+        externalFields = EMFieldClass.SumOfExternalFieldsForBunch(self, particleBunch, timeElapsed)
+
+        return [sumE + externalFields[0], sumB + externalFields[1]]
+
+    def SumOfExternalFieldsForBunch(self, particleBunch:ParticleBunch, timeElapsed, arrayOfIndices=None):
+        """ Method to add the contributions of the external electric and magnetic fields for every
+                particle of a bunch, without the fields between particles.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles being affected by the
+                    electromagnetic fields.
+                timeElapsed (float): Time that has elapsed in the simulation
+                arrayOfIndices (ndarray): Indices of the M particles of the bunch to find the fields
+                    for. If None, the fields are found for every particle.
+
+            Returns:
+                [sumE, sumB] (list): List containing N x 3 (or M x 3) arrays of the external electric
+                    and magnetic fields that are affecting each particle at timeElapsed in the simulation.
+        """
+        arrayOfPositions = particleBunch.arrayOfPositions
+        if arrayOfIndices is not None:
+            arrayOfPositions = arrayOfPositions[arrayOfIndices]
+        sumE = np.zeros((len(arrayOfPositions), 3))
+        sumB = np.zeros((len(arrayOfPositions), 3))
+
+        # each field is found at every position at once
+        for j in self.listOfElectricFields:
+            sumE += j.GenerateFieldAtPositions(timeElapsed, arrayOfPositions)
+        for j in self.listOfMagneticFields:
+            sumB += j.GenerateFieldAtPositions(timeElapsed, arrayOfPositions)
+
+        return [sumE, sumB]
+
+    def SumOfEMFieldsAtParticles(self, particleBunch:ParticleBunch, arrayOfIndices, timeElapsed):
+        """ Method to add the contributions of electric and magnetic fields from external sources
+                and from the particles in the simulation for some of the particles of a bunch.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles being affected by the
+                    electromagnetic fields.
+                arrayOfIndices (ndarray): Indices of the M particles of the bunch to find the fields for
+                timeElapsed (float): Time that has elapsed in the simulation
+
+            Returns:
+                [sumE, sumB] (list): List containing M x 3 arrays of the total electric and magnetic
+                    fields that are affecting each chosen particle at timeElapsed in the simulation.
+        """
+        if particleBunch is self.bunchOfParticles:
+            # a particle does not interact with its own field
+            sumE, sumB = self.fieldSolver.GenerateFieldsAtParticles(self.bunchOfParticles, arrayOfIndices)
+        else:
+            sumE, sumB = [i[arrayOfIndices] for i in
+            self.fieldSolver.GenerateBunchFields(self.bunchOfParticles, particleBunch)]
+
+        externalFields = EMFieldClass.SumOfExternalFieldsForBunch(self, particleBunch, timeElapsed
+        , arrayOfIndices=arrayOfIndices)
+
+        return [sumE + externalFields[0], sumB + externalFields[1]]
         
     def GiveAcceleration(self, particleBunch:ParticleBunch, timeElapsed):
         """ Method to update the acceleration of particles in the simulation from the total EM field
@@ -86,11 +213,15 @@ class EMFieldClass:
                 particleBunch (object: ParticleBunch): The bunch of particles that are iterated through
                     to accelerate them all.
                 timeElapsed (float): Time that has passed in the simulation so far
+
+            Parameters:
+                electromagneticFields (list): N x 3 arrays of the electric and magnetic fields acting
+                    on each particle
         """
+        electromagneticFields = EMFieldClass.SumOfEMFieldsForBunch(self, particleBunch, timeElapsed)
+
         # Lorentz Force acting on each particle, with a field with electric and magnetic components.
         # Force divided by relativistic mass results in acceleration of the particle
-        for i in particleBunch.listOfParticles:
-            i.acceleration = (np.divide((i.charge * EMFieldClass.SumOfEMFields(self, i, timeElapsed)[0]
-            + i.charge * np.cross(i.velocity, EMFieldClass.SumOfEMFields(self, i, timeElapsed)[1]))
-            , i.RelativisticMass()))
-        
\ No newline at end of file
+        CompiledKernels.LorentzAccelerationKernel(particleBunch.arrayOfVelocities, particleBunch.arrayOfCharges
+        , particleBunch.arrayOfRestMasses, electromagneticFields[0], electromagneticFields[1]
+        , particleBunch.arrayOfAccelerations)
@@ -0,0 +1,294 @@
+import numpy as np
+import pandas as pd
+import math
+import scipy.constants as const
+
+class TimestepControllerClass:
+    """ Class that chooses the timestep of a simulation from the state of the bunch. The timestep of
+            each particle is the shortest of the following limits, and the timestep of the
+            simulation is the shortest timestep of any particle:
+
+            'maximum': maximumTimestep
+            'gyration': a fraction of the cyclotron period of the particle in the external
+                magnetic fields
+            'oscillation': a fraction of the shortest period of the oscillating external fields
+            'region': the time taken for the particle to reach the nearest boundary of an external
+                field, so that particles land on the edge of a field instead of jumping over it
+            'error': the timestep that keeps the estimated error in velocity of the last timestep
+                within the tolerances. The error is estimated from the change in acceleration of
+                the particle between the last two timesteps.
+
+            The timestep is never shorter than minimumTimestep ('minimum'). Every timestep that is
+            taken is recorded with the limit that set it.
+
+        Class Attributes:
+            maximumTimestep (float): The longest timestep that is used
+            minimumTimestep (float): The shortest timestep that is used, which is also the timestep
+                used to cross the boundary of a field
+            relativeTolerance (float): Largest error in velocity allowed in a timestep, relative to
+                the speed of each particle
+            absoluteVelocityTolerance (float): Largest error in velocity allowed in a timestep for a
+                particle at rest
+            stepsPerPeriod (int): Number of timesteps in the shortest cyclotron or oscillation period
+            name (string): Name of the timestep controller
+            listOfTimes (list): Time at the start of each recorded timestep
+            listOfTimesteps (list): Recorded timesteps
+            listOfLimits (list): The limit that set each recorded timestep
+    """
+
+    def __init__(self, maximumTimestep=1e-3, minimumTimestep=1e-9, relativeTolerance=1e-3
+    , absoluteVelocityTolerance=1e-3, stepsPerPeriod:int=50, name='Timestep Controller'):
+        """ Constructor for the TimestepControllerClass class.
+
+            Args:
+                maximumTimestep (float): The longest timestep that is used
+                minimumTimestep (float): The shortest timestep that is used
+                relativeTolerance (float): Largest error in velocity allowed in a timestep, relative
+                    to the speed of each particle
+                absoluteVelocityTolerance (float): Largest error in velocity allowed in a timestep for
+                    a particle at rest
+                stepsPerPeriod (int): Number of timesteps in the shortest cyclotron or oscillation period
+                name (string): Name of the timestep controller
+        """
+        self.maximumTimestep = maximumTimestep
+        self.minimumTimestep = minimumTimestep
+        self.relativeTolerance = relativeTolerance
+        self.absoluteVelocityTolerance = absoluteVelocityTolerance
+        self.stepsPerPeriod = stepsPerPeriod
+        self.name = name
+        self.listOfTimes = []
+        self.listOfTimesteps = []
+        self.listOfLimits = []
+        TimestepControllerClass.Reset(self)
+
+    def __repr__(self):
+        return 'Timestep Controller: {0}, Maximum Timestep: {1}, Minimum Timestep: {2}'.format(
+            self.name, self.maximumTimestep, self.minimumTimestep)
+
+    def Reset(self):
+        """ Method that forgets the accelerations of the last timesteps, which must be done whenever
+                the bunch is moved to a new state, such as at the start of a simulation. The
+                recorded history is kept.
+        """
+        self.lastAccelerations = None # accelerations of the last timestep
+        self.previousAccelerations = None # accelerations of the timestep before the last
+        self.lastTimestep = None
+        self.lastLimit = None
+
+    def FindGyrationTimestep(self, particleBunch, arrayOfMagneticFields, arrayOfIndices=None):
+        """ Method that returns a fraction of the cyclotron period of each particle.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                arrayOfMagneticFields (ndarray): N x 3 (or M x 3) array of the magnetic field acting on
+                    each particle
+                arrayOfIndices (ndarray): Indices of the M particles to find the timestep of. If None,
+                    the timestep of every particle is found.
+
+            Parameters:
+                cyclotronFrequencies (ndarray): Angular frequency that each particle circles at,
+                    qB / (gamma m)
+
+            Returns:
+                Timesteps (ndarray): The cyclotron period of each particle divided by stepsPerPeriod,
+                    which is infinite for a particle outside of any magnetic field
+        """
+        if arrayOfIndices is None:
+            arrayOfIndices = slice(None)
+        cyclotronFrequencies = (np.abs(particleBunch.arrayOfCharges[arrayOfIndices])
+        * np.linalg.norm(arrayOfMagneticFields, axis=1)
+        / (particleBunch.FindLorentzFactors()[arrayOfIndices] * particleBunch.arrayOfRestMasses[arrayOfIndices]))
+
+        with np.errstate(divide='ignore'):
+            return 2 * const.pi / cyclotronFrequencies / self.stepsPerPeriod
+
+    def FindOscillationTimestep(self, totalEMField):
+        """ Method that returns a fraction of the shortest period of the oscillating external fields.
+
+            Args:
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+
+            Returns:
+                Timestep (float): The shortest period divided by stepsPerPeriod
+        """
+        angularFrequencies = [abs(i.angularFrequency) for i in
+        totalEMField.listOfElectricFields + totalEMField.listOfMagneticFields if i.angularFrequency != 0.0]
+        if len(angularFrequencies) == 0:
+            return math.inf
+
+        return 2 * const.pi / max(angularFrequencies) / self.stepsPerPeriod
+
+    def FindRegionTimestep(self, particleBunch, totalEMField, arrayOfAccelerations, arrayOfIndices=None):
+        """ Method that returns the shortest time for each particle to reach a boundary of an external
+                field along any dimension, moving with the size of its current velocity and
+                acceleration along that dimension.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                arrayOfAccelerations (ndarray): N x 3 (or M x 3) array of the acceleration of each particle
+                arrayOfIndices (ndarray): Indices of the M particles to find the timestep of. If None,
+                    the timestep of every particle is found.
+
+            Parameters:
+                distances (ndarray): Distance of each particle from a boundary
+                timesToBoundary (ndarray): Time for each particle to travel the distance, the
+                    positive root of d = v t + a t^2 / 2
+
+            Returns:
+                Timesteps (ndarray): The shortest time for each particle to reach a boundary
+        """
+        if arrayOfIndices is None:
+            arrayOfIndices = slice(None)
+        positions = particleBunch.arrayOfPositions[arrayOfIndices]
+        speeds = np.abs(particleBunch.arrayOfVelocities[arrayOfIndices])
+        accelerations = np.abs(arrayOfAccelerations)
+        regionTimesteps = np.full(len(positions), math.inf)
+
+        for field in totalEMField.listOfElectricFields + totalEMField.listOfMagneticFields:
+            for k in range(3):
+                for boundary in field.listOfDimensions[k]:
+                    if not np.isfinite(boundary):
+                        continue
+                    distances = np.abs(positions[:, k] - boundary)
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        timesToBoundary = 2 * distances / (speeds[:, k]
+                        + np.sqrt(speeds[:, k] * speeds[:, k] + 2 * accelerations[:, k] * distances))
+                    timesToBoundary = np.where(np.isnan(timesToBoundary), math.inf, timesToBoundary)
+                    regionTimesteps = np.minimum(regionTimesteps, timesToBoundary)
+
+        return regionTimesteps
+
+    def FindErrorTimestep(self, particleBunch, arrayOfIndices=None):
+        """ Method that returns the timestep that keeps the error in velocity within the tolerances.
+                The error of the last timestep is estimated as half of the change in acceleration
+                multiplied by the timestep, and falls with the square of the timestep.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                arrayOfIndices (ndarray): Indices of the M particles to find the timestep of. If None,
+                    the timestep of every particle is found.
+
+            Parameters:
+                velocityErrors (ndarray): Estimated error in the velocity of each particle
+                errorRatios (ndarray): Velocity error of each particle divided by its tolerance
+
+            Returns:
+                Timesteps (ndarray): The timestep of each particle that is expected to meet the tolerances
+        """
+        if arrayOfIndices is None:
+            arrayOfIndices = slice(None)
+        velocities = particleBunch.arrayOfVelocities[arrayOfIndices]
+        if self.previousAccelerations is None or self.previousAccelerations.shape != self.lastAccelerations.shape:
+            return np.full(len(velocities), math.inf)
+
+        # the last timestep may be a single timestep or the timestep of each particle
+        lastTimesteps = self.lastTimestep
+        if np.ndim(lastTimesteps) > 0:
+            lastTimesteps = lastTimesteps[arrayOfIndices]
+
+        velocityErrors = 0.5 * lastTimesteps * np.linalg.norm(self.lastAccelerations[arrayOfIndices]
+        - self.previousAccelerations[arrayOfIndices], axis=1)
+        tolerances = self.relativeTolerance * np.linalg.norm(velocities, axis=1) + self.absoluteVelocityTolerance
+        errorRatios = velocityErrors / tolerances
+
+        with np.errstate(divide='ignore'):
+            return lastTimesteps * np.clip(0.9 * errorRatios**-0.5, 0.2, 5.0)
+
+    def FindParticleTimesteps(self, particleBunch, totalEMField, timeElapsed, arrayOfIndices=None):
+        """ Method that returns the timestep of each particle and the limit that set it.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                arrayOfIndices (ndarray): Indices of the M particles to find the timestep of. If None,
+                    the timestep of every particle is found.
+
+            Parameters:
+                externalFields (list): N x 3 arrays of the external electric and magnetic fields acting
+                    on each particle
+                externalAccelerations (ndarray): N x 3 array of the acceleration of each particle from
+                    the external fields alone
+                dictionaryOfLimits (dictionary): The timesteps allowed by each limit
+
+            Returns:
+                [arrayOfTimesteps, arrayOfLimits] (list): The shortest timestep allowed by any limit for
+                    each particle, and the name of that limit
+        """
+        externalFields = totalEMField.SumOfExternalFieldsForBunch(particleBunch, timeElapsed
+        , arrayOfIndices=arrayOfIndices)
+        if arrayOfIndices is None:
+            arrayOfIndices = np.arange(particleBunch.numberOfParticles)
+        numberOfParticles = len(arrayOfIndices)
+        externalAccelerations = (particleBunch.arrayOfCharges[arrayOfIndices, np.newaxis]
+        * (externalFields[0] + np.cross(particleBunch.arrayOfVelocities[arrayOfIndices], externalFields[1]))
+        / (particleBunch.FindLorentzFactors() * particleBunch.arrayOfRestMasses)[arrayOfIndices, np.newaxis])
+
+        dictionaryOfLimits = {'maximum':self.maximumTimestep
+        , 'gyration':TimestepControllerClass.FindGyrationTimestep(self, particleBunch, externalFields[1]
+        , arrayOfIndices=arrayOfIndices)
+        , 'oscillation':TimestepControllerClass.FindOscillationTimestep(self, totalEMField)
+        , 'region':TimestepControllerClass.FindRegionTimestep(self, particleBunch, totalEMField
+        , externalAccelerations, arrayOfIndices=arrayOfIndices)
+        , 'error':TimestepControllerClass.FindErrorTimestep(self, particleBunch, arrayOfIndices=arrayOfIndices)}
+
+        namesOfLimits = np.array(list(dictionaryOfLimits.keys()) + ['minimum'])
+        limits = np.stack([np.broadcast_to(i, numberOfParticles) for i in dictionaryOfLimits.values()])
+        shortestLimits = np.argmin(limits, axis=0)
+        arrayOfTimesteps = limits[shortestLimits, np.arange(numberOfParticles)]
+        # no timestep is shorter than the minimum timestep, which becomes the limit if every other
+        # limit is shorter
+        belowMinimum = arrayOfTimesteps < self.minimumTimestep
+        arrayOfTimesteps[belowMinimum] = self.minimumTimestep
+        shortestLimits[belowMinimum] = len(dictionaryOfLimits)
+
+        return [arrayOfTimesteps, namesOfLimits[shortestLimits]]
+
+    def FindTimestep(self, particleBunch, totalEMField, timeElapsed):
+        """ Method that returns the timestep for the next update of the bunch, which is the shortest
+                timestep of any particle.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+
+            Returns:
+                timestep (float): The shortest timestep allowed by any limit
+        """
+        arrayOfTimesteps, arrayOfLimits = TimestepControllerClass.FindParticleTimesteps(self, particleBunch
+        , totalEMField, timeElapsed)
+        shortestParticle = np.argmin(arrayOfTimesteps)
+        self.lastLimit = arrayOfLimits[shortestParticle]
+
+        return arrayOfTimesteps[shortestParticle]
+
+    def RecordTimestep(self, particleBunch, timeElapsed, timestep):
+        """ Method that records a timestep after it has been taken, along with the accelerations of
+                the particles that are used to estimate the error.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles after the update
+                timeElapsed (float): Time at the start of the timestep
+                timestep (float): The timestep that was taken, which may be shorter than the timestep
+                    that was found by FindTimestep(). May be an array of the timestep of each particle.
+        """
+        self.listOfTimes.append(timeElapsed)
+        self.listOfTimesteps.append(timestep)
+        self.listOfLimits.append(self.lastLimit)
+
+        self.previousAccelerations = self.lastAccelerations
+        self.lastAccelerations = particleBunch.arrayOfAccelerations.copy()
+        self.lastTimestep = timestep
+
+    def ReportTimestepHistory(self):
+        """ Method that returns the recorded timesteps as a pandas dataframe.
+
+            Returns:
+                dataFrame (pandas dataframe): Dataframe with the time at the start of each timestep,
+                    the timestep and the limit that set it
+        """
+        dictionary = {'Time':self.listOfTimes, 'Timestep':self.listOfTimesteps, 'Limit':self.listOfLimits}
+
+        return pd.DataFrame(dictionary)
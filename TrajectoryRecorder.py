@@ -0,0 +1,283 @@
+import numpy as np
+import scipy.constants as const
+import json
+import os
+import re
+import shutil
+import ColumnarResults
+
+class TrajectoryRecorderClass:
+    """ Class that streams the history of a simulation to a directory of .npy files while the
+            simulation runs, instead of keeping a copy of every particle in memory.
+
+            Each record holds the time, the position, velocity and total energy of every particle,
+            and the mean energy and energy spread of the bunch. Records are collected in arrays of
+            chunkSize records, and each full chunk is written to one .npy file for each column,
+            named '<column>_<chunk number>.npy', so the memory used does not grow with the duration
+            of the simulation. metadata.json is rewritten after every chunk, so the records written
+            before a crash can still be read. When the recorder is closed, the chunks of each column
+            are joined into one '<column>.npy' file, which makes the directory a result in the
+            format of ColumnarResults.
+
+        Class Attributes:
+            directoryName (string): Directory that the chunks are written to
+            chunkSize (int): Number of records in each chunk
+            name (string): Name of the recorder
+            numberOfRecords (int): Number of records made, including those not yet written
+            numberOfChunks (int): Number of chunks written to the directory
+            numberOfJoinedRecords (int): Number of records in the joined '<column>.npy' files
+            numberOfBufferedRecords (int): Number of records held in memory that are not yet written
+            listOfParticleNames (list): Names of the particles of the recorded bunch
+            dictionaryOfBuffers (dictionary): Array that holds the records of the current chunk
+                for each column
+    """
+
+    listOfColumns = ['Time', 'Positions', 'Velocities', 'Energies', 'Energy', 'Spread']
+
+    def __init__(self, directoryName:str, chunkSize:int=1024, overwrite:bool=True, name='Trajectory Recorder'):
+        """ Constructor for the TrajectoryRecorderClass class.
+
+            Args:
+                directoryName (string): Directory that the chunks are written to, which is created if
+                    it does not exist
+                chunkSize (int): Number of records in each chunk
+                overwrite (bool): If True, the chunks of an earlier recording in the directory are
+                    removed. If False, a directory that holds an earlier recording is refused.
+                name (string): Name of the recorder
+
+            Raises:
+                FileExistsError: If overwrite is False and the directory holds an earlier recording
+        """
+        self.directoryName = directoryName
+        self.chunkSize = chunkSize
+        self.name = name
+        self.numberOfRecords = 0
+        self.numberOfChunks = 0
+        self.numberOfJoinedRecords = 0
+        self.numberOfBufferedRecords = 0
+        self.listOfParticleNames = []
+        self.dictionaryOfBuffers = None
+
+        os.makedirs(directoryName, exist_ok=True)
+        listOfOldFiles = [i for i in os.listdir(directoryName) if i == 'metadata.json'
+        or re.fullmatch(r'(%s)(_\d+)?\.npy'%('|'.join(TrajectoryRecorderClass.listOfColumns)), i)]
+        if listOfOldFiles and not overwrite:
+            raise FileExistsError("%s already holds a recording"%(directoryName))
+        for i in listOfOldFiles:
+            os.remove(os.path.join(directoryName, i))
+
+    def __repr__(self):
+        return 'Trajectory Recorder: {0}, Directory: {1}, Records: {2}, Chunk Size: {3}'.format(
+        self.name, self.directoryName, self.numberOfRecords, self.chunkSize)
+
+    def CreateBuffers(self, particleBunch):
+        """ Method that creates the arrays that hold the records of one chunk, with a size set by the
+                number of particles in the bunch.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is recorded
+        """
+        numberOfParticles = particleBunch.numberOfParticles
+        self.listOfParticleNames = particleBunch.FindParticleNames()
+        self.dictionaryOfBuffers = {'Time':np.zeros(self.chunkSize)
+        , 'Positions':np.zeros((self.chunkSize, numberOfParticles, 3))
+        , 'Velocities':np.zeros((self.chunkSize, numberOfParticles, 3))
+        , 'Energies':np.zeros((self.chunkSize, numberOfParticles))
+        , 'Energy':np.zeros(self.chunkSize), 'Spread':np.zeros(self.chunkSize)}
+
+    def Record(self, timeElapsed, particleBunch):
+        """ Method that adds the current state of the bunch to the chunk, and writes the chunk once
+                it is full.
+
+            Args:
+                timeElapsed (float): Time that has elapsed in the simulation
+                particleBunch (object: ParticleBunch): The bunch of particles that is recorded
+        """
+        if self.dictionaryOfBuffers is None:
+            TrajectoryRecorderClass.CreateBuffers(self, particleBunch)
+
+        i = self.numberOfBufferedRecords
+        self.dictionaryOfBuffers['Time'][i] = timeElapsed
+        self.dictionaryOfBuffers['Positions'][i] = particleBunch.arrayOfPositions
+        self.dictionaryOfBuffers['Velocities'][i] = particleBunch.arrayOfVelocities
+        # total energy of each particle, which is the Lorentz factor multiplied by the rest energy
+        self.dictionaryOfBuffers['Energies'][i] = (particleBunch.FindLorentzFactors()
+        * particleBunch.arrayOfRestMasses * const.speed_of_light * const.speed_of_light)
+        self.dictionaryOfBuffers['Energy'][i] = particleBunch.bunchMeanEnergy
+        self.dictionaryOfBuffers['Spread'][i] = particleBunch.bunchEnergySpread
+        self.numberOfBufferedRecords += 1
+        self.numberOfRecords += 1
+
+        if self.numberOfBufferedRecords == self.chunkSize:
+            TrajectoryRecorderClass.Flush(self)
+
+    def Flush(self):
+        """ Method that writes the records held in memory as a new chunk, and rewrites metadata.json.
+                Nothing is written if there are no records held in memory.
+        """
+        if self.numberOfBufferedRecords == 0:
+            return
+
+        for column in TrajectoryRecorderClass.listOfColumns:
+            np.save(os.path.join(self.directoryName, '%s_%05d.npy'%(column, self.numberOfChunks))
+            , self.dictionaryOfBuffers[column][:self.numberOfBufferedRecords])
+        self.numberOfChunks += 1
+        self.numberOfBufferedRecords = 0
+        TrajectoryRecorderClass.WriteChunkMetadata(self)
+
+    def WriteChunkMetadata(self):
+        """ Method that rewrites metadata.json with the records that have been written to the directory.
+        """
+        metadata = {'numberOfRecords':self.numberOfRecords - self.numberOfBufferedRecords
+        , 'numberOfChunks':self.numberOfChunks, 'chunkSize':self.chunkSize
+        , 'listOfColumns':TrajectoryRecorderClass.listOfColumns, 'listOfParticleNames':self.listOfParticleNames}
+        # the metadata is written under another name and then renamed, so it is never partly written
+        with open(os.path.join(self.directoryName, 'metadata.json.tmp'), 'w') as metadataFile:
+            json.dump(metadata, metadataFile, indent=4)
+        os.replace(os.path.join(self.directoryName, 'metadata.json.tmp'), os.path.join(self.directoryName
+        , 'metadata.json'))
+
+    def Close(self):
+        """ Method that writes any records held in memory and joins the chunks of each column into one
+                file, which must be called at the end of a simulation. The records are copied one chunk
+                at a time, so the memory used does not grow with the number of records. Records made
+                after the recorder is closed are joined onto the end of the columns when it is closed again.
+
+            Parameters:
+                joinedRecords (ndarray): Memory-mapped array of the joined column, written to a
+                    temporary file that replaces the column once it is complete
+        """
+        TrajectoryRecorderClass.Flush(self)
+        if self.numberOfChunks == 0:
+            return
+
+        for column in TrajectoryRecorderClass.listOfColumns:
+            columnFileName = os.path.join(self.directoryName, '%s.npy'%(column))
+            listOfPieces = [os.path.join(self.directoryName, '%s_%05d.npy'%(column, i))
+            for i in range(self.numberOfChunks)]
+            if os.path.isfile(columnFileName):
+                listOfPieces.insert(0, columnFileName)
+            listOfPieces = [np.load(i, mmap_mode='r') for i in listOfPieces]
+
+            temporaryFileName = os.path.join(self.directoryName, '%s.npy.tmp'%(column))
+            joinedRecords = np.lib.format.open_memmap(temporaryFileName, mode='w+', dtype=float
+            , shape=(sum(len(i) for i in listOfPieces),) + listOfPieces[0].shape[1:])
+            start = 0
+            for piece in listOfPieces:
+                for i in range(0, len(piece), self.chunkSize):
+                    block = piece[i:i + self.chunkSize]
+                    joinedRecords[start:start + len(block)] = block
+                    start += len(block)
+            joinedRecords.flush()
+            del joinedRecords, listOfPieces
+            os.replace(temporaryFileName, columnFileName)
+
+        for column in TrajectoryRecorderClass.listOfColumns:
+            for i in range(self.numberOfChunks):
+                os.remove(os.path.join(self.directoryName, '%s_%05d.npy'%(column, i)))
+        self.numberOfChunks = 0
+        self.numberOfJoinedRecords = self.numberOfRecords
+
+        ColumnarResults.WriteMetadata(self.directoryName, 'TrajectoryRecorderClass', self.numberOfRecords
+        , TrajectoryRecorderClass.listOfColumns, self.listOfParticleNames, numberOfChunks=0
+        , chunkSize=self.chunkSize)
+
+    def Restore(self):
+        """ Method that returns the directory to the state of the recorder when the recorder has been
+                loaded from a checkpoint of a simulation. Chunks written after the checkpoint are
+                removed, and if the chunks were joined after the checkpoint, the joined columns are
+                split back into the joined records and the chunks of the checkpoint. The records held
+                in memory were saved with the recorder.
+
+            Parameters:
+                joinedRecords (ndarray): Memory-mapped array of a joined column
+        """
+        for column in TrajectoryRecorderClass.listOfColumns:
+            columnFileName = os.path.join(self.directoryName, '%s.npy'%(column))
+            if not os.path.isfile(columnFileName):
+                continue
+            joinedRecords = np.load(columnFileName, mmap_mode='r')
+            if len(joinedRecords) > self.numberOfJoinedRecords:
+                for i in range(self.numberOfChunks):
+                    start = self.numberOfJoinedRecords + i * self.chunkSize
+                    np.save(os.path.join(self.directoryName, '%s_%05d.npy'%(column, i))
+                    , joinedRecords[start:start + self.chunkSize])
+                if self.numberOfJoinedRecords > 0:
+                    with open("%s.tmp"%(columnFileName), 'wb') as temporaryFile:
+                        np.save(temporaryFile, joinedRecords[:self.numberOfJoinedRecords])
+                    del joinedRecords
+                    os.replace("%s.tmp"%(columnFileName), columnFileName)
+                else:
+                    del joinedRecords
+                    os.remove(columnFileName)
+
+        for i in os.listdir(self.directoryName):
+            chunk = re.fullmatch(r'(%s)_(\d+)\.npy'%('|'.join(TrajectoryRecorderClass.listOfColumns)), i)
+            if chunk and int(chunk.group(2)) >= self.numberOfChunks:
+                os.remove(os.path.join(self.directoryName, i))
+        TrajectoryRecorderClass.WriteChunkMetadata(self)
+
+    def CopyTo(self, directoryName:str):
+        """ Method that copies the records written so far to another directory, which the recorder then
+                writes to. Used when a simulation is split into branches that each continue the recording.
+
+            Args:
+                directoryName (string): Directory that the records are copied to, which is created if it
+                    does not exist, and any earlier recording in it is removed
+        """
+        TrajectoryRecorderClass(directoryName)
+        for column in TrajectoryRecorderClass.listOfColumns:
+            listOfFileNames = ['%s_%05d.npy'%(column, i) for i in range(self.numberOfChunks)]
+            if self.numberOfJoinedRecords > 0:
+                listOfFileNames.append('%s.npy'%(column))
+            for i in listOfFileNames:
+                shutil.copyfile(os.path.join(self.directoryName, i), os.path.join(directoryName, i))
+        self.directoryName = directoryName
+        TrajectoryRecorderClass.WriteChunkMetadata(self)
+
+    def SaveColumnarCopy(self, directoryName:str, simulationType:str='TrajectoryRecorderClass'):
+        """ Method that copies the joined columns of a closed recorder to another directory, as a result
+                in the columnar format. The columns are copied file by file, so they are not read into
+                memory. Nothing is copied if the directory is the directory of the recorder.
+
+            Args:
+                directoryName (string): Directory of the copy, which is created if it does not exist
+                simulationType (string): Name of the class that saved the result, kept in the metadata
+        """
+        if os.path.abspath(directoryName) == os.path.abspath(self.directoryName):
+            return
+        os.makedirs(directoryName, exist_ok=True)
+        # the old metadata is removed first, so the directory is not a complete result while it is written
+        if os.path.isfile(os.path.join(directoryName, 'metadata.json')):
+            os.remove(os.path.join(directoryName, 'metadata.json'))
+
+        listOfColumns = [i for i in TrajectoryRecorderClass.listOfColumns
+        if os.path.isfile(os.path.join(self.directoryName, '%s.npy'%(i)))]
+        for column in listOfColumns:
+            shutil.copyfile(os.path.join(self.directoryName, '%s.npy'%(column))
+            , os.path.join(directoryName, '%s.npy'%(column)))
+        ColumnarResults.WriteMetadata(directoryName, simulationType, self.numberOfJoinedRecords, listOfColumns
+        , self.listOfParticleNames)
+
+def LoadTrajectoryColumn(directoryName:str, column:str):
+    """ Function that reads one column of a recording by joining the column of a closed recorder
+            and any chunks that have not yet been joined.
+
+        Args:
+            directoryName (string): Directory that the recording was written to
+            column (string): Name of the column, one of TrajectoryRecorderClass.listOfColumns
+
+        Returns:
+            arrayOfRecords (ndarray): Array of the column with one row for each record
+    """
+    with open(os.path.join(directoryName, 'metadata.json')) as metadataFile:
+        metadata = json.load(metadataFile)
+    if column not in metadata['listOfColumns']:
+        raise ValueError("%s is not a column of the recording in %s"%(column, directoryName))
+
+    listOfFileNames = [os.path.join(directoryName, '%s_%05d.npy'%(column, i))
+    for i in range(metadata['numberOfChunks'])]
+    if os.path.isfile(os.path.join(directoryName, '%s.npy'%(column))):
+        listOfFileNames.insert(0, os.path.join(directoryName, '%s.npy'%(column)))
+
+    return np.concatenate([np.load(i) for i in listOfFileNames])
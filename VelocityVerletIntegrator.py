@@ -0,0 +1,77 @@
+from AbstractIntegrator import AbstractIntegratorClass, np
+
+class VelocityVerletIntegratorClass(AbstractIntegratorClass):
+    """ Class that moves the bunch with the velocity Verlet (kick-drift-kick leapfrog) method.
+            Half of the impulse is applied, the particles drift for the whole timestep and the
+            second half of the impulse is found at the new positions. Second order and time
+            reversible, with two field evaluations per timestep.
+
+            The magnetic force depends on the velocity, so the first half impulse uses the velocity
+            at the end of that half impulse, which is found exactly by solving a linear equation.
+            The second half impulse then uses the same velocity and stays explicit.
+
+        Class Attributes:
+            name (string): Name of the integrator
+            numberOfFieldEvaluations (int): The number of times the fields acting on the whole bunch
+                have been found by the integrator
+    """
+
+    def __init__(self, name='Velocity Verlet Integrator'):
+        """ Constructor for the VelocityVerletIntegratorClass class.
+                Inherits the __init__ from AbstractIntegratorClass.
+
+            Args:
+                name (string): Name of the integrator
+        """
+        super().__init__(name=name)
+
+    def __repr__(self):
+        return 'Velocity Verlet Integrator: {0}'.format(self.name)
+
+    def Step(self, particleBunch, totalEMField, timeElapsed, timestep, limitVelocity:bool=True):
+        """ Method that moves the particle bunch forward by one timestep with the velocity Verlet method.
+
+            Args:
+                particleBunch (object: ParticleBunch): The bunch of particles that is moved
+                totalEMField (object: EMFieldClass): The electromagnetic fields acting on the bunch
+                timeElapsed (float): Time that has elapsed in the simulation
+                timestep (float): Time that the update lasts for
+                limitVelocity (bool): Not used, since the velocity is found from the momentum
+
+            Parameters:
+                electromagneticFields (list): N x 3 arrays of the electric and magnetic fields acting
+                    on each particle at the start of the timestep
+                halfStepMomenta (ndarray): N x 3 array of the momenta per unit rest mass after
+                    the first half impulse
+
+            Returns:
+                [timestep, numberOfTimesBreakIsPrevented] (list): The timestep that was used and zero
+        """
+        initialPositions = particleBunch.arrayOfPositions.copy()
+        initialVelocities = particleBunch.arrayOfVelocities.copy()
+        initialMomenta = VelocityVerletIntegratorClass.FindMomenta(self, particleBunch)
+
+        # kick, solving u = w + u x t for the momentum u after the half impulse
+        electromagneticFields = totalEMField.SumOfEMFieldsForBunch(particleBunch, timeElapsed)
+        self.numberOfFieldEvaluations += 1
+        chargeOverMass = (particleBunch.arrayOfCharges / particleBunch.arrayOfRestMasses)[:, np.newaxis]
+        electricMomenta = initialMomenta + chargeOverMass * electromagneticFields[0] * (0.5 * timestep)
+        rotationVector = (chargeOverMass * electromagneticFields[1] * (0.5 * timestep)
+        / particleBunch.FindLorentzFactors()[:, np.newaxis])
+        halfStepMomenta = ((electricMomenta + np.cross(electricMomenta, rotationVector)
+        + np.einsum('ij,ij->i', electricMomenta, rotationVector)[:, np.newaxis] * rotationVector)
+        / (1 + np.einsum('ij,ij->i', rotationVector, rotationVector))[:, np.newaxis])
+
+        # drift
+        finalPositions = (initialPositions
+        + timestep * VelocityVerletIntegratorClass.FindVelocities(self, halfStepMomenta))
+
+        # kick
+        forces = VelocityVerletIntegratorClass.FindDerivatives(self, particleBunch, totalEMField
+        , timeElapsed + timestep, finalPositions, halfStepMomenta)[1]
+        finalMomenta = halfStepMomenta + 0.5 * timestep * forces
+
+        VelocityVerletIntegratorClass.SetState(self, particleBunch, initialVelocities, finalPositions
+        , finalMomenta, timestep)
+
+        return [timestep, 0]
@@ -7,6 +7,7 @@ from Plotting import PlottingClass
 from SimulationPhaseChange import SimulationPhaseChangeClass
 from SimulationStandard import SimulationStandardClass
 from SimulationConservationLaws import SimulationConservationLawsClass
+from ExactGyration import ExactGyrationClass
 
 import scipy.constants as const
 import scipy
@@ -33,8 +34,11 @@ cyclotronEMField = EMFieldClass(bunchOfParticles=cyclotronParticleBunch
 , listOfElectricFields=[cyclotronEField], listOfMagneticFields=[cyclotronBField]
 , name='cyclotronEMField')
 
+# outside the accelerating electric field the protons only circle in the static magnetic field, so they
+# are moved along exact helices and recorded every 2e-3 s instead of every timestep
 cyclotronSimulation = SimulationStandardClass(totalEMField=cyclotronEMField
-, particleBunch=cyclotronParticleBunch, duration=3, largeTimestep=5e-4, smallTimestep=1e-6)
+, particleBunch=cyclotronParticleBunch, duration=3, largeTimestep=5e-4, smallTimestep=1e-6
+, exactGyration=ExactGyrationClass(), recordingInterval=2e-3)
 
 # Run conditions for the example Cyclotron Simulation
 cyclotronSimulation.RunSimulation()
@@ -67,6 +71,9 @@ synchrotronEMField = EMFieldClass(bunchOfParticles=synchrotronParticleBunch
 , listOfElectricFields=[synchrotronEField1, synchrotronEField2], listOfMagneticFields=[synchrotronBField]
 , name='synchrotronEMField')
 
+# the timesteps are kept short enough for the uranium atoms to be stepped through the 2 m wide electric
+# fields, which a longer timestep of the boris integrator would jump across, so the larger timesteps
+# that the boris method allows in the magnetic field alone are not used here
 synchrotronSimulation = SimulationStandardClass(totalEMField=synchrotronEMField
 , particleBunch=synchrotronParticleBunch, duration=0.0145, largeTimestep=1e-7, smallTimestep=5e-8)
 
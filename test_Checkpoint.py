@@ -0,0 +1,107 @@
+from AbstractSimulation import LoadCheckpoint, ResumeSimulation
+from TrajectoryRecorder import TrajectoryRecorderClass, LoadTrajectoryColumn
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticSynchrotronField import MagneticSynchrotronFieldClass
+from ParticleBunchClass import ParticleBunch
+from SumEMFields import EMFieldClass
+from SimulationStandard import SimulationStandardClass
+from RecordingPolicy import RecordingPolicyClass
+
+import scipy.constants as const
+import scipy
+import numpy as np
+import pytest
+import os
+from copy import deepcopy
+
+test_ParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-6
+, bunchMeanEnergy=3.5356655116389166e-08, restMassOfBunch=92*const.proton_mass+143*const.neutron_mass
+, chargeOfBunch=92* const.elementary_charge, name='test_Uranium')
+
+test_SynchrotronField = MagneticSynchrotronFieldClass(magneticFieldStrength=np.array([0, 6e-8, 0])
+, name='test_Synchrotron Field', particleBunch=test_ParticleBunch)
+
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([3e4, 0, 0])
+, listOfDimensions=[[-1, 1], [-1 * scipy.inf, scipy.inf], [-1, 1]], name='test_Electric Field')
+
+test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch, listOfElectricFields=[test_ElectricField]
+, listOfMagneticFields=[test_SynchrotronField], name='test_EM Field')
+
+test_Simulation = SimulationStandardClass(totalEMField=test_EMField, particleBunch=test_ParticleBunch
+, duration=2e-4, largeTimestep=1e-6, smallTimestep=5e-7, recordingPolicy=RecordingPolicyClass(stepInterval=3))
+
+class CrashAfterSteps:
+    """ Replacement for SimulationStandardClass.UpdateBunch that stops the simulation with an error
+            after a number of steps, as if its process had been stopped.
+    """
+    def __init__(self, numberOfSteps):
+        self.numberOfSteps = numberOfSteps
+        self.UpdateBunch = SimulationStandardClass.UpdateBunch
+
+    def __call__(self, simulation, timeElapsed, timestep):
+        self.numberOfSteps -= 1
+        if self.numberOfSteps < 0:
+            raise RuntimeError("test_Crash")
+        return self.UpdateBunch(simulation, timeElapsed, timestep)
+
+def test_SaveCheckpoint(tmp_path):
+    # checks that a checkpoint holds the simulation and the time at the start of its last step
+    test_CheckpointSimulation = deepcopy(test_Simulation)
+    test_CheckpointSimulation.checkpointFile = str(tmp_path / 'test.checkpoint')
+    test_CheckpointSimulation.SaveCheckpoint(1.5e-5)
+    assert not os.path.isfile(str(tmp_path / 'test.checkpoint.tmp'))
+    test_LoadedSimulation, timeElapsed = LoadCheckpoint(str(tmp_path / 'test.checkpoint'))
+    assert timeElapsed == 1.5e-5
+    assert test_LoadedSimulation.totalEMField.listOfMagneticFields[0].particleBunch is test_LoadedSimulation.particleBunch
+    assert np.shares_memory(test_LoadedSimulation.particleBunch.listOfParticles[1].position
+    , test_LoadedSimulation.particleBunch.arrayOfPositions)
+
+def test_ResumeSimulation(tmp_path, monkeypatch):
+    # stops a synchrotron simulation part way through, resumes it from its last checkpoint and checks that
+    # the bunch, the history and the recording are identical to a simulation that was never stopped
+    test_ReferenceSimulation = deepcopy(test_Simulation)
+    test_ReferenceSimulation.RunSimulation()
+
+    test_CheckpointSimulation = deepcopy(test_Simulation)
+    test_CheckpointSimulation.checkpointFile = str(tmp_path / 'test.checkpoint')
+    test_CheckpointSimulation.checkpointInterval = 0.0
+    monkeypatch.setattr(SimulationStandardClass, 'UpdateBunch', CrashAfterSteps(50))
+    with pytest.raises(RuntimeError):
+        test_CheckpointSimulation.RunSimulation()
+    monkeypatch.undo()
+
+    test_ResumedSimulation = ResumeSimulation(str(tmp_path / 'test.checkpoint'))
+    assert test_ResumedSimulation.particleBunch.arrayOfPositions.tolist() == (
+        test_ReferenceSimulation.particleBunch.arrayOfPositions.tolist())
+    assert test_ResumedSimulation.particleBunch.arrayOfVelocities.tolist() == (
+        test_ReferenceSimulation.particleBunch.arrayOfVelocities.tolist())
+    assert test_ResumedSimulation.simulationTime == test_ReferenceSimulation.simulationTime
+    assert test_ResumedSimulation.simulationSpread == test_ReferenceSimulation.simulationSpread
+    assert test_ResumedSimulation.simulationState[-1][2].velocity.tolist() == (
+        test_ReferenceSimulation.simulationState[-1][2].velocity.tolist())
+
+def test_ResumeRecordedSimulation(tmp_path, monkeypatch):
+    # resumes a recorded simulation after it was stopped part way through, and again after it finished
+    # and joined its chunks, and checks that the recording is identical to that of a simulation that was
+    # never stopped
+    test_ReferenceSimulation = deepcopy(test_Simulation)
+    test_ReferenceSimulation.trajectoryRecorder = TrajectoryRecorderClass(str(tmp_path / 'reference'), chunkSize=8)
+    test_ReferenceSimulation.RunSimulation()
+
+    test_CheckpointSimulation = deepcopy(test_Simulation)
+    test_CheckpointSimulation.trajectoryRecorder = TrajectoryRecorderClass(str(tmp_path / 'recorded'), chunkSize=8)
+    test_CheckpointSimulation.checkpointFile = str(tmp_path / 'test.checkpoint')
+    test_CheckpointSimulation.checkpointInterval = 0.0
+    monkeypatch.setattr(SimulationStandardClass, 'UpdateBunch', CrashAfterSteps(100))
+    with pytest.raises(RuntimeError):
+        test_CheckpointSimulation.RunSimulation()
+    monkeypatch.undo()
+
+    # the second resume starts from the last checkpoint of the first, after the chunks have been joined
+    for i in range(2):
+        test_ResumedSimulation = ResumeSimulation(str(tmp_path / 'test.checkpoint'))
+        for column in TrajectoryRecorderClass.listOfColumns:
+            assert np.array_equal(LoadTrajectoryColumn(str(tmp_path / 'recorded'), column)
+            , LoadTrajectoryColumn(str(tmp_path / 'reference'), column))
+        assert test_ResumedSimulation.particleBunch.arrayOfPositions.tolist() == (
+            test_ReferenceSimulation.particleBunch.arrayOfPositions.tolist())
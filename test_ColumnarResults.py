@@ -0,0 +1,114 @@
+from ColumnarResults import ColumnarResultsClass, IsColumnarResults, WriteColumnarResults, ConvertStatesToColumns
+from TrajectoryRecorder import TrajectoryRecorderClass
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
+from ParticleBunchClass import ParticleBunch
+from SumEMFields import EMFieldClass
+from SimulationStandard import SimulationStandardClass
+from SimulationPhaseChange import SimulationPhaseChangeClass
+from Plotting import PlottingClass
+
+import scipy.constants as const
+import scipy
+import numpy as np
+import pandas as pd
+import pytest
+import os
+import re
+from copy import deepcopy
+
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([1e5, 0, 0])
+, listOfDimensions=[[-0.5, 0.5], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+, angularFrequency=1e-7 * const.elementary_charge / const.proton_mass
+, phaseShift=0.0, name='test_Electric Field')
+
+test_MagneticField = MagneticExternalFieldClass(magneticFieldStrength=np.array([0, 1e-7, 0])
+, name='test_Magnetic Field', angularFrequency=0.0, phaseShift=0.0
+, listOfDimensions=[[-1*scipy.inf, scipy.inf] for i in range(3)])
+
+test_ParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch
+, listOfElectricFields=[test_ElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_Simulation = SimulationStandardClass(totalEMField=test_EMField, particleBunch=test_ParticleBunch
+, duration=1e-2, largeTimestep=1e-4, smallTimestep=1e-4)
+
+test_PhaseChangeSimulation = SimulationPhaseChangeClass(listOfPhaseChangingFields=[test_ElectricField]
+, phaseResolution=4, totalEMField=test_EMField, particleBunch=test_ParticleBunch
+, duration=1e-2, largeTimestep=1e-4, smallTimestep=1e-4)
+
+def test_ColumnarResults__repr__(tmp_path):
+    # checks the repr function works
+    WriteColumnarResults(str(tmp_path), {'Time':[0.0, 1.0]}, 'test_Simulation')
+    test_Results = ColumnarResultsClass(str(tmp_path))
+    assert re.findall("Simulation: test_Simulation, Records: 2", test_Results.__repr__()) == [
+        "Simulation: test_Simulation, Records: 2"]
+
+def test_WriteColumnarResults(tmp_path):
+    # writes two columns and checks that they are read back as memory-mapped arrays by attribute
+    WriteColumnarResults(str(tmp_path), {'Time':[0.0, 0.5, 1.0], 'Positions':np.arange(18).reshape(3, 2, 3)}
+    , 'test_Simulation', ['a', 'b'])
+    assert IsColumnarResults(str(tmp_path))
+    assert not IsColumnarResults(str(tmp_path / 'missing'))
+    test_Results = ColumnarResultsClass(str(tmp_path))
+    assert isinstance(test_Results.Time, np.memmap)
+    assert test_Results.Time.tolist() == [0.0, 0.5, 1.0]
+    assert test_Results.Positions[2, 1].tolist() == [15.0, 16.0, 17.0]
+    assert test_Results.metadata['listOfParticleNames'] == ['a', 'b']
+    with pytest.raises(AttributeError):
+        test_Results.Momentum
+    with pytest.raises(ValueError):
+        ColumnarResultsClass(str(tmp_path / 'missing'))
+
+def test_ConvertStatesToColumns():
+    # checks that a list of states is converted to T x N x 3 arrays
+    listOfStates = [deepcopy(test_ParticleBunch.listOfParticles) for i in range(4)]
+    dictionaryOfColumns = ConvertStatesToColumns(listOfStates)
+    assert dictionaryOfColumns['Positions'].shape == (4, 3, 3)
+    assert dictionaryOfColumns['Velocities'][3, 1].tolist() == test_ParticleBunch.listOfParticles[1].velocity.tolist()
+
+def test_StandardSaveColumnar(tmp_path):
+    # saves the standard simulation in both formats, and checks that plotting reads the same positions
+    # and velocities from each
+    test_CopyOfSimulation = deepcopy(test_Simulation)
+    test_CopyOfSimulation.RunSimulation()
+    pickleFileName = str(tmp_path / 'standard')
+    columnarFileName = str(tmp_path / 'standard columnar')
+    test_CopyOfSimulation.SaveSimulation(pickleFileName)
+    test_CopyOfSimulation.SaveSimulation(columnarFileName, fileFormat='columnar')
+
+    test_PicklePlotting = PlottingClass(pickleFileName)
+    test_ColumnarPlotting = PlottingClass(columnarFileName)
+    assert isinstance(test_PicklePlotting.LoadSim, pd.DataFrame)
+    assert isinstance(test_ColumnarPlotting.LoadSim, ColumnarResultsClass)
+    assert test_ColumnarPlotting.LoadSim.Time.tolist() == test_PicklePlotting.LoadSim.Time.tolist()
+    assert test_ColumnarPlotting.LoadSim.Spread.tolist() == test_PicklePlotting.LoadSim.Spread.tolist()
+    for column in ['Positions', 'Velocities']:
+        assert np.array_equal(test_ColumnarPlotting.FindParticleColumn(column)
+        , test_PicklePlotting.FindParticleColumn(column))
+    assert test_ColumnarPlotting.FindParticleNames() == test_PicklePlotting.FindParticleNames()
+
+def test_PhaseChangeSaveColumnar(tmp_path):
+    # saves the phase change simulation in the columnar format
+    test_CopyOfSimulation = deepcopy(test_PhaseChangeSimulation)
+    test_CopyOfSimulation.RunSimulation()
+    test_CopyOfSimulation.SaveSimulation(str(tmp_path), fileFormat='columnar')
+    test_Results = ColumnarResultsClass(str(tmp_path))
+    assert test_Results.Phase.tolist() == test_CopyOfSimulation.simulationPhaseShift
+    assert test_Results.FinalSpread.tolist() == test_CopyOfSimulation.simulationFinalSpread
+
+def test_RecorderColumnar(tmp_path):
+    # checks that a closed recorder leaves one file for each column, which is read as a columnar result
+    test_Recorder = TrajectoryRecorderClass(str(tmp_path), chunkSize=4)
+    for i in range(10):
+        test_Recorder.Record(i * 0.5, test_ParticleBunch)
+    test_Recorder.Close()
+    assert sorted(os.listdir(str(tmp_path))) == sorted(['%s.npy'%(i) for i in TrajectoryRecorderClass.listOfColumns]
+    + ['metadata.json'])
+    test_Results = ColumnarResultsClass(str(tmp_path))
+    assert test_Results.Time.tolist() == [i * 0.5 for i in range(10)]
+    assert test_Results.Positions.shape == (10, 3, 3)
@@ -0,0 +1,120 @@
+import CompiledKernels
+from BarnesHutFieldSolver import BarnesHutFieldSolverClass
+
+import numpy as np
+import scipy.constants as const
+import pytest
+
+# the loop form is compiled with Numba if it is installed, and is run by the interpreter otherwise
+if CompiledKernels.isNumbaAvailable:
+    listOfLoops = [CompiledKernels.ElectricFieldKernel, CompiledKernels.MagneticFieldKernel
+    , CompiledKernels.LorentzAccelerationKernel, CompiledKernels.CromerUpdateKernel, CompiledKernels.TreeFieldsKernel]
+else:
+    listOfLoops = [CompiledKernels.ElectricFieldLoop, CompiledKernels.MagneticFieldLoop
+    , CompiledKernels.LorentzAccelerationLoop, CompiledKernels.CromerUpdateLoop, CompiledKernels.TreeFieldsLoop]
+electricFieldLoop, magneticFieldLoop, lorentzAccelerationLoop, cromerUpdateLoop, treeFieldsLoop = listOfLoops
+
+np.random.seed(0)
+test_SourcePositions = np.random.normal(scale=1e-3, size=(30, 3))
+test_SourceVelocities = np.random.normal(scale=1e5, size=(30, 3))
+test_SourceCharges = const.elementary_charge * np.random.choice([-1.0, 1.0], size=30)
+test_AffectedPositions = np.random.normal(scale=1e-3, size=(20, 3))
+# the first 20 sources are the affected particles, which do not interact with themselves
+test_InteractionMask = np.arange(30)[np.newaxis, :] != np.arange(20)[:, np.newaxis]
+test_NoMask = np.ones((0, 0), dtype=bool)
+test_NoSelfIndices = np.full(20, -1, dtype=np.int64)
+test_SelfIndices = np.arange(20, dtype=np.int64)
+
+def test_KernelsAreChosen():
+    # checks that the kernels used by the simulations are the compiled loops if Numba is installed
+    # and the NumPy functions otherwise
+    if CompiledKernels.isNumbaAvailable:
+        assert CompiledKernels.ElectricFieldKernel is not CompiledKernels.ElectricFieldNumPy
+    else:
+        assert CompiledKernels.ElectricFieldKernel is CompiledKernels.ElectricFieldNumPy
+        assert CompiledKernels.CromerUpdateKernel is CompiledKernels.CromerUpdateNumPy
+
+def test_ElectricFieldParity():
+    # checks that both forms find the same electric field, with and without a mask, and that removing
+    # each particle from its own field by index is the same as masking it out
+    maskedFields = electricFieldLoop(test_SourcePositions, test_SourceCharges, test_SourcePositions[:20]
+    , test_InteractionMask, True, test_NoSelfIndices)
+    for affectedPositions, mask, isMasked, selfIndices in [[test_AffectedPositions, test_NoMask, False
+    , test_NoSelfIndices], [test_SourcePositions[:20], test_InteractionMask, True, test_NoSelfIndices]
+    , [test_SourcePositions[:20], test_NoMask, False, test_SelfIndices]]:
+        loopFields = electricFieldLoop(test_SourcePositions, test_SourceCharges, affectedPositions
+        , mask, isMasked, selfIndices)
+        numPyFields = CompiledKernels.ElectricFieldNumPy(test_SourcePositions, test_SourceCharges
+        , affectedPositions, mask, isMasked, selfIndices, chunkSize=7)
+        assert loopFields == pytest.approx(numPyFields, rel=1e-10, abs=0.0)
+    assert numPyFields == pytest.approx(maskedFields, rel=1e-10, abs=0.0)
+
+def test_MagneticFieldParity():
+    # checks that both forms find the same magnetic field, with and without a mask, and that removing
+    # each particle from its own field by index is the same as masking it out
+    maskedFields = magneticFieldLoop(test_SourcePositions, test_SourceVelocities, test_SourceCharges
+    , test_SourcePositions[:20], test_InteractionMask, True, test_NoSelfIndices)
+    for affectedPositions, mask, isMasked, selfIndices in [[test_AffectedPositions, test_NoMask, False
+    , test_NoSelfIndices], [test_SourcePositions[:20], test_InteractionMask, True, test_NoSelfIndices]
+    , [test_SourcePositions[:20], test_NoMask, False, test_SelfIndices]]:
+        loopFields = magneticFieldLoop(test_SourcePositions, test_SourceVelocities, test_SourceCharges
+        , affectedPositions, mask, isMasked, selfIndices)
+        numPyFields = CompiledKernels.MagneticFieldNumPy(test_SourcePositions, test_SourceVelocities
+        , test_SourceCharges, affectedPositions, mask, isMasked, selfIndices, chunkSize=7)
+        assert loopFields == pytest.approx(numPyFields, rel=1e-10, abs=0.0)
+    assert numPyFields == pytest.approx(maskedFields, rel=1e-10, abs=0.0)
+
+def test_LorentzAccelerationParity():
+    # checks that both forms find the same acceleration for particles moving at up to 0.9 c
+    velocities = np.random.uniform(-0.5, 0.5, size=(30, 3)) * const.speed_of_light
+    restMasses = np.full(30, const.proton_mass)
+    electricFields = np.random.normal(scale=1e4, size=(30, 3))
+    magneticFields = np.random.normal(scale=1e-2, size=(30, 3))
+    loopAccelerations, numPyAccelerations = np.zeros((30, 3)), np.zeros((30, 3))
+    lorentzAccelerationLoop(velocities, test_SourceCharges, restMasses, electricFields, magneticFields
+    , loopAccelerations)
+    CompiledKernels.LorentzAccelerationNumPy(velocities, test_SourceCharges, restMasses, electricFields
+    , magneticFields, numPyAccelerations)
+    assert loopAccelerations == pytest.approx(numPyAccelerations, rel=1e-10, abs=0.0)
+
+def test_CromerUpdateParity():
+    # checks that both forms move the particles to the same place, updating the arrays in place
+    accelerations = np.random.normal(scale=1e8, size=(30, 3))
+    loopPositions, loopVelocities = test_SourcePositions.copy(), test_SourceVelocities.copy()
+    numPyPositions, numPyVelocities = test_SourcePositions.copy(), test_SourceVelocities.copy()
+    cromerUpdateLoop(loopPositions, loopVelocities, accelerations, 1e-9)
+    CompiledKernels.CromerUpdateNumPy(numPyPositions, numPyVelocities, accelerations, 1e-9)
+    assert loopVelocities == pytest.approx(numPyVelocities, rel=1e-12, abs=0.0)
+    assert loopPositions == pytest.approx(numPyPositions, rel=1e-12, abs=0.0)
+    assert not np.array_equal(loopPositions, test_SourcePositions)
+
+def FindTreeFields(treeFieldsForm, openingAngle, affectedPositions, selfIndices, **kwargs):
+    # builds the octree of the sources and of the affected positions and returns the sums found with them
+    test_Solver = BarnesHutFieldSolverClass(openingAngle=openingAngle, maximumParticlesPerLeaf=4)
+    tree = test_Solver.BuildTree(test_SourcePositions, test_SourceVelocities, test_SourceCharges)
+    groups = test_Solver.FindGroups(test_Solver.BuildTree(affectedPositions, np.zeros_like(affectedPositions)
+    , np.zeros(len(affectedPositions))), affectedPositions)
+    return treeFieldsForm(test_SourcePositions, test_SourceVelocities, test_SourceCharges, affectedPositions
+    , selfIndices, tree['centre'], tree['halfWidth'], tree['children'], tree['leafStart'], tree['leafCount']
+    , tree['leafOrder'], tree['charge'], tree['chargeCentre'], tree['current'], groups['order'], groups['start']
+    , groups['count'], groups['lowerCorner'], groups['upperCorner'], openingAngle, **kwargs)
+
+def test_TreeFieldsParity():
+    # checks that both forms walk the tree to the same fields, and that with an opening angle of zero the
+    # fields are the same as the sums over every pair of particles
+    for affectedPositions, selfIndices in [[test_AffectedPositions, test_NoSelfIndices]
+    , [test_SourcePositions[:20], test_SelfIndices]]:
+        for openingAngle in [0.0, 0.5]:
+            loopFields = FindTreeFields(treeFieldsLoop, openingAngle, affectedPositions, selfIndices)
+            numPyFields = FindTreeFields(CompiledKernels.TreeFieldsNumPy, openingAngle, affectedPositions
+            , selfIndices, chunkSize=5, groupsPerWalk=2)
+            assert loopFields[0] == pytest.approx(numPyFields[0], rel=1e-10, abs=0.0)
+            assert loopFields[1] == pytest.approx(numPyFields[1], rel=1e-10, abs=0.0)
+        # distant nodes are treated as single points when the opening angle is not zero
+        assert not np.allclose(numPyFields[0], FindTreeFields(CompiledKernels.TreeFieldsNumPy, 0.0, affectedPositions
+        , selfIndices)[0], rtol=1e-10, atol=0.0)
+        exactFields = FindTreeFields(CompiledKernels.TreeFieldsNumPy, 0.0, affectedPositions, selfIndices)
+        assert exactFields[0] == pytest.approx(CompiledKernels.ElectricFieldNumPy(test_SourcePositions
+        , test_SourceCharges, affectedPositions, test_NoMask, False, selfIndices), rel=1e-10, abs=0.0)
+        assert exactFields[1] == pytest.approx(CompiledKernels.MagneticFieldNumPy(test_SourcePositions
+        , test_SourceVelocities, test_SourceCharges, affectedPositions, test_NoMask, False, selfIndices), rel=1e-10, abs=0.0)
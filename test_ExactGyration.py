@@ -0,0 +1,99 @@
+from ParticleBunchClass import ParticleBunch
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
+from SumEMFields import EMFieldClass
+from ExactGyration import ExactGyrationClass
+
+import numpy as np
+import scipy.constants as const
+import scipy
+import math
+import pytest
+import re
+
+test_MagneticField = MagneticExternalFieldClass(magneticFieldStrength=np.array([0, 1e-3, 0])
+, name='test_Magnetic Field', angularFrequency=0.0, phaseShift=0.0
+, listOfDimensions=[[-1*scipy.inf, scipy.inf] for i in range(3)])
+
+# the proton starts at the origin moving along x at 1000 m/s, so it turns towards z on a circle
+# of radius 1.04e-2 m and reaches the electric field at x = 5e-3 m
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([1e3, 0, 0])
+, listOfDimensions=[[5e-3, 1], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+, angularFrequency=0.0, phaseShift=0.0, name='test_Electric Field')
+
+test_ExactGyration = ExactGyrationClass(name='test_Exact Gyration')
+
+# time taken for a proton to circle once in the magnetic field
+test_Period = 2 * const.pi * const.proton_mass / (const.elementary_charge * 1e-3)
+
+def CreateBunch(numberOfParticles:int=1):
+    test_ParticleBunch = ParticleBunch(numberOfParticles=numberOfParticles, bunchPositionSpread=0.0
+    , bunchEnergySpread=0.0, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+    , chargeOfBunch=const.elementary_charge, name="test_Bunch")
+    test_ParticleBunch.arrayOfVelocities[:] = np.array([1000.0, 0, 0])
+    test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch, listOfElectricFields=[test_ElectricField]
+    , listOfMagneticFields=[test_MagneticField])
+    return [test_ParticleBunch, test_EMField]
+
+def test_ExactGyration__repr__():
+    # checks the repr function works
+    assert re.findall("Exact Gyration: test_Exact Gyration", test_ExactGyration.__repr__()) == [
+        "Exact Gyration: test_Exact Gyration"]
+
+def test_FindHelices():
+    # checks that the proton keeps its speed, reaches the top of the circle after half a period and
+    # returns to the origin after a whole period
+    test_ParticleBunch, test_EMField = CreateBunch()
+    radius = const.proton_mass * 1000 / (const.elementary_charge * 1e-3)
+    positions, velocities = test_ExactGyration.FindHelices(test_ParticleBunch, np.array([[0, 1e-3, 0]])
+    , np.array([0.5, 1.0]) * test_Period)
+    assert np.linalg.norm(velocities, axis=2) == pytest.approx(1000.0)
+    assert positions[0, 0] == pytest.approx(np.array([0, 0, 2 * radius]), abs=1e-12)
+    assert positions[1, 0] == pytest.approx(np.zeros(3), abs=1e-12)
+
+def test_Jump():
+    # checks that the jump ends just before the proton reaches the electric field
+    test_ParticleBunch, test_EMField = CreateBunch()
+    radius = const.proton_mass * 1000 / (const.elementary_charge * 1e-3)
+    timeToField = math.asin(5e-3 / radius) / (2 * const.pi) * test_Period
+    jumpTime = test_ExactGyration.Jump(test_ParticleBunch, test_EMField, 0.0, 1e-8, 1.0)
+    # the proton is left less than a thousandth of the timestep from the field
+    assert jumpTime == pytest.approx(timeToField, abs=1e-11)
+    assert jumpTime < timeToField
+    assert test_ParticleBunch.arrayOfPositions[0, 0] < 5e-3
+    # the proton is now next to the electric field, so a timestep of the integrator is taken instead
+    assert test_ExactGyration.Jump(test_ParticleBunch, test_EMField, jumpTime, 1e-8, 1.0) == 0.0
+
+def test_JumpToLongestJump():
+    # checks that a jump ends at the longest jump if no boundary is reached before it
+    test_ParticleBunch, test_EMField = CreateBunch()
+    assert test_ExactGyration.Jump(test_ParticleBunch, test_EMField, 0.0, 1e-7, 2e-6) == 2e-6
+
+def test_NoJumpWithInteractingParticles():
+    # checks that two protons a micrometre apart push each other too strongly to gyrate exactly
+    test_ParticleBunch, test_EMField = CreateBunch(numberOfParticles=2)
+    test_ParticleBunch.arrayOfPositions[1] = np.array([0, 1e-6, 0])
+    assert test_ExactGyration.IsBunchGyrating(test_ParticleBunch, test_EMField, 0.0) == False
+    assert test_ExactGyration.Jump(test_ParticleBunch, test_EMField, 0.0, 1e-6, 1.0) == 0.0
+
+def test_InteractionFieldsOnlyFoundForJump():
+    # checks that the fields between particles are not found while a particle is inside the electric
+    # field, and that the solve made for a jump that is not taken is reused once by the next step
+    test_ParticleBunch, test_EMField = CreateBunch(numberOfParticles=2)
+    test_ParticleBunch.arrayOfPositions[1] = np.array([0, 1e-6, 0])
+    listOfSolves = []
+    generateBunchFields = test_EMField.fieldSolver.GenerateBunchFields
+    test_EMField.fieldSolver.GenerateBunchFields = lambda sourceBunch, affectedBunch: (
+        listOfSolves.append(affectedBunch) or generateBunchFields(sourceBunch, affectedBunch))
+    test_ParticleBunch.arrayOfPositions[:, 0] += 0.5
+    assert test_ExactGyration.Jump(test_ParticleBunch, test_EMField, 0.0, 1e-6, 1.0) == 0.0
+    assert len(listOfSolves) == 0
+    test_ParticleBunch.arrayOfPositions[:, 0] -= 0.5
+    assert test_ExactGyration.Jump(test_ParticleBunch, test_EMField, 0.0, 1e-6, 1.0) == 0.0
+    assert len(listOfSolves) == 1
+    reusedFields = test_EMField.SumOfEMFieldsForBunch(test_ParticleBunch, 0.0)
+    assert len(listOfSolves) == 1
+    newFields = test_EMField.SumOfEMFieldsForBunch(test_ParticleBunch, 0.0)
+    assert len(listOfSolves) == 2
+    assert np.array_equal(reusedFields[0], newFields[0])
+    assert np.array_equal(reusedFields[1], newFields[1])
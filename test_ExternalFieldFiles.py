@@ -49,6 +49,12 @@ def test_ElectricIsParticleInField():
     truthValue = ElectricExternalFieldClass.IsParticleInField(self=test_ElectricExternalField, affectedParticle=test_Particle)
     assert truthValue == 0.0
 
+def test_ElectricIsPositionInField():
+    # test that an array of positions gives the same result as the particle
+    truthValues = test_ElectricExternalField.IsPositionInField(np.array([test_Particle.position
+    , test_Particle.position]))
+    assert truthValues.tolist() == [False, False]
+
 def test_ExternalMagneticField__repr__():
     # checks the repr function works
     assert re.findall(
@@ -78,3 +84,29 @@ def test_GenerateSynchrotronMagneticField():
     fieldArray = test_MagneticSynchrotronField.GenerateField(timeElapsed=1.0, affectedParticle=test_ParticleBunch.listOfParticles[0])
     assert [fieldArray[i] for i in range(3)] == pytest.approx([-5.97251874, -6.82573571, -7.67895267], rel=0.06)
 
+
+def test_GenerateFieldAtPositions():
+    # test that the fields found at an array of positions at once are the same as the fields found at
+    # each particle, for positions inside and outside of the fields
+    test_ListOfPositions = [[-3.5, 10, -7], [4.5, 10, -7], [0.0, 7.0, -10.0], [0.0, 13.0, 0.0]]
+    for field in [test_ElectricExternalField, test_MagneticExternalField, test_MagneticSynchrotronField]:
+        fieldArray = field.GenerateFieldAtPositions(1.0, np.array(test_ListOfPositions))
+        assert fieldArray.shape == (4, 3)
+        for i, position in enumerate(test_ListOfPositions):
+            particle = Particle(position=np.array(position), velocity=np.zeros(3), acceleration=np.zeros(3)
+            , name='test_Particle', restMass=3.0, charge=7.0)
+            assert np.array_equal(fieldArray[i], field.GenerateField(1.0, particle))
+
+def test_FindTimeFactor():
+    # test that the cosine of the field is kept for the time, and found again when the time or the
+    # phase shift changes
+    test_Field = ElectricExternalFieldClass(electricFieldStrength=np.array([4.0, 5.0, 6.0])
+    , angularFrequency=10.0, phaseShift=0.1, listOfDimensions=[[-4, 4], [8, 16], [-16, -8]]
+    , name="test_Electric Field")
+    assert test_Field.FindTimeFactor(1.0) == math.cos(10.0 + 0.1 * 2 * math.pi)
+    assert test_Field.timeFactorCache == [1.0, 10.0, 0.1, math.cos(10.0 + 0.1 * 2 * math.pi)]
+    test_Field.timeFactorCache[3] = 0.5
+    assert test_Field.FindTimeFactor(1.0) == 0.5
+    assert test_Field.FindTimeFactor(2.0) == math.cos(20.0 + 0.1 * 2 * math.pi)
+    test_Field.phaseShift = 0.3
+    assert test_Field.FindTimeFactor(2.0) == math.cos(20.0 + 0.3 * 2 * math.pi)
@@ -0,0 +1,135 @@
+from ParticleBunchClass import ParticleBunch
+from AbstractFieldSolver import AbstractFieldSolverClass
+from DirectSumFieldSolver import DirectSumFieldSolverClass
+from BarnesHutFieldSolver import BarnesHutFieldSolverClass
+from ParticleInCellFieldSolver import ParticleInCellFieldSolverClass
+from SumEMFields import EMFieldClass
+
+import numpy as np
+import scipy.constants as const
+import pytest
+import re
+from copy import deepcopy
+
+test_ParticleBunch = ParticleBunch(numberOfParticles=200, bunchPositionSpread=1e-3
+, bunchEnergySpread=1e-22, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+, chargeOfBunch=const.elementary_charge, name="test_Bunch")
+test_ParticleBunch.arrayOfVelocities[:, 1] = np.random.normal(scale=100, size=200)
+test_DirectSumFieldSolver = DirectSumFieldSolverClass(name="test_Direct Sum")
+test_BarnesHutFieldSolver = BarnesHutFieldSolverClass(openingAngle=0.5, name="test_Barnes-Hut")
+test_ExactBarnesHutFieldSolver = BarnesHutFieldSolverClass(openingAngle=0.0, maximumParticlesPerLeaf=4)
+test_ParticleInCellFieldSolver = ParticleInCellFieldSolverClass(gridResolution=32, name="test_Particle-in-Cell")
+
+def test_BarnesHutFieldSolver__repr__():
+    # checks the repr function works
+    assert re.findall("Barnes-Hut Field Solver: test_Barnes-Hut", test_BarnesHutFieldSolver.__repr__()) == [
+        "Barnes-Hut Field Solver: test_Barnes-Hut"]
+
+def test_DirectSumMatchesEMField():
+    # checks that the direct sum solver gives the same fields as the per particle sum
+    fields = test_DirectSumFieldSolver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+    test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch, listOfElectricFields=[]
+    , listOfMagneticFields=[])
+    particleFields = test_EMField.SumOfEMFields(test_ParticleBunch.listOfParticles[7], timeElapsed=0.0)
+    assert fields[0][7] == pytest.approx(particleFields[0])
+    assert fields[1][7] == pytest.approx(particleFields[1])
+
+def test_GenerateBatchedFields():
+    # checks that each copy of a stacked bunch gets the same fields as the bunch on its own, with the
+    # second copy moved so that the copies do not interact with each other
+    stackedPositions = np.stack([test_ParticleBunch.arrayOfPositions, test_ParticleBunch.arrayOfPositions + 1.0])
+    stackedVelocities = np.stack([test_ParticleBunch.arrayOfVelocities, test_ParticleBunch.arrayOfVelocities])
+    batchedFields = test_DirectSumFieldSolver.GenerateBatchedFields(stackedPositions, stackedVelocities
+    , test_ParticleBunch.arrayOfCharges)
+    chunkedFields = test_DirectSumFieldSolver.GenerateBatchedFields(stackedPositions, stackedVelocities
+    , test_ParticleBunch.arrayOfCharges, chunkSize=3)
+    fields = test_DirectSumFieldSolver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+    for i in range(2):
+        assert batchedFields[0][i] == pytest.approx(fields[0], rel=1e-9)
+        assert batchedFields[1][i] == pytest.approx(fields[1], rel=1e-9)
+        assert np.array_equal(chunkedFields[0][i], batchedFields[0][i])
+        assert np.array_equal(chunkedFields[1][i], batchedFields[1][i])
+
+def test_BarnesHutZeroOpeningAngle():
+    # checks that an opening angle of zero reproduces the direct sum
+    exactFields = test_DirectSumFieldSolver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+    treeFields = test_ExactBarnesHutFieldSolver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+    assert treeFields[0] == pytest.approx(exactFields[0], rel=1e-9)
+    assert treeFields[1] == pytest.approx(exactFields[1], rel=1e-9)
+
+def test_BarnesHutAccuracy():
+    # checks that the tree approximation of the electric and magnetic fields is accurate
+    exactFields = test_DirectSumFieldSolver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+    treeFields = test_BarnesHutFieldSolver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+    for i in range(2):
+        relativeError = (np.linalg.norm(treeFields[i] - exactFields[i], axis=1)
+        / np.linalg.norm(exactFields[i], axis=1))
+        assert np.median(relativeError) < 1e-2
+
+def test_BarnesHutSeparateBunches():
+    # checks that the fields of one bunch at the particles of another, which walk the tree in groups from
+    # their own octree, match the direct sum
+    test_AffectedBunch = deepcopy(test_ParticleBunch)
+    test_AffectedBunch.arrayOfPositions[:] = np.random.normal(scale=2e-3, size=(200, 3))
+    exactFields = test_DirectSumFieldSolver.GenerateBunchFields(test_ParticleBunch, test_AffectedBunch)
+    treeFields = test_ExactBarnesHutFieldSolver.GenerateBunchFields(test_ParticleBunch, test_AffectedBunch)
+    assert treeFields[0] == pytest.approx(exactFields[0], rel=1e-9, abs=0.0)
+    assert treeFields[1] == pytest.approx(exactFields[1], rel=1e-9, abs=0.0)
+
+
+def test_ParticleInCellFieldSolver__repr__():
+    # checks the repr function works
+    assert re.findall("Particle-in-Cell Field Solver: test_Particle-in-Cell"
+    , test_ParticleInCellFieldSolver.__repr__()) == ["Particle-in-Cell Field Solver: test_Particle-in-Cell"]
+
+def test_ParticleInCellDistantParticle():
+    # checks that the grid fields of a single particle match the point fields far from the particle
+    test_SourceBunch = ParticleBunch(numberOfParticles=1, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Source")
+    test_SourceBunch.arrayOfVelocities[0] = np.array([0.0, 0.0, 1e3])
+    test_AffectedBunch = ParticleBunch(numberOfParticles=1, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Affected")
+    test_AffectedBunch.arrayOfPositions[0] = np.array([1.0, 0.0, 0.0])
+    exactFields = test_DirectSumFieldSolver.GenerateBunchFields(test_SourceBunch, test_AffectedBunch)
+    gridFields = test_ParticleInCellFieldSolver.GenerateBunchFields(test_SourceBunch, test_AffectedBunch)
+    assert gridFields[0][0] == pytest.approx(exactFields[0][0], rel=0.02, abs=1e-3 * np.linalg.norm(exactFields[0]))
+    assert gridFields[1][0] == pytest.approx(exactFields[1][0], rel=0.02, abs=1e-3 * np.linalg.norm(exactFields[1]))
+
+def test_ParticleInCellAccuracy():
+    # checks that the grid fields of a bunch are close to the fields of the direct sum
+    exactFields = test_DirectSumFieldSolver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+    gridFields = test_ParticleInCellFieldSolver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+    relativeError = (np.linalg.norm(gridFields[0] - exactFields[0], axis=1)
+    / np.linalg.norm(exactFields[0], axis=1))
+    assert np.median(relativeError) < 0.2
+
+def test_GenerateFieldsAtParticles():
+    # checks that the fields found at some of the particles match the fields found at every particle
+    arrayOfIndices = np.array([3, 50, 199])
+    for solver in [test_DirectSumFieldSolver, test_ExactBarnesHutFieldSolver, test_ParticleInCellFieldSolver]:
+        allFields = solver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+        someFields = solver.GenerateFieldsAtParticles(test_ParticleBunch, arrayOfIndices)
+        assert someFields[0] == pytest.approx(allFields[0][arrayOfIndices], rel=1e-9)
+        assert someFields[1] == pytest.approx(allFields[1][arrayOfIndices], rel=1e-9)
+
+def test_EmptyBunchFields():
+    # checks that every solver gives no fields for an empty bunch, or when no particles are chosen
+    test_EmptyBunch = ParticleBunch(numberOfParticles=0, bunchMeanEnergy=1.5032775929044686e-10
+    , restMassOfBunch=const.proton_mass, name="test_Empty Bunch")
+    for solver in [test_DirectSumFieldSolver, test_BarnesHutFieldSolver, test_ParticleInCellFieldSolver]:
+        for bunch in [test_EmptyBunch, test_ParticleBunch]:
+            fields = solver.GenerateFieldsAtParticles(bunch, np.arange(0))
+            assert fields[0].shape == fields[1].shape == (0, 3)
+        fields = solver.GenerateBunchFields(test_EmptyBunch, test_EmptyBunch)
+        assert fields[0].shape == fields[1].shape == (0, 3)
+
+def test_WeightedFieldSolvers():
+    # checks that every solver finds the fields of macro-particles from their weights multiplied by their
+    # charges, and that the weights do not change the particles that are affected
+    test_WeightedBunch = deepcopy(test_ParticleBunch)
+    test_WeightedBunch.arrayOfWeights[:] = 1e3
+    for test_FieldSolver in [test_DirectSumFieldSolver, test_ExactBarnesHutFieldSolver, test_ParticleInCellFieldSolver]:
+        fields = test_FieldSolver.GenerateBunchFields(test_ParticleBunch, test_ParticleBunch)
+        weightedFields = test_FieldSolver.GenerateBunchFields(test_WeightedBunch, test_WeightedBunch)
+        assert weightedFields[0] == pytest.approx(1e3 * fields[0], rel=1e-9)
+        assert weightedFields[1] == pytest.approx(1e3 * fields[1], rel=1e-9)
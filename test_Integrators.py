@@ -0,0 +1,136 @@
+from ParticleBunchClass import ParticleBunch
+from MagneticExternalField import MagneticExternalFieldClass
+from SumEMFields import EMFieldClass
+from EulerCromerIntegrator import EulerCromerIntegratorClass
+from BorisIntegrator import BorisIntegratorClass
+from VelocityVerletIntegrator import VelocityVerletIntegratorClass
+from RungeKutta4Integrator import RungeKutta4IntegratorClass
+from RungeKutta45Integrator import RungeKutta45IntegratorClass
+from BlockTimestepIntegrator import BlockTimestepIntegratorClass
+from TimestepController import TimestepControllerClass
+from ElectricExternalField import ElectricExternalFieldClass
+
+import numpy as np
+import copy
+import scipy.constants as const
+import scipy
+import pytest
+import re
+
+test_MagneticField = MagneticExternalFieldClass(magneticFieldStrength=np.array([0, 1e-3, 0])
+, name='test_Magnetic Field', angularFrequency=0.0, phaseShift=0.0
+, listOfDimensions=[[-1*scipy.inf, scipy.inf] for i in range(3)])
+
+# time taken for a proton to circle once in the magnetic field
+test_Period = 2 * const.pi * const.proton_mass / (const.elementary_charge * 1e-3)
+
+def GyrateOnce(integrator, numberOfSteps:int, maximumTimestep=None, fractionOfPeriod=1.0):
+    # moves a single proton around one full circle, or the fraction of a circle, and returns its distance
+    # from where it should be
+    test_ParticleBunch = ParticleBunch(numberOfParticles=1, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+    , chargeOfBunch=const.elementary_charge, name="test_Bunch")
+    test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch, listOfElectricFields=[]
+    , listOfMagneticFields=[test_MagneticField])
+    radius = const.proton_mass * np.linalg.norm(test_ParticleBunch.arrayOfVelocities[0]) / (const.elementary_charge * 1e-3)
+    angle = 2 * const.pi * fractionOfPeriod
+    exactPosition = radius * np.array([np.sin(angle), 0, 1 - np.cos(angle)])
+    timeElapsed = 0.0
+    while timeElapsed < fractionOfPeriod * test_Period * (1 - 1e-12):
+        timestep = min(test_Period / numberOfSteps, fractionOfPeriod * test_Period - timeElapsed)
+        timeElapsed += integrator.Step(test_ParticleBunch, test_EMField, timeElapsed, timestep)[0]
+    return np.linalg.norm(test_ParticleBunch.arrayOfPositions[0] - exactPosition)
+
+def test_Integrator__repr__():
+    # checks the repr function works
+    assert re.findall("Runge-Kutta 45 Integrator: test_Integrator", RungeKutta45IntegratorClass(
+        name="test_Integrator").__repr__()) == ["Runge-Kutta 45 Integrator: test_Integrator"]
+
+def test_IntegratorsReturnAfterOnePeriod():
+    # checks that every integrator brings the proton back to where it started after one period.
+    # the radius of the circle is about 1e-2 m
+    for integrator, tolerance in [[EulerCromerIntegratorClass(), 3e-3], [BorisIntegratorClass(), 3e-5]
+    , [VelocityVerletIntegratorClass(), 3e-5], [RungeKutta4IntegratorClass(), 1e-8]]:
+        assert GyrateOnce(integrator, 100) < tolerance
+
+def test_RungeKutta4Order():
+    # checks that halving the timestep makes the error of the fourth order method 16 times smaller
+    errorRatio = GyrateOnce(RungeKutta4IntegratorClass(), 50) / GyrateOnce(RungeKutta4IntegratorClass(), 100)
+    assert errorRatio == pytest.approx(16, rel=0.1)
+
+def test_VelocityVerletOrder():
+    # checks that halving the timestep makes the error of the second order method 4 times smaller
+    errorRatio = GyrateOnce(VelocityVerletIntegratorClass(), 50) / GyrateOnce(VelocityVerletIntegratorClass(), 100)
+    assert errorRatio == pytest.approx(4, rel=0.1)
+
+def test_BorisOrder():
+    # checks that halving the timestep makes the error of the second order method 4 times smaller, part way
+    # round the circle as well as after a whole circle
+    for fractionOfPeriod in [0.3, 1.0]:
+        errorRatio = (GyrateOnce(BorisIntegratorClass(), 50, fractionOfPeriod=fractionOfPeriod)
+        / GyrateOnce(BorisIntegratorClass(), 100, fractionOfPeriod=fractionOfPeriod))
+        assert errorRatio == pytest.approx(4, rel=0.1)
+
+def test_RungeKutta45ErrorControl():
+    # checks that the adaptive method meets its tolerance when it is allowed to take a timestep of a
+    # whole period, and needs fewer field evaluations than the fourth order method for the same accuracy
+    test_RungeKutta45 = RungeKutta45IntegratorClass()
+    adaptiveError = GyrateOnce(test_RungeKutta45, 1)
+    test_RungeKutta4 = RungeKutta4IntegratorClass()
+    fixedError = GyrateOnce(test_RungeKutta4, 100)
+    assert test_RungeKutta45.numberOfRejectedSteps > 0
+    assert adaptiveError < fixedError
+    assert test_RungeKutta45.numberOfFieldEvaluations < test_RungeKutta4.numberOfFieldEvaluations
+
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([1e3, 0, 0])
+, listOfDimensions=[[-0.5, 0.5], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+, angularFrequency=0.0, phaseShift=0.0, name='test_Electric Field')
+
+def CreateGapBunch():
+    # 40 protons, of which 4 start inside the electric field and the rest are far from it
+    np.random.seed(0)
+    test_ParticleBunch = ParticleBunch(numberOfParticles=40, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+    , chargeOfBunch=const.elementary_charge, name="test_Bunch")
+    test_ParticleBunch.arrayOfPositions[:] = np.random.uniform(-2, 2, (40, 3)) + np.array([3.0, 0, 0])
+    test_ParticleBunch.arrayOfPositions[:4, 0] = np.random.uniform(-0.3, 0.3, 4)
+    test_ParticleBunch.arrayOfVelocities[:] = np.random.normal(0, 1e4, (40, 3))
+    test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch, listOfElectricFields=[test_ElectricField]
+    , listOfMagneticFields=[test_MagneticField])
+    return [test_ParticleBunch, test_EMField]
+
+def MoveGapBunch(integrator, timestep, numberOfBlocks:int=5):
+    # moves the bunch for five twentieths of a period and returns the final positions
+    test_ParticleBunch, test_EMField = CreateGapBunch()
+    timeElapsed = 0.0
+    while timeElapsed < numberOfBlocks * test_Period / 20 * (1 - 1e-9):
+        timeElapsed += integrator.Step(test_ParticleBunch, test_EMField, timeElapsed, timestep)[0]
+    return test_ParticleBunch.arrayOfPositions.copy()
+
+def test_BlockTimestepSingleLevel():
+    # checks that when every particle is held on the same level the block integrator moves the bunch
+    # exactly as the Boris integrator does
+    test_Controller = TimestepControllerClass(maximumTimestep=test_Period / 80, minimumTimestep=test_Period / 80)
+    test_BlockTimestep = BlockTimestepIntegratorClass(test_Controller, maximumLevel=4)
+    blockPositions = MoveGapBunch(test_BlockTimestep, test_Period / 20, numberOfBlocks=2)
+    borisPositions = MoveGapBunch(BorisIntegratorClass(), test_Period / 80, numberOfBlocks=2)
+    assert np.array_equal(blockPositions, borisPositions)
+    assert test_BlockTimestep.numberOfParticleSteps == 40 * 8
+    assert test_BlockTimestep.listOfLevelCounts[0][2] == 40
+
+def test_BlockTimestepAccuracy():
+    # checks that the block integrator is closer to a fine Boris integration than a Boris integration
+    # with the block as its timestep, while taking far fewer particle steps than the fine integration
+    test_Controller = TimestepControllerClass(maximumTimestep=test_Period / 20
+    , minimumTimestep=test_Period / 20 / 256)
+    test_BlockTimestep = BlockTimestepIntegratorClass(test_Controller, maximumLevel=8)
+    blockPositions = MoveGapBunch(test_BlockTimestep, test_Period / 20)
+    finePositions = MoveGapBunch(BorisIntegratorClass(), test_Period / 20 / 256)
+    coarsePositions = MoveGapBunch(BorisIntegratorClass(), test_Period / 20)
+    blockErrors = np.linalg.norm(blockPositions - finePositions, axis=1)
+    coarseErrors = np.linalg.norm(coarsePositions - finePositions, axis=1)
+    assert np.all(blockErrors < coarseErrors)
+    # the particles far from the electric field only need the steps set by their gyration
+    assert np.max(blockErrors[4:]) < 0.2 * np.max(coarseErrors[4:])
+    assert test_BlockTimestep.numberOfParticleSteps < 0.2 * 40 * 256 * 5
+    assert len(test_BlockTimestep.timestepController.ReportTimestepHistory()) == 5
@@ -0,0 +1,88 @@
+from LegacyResults import (FindLegacySimulationType, ConvertLegacyResults, LoadLegacyResults, ConvertLegacyDirectory
+, IsConversionCurrent)
+from ColumnarResults import ColumnarResultsClass
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
+from ParticleBunchClass import ParticleBunch
+from SumEMFields import EMFieldClass
+from SimulationStandard import SimulationStandardClass
+
+import scipy.constants as const
+import scipy
+import numpy as np
+import pandas as pd
+import pytest
+import shutil
+import os
+
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([1e5, 0, 0])
+, listOfDimensions=[[-0.5, 0.5], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+, angularFrequency=1e-7 * const.elementary_charge / const.proton_mass
+, phaseShift=0.0, name='test_Electric Field')
+
+test_MagneticField = MagneticExternalFieldClass(magneticFieldStrength=np.array([0, 1e-7, 0])
+, name='test_Magnetic Field', angularFrequency=0.0, phaseShift=0.0
+, listOfDimensions=[[-1*scipy.inf, scipy.inf] for i in range(3)])
+
+test_ParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch
+, listOfElectricFields=[test_ElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_Simulation = SimulationStandardClass(totalEMField=test_EMField, particleBunch=test_ParticleBunch
+, duration=1e-3, largeTimestep=1e-4, smallTimestep=1e-4)
+test_Simulation.RunSimulation()
+
+def test_FindLegacySimulationType():
+    # checks that the simulation is found from the columns of the dataframe in any order
+    assert FindLegacySimulationType(['Spread', 'Time', 'Simulation', 'Energy']) == 'SimulationStandardClass'
+    assert FindLegacySimulationType(['Phase', 'FinalSpread']) == 'SimulationPhaseChangeClass'
+    assert FindLegacySimulationType(['Run', 'FinalMeanEnergy']) is None
+
+def test_ConvertStandardResults(tmp_path):
+    # saves the standard simulation to a .pkl file, converts it and checks every record of the particles
+    pickledFile = str(tmp_path / 'standard')
+    test_Simulation.SaveSimulation(pickledFile)
+    assert ConvertLegacyResults(pickledFile) == pickledFile
+    test_Results = ColumnarResultsClass(pickledFile)
+    assert test_Results.metadata['simulationType'] == 'SimulationStandardClass'
+    assert test_Results.listOfColumns == ['Time', 'Energy', 'Spread', 'Positions', 'Velocities', 'Accelerations']
+    assert test_Results.Time.tolist() == test_Simulation.simulationTime
+    assert test_Results.Positions.shape == (len(test_Simulation.simulationState), 3, 3)
+    for i, state in enumerate(test_Simulation.simulationState):
+        assert test_Results.Velocities[i].tolist() == [j.velocity.tolist() for j in state]
+    assert test_Results.metadata['listOfParticleNames'][2] == 'test_Particle Bunch 3'
+
+def test_ConvertUnknownResults(tmp_path):
+    # checks that a .pkl file that was not saved by a simulation is refused
+    pd.DataFrame({'Run':[0, 1]}).to_pickle(str(tmp_path / 'table.pkl'))
+    with pytest.raises(ValueError):
+        ConvertLegacyResults(str(tmp_path / 'table'))
+
+def test_LoadLegacyResults(tmp_path):
+    # checks that a .pkl result is only converted the first time it is read
+    pickledFile = str(tmp_path / 'standard')
+    test_Simulation.SaveSimulation(pickledFile)
+    assert not IsConversionCurrent(pickledFile)
+    test_Results = LoadLegacyResults(pickledFile)
+    assert IsConversionCurrent(pickledFile)
+    metadataTime = os.path.getmtime(os.path.join(pickledFile, 'metadata.json'))
+    assert LoadLegacyResults(pickledFile).Energy.tolist() == test_Results.Energy.tolist()
+    assert os.path.getmtime(os.path.join(pickledFile, 'metadata.json')) == metadataTime
+
+def test_ConvertLegacyDirectory(tmp_path):
+    # converts a directory of a saved phase change result, a standard result and a table that is not a
+    # result with a pool of two processes
+    shutil.copy('phase change simulation 48 segments.pkl', str(tmp_path))
+    test_Simulation.SaveSimulation(str(tmp_path / 'standard'))
+    pd.DataFrame({'Run':[0, 1]}).to_pickle(str(tmp_path / 'table.pkl'))
+    dictionaryOfResults = ConvertLegacyDirectory(str(tmp_path), str(tmp_path / 'converted'), numberOfWorkers=2)
+    assert dictionaryOfResults[str(tmp_path / 'table.pkl')] is None
+    assert dictionaryOfResults[str(tmp_path / 'standard.pkl')] == str(tmp_path / 'converted' / 'standard')
+    test_Results = ColumnarResultsClass(str(tmp_path / 'converted' / 'phase change simulation 48 segments'))
+    legacyDataFrame = pd.read_pickle('phase change simulation 48 segments.pkl')
+    assert test_Results.FinalSpread.tolist() == legacyDataFrame.FinalSpread.tolist()
+    assert len(test_Results.Phase) == 49
@@ -0,0 +1,28 @@
+from LowDiscrepancy import FindNormalPoints
+
+import numpy as np
+import scipy.special
+import pytest
+
+qmc = pytest.importorskip("scipy.stats.qmc")
+
+def test_ScrambledPointsAreStratified():
+    # checks that the first 2**8 points of each scrambled sequence put one point in each of 2**8 equal
+    # intervals of the Sobol dimensions, and of the first Halton dimension, which is in base 2
+    test_Points = scipy.special.ndtr(FindNormalPoints(qmc.Sobol(d=4, scramble=True
+    , seed=np.random.default_rng(1)), 0, 256))
+    for dimension in range(4):
+        assert len(set(np.floor(test_Points[:, dimension] * 256).astype(int))) == 256
+    test_Points = scipy.special.ndtr(FindNormalPoints(qmc.Halton(d=4, scramble=True
+    , seed=np.random.default_rng(1)), 0, 256))
+    assert len(set(np.floor(test_Points[:, 0] * 256).astype(int))) == 256
+
+def test_NormalPointsInChunks():
+    # checks that the points do not depend on the chunks they are made in, and are finite
+    for sequenceClass in [qmc.Sobol, qmc.Halton]:
+        sequence = sequenceClass(d=4, scramble=True, seed=np.random.default_rng(2))
+        test_Points = FindNormalPoints(sequence, 0, 100)
+        assert np.array_equal(test_Points, np.vstack([FindNormalPoints(sequence, 0, 30)
+        , FindNormalPoints(sequence, 30, 100)]))
+        assert np.array_equal(test_Points[60:], FindNormalPoints(sequence, 60, 100))
+        assert np.all(np.isfinite(test_Points))
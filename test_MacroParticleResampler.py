@@ -0,0 +1,107 @@
+from MacroParticleResampler import MacroParticleResamplerClass
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
+from ParticleBunchClass import ParticleBunch
+from SumEMFields import EMFieldClass
+from SimulationStandard import SimulationStandardClass
+from TrajectoryRecorder import TrajectoryRecorderClass
+
+import scipy.constants as const
+import scipy
+import numpy as np
+import pytest
+import re
+
+test_Resampler = MacroParticleResamplerClass(maximumNumberOfParticles=300, stepInterval=5, seed=2
+, name='test_Resampler')
+
+def CreateBunch():
+    """ Function that returns a bunch of 400 macro-particles of weight 1e6, with a spread in velocity in y.
+    """
+    particleBunch = ParticleBunch(numberOfParticles=400, bunchPositionSpread=1e-3, bunchEnergySpread=1e-14
+    , bunchMeanEnergy=1.01 * const.proton_mass * const.speed_of_light ** 2, restMassOfBunch=const.proton_mass
+    , name='test_Bunch', seed=1, macroParticleWeight=1e6)
+    particleBunch.arrayOfVelocities[:, 1] = np.random.default_rng(0).normal(scale=1e3, size=400)
+    return particleBunch
+
+def FindTotals(particleBunch):
+    """ Function that returns the total weight, charge, momentum and energy of a bunch.
+    """
+    weights = particleBunch.arrayOfWeights
+    momenta = (particleBunch.FindLorentzFactors() * particleBunch.arrayOfRestMasses)[:, np.newaxis] * (
+        particleBunch.arrayOfVelocities)
+    return [np.sum(weights), np.sum(weights * particleBunch.arrayOfCharges)
+    , np.sum(weights[:, np.newaxis] * momenta, axis=0), np.sum(weights * particleBunch.FindTotalEnergies())]
+
+def test_MacroParticleResampler__repr__():
+    # checks the repr function works
+    assert re.findall("Macro-Particle Resampler: test_Resampler", test_Resampler.__repr__()) == [
+        "Macro-Particle Resampler: test_Resampler"]
+
+def test_IsResamplingStep():
+    # checks that the bunch is resampled every stepInterval steps from the first
+    test_Resampler.Reset()
+    assert [test_Resampler.IsResamplingStep() for i in range(11)] == [i % 5 == 0 for i in range(11)]
+
+def test_MergeCore():
+    # checks that a bunch above the maximum number of particles is merged down to it, keeping its charge
+    # and momentum, and its energy within the tolerance
+    test_Bunch = CreateBunch()
+    initialTotals = FindTotals(test_Bunch)
+    test_Resampler.Reset()
+    while test_Bunch.numberOfParticles > 300:
+        assert test_Resampler.Resample(test_Bunch)[1] > 0
+    finalTotals = FindTotals(test_Bunch)
+    assert test_Bunch.numberOfParticles == 300
+    assert test_Bunch.listOfParticles[-1].arrayOfPositions is test_Bunch.arrayOfPositions
+    assert finalTotals[0] == pytest.approx(initialTotals[0], rel=1e-12)
+    assert finalTotals[1] == pytest.approx(initialTotals[1], rel=1e-12)
+    assert finalTotals[2] == pytest.approx(initialTotals[2], rel=1e-12)
+    assert finalTotals[3] == pytest.approx(initialTotals[3], rel=1e-6)
+    assert test_Resampler.energyChange == pytest.approx(finalTotals[3] - initialTotals[3], rel=1e-3)
+
+def test_SplitHalo():
+    # checks that a bunch below the maximum number of particles has its halo particles split, furthest
+    # first, keeping its charge, momentum and energy
+    test_Bunch = CreateBunch()
+    distances = np.linalg.norm((test_Bunch.arrayOfPositions - np.mean(test_Bunch.arrayOfPositions, axis=0))
+    / np.std(test_Bunch.arrayOfPositions, axis=0), axis=1)
+    furthestPosition = test_Bunch.arrayOfPositions[np.argmax(distances)].copy()
+    initialTotals = FindTotals(test_Bunch)
+    test_SplittingResampler = MacroParticleResamplerClass(maximumNumberOfParticles=404, haloDistance=2.5
+    , minimumWeight=1e6 / 2, seed=2)
+    assert test_SplittingResampler.Resample(test_Bunch) == [4, 0]
+    # the halves of a particle can not be split again below the minimum weight
+    test_SplittingResampler.maximumNumberOfParticles = 1000
+    numberOfSplits = test_SplittingResampler.Resample(test_Bunch)[0]
+    assert test_Bunch.numberOfParticles == 404 + numberOfSplits
+    assert np.min(test_Bunch.arrayOfWeights) == 1e6 / 2
+    finalTotals = FindTotals(test_Bunch)
+    for i in range(4):
+        assert finalTotals[i] == pytest.approx(initialTotals[i], rel=1e-12)
+    halves = np.flatnonzero(np.all(np.isclose(test_Bunch.arrayOfPositions, furthestPosition, rtol=0, atol=1e-4)
+    , axis=1) & (test_Bunch.arrayOfWeights == 1e6 / 2))
+    assert np.mean(test_Bunch.arrayOfPositions[halves], axis=0) == pytest.approx(furthestPosition, rel=1e-9)
+
+def test_ResampledSimulation(tmp_path):
+    # runs a simulation that resamples its bunch and checks that the number of particles is held at the
+    # maximum and the weight of the bunch does not change, and that it can not be recorded by a
+    # trajectory recorder
+    test_Bunch = CreateBunch()
+    test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([1e5, 0, 0])
+    , listOfDimensions=[[-0.5, 0.5], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+    , name='test_Electric Field')
+    test_EMField = EMFieldClass(bunchOfParticles=test_Bunch, listOfElectricFields=[test_ElectricField]
+    , listOfMagneticFields=[], name='test_EM Field')
+    test_Simulation = SimulationStandardClass(totalEMField=test_EMField, particleBunch=test_Bunch
+    , duration=1e-7, largeTimestep=1e-8, smallTimestep=1e-8
+    , resampler=MacroParticleResamplerClass(maximumNumberOfParticles=350, stepInterval=2))
+    test_Simulation.RunSimulation()
+    assert test_Bunch.numberOfParticles == 350
+    assert len(test_Simulation.simulationState[0]) < 400
+    assert np.sum(test_Bunch.arrayOfWeights) == pytest.approx(400e6, rel=1e-12)
+    assert test_Simulation.resampler.numberOfMerges == 50
+
+    test_Simulation.trajectoryRecorder = TrajectoryRecorderClass(str(tmp_path / 'recording'))
+    with pytest.raises(ValueError):
+        test_Simulation.RunSimulation()
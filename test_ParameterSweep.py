@@ -0,0 +1,98 @@
+from ParameterSweep import ParameterSweepClass, SetAttributeFromPath, SplitAttributePath
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
+from ParticleBunchClass import ParticleBunch
+from SumEMFields import EMFieldClass
+from SimulationStandard import SimulationStandardClass
+
+import scipy.constants as const
+import scipy
+import numpy as np
+import pytest
+import re
+from copy import deepcopy
+
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([1e5, 0, 0])
+, listOfDimensions=[[-0.5, 0.5], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+, angularFrequency=1e-7 * const.elementary_charge / const.proton_mass
+, phaseShift=0.0, name='test_Electric Field')
+
+test_MagneticField = MagneticExternalFieldClass(magneticFieldStrength=np.array([0, 1e-7, 0])
+, name='test_Magnetic Field', angularFrequency=0.0, phaseShift=0.0
+, listOfDimensions=[[-1*scipy.inf, scipy.inf] for i in range(3)])
+
+test_ParticleBunch = ParticleBunch(numberOfParticles=2, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch
+, listOfElectricFields=[test_ElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_Simulation = SimulationStandardClass(totalEMField=test_EMField, particleBunch=test_ParticleBunch
+, duration=1e-3, largeTimestep=1e-4, smallTimestep=1e-4)
+
+test_GridSweep = ParameterSweepClass(test_Simulation, {'totalEMField.listOfElectricFields[0].fieldStrength[0]':[1e5, 2e5]
+, 'totalEMField.listOfMagneticFields[0].angularFrequency':[0.0, 1.0, 2.0]}, name='test_Grid Sweep')
+
+test_LatinHypercubeSweep = ParameterSweepClass(test_Simulation, {'smallTimestep':[1e-6, 1e-4]
+, 'particleBunch.bunchEnergySpread':[1e-23, 1e-22]}, design='latin hypercube', numberOfSamples=4, seed=1)
+
+def test_ParameterSweep__repr__():
+    # checks the repr function works
+    assert re.findall("Parameter Sweep: test_Grid Sweep, Design: grid, Number of Runs: 6"
+    , test_GridSweep.__repr__()) == ["Parameter Sweep: test_Grid Sweep, Design: grid, Number of Runs: 6"]
+
+def test_UnknownDesign():
+    # checks that a design that does not exist is refused
+    with pytest.raises(ValueError):
+        ParameterSweepClass(test_Simulation, {'smallTimestep':[1e-6, 1e-4]}, design='sobol')
+
+def test_GridDesign():
+    # checks that the grid has every combination of the values
+    assert len(test_GridSweep.listOfParameterSets) == 6
+    assert test_GridSweep.listOfParameterSets[4] == {'totalEMField.listOfElectricFields[0].fieldStrength[0]':2e5
+    , 'totalEMField.listOfMagneticFields[0].angularFrequency':1.0}
+
+def test_LatinHypercubeDesign():
+    # checks that each parameter has one sample in each quarter of its bounds
+    smallTimesteps = np.array([i['smallTimestep'] for i in test_LatinHypercubeSweep.listOfParameterSets])
+    quarters = np.floor((smallTimesteps - 1e-6) / ((1e-4 - 1e-6) / 4))
+    assert sorted(quarters.tolist()) == [0.0, 1.0, 2.0, 3.0]
+
+def test_SplitAttributePath():
+    # checks that a path is split into attribute names and indices
+    assert SplitAttributePath('totalEMField.listOfElectricFields[0].fieldStrength[1]') == ['totalEMField'
+    , 'listOfElectricFields', 0, 'fieldStrength', 1]
+
+def test_SetAttributeFromPath():
+    # checks that an element of a field strength is set on a copy of the array, so the original
+    # simulation is not changed, and that changing the bunch spread creates the particles again
+    test_CopyOfSimulation = deepcopy(test_Simulation)
+    SetAttributeFromPath(test_CopyOfSimulation, 'totalEMField.listOfElectricFields[0].fieldStrength[1]', 3.0)
+    assert test_CopyOfSimulation.totalEMField.listOfElectricFields[0].fieldStrength.tolist() == [1e5, 3.0, 0.0]
+    assert test_ElectricField.fieldStrength.tolist() == [1e5, 0.0, 0.0]
+    SetAttributeFromPath(test_CopyOfSimulation, 'particleBunch.numberOfParticles', 5)
+    assert test_CopyOfSimulation.particleBunch.arrayOfPositions.shape == (5, 3)
+    assert test_CopyOfSimulation.totalEMField.bunchOfParticles.numberOfParticles == 5
+
+def test_RunSweepWorkers():
+    # runs the grid sweep one run at a time and across two processes, and checks that the result tables
+    # are the same and in the order of the grid
+    test_ParallelGridSweep = deepcopy(test_GridSweep)
+    test_ParallelGridSweep.numberOfWorkers = 2
+    serialTable = test_GridSweep.RunSweep()
+    parallelTable = test_ParallelGridSweep.RunSweep()
+    assert list(serialTable.columns[:3]) == ['Run', 'totalEMField.listOfElectricFields[0].fieldStrength[0]'
+    , 'totalEMField.listOfMagneticFields[0].angularFrequency']
+    assert serialTable.equals(parallelTable)
+    # the stronger accelerating field moves the bunch further
+    assert serialTable.FinalMeanX[3] > serialTable.FinalMeanX[0]
+    assert test_Simulation.simulationTime == []
+
+def test_RunSweepSeeded():
+    # checks that a seeded sweep that creates its bunch again gives the same results each time
+    firstTable = deepcopy(test_LatinHypercubeSweep).RunSweep()
+    secondTable = deepcopy(test_LatinHypercubeSweep).RunSweep()
+    assert firstTable.equals(secondTable)
+    assert len(set(firstTable.FinalMeanX)) == 4
@@ -70,4 +70,14 @@ def test_GenerateElectricField():
 def test_GenerateMagneticField():
     # check that a magnetic field can be created by a particle and is the correct vector at a distance
     assert test_Particle.magneticField.GenerateField(affectedParticle=test_Particle2) == pytest.approx(
-        np.array([3.64049352e-09, -7.28098705e-09,  3.64049352e-09]))
\ No newline at end of file
+        np.array([3.64049352e-09, -7.28098705e-09,  3.64049352e-09]))
+
+def test_LegacyParticleState():
+    # checks that particles pickled before particles became views of arrays can be restored
+    test_LegacyParticle = Particle.__new__(Particle)
+    test_LegacyParticle.__setstate__({'name':'test_Legacy Particle', 'position':np.array([1.0, 2.0, 3.0])
+    , 'velocity':np.array([4.0, 5.0, 6.0]), 'acceleration':np.array([0.0, 0.0, 0.0]), 'restMass':3.0
+    , 'charge':7.0})
+    assert test_LegacyParticle.position.tolist() == [1.0, 2.0, 3.0]
+    assert test_LegacyParticle.charge == 7.0
+    assert test_LegacyParticle.weight == 1.0
@@ -1,6 +1,7 @@
 from ParticleBunchClass import ParticleBunch, np, math, const, Particle
 import re
 import pytest
+import pickle
 
 test_ParticleBunch = ParticleBunch(numberOfParticles=1000, bunchPositionSpread=1.0
 , bunchEnergySpread=1e-22, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
@@ -43,4 +44,186 @@ def test_FindBunchMeanVelocity():
 
 def test_FindBunchMeanMomentum():
     # checks that the method for finding the mean momentum of particles in the bunch is correct
-    assert test_ParticleBunch.FindBunchMeanMomentum()[0] == pytest.approx(1.672621898e-24, rel=0.05)
\ No newline at end of file
+    assert test_ParticleBunch.FindBunchMeanMomentum()[0] == pytest.approx(1.672621898e-24, rel=0.05)
+
+def test_ParticlesAreViewsOfBunchArrays():
+    # checks that particles in the bunch share their state with the arrays of the bunch
+    test_Bunch = ParticleBunch(numberOfParticles=5, bunchPositionSpread=1.0, bunchEnergySpread=1e-22
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=1.0
+    , name="test_Bunch")
+    test_Bunch.listOfParticles[2].position = np.array([1.0, 2.0, 3.0])
+    assert test_Bunch.arrayOfPositions[2].tolist() == [1.0, 2.0, 3.0]
+    test_Bunch.arrayOfVelocities[2] = np.array([4.0, 5.0, 6.0])
+    assert test_Bunch.listOfParticles[2].velocity.tolist() == [4.0, 5.0, 6.0]
+    assert test_Bunch.arrayOfPositions.shape == (5, 3)
+
+def test_ParticlesAreCreatedWhenUsed():
+    # checks that the particle objects are only created when the list of particles is first used, and
+    # are then views of the arrays as they are at that time
+    test_Bunch = ParticleBunch(numberOfParticles=5, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch", seed=3)
+    test_Bunch.UpdateCromer(deltaT=2.0)
+    assert test_Bunch.__dict__['listOfParticles'] is None
+    assert test_Bunch.FindParticleNames() == ["test_Bunch %s"%(i) for i in range(1, 6)]
+    assert test_Bunch.listOfParticles[4].position.tolist() == test_Bunch.arrayOfPositions[4].tolist()
+    assert test_Bunch.listOfParticles is test_Bunch.listOfParticles
+    test_Bunch.listOfParticles[4].name = "Renamed"
+    assert test_Bunch.FindParticleNames()[4] == "Renamed"
+
+def test_BunchUpdateCromer():
+    # checks that the whole bunch is updated with the euler cromer method
+    test_Bunch = ParticleBunch(numberOfParticles=2, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch")
+    test_Bunch.listOfParticles[1].acceleration = np.array([1.0, 2.0, 3.0])
+    test_Bunch.UpdateCromer(deltaT=2.0)
+    assert test_Bunch.listOfParticles[1].velocity == pytest.approx(np.array([1002.0, 4.0, 6.0]), rel=0.01)
+    assert test_Bunch.listOfParticles[1].position == pytest.approx(np.array([2004.0, 8.0, 12.0]), rel=0.01)
+
+def test_BunchUpdateBorisConservesSpeedInMagneticField():
+    # checks that the boris method keeps the speed of particles fixed in a pure magnetic field
+    test_Bunch = ParticleBunch(numberOfParticles=2, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+    , chargeOfBunch=const.elementary_charge, name="test_Bunch")
+    initialSpeed = np.linalg.norm(test_Bunch.arrayOfVelocities, axis=1)
+    arrayOfMagneticFields = np.array([[0.0, 1e-3, 0.0] for i in range(2)])
+    for i in range(1000):
+        test_Bunch.UpdateBoris(1e-6, np.zeros((2, 3)), arrayOfMagneticFields)
+    assert np.linalg.norm(test_Bunch.arrayOfVelocities, axis=1) == pytest.approx(initialSpeed, rel=1e-12)
+    assert test_Bunch.arrayOfVelocities[0, 2] != 0.0
+
+def test_BunchUpdateBorisBelowSpeedOfLight():
+    # checks that a very large electric field can not push a particle faster than light, and that the
+    # particle can still be updated with a finite Lorentz factor afterwards
+    test_Bunch = ParticleBunch(numberOfParticles=2, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+    , chargeOfBunch=const.elementary_charge, name="test_Bunch")
+    for fieldStrength in [1e12, 1e15, 1e15]:
+        arrayOfElectricFields = np.array([[fieldStrength, 0.0, 0.0] for i in range(2)])
+        test_Bunch.UpdateBoris(1.0, arrayOfElectricFields, np.zeros((2, 3)))
+        assert np.all(np.linalg.norm(test_Bunch.arrayOfVelocities, axis=1) < const.speed_of_light)
+        assert np.all(np.isfinite(test_Bunch.FindLorentzFactors()))
+        assert np.all(np.isfinite(test_Bunch.arrayOfPositions))
+
+def test_FindBunchStatistics():
+    # checks the statistics of one pass against the energy and momentum of each particle
+    test_Bunch = ParticleBunch(numberOfParticles=50, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch")
+    listOfEnergies = [i.TotalEnergy() for i in test_Bunch.listOfParticles]
+    dictionaryOfStatistics = test_Bunch.FindBunchStatistics()
+    assert dictionaryOfStatistics['MeanEnergy'] == pytest.approx(np.mean(listOfEnergies), rel=1e-12)
+    assert dictionaryOfStatistics['EnergySpread'] == pytest.approx(np.std(listOfEnergies), rel=1e-6)
+    assert dictionaryOfStatistics['MeanMomentum'] == pytest.approx(
+        np.mean([i.Momentum() for i in test_Bunch.listOfParticles], axis=0), rel=1e-12)
+    assert test_Bunch.FindTotalEnergies() == pytest.approx(listOfEnergies, rel=1e-12)
+
+def test_BunchStatisticsCache():
+    # checks that the statistics are reused until the state of a particle changes
+    test_Bunch = ParticleBunch(numberOfParticles=5, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch")
+    dictionaryOfStatistics = test_Bunch.FindBunchStatistics()
+    assert test_Bunch.FindBunchStatistics() is dictionaryOfStatistics
+    test_Bunch.FindBunchMeanPosition()[0] = 1.0
+    assert test_Bunch.FindBunchStatistics() is dictionaryOfStatistics
+    test_Bunch.listOfParticles[3].position = np.array([1.0, 0.0, 0.0])
+    assert test_Bunch.FindBunchStatistics() is not dictionaryOfStatistics
+    assert test_Bunch.FindBunchMeanPosition()[0] == pytest.approx(np.mean(test_Bunch.arrayOfPositions[:, 0]))
+
+def test_FindBunchEmittance():
+    # checks that a bunch whose momentum grows in step with its position has no emittance in x, and that
+    # the emittance in y is the product of the spread of position and momentum if they are unrelated
+    test_Bunch = ParticleBunch(numberOfParticles=4, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch")
+    test_Bunch.arrayOfPositions[:] = np.array([[-2e-3, -1e-3, 0], [-1e-3, 1e-3, 0], [1e-3, -1e-3, 0], [2e-3, 1e-3, 0]])
+    test_Bunch.arrayOfVelocities[:] = np.array([[1e3 - 2, 10, 0], [1e3 - 1, 10, 0], [1e3 + 1, -10, 0], [1e3 + 2, -10, 0]])
+    emittance = test_Bunch.FindBunchEmittance()
+    assert emittance[0] == pytest.approx(0.0, abs=1e-20)
+    assert emittance[1] == pytest.approx(1e-3 * 10 / const.speed_of_light, rel=1e-6)
+
+def test_SeededBunch():
+    # checks that a seed makes the bunch repeatable whatever the size of the chunks it is drawn in, and that
+    # the global random state of numpy makes a bunch without a seed repeatable
+    test_Bunch = ParticleBunch(numberOfParticles=10, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch", seed=3)
+    test_ChunkedBunch = ParticleBunch(numberOfParticles=10, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch", seed=3
+    , chunkSize=3)
+    assert np.array_equal(test_Bunch.arrayOfPositions, test_ChunkedBunch.arrayOfPositions)
+    assert np.array_equal(test_Bunch.arrayOfVelocities, test_ChunkedBunch.arrayOfVelocities)
+    assert test_ChunkedBunch.listOfParticles[9].position.tolist() == test_Bunch.arrayOfPositions[9].tolist()
+    assert test_ChunkedBunch.listOfParticles[9].name == "test_Bunch 10"
+
+    listOfBunches = []
+    for i in range(2):
+        np.random.seed(5)
+        listOfBunches.append(ParticleBunch(numberOfParticles=4, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+        , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch"))
+    assert np.array_equal(listOfBunches[0].arrayOfPositions, listOfBunches[1].arrayOfPositions)
+
+def test_EnergyBelowRestEnergy():
+    # checks that a bunch can not be made with less than the rest energy of its particles
+    with pytest.raises(ValueError):
+        ParticleBunch(numberOfParticles=2, bunchPositionSpread=1e-3, bunchEnergySpread=0.0
+        , bunchMeanEnergy=1e-10, restMassOfBunch=const.proton_mass, name="test_Bunch")
+
+def test_LowDiscrepancyBunch():
+    # checks that the positions and energies of a bunch drawn from each low-discrepancy sequence are
+    # closer to the mean and spread asked for than those of a random bunch, and do not depend on the
+    # size of the chunks they are drawn in
+    pytest.importorskip("scipy.stats.qmc")
+    listOfErrors = []
+    for samplingMethod in ['random', 'sobol', 'halton']:
+        test_Bunch = ParticleBunch(numberOfParticles=256, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+        , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch", seed=7
+        , samplingMethod=samplingMethod)
+        test_ChunkedBunch = ParticleBunch(numberOfParticles=256, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+        , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch", seed=7
+        , chunkSize=100, samplingMethod=samplingMethod)
+        assert np.array_equal(test_Bunch.arrayOfPositions, test_ChunkedBunch.arrayOfPositions)
+        assert np.array_equal(test_Bunch.arrayOfVelocities, test_ChunkedBunch.arrayOfVelocities)
+        listOfErrors.append(max(np.max(np.abs(test_Bunch.arrayOfPositions.mean(axis=0))) / 1e-3
+        , np.max(np.abs(test_Bunch.arrayOfPositions.std(axis=0) - 1e-3)) / 1e-3))
+    assert listOfErrors[1] < 0.02
+    assert listOfErrors[2] < 0.02
+    assert listOfErrors[0] > 2 * max(listOfErrors[1:])
+
+def test_SamplingMethodNotKnown():
+    # checks that a bunch can not be made with a sampling method that does not exist
+    with pytest.raises(ValueError):
+        ParticleBunch(numberOfParticles=2, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+        , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch"
+        , samplingMethod='grid')
+
+def test_WeightedBunchStatistics():
+    # checks that a bunch of weighted macro-particles has the statistics of a bunch where each particle
+    # is repeated as many times as its weight
+    test_Bunch = ParticleBunch(numberOfParticles=4, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch", seed=2)
+    test_Bunch.arrayOfVelocities[:, 1] = [10.0, -20.0, 30.0, 5.0]
+    test_Bunch.arrayOfWeights[:] = [3.0, 1.0, 2.0, 1.0]
+    test_RepeatedBunch = ParticleBunch(numberOfParticles=1, bunchEnergySpread=1e-22
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch")
+    test_RepeatedBunch.listOfParticles = [Particle(position=test_Bunch.arrayOfPositions[i]
+    , velocity=test_Bunch.arrayOfVelocities[i], restMass=const.proton_mass)
+    for i in [0, 0, 0, 1, 2, 2, 3]]
+    dictionaryOfStatistics = test_Bunch.FindBunchStatistics()
+    dictionaryOfRepeatedStatistics = test_RepeatedBunch.FindBunchStatistics()
+    for key in dictionaryOfStatistics:
+        assert dictionaryOfStatistics[key] == pytest.approx(dictionaryOfRepeatedStatistics[key], rel=1e-9)
+    assert test_Bunch.FindSourceCharges().tolist() == (test_Bunch.arrayOfWeights * const.elementary_charge).tolist()
+
+def test_MacroParticleBunch():
+    # checks that the particles of a bunch are created with its macro-particle weight and are views of its
+    # weights, and that a bunch pickled before particles had weights is given weights of 1
+    test_Bunch = ParticleBunch(numberOfParticles=3, bunchPositionSpread=1e-3, bunchEnergySpread=1e-22
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch"
+    , macroParticleWeight=1e6)
+    assert test_Bunch.listOfParticles[2].weight == 1e6
+    test_Bunch.listOfParticles[2].weight = 5e5
+    assert test_Bunch.arrayOfWeights.tolist() == [1e6, 1e6, 5e5]
+
+    test_LegacyBunch = ParticleBunch.__new__(ParticleBunch)
+    legacyState = {key: value for key, value in pickle.loads(pickle.dumps(test_Bunch)).__dict__.items()
+    if key not in ['arrayOfWeights', 'macroParticleWeight']}
+    test_LegacyBunch.__setstate__(legacyState)
+    assert test_LegacyBunch.arrayOfWeights.tolist() == [1.0, 1.0, 1.0]
+    assert test_LegacyBunch.listOfParticles[1].arrayOfWeights is test_LegacyBunch.arrayOfWeights
@@ -40,3 +40,27 @@ def test_GenerateMagneticField():
     # test that the magnetic field is calculated correctly
     assert test_PointMagneticField.GenerateField(test_Particle2) == pytest.approx(
         np.array([-9.04695408e-07,  6.84596832e-07, -6.10999201e-08]), rel=0.06)
+
+def test_GenerateElectricFieldFromArrays():
+    # test that the array kernel gives the same electric field as the pairwise method
+    arrayOfFields = PointElectricFieldClass.GenerateFieldFromArrays(np.array([test_Particle.position])
+    , np.array([test_Particle.charge]), np.array([test_Particle2.position]))
+    assert arrayOfFields[0] == pytest.approx(test_PointElectricField.GenerateField(test_Particle2))
+
+def test_GenerateMagneticFieldFromArrays():
+    # test that the array kernel gives the same magnetic field as the pairwise method
+    # and that masked pairs do not contribute
+    arrayOfFields = PointMagneticFieldClass.GenerateFieldFromArrays(np.array([test_Particle.position])
+    , np.array([test_Particle.velocity]), np.array([test_Particle.charge])
+    , np.array([test_Particle2.position, test_Particle.position]), interactionMask=np.array([[True], [False]]))
+    assert arrayOfFields[0] == pytest.approx(test_PointMagneticField.GenerateField(test_Particle2))
+    assert arrayOfFields[1].tolist() == [0.0, 0.0, 0.0]
+
+def test_GenerateWeightedFields():
+    # checks that a macro-particle generates the fields of its weight multiplied by its charge
+    test_MacroParticle = Particle(position=np.array([10, 100, 1000]), velocity=np.array([1e6, 1.5e6, 2e6])
+    , name='test_Macro Particle', restMass=3.0, charge=7.0, weight=2.5)
+    assert test_MacroParticle.electricField.GenerateField(test_Particle2) == pytest.approx(
+        2.5 * test_PointElectricField.GenerateField(test_Particle2), rel=1e-12)
+    assert test_MacroParticle.magneticField.GenerateField(test_Particle2) == pytest.approx(
+        2.5 * test_PointMagneticField.GenerateField(test_Particle2), rel=1e-12)
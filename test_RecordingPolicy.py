@@ -0,0 +1,145 @@
+from RecordingPolicy import RecordingPolicyClass
+from TrajectoryRecorder import TrajectoryRecorderClass, LoadTrajectoryColumn
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
+from ParticleBunchClass import ParticleBunch
+from SumEMFields import EMFieldClass
+from SimulationStandard import SimulationStandardClass
+from SimulationConservationLaws import SimulationConservationLawsClass
+
+import scipy.constants as const
+import scipy
+import numpy as np
+import pytest
+import re
+from copy import deepcopy
+
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([1e5, 0, 0])
+, listOfDimensions=[[-0.5, 0.5], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+, angularFrequency=1e-7 * const.elementary_charge / const.proton_mass
+, phaseShift=0.0, name='test_Electric Field')
+
+test_MagneticField = MagneticExternalFieldClass(magneticFieldStrength=np.array([0, 1e-7, 0])
+, name='test_Magnetic Field', angularFrequency=0.0, phaseShift=0.0
+, listOfDimensions=[[-1*scipy.inf, scipy.inf] for i in range(3)])
+
+test_ParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch
+, listOfElectricFields=[test_ElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_Simulation = SimulationStandardClass(totalEMField=test_EMField, particleBunch=test_ParticleBunch
+, duration=1e-2, largeTimestep=1e-4, smallTimestep=1e-4)
+
+test_ConservationParticleBunch = ParticleBunch(numberOfParticles=2, bunchEnergySpread=0.0
+, bunchMeanEnergy=1.5032775928961087e-10, restMassOfBunch=const.proton_mass
+, chargeOfBunch=const.elementary_charge, bunchPositionMean=0.5e-2, bunchPositionSpread=1e-4
+, name="test_Proton")
+
+test_ConservationEMField = EMFieldClass(bunchOfParticles=test_ConservationParticleBunch, listOfElectricFields=[]
+, listOfMagneticFields=[], name="test_Conservation EM Field")
+
+test_ConservationSimulation = SimulationConservationLawsClass(totalEMField=test_ConservationEMField
+, particleBunch=test_ConservationParticleBunch, duration=1e-5, largeTimestep=1e-7, spaceResolution=1
+, recordingPolicy=RecordingPolicyClass(stepInterval=25))
+
+def IsLeavingField(simulation, timeElapsed, timestep):
+    # event function that records the steps where the bunch has moved more than 500 km along x
+    return simulation.particleBunch.FindBunchMeanPosition()[0] > 5e5
+
+def IsThirdOrFifthSecond(simulation, timeElapsed, timestep):
+    # event function that records the steps at 3 s and 5 s
+    return timeElapsed in [3.0, 5.0]
+
+def test_RecordingPolicy__repr__():
+    # checks the repr function works
+    test_RecordingPolicy = RecordingPolicyClass(stepInterval=3, name='test_Policy')
+    assert re.findall("Recording Policy: test_Policy, Step Interval: 3", test_RecordingPolicy.__repr__()) == [
+        "Recording Policy: test_Policy, Step Interval: 3"]
+
+def test_StepInterval():
+    # checks that every third step is recorded, and that every step is recorded by default
+    test_RecordingPolicy = RecordingPolicyClass(stepInterval=3)
+    assert [test_RecordingPolicy.IsRecordingStep(None, i * 0.1, 0.1) for i in range(7)] == [True, False, False
+    , True, False, False, True]
+    test_DefaultPolicy = RecordingPolicyClass()
+    assert all(test_DefaultPolicy.IsRecordingStep(None, i * 0.1, 0.1) for i in range(7))
+
+def test_TimeInterval():
+    # checks that the first step at or after each multiple of the time interval is recorded
+    test_RecordingPolicy = RecordingPolicyClass(timeInterval=1.0)
+    times = [0.0, 0.4, 0.8, 1.2, 1.6, 2.0, 2.4, 3.5]
+    assert [test_RecordingPolicy.IsRecordingStep(None, i, 0.4) for i in times] == [True, False, False, True
+    , False, True, False, True]
+
+def test_MaximumRecords():
+    # checks that the history is halved when it is full, and that records are then made half as often
+    test_RecordingPolicy = RecordingPolicyClass(stepInterval=1, maximumRecords=4)
+    history = []
+    for i in range(12):
+        if test_RecordingPolicy.IsRecordingStep(None, float(i), 1.0):
+            history.append(i)
+            test_RecordingPolicy.CountRecord([history])
+    assert history == [0, 4, 8]
+    assert test_RecordingPolicy.stepInterval == 4 and test_RecordingPolicy.numberOfHalvings == 2
+    test_RecordingPolicy.Reset()
+    assert test_RecordingPolicy.stepInterval == 1 and test_RecordingPolicy.numberOfRecords == 0
+
+def test_MaximumRecordsKeepsEvents():
+    # checks that halving the history only removes records made by the step interval, and keeps every
+    # record made by the event function
+    test_RecordingPolicy = RecordingPolicyClass(stepInterval=1, eventFunction=IsThirdOrFifthSecond
+    , maximumRecords=4)
+    history = []
+    for i in range(12):
+        if test_RecordingPolicy.IsRecordingStep(None, float(i), 1.0):
+            history.append(i)
+            test_RecordingPolicy.CountRecord([history])
+    assert history == [0, 3, 5]
+    assert test_RecordingPolicy.listOfIsEventRecords == [False, True, True]
+
+def test_MaximumRecordsWithRecorder(tmp_path):
+    # checks that with a trajectory recorder the records already written are kept, and records are then
+    # made less often, so there are far fewer records than steps
+    test_BudgetSimulation = deepcopy(test_Simulation)
+    test_BudgetSimulation.recordingPolicy = RecordingPolicyClass(stepInterval=1, maximumRecords=20)
+    test_BudgetSimulation.RunSimulation()
+    test_RecordedSimulation = deepcopy(test_Simulation)
+    test_RecordedSimulation.recordingPolicy = RecordingPolicyClass(stepInterval=1, maximumRecords=20)
+    test_RecordedSimulation.trajectoryRecorder = TrajectoryRecorderClass(str(tmp_path), chunkSize=16)
+    test_RecordedSimulation.RunSimulation()
+    recordedTimes = LoadTrajectoryColumn(str(tmp_path), 'Time').tolist()
+    assert test_RecordedSimulation.recordingPolicy.numberOfHalvings > 0
+    assert len(recordedTimes) < 50
+    assert set(test_BudgetSimulation.simulationTime) <= set(recordedTimes)
+
+def test_StandardRecordingPolicies():
+    # runs the standard simulation with every step recorded, with a time interval and memory budget, and
+    # on an event, and checks the recorded histories against each other
+    test_FullSimulation = deepcopy(test_Simulation)
+    test_FullSimulation.RunSimulation()
+    test_BudgetSimulation = deepcopy(test_Simulation)
+    test_BudgetSimulation.recordingPolicy = RecordingPolicyClass(timeInterval=1e-3, maximumRecords=4)
+    test_BudgetSimulation.RunSimulation()
+    test_EventSimulation = deepcopy(test_Simulation)
+    test_EventSimulation.recordingPolicy = RecordingPolicyClass(eventFunction=IsLeavingField)
+    test_EventSimulation.RunSimulation()
+
+    # the first timestep is shortened to 1e-5 s to stay below the speed of light, so the records of
+    # the time interval are made at 1e-5 s after each multiple of 4e-3 s
+    assert test_BudgetSimulation.simulationTime == pytest.approx([0.0, 4.01e-3, 8.01e-3], rel=1e-6)
+    assert len(test_BudgetSimulation.simulationState) == len(test_BudgetSimulation.simulationSpread) == 3
+    fullIndex = test_FullSimulation.simulationTime.index(test_BudgetSimulation.simulationTime[2])
+    assert test_BudgetSimulation.simulationState[2][0].position.tolist() == (
+        test_FullSimulation.simulationState[fullIndex][0].position.tolist())
+    assert 0 < len(test_EventSimulation.simulationTime) < len(test_FullSimulation.simulationTime)
+    assert np.mean([i.position[0] for i in test_EventSimulation.simulationState[0]]) > 5e5
+
+def test_ConservationRecordingPolicy():
+    # checks that the conservation law simulation records every 25th of its 100 steps
+    test_ConservationSimulation.RunSimulation()
+    assert test_ConservationSimulation.simulationTime == pytest.approx([0.0, 2.5e-6, 5e-6, 7.5e-6], rel=1e-6)
+    assert len(test_ConservationSimulation.simulationEnergyFields) == 4
@@ -0,0 +1,97 @@
+from SimulationFork import SimulationForkClass, RunToForkTime
+from ParameterSweep import MeasureFinalBunch
+from TrajectoryRecorder import TrajectoryRecorderClass, LoadTrajectoryColumn
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
+from ParticleBunchClass import ParticleBunch
+from SumEMFields import EMFieldClass
+from SimulationStandard import SimulationStandardClass
+from SimulationConservationLaws import SimulationConservationLawsClass
+
+import scipy.constants as const
+import scipy
+import numpy as np
+import pytest
+import re
+from copy import deepcopy
+
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([1e5, 0, 0])
+, listOfDimensions=[[-0.5, 0.5], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+, angularFrequency=1e-7 * const.elementary_charge / const.proton_mass
+, phaseShift=0.0, name='test_Electric Field')
+
+test_MagneticField = MagneticExternalFieldClass(magneticFieldStrength=np.array([0, 1e-7, 0])
+, name='test_Magnetic Field', angularFrequency=0.0, phaseShift=0.0
+, listOfDimensions=[[-1*scipy.inf, scipy.inf] for i in range(3)])
+
+test_ParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch
+, listOfElectricFields=[test_ElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_Simulation = SimulationStandardClass(totalEMField=test_EMField, particleBunch=test_ParticleBunch
+, duration=1e-2, largeTimestep=1e-4, smallTimestep=1e-4)
+
+test_ListOfOverrides = [{}, {'totalEMField.listOfMagneticFields[0].fieldStrength[1]':2e-7}
+, {'totalEMField.listOfMagneticFields[0].fieldStrength[1]':5e-8}]
+
+def test_SimulationFork__repr__():
+    # checks the repr function works
+    test_Fork = SimulationForkClass(b'', test_ListOfOverrides, name='test_Fork')
+    assert re.findall("Simulation Fork: test_Fork, Number of Branches: 3", test_Fork.__repr__()) == [
+        "Simulation Fork: test_Fork, Number of Branches: 3"]
+
+def test_OnlyStandardSimulationsFork():
+    # checks that a simulation that can not be paused and resumed is refused before it is run
+    test_ConservationBunch = deepcopy(test_ParticleBunch)
+    test_ConservationSimulation = SimulationConservationLawsClass(totalEMField=EMFieldClass(
+    bunchOfParticles=test_ConservationBunch, listOfElectricFields=[], listOfMagneticFields=[]
+    , name='test_Clear EM Field'), particleBunch=test_ConservationBunch, duration=1e-5, largeTimestep=1e-7)
+    with pytest.raises(TypeError):
+        RunToForkTime(test_ConservationSimulation, 5e-6)
+    test_Fork = SimulationForkClass(test_ConservationSimulation.CreateCheckpoint(0.0), [{}])
+    with pytest.raises(TypeError):
+        test_Fork.RunBranches()
+    assert test_ConservationSimulation.simulationTime == []
+
+def test_RunToForkTime():
+    # checks that a branch without changes ends in the same state as a simulation that was never split
+    test_ReferenceSimulation = deepcopy(test_Simulation)
+    test_ReferenceSimulation.RunSimulation()
+    test_Checkpoint = RunToForkTime(deepcopy(test_Simulation), 5e-3)
+    test_Fork = SimulationForkClass(test_Checkpoint, [{}])
+    resultTable = test_Fork.RunBranches()
+    assert resultTable.FinalMeanX[0] == MeasureFinalBunch(test_ReferenceSimulation)['FinalMeanX']
+    assert resultTable.FinalEnergySpread[0] == MeasureFinalBunch(test_ReferenceSimulation)['FinalEnergySpread']
+
+def test_ParallelBranches():
+    # runs the branches one after another and across a pool of processes, and checks that the results
+    # are the same, and that changing the magnetic field at the fork changes the result
+    test_Checkpoint = RunToForkTime(deepcopy(test_Simulation), 5e-3)
+    test_SerialFork = SimulationForkClass(test_Checkpoint, test_ListOfOverrides)
+    test_ParallelFork = SimulationForkClass(test_Checkpoint, test_ListOfOverrides, numberOfWorkers=2)
+    test_SerialFork.RunBranches()
+    test_ParallelFork.RunBranches()
+    assert test_ParallelFork.resultTable.Branch.tolist() == [0, 1, 2]
+    assert test_ParallelFork.resultTable.FinalMeanX.tolist() == test_SerialFork.resultTable.FinalMeanX.tolist()
+    assert len(set(test_ParallelFork.resultTable.FinalMeanX)) == 3
+
+def test_RecordedBranches(tmp_path):
+    # checks that each branch continues its own copy of the recording made before the fork
+    test_ReferenceSimulation = deepcopy(test_Simulation)
+    test_ReferenceSimulation.trajectoryRecorder = TrajectoryRecorderClass(str(tmp_path / 'reference'), chunkSize=16)
+    test_ReferenceSimulation.RunSimulation()
+    test_RecordedSimulation = deepcopy(test_Simulation)
+    test_RecordedSimulation.trajectoryRecorder = TrajectoryRecorderClass(str(tmp_path / 'recorded'), chunkSize=16)
+    test_Fork = SimulationForkClass(RunToForkTime(test_RecordedSimulation, 5e-3), test_ListOfOverrides[:2])
+    test_Fork.RunBranches()
+
+    referencePositions = LoadTrajectoryColumn(str(tmp_path / 'reference'), 'Positions')
+    branchPositions = LoadTrajectoryColumn(str(tmp_path / 'recorded branch 1'), 'Positions')
+    assert np.array_equal(LoadTrajectoryColumn(str(tmp_path / 'recorded branch 0'), 'Positions'), referencePositions)
+    assert branchPositions.shape == referencePositions.shape
+    assert np.array_equal(branchPositions[:50], referencePositions[:50])
+    assert not np.array_equal(branchPositions[-1], referencePositions[-1])
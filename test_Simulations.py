@@ -6,6 +6,10 @@ from Plotting import PlottingClass
 from SimulationPhaseChange import SimulationPhaseChangeClass
 from SimulationStandard import SimulationStandardClass
 from SimulationConservationLaws import SimulationConservationLawsClass
+from BorisIntegrator import BorisIntegratorClass
+from TimestepController import TimestepControllerClass
+from ExactGyration import ExactGyrationClass
+from MagneticSynchrotronField import MagneticSynchrotronFieldClass
 
 import scipy.constants as const
 import scipy
@@ -60,6 +64,77 @@ test_Simulation2 = SimulationPhaseChangeClass(listOfPhaseChangingFields=[test_El
 , phaseResolution=12, totalEMField=test_EMField, particleBunch=test_ParticleBunch2
 , duration=1, largeTimestep=1e-3, smallTimestep= 1e-6)
 
+test_ParallelParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_ParallelElectricField = deepcopy(test_ElectricField)
+
+test_ParallelEMField = EMFieldClass(bunchOfParticles=test_ParallelParticleBunch
+, listOfElectricFields=[test_ParallelElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_ParallelSimulation = SimulationPhaseChangeClass(listOfPhaseChangingFields=[test_ParallelElectricField]
+, phaseResolution=4, totalEMField=test_ParallelEMField, particleBunch=test_ParallelParticleBunch
+, duration=0.2, largeTimestep=1e-3, smallTimestep= 1e-6, numberOfWorkers=2)
+
+# copy of the phase change simulation that runs every phase shift at the same time
+test_BatchedSimulation = deepcopy(test_ParallelSimulation)
+test_BatchedSimulation.numberOfWorkers = 1
+test_BatchedSimulation.batchPhases = True
+
+def CreateBatchedSimulation(isSynchrotron:bool=False):
+    # a short phase change simulation that runs every phase shift at the same time, with a bunch,
+    # fields and copies of its own
+    particleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+    , chargeOfBunch=const.elementary_charge, name='test_Particle Bunch')
+    electricField = deepcopy(test_ElectricField)
+    magneticField = deepcopy(test_MagneticField)
+    if isSynchrotron:
+        magneticField = MagneticSynchrotronFieldClass(magneticFieldStrength=np.array([0, 1e-7, 0])
+        , name='test_Magnetic Synchrotron Field', particleBunch=particleBunch)
+    emField = EMFieldClass(bunchOfParticles=particleBunch, listOfElectricFields=[electricField]
+    , listOfMagneticFields=[magneticField], name='test_EM Field')
+    return SimulationPhaseChangeClass(listOfPhaseChangingFields=[electricField], phaseResolution=4
+    , totalEMField=emField, particleBunch=particleBunch, duration=0.05, largeTimestep=1e-3
+    , smallTimestep=1e-6, batchPhases=True)
+
+test_BorisParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_BorisEMField = EMFieldClass(bunchOfParticles=test_BorisParticleBunch
+, listOfElectricFields=[test_ElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_BorisSimulation = SimulationStandardClass(totalEMField=test_BorisEMField
+, particleBunch=test_BorisParticleBunch, duration=1, largeTimestep=1e-3, smallTimestep=1e-6, integrator=BorisIntegratorClass())
+
+test_ControlledParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_ControlledEMField = EMFieldClass(bunchOfParticles=test_ControlledParticleBunch
+, listOfElectricFields=[test_ElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_ControlledSimulation = SimulationStandardClass(totalEMField=test_ControlledEMField
+, particleBunch=test_ControlledParticleBunch, duration=1, largeTimestep=1e-3, smallTimestep=1e-6
+, timestepController=TimestepControllerClass(maximumTimestep=1e-3, minimumTimestep=1e-9))
+
+test_GyrationParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_GyrationEMField = EMFieldClass(bunchOfParticles=test_GyrationParticleBunch
+, listOfElectricFields=[test_ElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_GyrationSimulation = SimulationStandardClass(totalEMField=test_GyrationEMField
+, particleBunch=test_GyrationParticleBunch, duration=1, largeTimestep=1e-3, smallTimestep=1e-6
+, integrator=BorisIntegratorClass(), exactGyration=ExactGyrationClass(), recordingInterval=0.05)
+
 test_Simulation3 = SimulationConservationLawsClass(totalEMField=test_ClearEMField, particleBunch=test_ParticleBunch3
 , duration=1e-5, largeTimestep=1e-7, spaceResolution=1)
 
@@ -71,6 +146,51 @@ def test_StandardRunSimulation():
     for i in range(test_ParticleBunch.numberOfParticles)])
     assert meanXPosition == pytest.approx(-174640, rel=0.01)
     
+def test_BorisRunSimulation():
+    # Runs the standard simulation with the boris method and checks the final position and speed of the particles.
+    # Unlike the euler cromer method, the speed does not grow while the particles circle in the magnetic field.
+    # Runs with timesteps 8 times shorter end within 0.05% of this position
+    test_BorisSimulation.RunSimulation()
+    meanXPosition = stats.mean([test_BorisParticleBunch.listOfParticles[i].position[0] 
+    for i in range(test_BorisParticleBunch.numberOfParticles)])
+    assert meanXPosition == pytest.approx(-148560, rel=0.01)
+    assert np.linalg.norm(test_BorisParticleBunch.arrayOfVelocities, axis=1) == pytest.approx(9.5749e6, rel=1e-3)
+
+def test_PushMethodAlias():
+    # checks that the deprecated pushMethod argument still picks the matching integrator
+    with pytest.warns(DeprecationWarning):
+        test_AliasSimulation = SimulationStandardClass(totalEMField=test_BorisEMField
+        , particleBunch=test_BorisParticleBunch, pushMethod='Boris')
+    assert isinstance(test_AliasSimulation.integrator, BorisIntegratorClass)
+    with pytest.raises(ValueError):
+        SimulationStandardClass(totalEMField=test_BorisEMField, particleBunch=test_BorisParticleBunch
+        , pushMethod='Leapfrog')
+    with pytest.raises(ValueError):
+        SimulationStandardClass(totalEMField=test_BorisEMField, particleBunch=test_BorisParticleBunch
+        , integrator=BorisIntegratorClass(), pushMethod='Cromer')
+
+def test_GyrationRunSimulation():
+    # Runs the standard simulation with exact gyration outside the accelerating electric field. The boris
+    # method approaches the final position as its timestep is made shorter (-149580 m for a timestep of
+    # 1e-4 s), and the bunch is recorded at least every 0.05 s with far fewer timesteps
+    test_GyrationSimulation.RunSimulation()
+    meanXPosition = np.mean(test_GyrationParticleBunch.arrayOfPositions[:, 0])
+    assert meanXPosition == pytest.approx(-148620, rel=1e-3)
+    assert np.linalg.norm(test_GyrationParticleBunch.arrayOfVelocities, axis=1) == pytest.approx(9.5749e6, rel=1e-3)
+    assert np.max(np.diff(test_GyrationSimulation.simulationTime)) <= 0.05 + 1e-12
+    assert len(test_GyrationSimulation.simulationTime) < 50
+
+def test_ControlledRunSimulation():
+    # Runs the standard simulation with a timestep controller. The first timestep ends as the particles
+    # leave the accelerating electric field, which takes sqrt(2 * 0.5 m / a) for a proton at rest
+    test_ControlledSimulation.RunSimulation()
+    timestepHistory = test_ControlledSimulation.timestepController.ReportTimestepHistory()
+    exitTime = (2 * 0.5 * const.proton_mass / (const.elementary_charge * 1e5))**0.5
+    assert timestepHistory.Timestep[0] == pytest.approx(exitTime, rel=0.01)
+    assert timestepHistory.Limit[0] == 'region'
+    assert len(timestepHistory) == len(test_ControlledSimulation.simulationTime)
+    assert sum(timestepHistory.Timestep) == pytest.approx(1.0, rel=0.01)
+
 def test_StandardSaveSimulation():
     # Checks if the simulation data is being saved correctly
     assert test_Simulation.simulationTime[1] == 1e-6
@@ -98,6 +218,63 @@ def test_PhaseChangeSaveSimulation():
     assert test_Simulation2.simulationPhaseShift[-1] == 1.08333
     assert minimumSpreadList == [2,8]
 
+def test_PhaseChangeParallelRunSimulation():
+    # Runs the phase change simulation across a process pool and checks that the results are gathered
+    # in phase order and are the same as those of a serial run from the same initial bunch
+    test_SerialSimulation = deepcopy(test_ParallelSimulation)
+    test_SerialSimulation.numberOfWorkers = 1
+    test_SerialSimulation.RunSimulation()
+    test_ParallelSimulation.RunSimulation()
+    assert test_ParallelSimulation.simulationPhaseShift == [0.25, 0.5, 0.75, 1.0, 1.25]
+    assert test_ParallelSimulation.simulationFinalSpread == test_SerialSimulation.simulationFinalSpread
+    assert test_ParallelSimulation.listOfPhaseChangingFields[0].phaseShift == 1.0
+
+def test_PhaseChangeBatchedRunSimulation():
+    # Runs every phase shift of the phase change simulation at the same time and checks that the results
+    # are the same as those of a serial run, and that the bunch is left in its initial state
+    test_SerialSimulation = deepcopy(test_BatchedSimulation)
+    test_SerialSimulation.batchPhases = False
+    initialPositions = test_BatchedSimulation.particleBunch.arrayOfPositions.copy()
+    test_SerialSimulation.RunSimulation()
+    test_BatchedSimulation.RunSimulation()
+    assert test_BatchedSimulation.simulationPhaseShift == [0.25, 0.5, 0.75, 1.0, 1.25]
+    assert test_BatchedSimulation.simulationFinalSpread == pytest.approx(test_SerialSimulation.simulationFinalSpread
+    , rel=1e-9, abs=0.0)
+    assert np.array_equal(test_BatchedSimulation.particleBunch.arrayOfPositions, initialPositions)
+
+def test_PhaseChangeBatchedUnsupported():
+    # checks that batched phases are refused for a simulation that RunPhase would move differently
+    test_ControlledBatchedSimulation = deepcopy(test_BatchedSimulation)
+    test_ControlledBatchedSimulation.timestepController = TimestepControllerClass()
+    with pytest.raises(ValueError):
+        test_ControlledBatchedSimulation.RunBatchedPhases()
+
+def test_PhaseChangeBatchedWeights():
+    # checks that the batched phases count each macro-particle as its weight, in the same way as a
+    # serial run, when the weights of the particles are different
+    test_WeightedSimulation = CreateBatchedSimulation()
+    test_WeightedSimulation.particleBunch.arrayOfWeights[:] = np.array([1.0, 4.0, 0.5])
+    test_SerialSimulation = deepcopy(test_WeightedSimulation)
+    test_SerialSimulation.batchPhases = False
+    test_WeightedSimulation.RunSimulation()
+    test_SerialSimulation.RunSimulation()
+    # the spreads are far smaller than the default absolute tolerance of approx
+    assert test_WeightedSimulation.simulationFinalSpread == pytest.approx(test_SerialSimulation.simulationFinalSpread
+    , rel=1e-9, abs=0.0)
+
+def test_PhaseChangeBatchedSynchrotronField():
+    # checks that a synchrotron magnetic field, which follows the state of the bunch, is not batched,
+    # and that the simulation is run one phase after another instead
+    test_SynchrotronSimulation = CreateBatchedSimulation(isSynchrotron=True)
+    test_SerialSimulation = deepcopy(test_SynchrotronSimulation)
+    test_SerialSimulation.batchPhases = False
+    assert test_SynchrotronSimulation.CanBatchPhases() == False
+    with pytest.raises(ValueError):
+        deepcopy(test_SynchrotronSimulation).RunBatchedPhases()
+    test_SynchrotronSimulation.RunSimulation()
+    test_SerialSimulation.RunSimulation()
+    assert test_SynchrotronSimulation.simulationFinalSpread == test_SerialSimulation.simulationFinalSpread
+
 def test_CreateListOfPositions():
     # checks that the list of positions is updated correctly
     assert test_Simulation3.listOfPositions[1].tolist() == [0.0, 0.0, 0.001]
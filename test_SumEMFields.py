@@ -38,3 +38,12 @@ def test_GiveAcceleration():
     test_EMField.GiveAcceleration(particleBunch=test_ParticleBunch, timeElapsed=1.0)
     assert test_ParticleBunch.listOfParticles[0].acceleration == pytest.approx(
         np.array([-1.1489979e+35, -1.1489979e+35, -1.1489979e+35]), rel=0.01)
+
+
+def test_SumOfEMFieldsForBunch():
+    # checks that the fields for the whole bunch match the fields found for each particle
+    arrayOfFields = test_EMField.SumOfEMFieldsForBunch(particleBunch=test_ParticleBunch, timeElapsed=1.0)
+    for i in range(2):
+        fields = test_EMField.SumOfEMFields(affectedParticle=test_ParticleBunch.listOfParticles[i], timeElapsed=1.0)
+        assert arrayOfFields[0][i] == pytest.approx(fields[0])
+        assert arrayOfFields[1][i] == pytest.approx(fields[1])
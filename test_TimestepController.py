@@ -0,0 +1,92 @@
+from ParticleBunchClass import ParticleBunch
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
+from SumEMFields import EMFieldClass
+from TimestepController import TimestepControllerClass
+
+import numpy as np
+import scipy.constants as const
+import scipy
+import pytest
+import re
+
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([0, 0, 0])
+, listOfDimensions=[[-0.5, 0.5], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+, angularFrequency=10.0, phaseShift=0.0, name='test_Electric Field')
+
+test_MagneticField = MagneticExternalFieldClass(magneticFieldStrength=np.array([0, 1e-3, 0])
+, name='test_Magnetic Field', angularFrequency=0.0, phaseShift=0.0
+, listOfDimensions=[[-1*scipy.inf, scipy.inf] for i in range(3)])
+
+test_ParticleBunch = ParticleBunch(numberOfParticles=1, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+, chargeOfBunch=const.elementary_charge, name="test_Bunch")
+
+test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch, listOfElectricFields=[test_ElectricField]
+, listOfMagneticFields=[test_MagneticField])
+
+test_TimestepController = TimestepControllerClass(maximumTimestep=1.0, minimumTimestep=1e-9
+, stepsPerPeriod=50, name='test_Timestep Controller')
+
+def test_TimestepController__repr__():
+    # checks the repr function works
+    assert re.findall("Timestep Controller: test_Timestep Controller", test_TimestepController.__repr__()) == [
+        "Timestep Controller: test_Timestep Controller"]
+
+def test_FindGyrationTimestep():
+    # checks that the timestep is a fiftieth of the cyclotron period of a slow proton
+    cyclotronPeriod = 2 * const.pi * const.proton_mass / (const.elementary_charge * 1e-3)
+    assert test_TimestepController.FindGyrationTimestep(test_ParticleBunch
+    , np.array([[0, 1e-3, 0]])) == pytest.approx(cyclotronPeriod / 50, rel=1e-6)
+
+def test_FindOscillationTimestep():
+    # checks that the timestep is a fiftieth of the period of the oscillating electric field
+    assert test_TimestepController.FindOscillationTimestep(test_EMField) == pytest.approx(
+        2 * const.pi / 10.0 / 50)
+
+def test_FindRegionTimestep():
+    # checks the time taken for a proton at the origin moving at 1000 m/s to reach the edge of the field
+    assert test_TimestepController.FindRegionTimestep(test_ParticleBunch, test_EMField
+    , np.zeros((1, 3))) == pytest.approx(0.5 / 1000, rel=1e-4)
+    # and that a constant acceleration shortens this time
+    assert test_TimestepController.FindRegionTimestep(test_ParticleBunch, test_EMField
+    , np.array([[1e6, 0, 0]])) < 0.5 / 1000
+
+def test_FindTimestep():
+    # checks that the shortest limit, which is the cyclotron period, is used and recorded with the timestep
+    cyclotronPeriod = 2 * const.pi * const.proton_mass / (const.elementary_charge * 1e-3)
+    timestep = test_TimestepController.FindTimestep(test_ParticleBunch, test_EMField, timeElapsed=0.0)
+    assert timestep == pytest.approx(cyclotronPeriod / 50, rel=1e-6)
+    assert test_TimestepController.lastLimit == 'gyration'
+    test_TimestepController.RecordTimestep(test_ParticleBunch, 0.0, timestep)
+    assert test_TimestepController.ReportTimestepHistory().Limit.tolist() == ['gyration']
+
+def test_FindErrorTimestep():
+    # checks that a large change in acceleration between timesteps makes the next timestep shorter
+    test_Controller = TimestepControllerClass()
+    test_Bunch = ParticleBunch(numberOfParticles=1, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, name="test_Bunch")
+    test_Controller.RecordTimestep(test_Bunch, 0.0, 1e-3)
+    assert test_Controller.FindErrorTimestep(test_Bunch) == scipy.inf
+    test_Bunch.arrayOfAccelerations[0] = np.array([1e4, 0, 0])
+    test_Controller.RecordTimestep(test_Bunch, 1e-3, 1e-3)
+    # the velocity error of 5 m/s is 5 times the tolerance of about 1 m/s, and the error falls with
+    # the square of the timestep
+    assert test_Controller.FindErrorTimestep(test_Bunch) == pytest.approx(0.9e-3 / 5**0.5, rel=1e-3)
+
+def test_FindParticleTimesteps():
+    # checks that a fast proton inside the field region is limited by the region and a slow proton by
+    # the gyration, and that the timestep of the bunch is the shortest of these
+    test_Bunch = ParticleBunch(numberOfParticles=2, bunchPositionSpread=0.0, bunchEnergySpread=0.0
+    , bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass
+    , chargeOfBunch=const.elementary_charge, name="test_Bunch")
+    test_Bunch.arrayOfVelocities[1] = np.array([1e6, 0, 0])
+    test_Field = EMFieldClass(bunchOfParticles=test_Bunch, listOfElectricFields=[test_ElectricField]
+    , listOfMagneticFields=[test_MagneticField])
+    test_Controller = TimestepControllerClass(maximumTimestep=1.0, minimumTimestep=1e-9, stepsPerPeriod=50)
+    particleTimesteps, arrayOfLimits = test_Controller.FindParticleTimesteps(test_Bunch, test_Field, 0.0
+    , arrayOfIndices=np.array([0, 1]))
+    assert arrayOfLimits.tolist() == ['gyration', 'region']
+    assert particleTimesteps[1] < particleTimesteps[0]
+    assert test_Controller.FindTimestep(test_Bunch, test_Field, 0.0) == pytest.approx(particleTimesteps[1])
+    assert test_Controller.lastLimit == 'region'
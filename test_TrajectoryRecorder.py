@@ -0,0 +1,106 @@
+from TrajectoryRecorder import TrajectoryRecorderClass, LoadTrajectoryColumn
+from ElectricExternalField import ElectricExternalFieldClass
+from MagneticExternalField import MagneticExternalFieldClass
+from ParticleBunchClass import ParticleBunch
+from SumEMFields import EMFieldClass
+from SimulationStandard import SimulationStandardClass
+from ColumnarResults import ColumnarResultsClass
+
+import scipy.constants as const
+import scipy
+import numpy as np
+import pytest
+import json
+import os
+import re
+from copy import deepcopy
+
+test_ElectricField = ElectricExternalFieldClass(electricFieldStrength=np.array([1e5, 0, 0])
+, listOfDimensions=[[-0.5, 0.5], [-1 * scipy.inf, scipy.inf], [-1 * scipy.inf, scipy.inf]]
+, angularFrequency=1e-7 * const.elementary_charge / const.proton_mass
+, phaseShift=0.0, name='test_Electric Field')
+
+test_MagneticField = MagneticExternalFieldClass(magneticFieldStrength=np.array([0, 1e-7, 0])
+, name='test_Magnetic Field', angularFrequency=0.0, phaseShift=0.0
+, listOfDimensions=[[-1*scipy.inf, scipy.inf] for i in range(3)])
+
+test_ParticleBunch = ParticleBunch(numberOfParticles=3, bunchEnergySpread=1e-22, bunchPositionSpread=1e-3
+, bunchMeanEnergy=1.5032775929044686e-10, restMassOfBunch=const.proton_mass, chargeOfBunch=const.elementary_charge
+, name='test_Particle Bunch')
+
+test_EMField = EMFieldClass(bunchOfParticles=test_ParticleBunch
+, listOfElectricFields=[test_ElectricField], listOfMagneticFields=[test_MagneticField]
+, name='test_EM Field')
+
+test_Simulation = SimulationStandardClass(totalEMField=test_EMField, particleBunch=test_ParticleBunch
+, duration=1e-2, largeTimestep=1e-4, smallTimestep=1e-4)
+
+def test_TrajectoryRecorder__repr__(tmp_path):
+    # checks the repr function works
+    test_Recorder = TrajectoryRecorderClass(str(tmp_path), chunkSize=8, name='test_Recorder')
+    assert re.findall("Trajectory Recorder: test_Recorder", test_Recorder.__repr__()) == [
+        "Trajectory Recorder: test_Recorder"]
+
+def test_RecordChunks(tmp_path):
+    # records 20 states in chunks of 8, and checks that three chunks are written and joined in order
+    test_Recorder = TrajectoryRecorderClass(str(tmp_path), chunkSize=8)
+    for i in range(20):
+        test_ParticleBunch.arrayOfPositions[0, 0] = i
+        test_Recorder.Record(i * 0.5, test_ParticleBunch)
+    assert test_Recorder.numberOfChunks == 2
+    test_Recorder.Flush()
+    with open(os.path.join(str(tmp_path), 'metadata.json')) as metadataFile:
+        assert json.load(metadataFile)['numberOfChunks'] == 3
+    test_Recorder.Close()
+
+    # closing the recorder joins the chunks of each column into one file
+    with open(os.path.join(str(tmp_path), 'metadata.json')) as metadataFile:
+        metadata = json.load(metadataFile)
+    assert metadata['numberOfRecords'] == 20 and metadata['numberOfChunks'] == 0
+    assert metadata['listOfParticleNames'][0] == 'test_Particle Bunch 1'
+    assert LoadTrajectoryColumn(str(tmp_path), 'Time').tolist() == [i * 0.5 for i in range(20)]
+    positions = LoadTrajectoryColumn(str(tmp_path), 'Positions')
+    assert positions.shape == (20, 3, 3)
+    assert positions[:, 0, 0].tolist() == list(range(20))
+    energies = LoadTrajectoryColumn(str(tmp_path), 'Energies')
+    assert energies[-1, 1] == pytest.approx(test_ParticleBunch.listOfParticles[1].TotalEnergy(), rel=1e-12)
+
+def test_RecorderOverwrite(tmp_path):
+    # checks that an earlier recording is only replaced when overwrite is True
+    test_Recorder = TrajectoryRecorderClass(str(tmp_path), chunkSize=8)
+    test_Recorder.Record(0.0, test_ParticleBunch)
+    test_Recorder.Close()
+    with pytest.raises(FileExistsError):
+        TrajectoryRecorderClass(str(tmp_path), overwrite=False)
+    TrajectoryRecorderClass(str(tmp_path))
+    assert os.listdir(str(tmp_path)) == []
+
+def test_StandardSimulationRecorder(tmp_path):
+    # runs the same simulation with and without a recorder, and checks that the recorded history
+    # is the same as the history kept in memory
+    test_RecordedSimulation = deepcopy(test_Simulation)
+    test_RecordedSimulation.trajectoryRecorder = TrajectoryRecorderClass(str(tmp_path), chunkSize=16)
+    test_CopyOfSimulation = deepcopy(test_Simulation)
+    test_CopyOfSimulation.RunSimulation()
+    test_RecordedSimulation.RunSimulation()
+    assert test_RecordedSimulation.simulationState == []
+
+    positions = LoadTrajectoryColumn(str(tmp_path), 'Positions')
+    assert LoadTrajectoryColumn(str(tmp_path), 'Time').tolist() == test_CopyOfSimulation.simulationTime
+    assert LoadTrajectoryColumn(str(tmp_path), 'Spread').tolist() == test_CopyOfSimulation.simulationSpread
+    assert positions[-1, 2].tolist() == test_CopyOfSimulation.simulationState[-1][2].position.tolist()
+
+def test_SaveRecordedSimulation(tmp_path):
+    # checks that saving a recorded simulation in the columnar format copies the recording to the file
+    # name, and that saving it as a .pkl file warns that nothing is saved
+    test_RecordedSimulation = deepcopy(test_Simulation)
+    test_RecordedSimulation.trajectoryRecorder = TrajectoryRecorderClass(str(tmp_path / 'recording'), chunkSize=16)
+    test_RecordedSimulation.RunSimulation()
+    test_RecordedSimulation.SaveSimulation(str(tmp_path / 'saved'), fileFormat='columnar')
+    test_Results = ColumnarResultsClass(str(tmp_path / 'saved'))
+    assert test_Results.metadata['simulationType'] == 'SimulationStandardClass'
+    assert test_Results.metadata['listOfParticleNames'] == test_ParticleBunch.FindParticleNames()
+    assert test_Results.Positions.tolist() == LoadTrajectoryColumn(str(tmp_path / 'recording'), 'Positions').tolist()
+    with pytest.warns(UserWarning):
+        test_RecordedSimulation.SaveSimulation(str(tmp_path / 'pickled'))
+    assert not os.path.exists(str(tmp_path / 'pickled.pkl'))